@@ -0,0 +1,264 @@
+"""
+Envío de formularios en lote
+
+Un lote es una lista mixta de formularios form1–form4 recibida en un solo
+POST, como arreglo JSON o como NDJSON (un objeto por línea, leído en
+streaming). Cada elemento se valida con el modelo Pydantic de su formulario.
+Los inválidos se reportan sin rechazar el lote. Los válidos se encolan por
+tramos, cada tramo como un grupo de Celery publicado con un solo productor,
+y el registro del lote se escribe en Redis con un pipeline por tramo.
+
+Nada se encola hasta haber leído el lote completo: un lote que supera
+BATCH_MAX_ITEMS se rechaza entero (413), sin dejar elementos encolados.
+
+Formato de cada elemento:
+    {"form_type": "form2", "data": {...mismo JSON que POST /api/forms/form2...}}
+
+Claves en Redis:
+    batch:{id}        Hash con los metadatos del lote (creado, total, aceptados,
+                      rechazados) y sus contadores de progreso (app/batch_progress.py)
+    batch:{id}:tasks  Lista de task_ids de los elementos aceptados, en orden
+
+Configuración por variables de entorno:
+    BATCH_MAX_ITEMS: Elementos máximos por lote (default 10000)
+    BATCH_CHUNK_SIZE: Elementos por grupo de Celery y por pipeline (default 500)
+    BATCH_TTL: Segundos que se conserva el registro del lote (default 86400,
+               app/batch_progress.py)
+"""
+
+import json
+import os
+import time
+import uuid
+
+from celery import group
+from pydantic import ValidationError
+
+from app.batch_progress import PENDIENTES, TTL_LOTE, clave_lote
+from app.models import FORM_MODELS, BatchItem, BatchItemResult
+from app.queues import nombre_cola
+from app.redis_client import get_redis
+from app.tasks import execute_form_task
+
+
+MAX_ELEMENTOS = int(os.getenv('BATCH_MAX_ITEMS', '10000'))
+TAMANO_TRAMO = int(os.getenv('BATCH_CHUNK_SIZE', '500'))
+
+TIPOS_NDJSON = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+
+class LoteDemasiadoGrande(Exception):
+    """El lote supera BATCH_MAX_ITEMS"""
+
+
+def _errores_pydantic(error):
+    """Errores de validación en formato JSON serializable (sin el objeto `ctx`)"""
+    return [
+        {'loc': list(e['loc']), 'msg': e['msg'], 'type': e['type']}
+        for e in error.errors()
+    ]
+
+
+def validar_elemento(indice, crudo):
+    """
+    Valida un elemento del lote con el modelo de su formulario
+
+    Args:
+        indice (int): Posición del elemento en el lote
+        crudo: Objeto decodificado del JSON, o la excepción si no se pudo decodificar
+
+    Returns:
+        tuple: (BatchItemResult, datos normalizados o None si es inválido)
+    """
+    if isinstance(crudo, Exception):
+        return BatchItemResult(index=indice, errors=[
+            {'loc': [], 'msg': f"JSON inválido: {crudo}", 'type': 'json_invalid'}
+        ]), None
+
+    try:
+        elemento = BatchItem.model_validate(crudo)
+    except ValidationError as e:
+        return BatchItemResult(index=indice, errors=_errores_pydantic(e)), None
+
+    modelo = FORM_MODELS.get(elemento.form_type)
+    if modelo is None:
+        return BatchItemResult(index=indice, form_type=elemento.form_type, errors=[{
+            'loc': ['form_type'],
+            'msg': f"Tipo de formulario inválido. Opciones: {', '.join(FORM_MODELS)}",
+            'type': 'value_error',
+        }]), None
+
+    try:
+        datos = modelo.model_validate(elemento.data).model_dump()
+    except ValidationError as e:
+        errores = _errores_pydantic(e)
+        for error in errores:
+            error['loc'] = ['data'] + error['loc']
+        return BatchItemResult(index=indice, form_type=elemento.form_type, errors=errores), None
+
+    return BatchItemResult(index=indice, form_type=elemento.form_type), datos
+
+
+def elementos_json(cuerpo):
+    """
+    Elementos de un cuerpo con un arreglo JSON
+
+    Raises:
+        ValueError: Si el cuerpo no es un arreglo JSON
+    """
+    try:
+        elementos = json.loads(cuerpo)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"El cuerpo no es JSON válido: {e}")
+    if not isinstance(elementos, list):
+        raise ValueError("El cuerpo debe ser un arreglo JSON de formularios")
+    return elementos
+
+
+async def elementos_ndjson(fragmentos):
+    """
+    Elementos de un cuerpo NDJSON leído en streaming
+
+    Cada línea no vacía produce un objeto decodificado; una línea que no es
+    JSON válido produce la excepción, para reportarla como error del elemento.
+
+    Args:
+        fragmentos: Iterador asíncrono de bytes (p. ej. `request.stream()`)
+    """
+    pendiente = b''
+    async for fragmento in fragmentos:
+        pendiente += fragmento
+        *lineas, pendiente = pendiente.split(b'\n')
+        for linea in lineas:
+            if linea.strip():
+                yield _decodificar_linea(linea)
+    if pendiente.strip():
+        yield _decodificar_linea(pendiente)
+
+
+def _decodificar_linea(linea):
+    try:
+        return json.loads(linea)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        return e
+
+
+def registrar_lote(batch_id, aceptados):
+    """
+    Crea el registro de un lote de `aceptados` formularios ya validados
+
+    Lo usan las tareas en pestañas (`execute_form_tabs_task`): todos sus
+    formularios van en una tarea, pero cada uno cuenta en el progreso del lote.
+    """
+    pipe = get_redis().pipeline(transaction=False)
+    pipe.hset(clave_lote(batch_id), mapping={'creado': time.time(), 'total': aceptados, 'aceptados': aceptados,
+                                              'rechazados': 0})
+    pipe.hincrby(clave_lote(batch_id), PENDIENTES, aceptados)
+    pipe.expire(clave_lote(batch_id), TTL_LOTE)
+    pipe.execute()
+
+
+class EncoladorLote:
+    """
+    Valida y encola los elementos de un lote por tramos
+
+    Los elementos válidos esperan en memoria hasta `cerrar`, para que un lote
+    que supera el máximo no deje nada encolado.
+
+    Uso:
+        encolador = EncoladorLote()
+        for indice, crudo in enumerate(elementos):
+            encolador.agregar(indice, crudo)
+        encolador.cerrar()
+    """
+
+    def __init__(self, batch_id=None, tamano_tramo=TAMANO_TRAMO, max_elementos=MAX_ELEMENTOS, prioridad=None):
+        self.batch_id = batch_id or str(uuid.uuid4())
+        # Sin prioridad, los elementos del lote van a 'bulk' (app/queues.py)
+        self.prioridad = prioridad
+        self.tamano_tramo = max(1, tamano_tramo)
+        self.max_elementos = max_elementos
+        self.resultados = []
+        self.aceptados = 0
+        self._validos = []
+        self._iniciado = False
+
+    @property
+    def total(self):
+        return len(self.resultados)
+
+    @property
+    def rechazados(self):
+        return self.total - self.aceptados
+
+    def agregar(self, indice, crudo):
+        """
+        Valida un elemento y, si es válido, lo reserva para encolarlo al cerrar
+
+        Raises:
+            LoteDemasiadoGrande: Si se supera el máximo de elementos
+        """
+        if self.total >= self.max_elementos:
+            raise LoteDemasiadoGrande(f"El lote supera el máximo de {self.max_elementos} elementos")
+
+        resultado, datos = validar_elemento(indice, crudo)
+        self.resultados.append(resultado)
+        if datos is not None:
+            resultado.task_id = str(uuid.uuid4())
+            self._validos.append((resultado, datos))
+        return resultado
+
+    def verificar_tamano(self, total):
+        """
+        Rechaza de antemano un lote de tamaño conocido (arreglo JSON)
+
+        Raises:
+            LoteDemasiadoGrande: Si `total` supera el máximo de elementos
+        """
+        if total > self.max_elementos:
+            raise LoteDemasiadoGrande(
+                f"El lote tiene {total} elementos y supera el máximo de {self.max_elementos}"
+            )
+
+    def _opciones(self, resultado):
+        """Cola explícita del elemento si el lote pidió una prioridad"""
+        return {'queue': nombre_cola(self.prioridad, resultado.form_type)} if self.prioridad else {}
+
+    def _encolar_tramo(self, tramo):
+        """Encola un tramo como un grupo de Celery y registra sus task_ids"""
+
+        # Primero el registro: un worker rápido no debe encontrar el lote sin crear
+        pipe = get_redis().pipeline(transaction=False)
+        if not self._iniciado:
+            pipe.hset(clave_lote(self.batch_id), 'creado', time.time())
+            self._iniciado = True
+        pipe.rpush(clave_lote(self.batch_id, 'tasks'), *[r.task_id for r, _ in tramo])
+        pipe.hincrby(clave_lote(self.batch_id), 'aceptados', len(tramo))
+        pipe.hincrby(clave_lote(self.batch_id), PENDIENTES, len(tramo))
+        pipe.expire(clave_lote(self.batch_id), TTL_LOTE)
+        pipe.expire(clave_lote(self.batch_id, 'tasks'), TTL_LOTE)
+        pipe.expire(clave_lote(self.batch_id, 'failures'), TTL_LOTE)
+        pipe.execute()
+
+        group(
+            execute_form_task.s(r.form_type, datos, batch_id=self.batch_id).set(task_id=r.task_id, **self._opciones(r))
+            for r, datos in tramo
+        ).apply_async(task_id=self.batch_id)
+
+        self.aceptados += len(tramo)
+
+    def cerrar(self):
+        """Encola los elementos válidos por tramos y guarda los totales definitivos del lote"""
+        validos, self._validos = self._validos, []
+        for inicio in range(0, len(validos), self.tamano_tramo):
+            self._encolar_tramo(validos[inicio:inicio + self.tamano_tramo])
+
+        campos = {'total': self.total, 'aceptados': self.aceptados, 'rechazados': self.rechazados}
+        if not self._iniciado:
+            campos['creado'] = time.time()
+            self._iniciado = True
+
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.hset(clave_lote(self.batch_id), mapping=campos)
+        pipe.expire(clave_lote(self.batch_id), TTL_LOTE)
+        pipe.execute()
@@ -0,0 +1,221 @@
+"""
+Progreso de los lotes de formularios mantenido de forma incremental
+
+Cada tarea de un lote actualiza los contadores del lote al cambiar de
+estado (pendiente -> en curso -> exitoso/fallido, con reintentos de por
+medio). Cada transición es una sola transacción MULTI/EXEC de HINCRBY. Así,
+consultar el estado de un lote es un HGETALL de tamaño fijo más una página
+de la lista de fallos, sin importar cuántos formularios tenga.
+
+Cada transición se aplica una sola vez por tarea (e intento): antes de tocar
+los contadores se agrega su marca al conjunto del lote con SADD, y si ya
+estaba se ignora. Con `task_acks_late` una entrega repetida por el broker
+vuelve a llamar a `marcar_inicio` y `marcar_exito` sin contarse dos veces.
+Los errores de Redis se informan pero no detienen el formulario.
+
+Una tarea que el worker mata por `task_time_limit` no llega a marcar su
+fallo. Las tareas en curso se anotan con su hora de inicio y `estado_lote`
+da por fallidas las que llevan más de BATCH_RUNNING_TIMEOUT en curso.
+
+Claves en Redis (ver también app/batch.py):
+    batch:{id}           Hash con metadatos, contadores y marcas de tiempo
+    batch:{id}:failures  Lista JSON de los formularios que fallaron definitivamente
+    batch:{id}:marks     Conjunto de transiciones ya aplicadas
+    batch:{id}:running   Hash task_id -> JSON con la hora de inicio y el tipo de
+                         formulario de las tareas en curso
+
+Configuración por variables de entorno:
+    BATCH_TTL: Segundos que se conserva el registro del lote (default 86400)
+    BATCH_RUNNING_TIMEOUT: Segundos en curso tras los cuales una tarea se da
+                           por fallida (default 1860: task_time_limit + 60)
+"""
+
+import json
+import os
+import time
+
+from app.logs import obtener_logger
+from app.redis_client import get_redis
+
+
+log = obtener_logger(__name__)
+
+
+TTL_LOTE = int(os.getenv('BATCH_TTL', '86400'))
+LIMITE_EN_CURSO = float(os.getenv('BATCH_RUNNING_TIMEOUT', '1860'))
+
+
+# Contadores del hash del lote
+PENDIENTES = 'pendientes'
+EN_CURSO = 'en_curso'
+REINTENTANDO = 'reintentando'
+EXITOSOS = 'exitosos'
+FALLIDOS = 'fallidos'
+
+CONTADORES = (PENDIENTES, EN_CURSO, REINTENTANDO, EXITOSOS, FALLIDOS)
+
+
+def clave_lote(batch_id, sufijo=None):
+    """Clave Redis del lote (o de una de sus estructuras auxiliares)"""
+    return f"batch:{batch_id}" if sufijo is None else f"batch:{batch_id}:{sufijo}"
+
+
+def _transicion(batch_id, task_id, marca, origen, destino, fallo=None, form_type=None):
+    """
+    Mueve una tarea del contador `origen` al `destino` en una sola transacción
+
+    Args:
+        batch_id (str): ID del lote
+        task_id (str): Tarea que cambia de estado
+        marca (str): Identifica la transición; si ya se aplicó no se repite
+        origen (str): Contador que se decrementa
+        destino (str): Contador que se incrementa
+        fallo (dict): Registro a agregar a la lista de fallos, si corresponde
+        form_type (str): Tipo de formulario, anotado con las tareas en curso
+
+    Returns:
+        bool: True si se aplicó, False si ya estaba aplicada o Redis falló
+    """
+    try:
+        redis = get_redis()
+        if not redis.sadd(clave_lote(batch_id, 'marks'), marca):
+            log.debug("Transición %s del lote %s ya aplicada", marca, batch_id)
+            return False
+
+        ahora = time.time()
+        clave = clave_lote(batch_id)
+        en_curso = clave_lote(batch_id, 'running')
+
+        pipe = redis.pipeline()
+        pipe.hincrby(clave, origen, -1)
+        pipe.hincrby(clave, destino, 1)
+        if destino == EN_CURSO:
+            pipe.hsetnx(clave, 'iniciado', ahora)
+            pipe.hset(en_curso, task_id, json.dumps({'started_at': ahora, 'form_type': form_type}))
+        else:
+            pipe.hdel(en_curso, task_id)
+        if destino in (EXITOSOS, FALLIDOS):
+            pipe.hset(clave, 'actualizado', ahora)
+        if fallo is not None:
+            pipe.rpush(clave_lote(batch_id, 'failures'), json.dumps(fallo))
+        pipe.expire(clave_lote(batch_id, 'marks'), TTL_LOTE)
+        pipe.expire(en_curso, TTL_LOTE)
+        pipe.execute()
+        return True
+    except Exception as e:
+        log.warning("⚠ No se pudo actualizar el progreso del lote %s (%s): %s", batch_id, marca, e)
+        return False
+
+
+def marcar_inicio(batch_id, task_id, intento=0, form_type=None):
+    """La tarea empezó a ejecutarse (intento 0, o el reintento número `intento`)"""
+    if batch_id:
+        _transicion(batch_id, task_id, f"inicio:{task_id}:{intento}",
+                    REINTENTANDO if intento else PENDIENTES, EN_CURSO, form_type=form_type)
+
+
+def marcar_reintento(batch_id, task_id, intento):
+    """El intento número `intento` de la tarea falló y quedó programado otro"""
+    if batch_id:
+        _transicion(batch_id, task_id, f"reintento:{task_id}:{intento}", EN_CURSO, REINTENTANDO)
+
+
+def marcar_exito(batch_id, task_id):
+    """La tarea terminó y el formulario quedó enviado"""
+    if batch_id:
+        _transicion(batch_id, task_id, f"fin:{task_id}", EN_CURSO, EXITOSOS)
+
+
+def marcar_fallo(batch_id, task_id, form_type, error):
+    """La tarea agotó sus reintentos; se registra en la lista de fallos del lote"""
+    if batch_id:
+        _transicion(batch_id, task_id, f"fin:{task_id}", EN_CURSO, FALLIDOS, fallo={
+            'task_id': task_id,
+            'form_type': form_type,
+            'error': str(error),
+            'failed_at': time.time(),
+        })
+
+
+def fallar_vencidas(batch_id, limite=LIMITE_EN_CURSO):
+    """
+    Da por fallidas las tareas que llevan más de `limite` segundos en curso
+
+    El worker mata por `task_time_limit` a una tarea sin que llegue a marcar
+    su fallo; sin esto quedaría en curso para siempre.
+
+    Returns:
+        int: Tareas marcadas como fallidas
+    """
+    vencidas = 0
+    ahora = time.time()
+    for task_id, registro in get_redis().hgetall(clave_lote(batch_id, 'running')).items():
+        registro = json.loads(registro)
+        inicio = registro['started_at']
+        if ahora - inicio > limite:
+            log.warning("⚠ Tarea %s del lote %s lleva %.0fs en curso; se da por fallida",
+                        task_id, batch_id, ahora - inicio)
+            marcar_fallo(batch_id, task_id, registro.get('form_type') or 'desconocido',
+                         f"Sin respuesta del worker tras {limite:.0f}s en curso")
+            vencidas += 1
+    return vencidas
+
+
+def estado_lote(batch_id, offset=0, limite=50):
+    """
+    Estado agregado de un lote
+
+    Args:
+        batch_id (str): ID del lote
+        offset (int): Primer fallo a retornar
+        limite (int): Fallos por página
+
+    Returns:
+        dict: Contadores, rendimiento, ETA y una página de fallos, o None si
+              el lote no existe (o ya expiró)
+    """
+    try:
+        fallar_vencidas(batch_id)
+    except Exception as e:
+        log.warning("⚠ No se pudieron revisar las tareas en curso del lote %s: %s", batch_id, e)
+
+    redis = get_redis()
+    pipe = redis.pipeline(transaction=False)
+    pipe.hgetall(clave_lote(batch_id))
+    pipe.llen(clave_lote(batch_id, 'failures'))
+    pipe.lrange(clave_lote(batch_id, 'failures'), offset, offset + limite - 1)
+    campos, total_fallos, fallos = pipe.execute()
+
+    if not campos:
+        return None
+
+    contadores = {nombre: max(0, int(campos.get(nombre, 0))) for nombre in CONTADORES}
+    terminados = contadores[EXITOSOS] + contadores[FALLIDOS]
+    aceptados = int(campos.get('aceptados', 0))
+    restantes = max(0, aceptados - terminados)
+
+    iniciado = float(campos['iniciado']) if 'iniciado' in campos else None
+    actualizado = float(campos['actualizado']) if 'actualizado' in campos else None
+
+    por_minuto = None
+    eta = None
+    if iniciado is not None and terminados:
+        transcurrido = max(time.time() - iniciado, 1e-6)
+        por_minuto = terminados / transcurrido * 60
+        eta = restantes / (por_minuto / 60) if restantes else 0.0
+
+    return {
+        'batch_id': batch_id,
+        'total': int(campos.get('total', aceptados)),
+        'aceptados': aceptados,
+        'rechazados': int(campos.get('rechazados', 0)),
+        'contadores': contadores,
+        'completado': 'total' in campos and restantes == 0,
+        'creado': float(campos['creado']) if 'creado' in campos else None,
+        'iniciado': iniciado,
+        'actualizado': actualizado,
+        'por_minuto': por_minuto,
+        'eta_segundos': eta,
+        'total_fallos': total_fallos,
+        'fallos': [json.loads(f) for f in fallos],
+    }
@@ -0,0 +1,293 @@
+"""
+Benchmark de punta a punta de los formularios contra la encuesta simulada
+
+Ejecuta cada formulario N veces con cada motor/modo de llenado contra la
+encuesta simulada (app/survey_stub.py) y mide, por formulario:
+
+    - Latencia por formulario: p50, p95, p99 y media (segundos)
+    - Formularios por hora de un slot del worker (3600 / media)
+    - RSS máximo del navegador (o del proceso, en el modo HTTP)
+    - Segundos de CPU por formulario
+    - Peticiones, peticiones bloqueadas y bytes descargados por formulario
+      (modos con navegador, app/request_filter.py)
+
+Modos:
+    sleep        Motor declarativo con las pausas fijas originales, campo a campo
+    condiciones  Motor declarativo con esperas por condición, campo a campo
+    lote         Motor declarativo con matrices y páginas en un solo script
+    spec         Motor declarativo (app/form_engine.py) con la configuración del entorno
+    http         Motor HTTP sin navegador (app/http_engine.py). Experimental: habla
+                 el protocolo de la encuesta simulada, no el de Qualtrics JFE, así
+                 que sus números no dicen nada del envío a las encuestas reales
+
+Un formulario cuenta como exitoso si la encuesta simulada lo registró como
+completado. Los modos con navegador usan un solo Chrome por modo, con el
+perfil de CHROME_PROFILE (app/chrome_profile.py); su arranque se reporta
+aparte (`driver_startup_s`). El ahorro del bloqueo de peticiones se obtiene
+comparando `bytes_per_form` de un reporte con REQUEST_FILTER=0 contra uno con
+el filtro activo.
+
+El resultado es un JSON con claves ordenadas, pensado para guardarse por
+commit y compararse con `comparar` (run_benchmark.py --baseline).
+"""
+
+import json
+import math
+import os
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import urllib3
+
+from app.chrome_profile import resolver_perfil
+from app.driver_pool import crear_driver
+from app.form_engine import filler_para
+from app.form_specs import FORM_SPECS
+from app.http_engine import filler_http_para
+from app.request_filter import filtro_activo, medir_red
+from app.worker_capacity import cpu_arbol_segundos, memoria_arbol_mb
+
+
+MODOS = ('sleep', 'condiciones', 'lote', 'spec', 'http')
+MODOS_SIN_NAVEGADOR = ('http',)
+# Modos que sólo existen contra la encuesta simulada (se marcan en el reporte)
+MODOS_SOLO_SIMULADA = ('http',)
+
+# Argumentos del motor para cada modo (modo_espera, llenado_lote, llenado_pagina)
+CONFIGURACION_MODOS = {
+    'sleep': ('sleep', False, False),
+    'condiciones': ('condiciones', False, False),
+    'lote': ('condiciones', True, True),
+}
+
+EJEMPLOS = Path(__file__).resolve().parent.parent / 'examples'
+
+# Métricas en las que un aumento es una regresión (el resto: una disminución)
+METRICAS_MENOR_ES_MEJOR = ('p50_s', 'p95_s', 'p99_s', 'cpu_s_per_form', 'rss_mb_max', 'bytes_per_form')
+METRICAS_MAYOR_ES_MEJOR = ('forms_per_hour',)
+
+
+def percentil(valores, p):
+    """Percentil `p` (0-100) por rango más cercano; None si no hay valores"""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    rango = max(1, math.ceil(p / 100 * len(ordenados)))
+    return ordenados[rango - 1]
+
+
+def datos_ejemplo(form_type):
+    """Datos de examples/{form_type}_example.json"""
+    return json.loads((EJEMPLOS / f'{form_type}_example.json').read_text(encoding='utf-8'))
+
+
+def _commit_actual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=EJEMPLOS.parent, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class _RegistroEncuesta:
+    """Cuenta los formularios completados en la encuesta simulada (GET /__stub__/respuestas)"""
+
+    def __init__(self, url_base):
+        self.url = f"{url_base.rstrip('/')}/__stub__/respuestas"
+        self.http = urllib3.PoolManager()
+
+    def completados(self):
+        return len(json.loads(self.http.request('GET', self.url).data))
+
+
+def _crear_filler(modo, form_type, driver):
+    """Filler del formulario configurado para el modo"""
+    if modo == 'http':
+        return filler_http_para(form_type)(respaldo=False)
+    if modo == 'spec':
+        return filler_para(form_type)(driver=driver)
+
+    modo_espera, llenado_lote, llenado_pagina = CONFIGURACION_MODOS[modo]
+    return filler_para(form_type)(driver=driver, modo_espera=modo_espera, llenado_lote=llenado_lote,
+                                  llenado_pagina=llenado_pagina)
+
+
+def _ejecutar(filler, modo, datos):
+    """Llena un formulario; los errores los cuenta `medir_modo`"""
+    if modo == 'http':
+        filler.enviar(datos)
+    else:
+        filler.ejecutar(datos)
+
+
+def _media(valores):
+    return sum(valores) / len(valores) if valores else None
+
+
+def _resumen(duraciones, errores, rss, cpu, red):
+    media = _media(duraciones)
+    return {
+        'n': len(duraciones) + errores,
+        'errors': errores,
+        'p50_s': _redondear(percentil(duraciones, 50)),
+        'p95_s': _redondear(percentil(duraciones, 95)),
+        'p99_s': _redondear(percentil(duraciones, 99)),
+        'mean_s': _redondear(media),
+        'forms_per_hour': round(3600 / media, 1) if media else None,
+        'rss_mb_max': round(max(rss), 1) if rss else None,
+        'cpu_s_per_form': _redondear(cpu / (len(duraciones) + errores)) if cpu is not None else None,
+        'requests_per_form': _redondear(_media([r['requests_loaded'] for r in red])),
+        'blocked_requests_per_form': _redondear(_media([r['requests_blocked'] for r in red])),
+        'bytes_per_form': round(_media([r['bytes_loaded'] for r in red])) if red else None,
+    }
+
+
+def _redondear(valor):
+    return round(valor, 4) if valor is not None else None
+
+
+def medir_modo(modo, formularios, repeticiones, url_base):
+    """
+    Ejecuta todos los formularios `repeticiones` veces con un modo
+
+    Returns:
+        dict: 'driver_startup_s' y, por formulario, el resumen de sus métricas.
+              Los modos de MODOS_SOLO_SIMULADA llevan 'stub_protocol_only'
+    """
+    registro = _RegistroEncuesta(url_base)
+    driver = None
+    resultado = {'driver_startup_s': None, 'forms': {}}
+    if modo in MODOS_SOLO_SIMULADA:
+        resultado['stub_protocol_only'] = True
+        print(f"⚠ {modo}: motor experimental con el protocolo de la encuesta simulada; "
+              f"no representa el envío a Qualtrics")
+
+    if modo not in MODOS_SIN_NAVEGADOR:
+        inicio = time.monotonic()
+        driver = crear_driver()
+        resultado['driver_startup_s'] = _redondear(time.monotonic() - inicio)
+        pid = driver.service.process.pid
+    else:
+        pid = os.getpid()
+
+    try:
+        for form_type in formularios:
+            datos = datos_ejemplo(form_type)
+            duraciones, errores, rss, red = [], 0, [], []
+            cpu_inicial = cpu_arbol_segundos(pid)
+
+            for _ in range(repeticiones):
+                completados = registro.completados()
+                inicio = time.monotonic()
+                try:
+                    with medir_red(driver, form_type) as red_formulario:
+                        _ejecutar(_crear_filler(modo, form_type, driver), modo, datos)
+                    exito = registro.completados() > completados
+                except Exception as e:
+                    print(f"✗ {modo}/{form_type}: {e}")
+                    exito = False
+                duracion = time.monotonic() - inicio
+
+                if exito:
+                    duraciones.append(duracion)
+                else:
+                    errores += 1
+                memoria = memoria_arbol_mb(pid)
+                if memoria is not None:
+                    rss.append(memoria)
+                if red_formulario:
+                    red.append(red_formulario)
+
+            cpu_final = cpu_arbol_segundos(pid)
+            cpu = cpu_final - cpu_inicial if cpu_inicial is not None and cpu_final is not None else None
+            resultado['forms'][form_type] = _resumen(duraciones, errores, rss, cpu, red)
+            resumen = resultado['forms'][form_type]
+            print(f"✓ {modo}/{form_type}: p50 {resumen['p50_s']}s, p95 {resumen['p95_s']}s, "
+                  f"{resumen['forms_per_hour']} formularios/hora, {errores} errores")
+    finally:
+        if driver is not None:
+            driver.quit()
+
+    return resultado
+
+
+def ejecutar_benchmark(url_base, modos=MODOS, formularios=None, repeticiones=5, latencia_ms=None, jitter_ms=None):
+    """
+    Ejecuta el benchmark completo contra una encuesta simulada ya iniciada
+
+    Args:
+        url_base (str): URL de la encuesta simulada (se usa como FORM_BASE_URL)
+        modos (tuple): Modos a medir (ver MODOS)
+        formularios (list): Tipos de formulario. Si es None, todos los registrados
+        repeticiones (int): Formularios por modo y tipo
+        latencia_ms, jitter_ms (float): Configuración de la encuesta, sólo para el reporte
+
+    Returns:
+        dict: Reporte del benchmark (ver `guardar`)
+    """
+    formularios = list(formularios or FORM_SPECS)
+    anterior = os.environ.get('FORM_BASE_URL')
+    os.environ['FORM_BASE_URL'] = url_base
+
+    try:
+        resultados = {modo: medir_modo(modo, formularios, repeticiones, url_base) for modo in modos}
+    finally:
+        if anterior is None:
+            os.environ.pop('FORM_BASE_URL', None)
+        else:
+            os.environ['FORM_BASE_URL'] = anterior
+
+    return {
+        'version': 1,
+        'commit': _commit_actual(),
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'config': {
+            'repetitions': repeticiones,
+            'modes': list(modos),
+            'forms': formularios,
+            'stub_latency_ms': latencia_ms,
+            'stub_jitter_ms': jitter_ms,
+            'chrome_profile': resolver_perfil(),
+            'request_filter': filtro_activo(),
+        },
+        'results': resultados,
+    }
+
+
+def guardar(reporte, ruta):
+    """Escribe el reporte con claves ordenadas para que los diffs entre commits sean legibles"""
+    Path(ruta).write_text(json.dumps(reporte, indent=2, sort_keys=True, ensure_ascii=False) + '\n', encoding='utf-8')
+
+
+def comparar(base, actual, tolerancia=0.10):
+    """
+    Regresiones de `actual` frente a un reporte base
+
+    Args:
+        base (dict): Reporte de referencia (p. ej. el del commit anterior)
+        actual (dict): Reporte nuevo
+        tolerancia (float): Variación relativa permitida (0.10 = 10 %)
+
+    Returns:
+        list: Descripción de cada métrica que empeoró más que la tolerancia
+    """
+    regresiones = []
+    for modo, resultado in actual['results'].items():
+        for form_type, metricas in resultado['forms'].items():
+            previas = base.get('results', {}).get(modo, {}).get('forms', {}).get(form_type)
+            if not previas:
+                continue
+            if metricas['errors'] > previas['errors']:
+                regresiones.append(f"{modo}/{form_type} errors: {previas['errors']} -> {metricas['errors']}")
+            for metrica in METRICAS_MENOR_ES_MEJOR + METRICAS_MAYOR_ES_MEJOR:
+                antes, ahora = previas.get(metrica), metricas.get(metrica)
+                if not antes or ahora is None:
+                    continue
+                cambio = (ahora - antes) / antes
+                if metrica in METRICAS_MAYOR_ES_MEJOR:
+                    cambio = -cambio
+                if cambio > tolerancia:
+                    regresiones.append(f"{modo}/{form_type} {metrica}: {antes} -> {ahora} ({cambio:+.0%})")
+    return regresiones
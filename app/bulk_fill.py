@@ -0,0 +1,411 @@
+"""
+Llenado en lote de matrices y páginas de Qualtrics
+
+`seleccionar_escala_matriz` hace varias peticiones HTTP al WebDriver por cada
+celda (espera de presencia, find_element, execute_script y la espera posterior).
+Este módulo ofrece dos niveles de agrupación:
+
+    - Por sección: todas las celdas de una matriz con un único `execute_script`
+      (`llenar_celdas_matriz`), con reporte por celda.
+    - Por página: todas las respuestas de la página (textos, escalas, Si/No,
+      checkboxes y matrices) compiladas como una lista de operaciones y
+      aplicadas en una sola pasada por el DOM (`aplicar_operaciones`), que
+      además verifica el resultado en la misma llamada.
+
+Las celdas u operaciones que fallen se reintentan por el camino tradicional
+de Selenium.
+
+Los modos se eligen por formulario (argumento del filler, luego
+FORM{N}_BULK_FILL / FORM{N}_PAGE_FILL y por último FORM_BULK_FILL /
+FORM_PAGE_FILL; ambos activos por defecto).
+"""
+
+import os
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from app.logs import obtener_logger
+
+
+log = obtener_logger(__name__)
+
+
+# Posiciones absolutas de las preguntas de escala y Si/No en Qualtrics
+XPATH_ESCALA = (
+    "/html/body/div[3]/div/form/div/div[2]/div[1]/div[3]/div[1]/div[{pregunta}]"
+    "/div[3]/div/fieldset/div/table/tbody/tr[2]/td[{columna}]/span/label"
+)
+XPATH_SI_NO = (
+    "/html/body/div[3]/div/form/div/div[2]/div[1]/div[3]/div[1]/div[{pregunta}]"
+    "/div[3]/div/fieldset/div/table/tbody/tr/td[{columna}]/span/label"
+)
+
+# Milisegundos que cada operación espera a que su elemento aparezca
+# (preguntas mostradas por display logic dentro de la misma página)
+ESPERA_ELEMENTO_MS = 5000
+
+
+# Recibe una lista de [QID, question_id, choice_id, valor] y retorna, en el
+# mismo orden, {id, ok, metodo, error} por celda.
+SCRIPT_LLENAR_MATRIZ = """
+var celdas = arguments[0];
+var reporte = [];
+
+for (var i = 0; i < celdas.length; i++) {
+    var c = celdas[i];
+    var id = 'QR~QID' + c[0] + '#' + c[1] + '~' + c[2] + '~' + c[3];
+    var input = document.getElementById(id);
+
+    if (!input) {
+        reporte.push({id: id, ok: false, metodo: null, error: 'no_encontrado'});
+        continue;
+    }
+
+    var metodo = 'label';
+    try {
+        var label = document.querySelector('label[for="' + CSS.escape(id) + '"]');
+        if (label) { label.click(); } else { metodo = 'input'; input.click(); }
+    } catch (e) {
+        metodo = 'input';
+    }
+
+    if (!input.checked) {
+        metodo = 'evento';
+        input.checked = true;
+        input.dispatchEvent(new Event('change', {bubbles: true}));
+        input.dispatchEvent(new Event('click', {bubbles: true}));
+    }
+
+    reporte.push({id: id, ok: input.checked, metodo: metodo, error: input.checked ? null : 'no_marcado'});
+}
+
+return reporte;
+"""
+
+
+# Recibe la lista de operaciones compilada por el filler y retorna, en el
+# mismo orden, {clave, ok, verificado, error, selector}. Es asíncrono para
+# poder esperar dentro del navegador a las preguntas que aparecen por display
+# logic. Las operaciones por XPath prueban antes su selector CSS estable
+# (`css`, ver app/field_locators.py); si lo ubicaron por XPath, `selector`
+# trae el CSS por id o label[for] para la próxima vez.
+SCRIPT_APLICAR_PAGINA = """
+var operaciones = arguments[0];
+var esperaMs = arguments[1];
+var terminar = arguments[arguments.length - 1];
+var reporte = [];
+var encontrados = [];
+
+function buscar(op) {
+    if (op.css) {
+        var porCss = document.querySelector(op.css);
+        if (porCss) { return porCss; }
+    }
+    if (op.tipo === 'label_xpath') {
+        return document.evaluate(op.xpath, document, null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    return document.getElementById(op.id);
+}
+
+function estable(op, el) {
+    if (op.tipo !== 'label_xpath' || (op.css && el.matches(op.css))) { return null; }
+    if (el.tagName === 'LABEL' && el.htmlFor) { return 'label[for="' + el.htmlFor + '"]'; }
+    if (el.id) { return '#' + CSS.escape(el.id); }
+    return null;
+}
+
+function inputDe(el) {
+    if (el.tagName === 'INPUT' || el.tagName === 'TEXTAREA') { return el; }
+    if (el.htmlFor) { return document.getElementById(el.htmlFor); }
+    return el.querySelector('input');
+}
+
+function disparar(el, tipos) {
+    for (var t = 0; t < tipos.length; t++) {
+        el.dispatchEvent(new Event(tipos[t], {bubbles: true}));
+    }
+}
+
+function aplicar(op, el) {
+    if (op.tipo === 'texto') {
+        el.focus();
+        el.value = op.valor;
+        disparar(el, ['input', 'change']);
+        el.blur();
+        return;
+    }
+
+    var input = inputDe(el);
+    // Nunca volver a hacer clic sobre algo marcado: desmarcaría los checkboxes
+    if (input && input.checked) { return; }
+
+    var label = el.tagName === 'LABEL' ? el
+        : document.querySelector('label[for="' + CSS.escape(el.id) + '"]');
+    (label || el).click();
+
+    if (input && !input.checked) {
+        input.checked = true;
+        disparar(input, ['change', 'click']);
+    }
+}
+
+function verificar(op, el) {
+    if (op.tipo === 'texto') { return el.value === op.valor; }
+    var input = inputDe(el);
+    return !!(input && input.checked);
+}
+
+function paso(i, inicio) {
+    if (i >= operaciones.length) {
+        // Verificación final: la display logic pudo ocultar o resetear respuestas
+        for (var k = 0; k < reporte.length; k++) {
+            var actual = encontrados[k] && encontrados[k].isConnected ? encontrados[k] : buscar(operaciones[k]);
+            reporte[k].verificado = !!(reporte[k].ok && actual && verificar(operaciones[k], actual));
+        }
+        terminar(reporte);
+        return;
+    }
+
+    var op = operaciones[i];
+    var el = buscar(op);
+    encontrados[i] = el;
+
+    if (!el) {
+        if (Date.now() - inicio < esperaMs) {
+            setTimeout(function () { paso(i, inicio); }, 25);
+            return;
+        }
+        reporte.push({clave: op.clave, ok: false, verificado: false, error: 'no_encontrado'});
+    } else {
+        try {
+            aplicar(op, el);
+            reporte.push({clave: op.clave, ok: verificar(op, el), verificado: false, error: null,
+                          selector: estable(op, el)});
+        } catch (e) {
+            reporte.push({clave: op.clave, ok: false, verificado: false, error: String(e)});
+        }
+    }
+    paso(i + 1, Date.now());
+}
+
+paso(0, Date.now());
+"""
+
+
+def _resolver_bandera(variable, form_type, activo):
+    """Lee una bandera 1/0 por formulario (FORM{N}_X) o global (FORM_X)"""
+    if activo is not None:
+        return bool(activo)
+
+    valor = os.getenv(f'{form_type.upper()}_{variable}') if form_type else None
+    if valor is None:
+        valor = os.getenv(f'FORM_{variable}', '1')
+    return valor.strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+def resolver_llenado_lote(form_type=None, activo=None):
+    """
+    Determina si un formulario llena cada matriz con un solo script
+
+    Args:
+        form_type (str): Tipo de formulario ('form1'...'form4')
+        activo (bool): Valor explícito; tiene prioridad sobre el entorno
+
+    Returns:
+        bool: True si las secciones se llenan con un solo script
+    """
+    return _resolver_bandera('BULK_FILL', form_type, activo)
+
+
+def resolver_llenado_pagina(form_type=None, activo=None):
+    """
+    Determina si un formulario aplica cada página completa con un solo script
+
+    Args:
+        form_type (str): Tipo de formulario ('form1'...'form4')
+        activo (bool): Valor explícito; tiene prioridad sobre el entorno
+
+    Returns:
+        bool: True si las páginas se llenan con `aplicar_operaciones`
+    """
+    return _resolver_bandera('PAGE_FILL', form_type, activo)
+
+
+def normalizar_valores(num_filas, valores=None, seccion_nombre=''):
+    """
+    Ajusta los valores de una sección a su número de filas
+
+    Args:
+        num_filas (int): Filas de la matriz
+        valores (list): Valores (1-10). Si es None, usa 10 para todas
+        seccion_nombre (str): Nombre de la sección, para el mensaje de advertencia
+
+    Returns:
+        list: Exactamente `num_filas` valores (recortados o completados con 10)
+    """
+    if valores is None:
+        return [10] * num_filas
+
+    if len(valores) != num_filas:
+        log.warning("Se esperaban %s valores para '%s', pero se recibieron %s", num_filas, seccion_nombre, len(valores))
+        # Ajustar valores si es necesario
+        if len(valores) > num_filas:
+            valores = valores[:num_filas]
+        else:
+            valores = list(valores) + [10] * (num_filas - len(valores))
+
+    return valores
+
+
+def buscar_opcion(opcion, mapeo):
+    """
+    Busca el choice ID de una opción por coincidencia parcial de texto
+
+    Args:
+        opcion (str): Texto recibido (ej: 'Pagina web')
+        mapeo (dict): Texto normalizado -> choice ID
+
+    Returns:
+        str: Choice ID, o None si la opción no es reconocida
+    """
+    opcion_normalizada = opcion.lower().strip()
+    for clave, choice_id in mapeo.items():
+        if clave in opcion_normalizada or opcion_normalizada in clave:
+            return choice_id
+    return None
+
+
+def llenar_celdas_matriz(driver, celdas):
+    """
+    Marca varias celdas de matriz en un único round-trip al navegador
+
+    Args:
+        driver (WebDriver): Driver con la página del formulario abierta
+        celdas (list): Tuplas (QID, question_id, choice_id, valor)
+
+    Returns:
+        list: Un dict por celda con 'id', 'ok', 'metodo' y 'error'
+    """
+    if not celdas:
+        return []
+
+    payload = [[str(qid), str(question_id), str(choice_id), str(valor)]
+               for qid, question_id, choice_id, valor in celdas]
+    return driver.execute_script(SCRIPT_LLENAR_MATRIZ, payload)
+
+
+# ----------------------------------------------------------------------
+# Operaciones de página
+# ----------------------------------------------------------------------
+
+def op_texto(elemento_id, valor, clave=None):
+    """Operación que escribe `valor` en el campo de texto `elemento_id`"""
+    return {'tipo': 'texto', 'id': elemento_id, 'valor': '' if valor is None else str(valor),
+            'clave': clave or elemento_id}
+
+
+def op_radio(elemento_id, clave=None, celda=None, seccion=None):
+    """
+    Operación que marca el radio `elemento_id`
+
+    Args:
+        celda (tuple): (QID, question_id, choice_id, valor) si es una celda de
+                       matriz; permite llenarla con `llenar_celdas_matriz`
+        seccion (str): Sección de matriz de la celda (para el avance por sección)
+    """
+    op = {'tipo': 'radio', 'id': elemento_id, 'clave': clave or elemento_id}
+    if celda is not None:
+        op['celda'] = list(celda)
+    if seccion is not None:
+        op['seccion'] = seccion
+    return op
+
+
+def op_checkbox(elemento_id, clave=None):
+    """Operación que marca (sin alternar) el checkbox `elemento_id`"""
+    return {'tipo': 'checkbox', 'id': elemento_id, 'clave': clave or elemento_id}
+
+
+def op_label_xpath(xpath, clave, entrada=None):
+    """
+    Operación que hace clic en un label
+
+    Args:
+        entrada (str): id del input del label (`label[for=...]`), si se
+                       conoce; se prueba antes que el XPath absoluto
+    """
+    op = {'tipo': 'label_xpath', 'xpath': xpath, 'clave': clave}
+    if entrada is not None:
+        op['entrada'] = entrada
+    return op
+
+
+def op_escala(pregunta, columna, clave, qid=None):
+    """Operación para una pregunta de escala 0-10 / 1-10 (por QID si se conoce, si no por posición)"""
+    entrada = f"QR~QID{qid}~{columna}" if qid is not None else None
+    return op_label_xpath(XPATH_ESCALA.format(pregunta=pregunta, columna=columna), clave, entrada)
+
+
+def op_si_no(pregunta, respuesta, clave, qid=None):
+    """Operación para una pregunta Si/No ('Si' -> choice/td 1, otro -> 2; por QID si se conoce)"""
+    columna = 1 if (respuesta or '').lower() == 'si' else 2
+    entrada = f"QR~QID{qid}~{columna}" if qid is not None else None
+    return op_label_xpath(XPATH_SI_NO.format(pregunta=pregunta, columna=columna), clave, entrada)
+
+
+def aplicar_operaciones(driver, operaciones, espera_ms=ESPERA_ELEMENTO_MS):
+    """
+    Aplica y verifica todas las operaciones de una página en una sola llamada
+
+    Args:
+        driver (WebDriver): Driver con la página del formulario abierta
+        operaciones (list): Operaciones construidas con las funciones op_*
+        espera_ms (int): Milisegundos que cada operación espera a su elemento
+
+    Returns:
+        list: Un dict por operación con 'clave', 'ok', 'verificado', 'error' y
+              'selector' (CSS estable aprendido, o None)
+    """
+    if not operaciones:
+        return []
+
+    # Peor caso: todas las operaciones agotan su espera
+    driver.set_script_timeout(30 + len(operaciones) * espera_ms / 1000)
+    return driver.execute_async_script(SCRIPT_APLICAR_PAGINA, operaciones, espera_ms)
+
+
+def aplicar_operacion_webdriver(driver, op, timeout=10, elemento=None):
+    """
+    Aplica una operación con llamadas normales de Selenium (camino de respaldo)
+
+    Args:
+        driver (WebDriver): Driver con la página del formulario abierta
+        op (dict): Operación que falló en `aplicar_operaciones`
+        timeout (float): Segundos máximos esperando el elemento
+        elemento (WebElement): Input o label de la operación ya resuelto
+                               (caché por página de app/field_locators.py).
+                               Si es None se busca aquí
+    """
+    wait = WebDriverWait(driver, timeout)
+
+    if op['tipo'] == 'texto':
+        campo = elemento or wait.until(EC.presence_of_element_located((By.ID, op['id'])))
+        campo.clear()
+        campo.send_keys(op['valor'])
+    elif op['tipo'] == 'label_xpath':
+        por_css = [elemento] if elemento else []
+        if not por_css and op.get('css'):
+            por_css = driver.find_elements(By.CSS_SELECTOR, op['css'])
+        if por_css:
+            por_css[0].click()
+        else:
+            wait.until(EC.element_to_be_clickable((By.XPATH, op['xpath']))).click()
+    else:
+        entrada = elemento or wait.until(EC.presence_of_element_located((By.ID, op['id'])))
+        if entrada.is_selected():
+            return
+        label = driver.find_element(By.CSS_SELECTOR, f"label[for='{op['id']}']")
+        driver.execute_script("arguments[0].click();", label)
@@ -7,6 +7,9 @@ Este módulo configura Celery con Redis como broker y backend de resultados.
 from celery import Celery
 import os
 
+from app.queues import COLA_INTERACTIVA, colas_declaradas, enrutar_tarea
+from app.worker_capacity import configuracion_worker
+
 # Configurar la URL de Redis desde variable de entorno o usar localhost por defecto
 REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 
@@ -44,8 +47,19 @@ celery_app.conf.update(
     
     # Worker
     worker_prefetch_multiplier=1,
-    worker_max_tasks_per_child=50,
+
+    # Colas por prioridad (ver app/queues.py): los envíos individuales no
+    # esperan detrás de los lotes
+    task_queues=colas_declaradas(),
+    task_default_queue=COLA_INTERACTIVA,
+    task_routes=(enrutar_tarea,),
+    # El worker vacía sus colas en el orden en que se suscribió (interactivas primero)
+    broker_transport_options={'queue_order_strategy': 'priority'},
 )
 
+# Pool, concurrencia y reciclaje de hijos según la capacidad del nodo
+# (ver app/worker_capacity.py)
+celery_app.conf.update(configuracion_worker())
+
 if __name__ == '__main__':
     celery_app.start()
@@ -0,0 +1,178 @@
+"""
+Perfiles de arranque de Chrome para los fillers y el pool de navegadores
+
+    completo  Chrome con ventana y las opciones originales de los scripts
+              (útil para ver el llenado en desarrollo)
+    ligero    Headless (--headless=new) y recortado para los workers: sin
+              imágenes, fuentes remotas ni reproducción de medios; sin
+              extensiones, GPU ni tráfico en segundo plano; ventana pequeña
+              y estrategia de carga 'eager' (driver.get vuelve con el DOM
+              listo, sin esperar imágenes ni iframes)
+
+Ambos conservan los topes de memoria y las banderas que mantienen vivas las
+pestañas en segundo plano (ver app/tabs.py). Con REQUEST_STATS activo ambos
+guardan los eventos de red en el log 'performance' de chromedriver (ver
+app/request_filter.py).
+
+Con el perfil ligero cada navegador usa un directorio de perfil fijo a partir
+de CHROME_USER_DATA_DIR, en lugar de uno temporal nuevo por arranque; la
+caché de Qualtrics (scripts y hojas de estilo) se conserva entre reciclajes.
+La plantilla admite `{pid}` y `{ranura}`: la ranura es el primer número cuyo
+directorio no está en uso por otro Chrome (Chrome deja un `SingletonLock`
+mientras corre).
+
+Configuración por variables de entorno:
+    CHROME_PROFILE: 'completo' (default) o 'ligero'
+    CHROME_WINDOW_SIZE: Tamaño de ventana del perfil ligero (default 1024,768)
+    CHROME_USER_DATA_DIR: Plantilla del directorio de perfil del perfil ligero
+                          (default /tmp/chrome-rpa/{pid}-{ranura}; vacío usa
+                          un perfil temporal por arranque)
+"""
+
+import glob
+import os
+import shutil
+import threading
+
+from selenium.webdriver.chrome.options import Options
+
+from app.request_filter import estadisticas_activas
+from app.worker_capacity import LIMITE_MEMORIA_CHROME_MB
+
+
+PERFIL_COMPLETO = 'completo'
+PERFIL_LIGERO = 'ligero'
+PERFILES_CHROME = (PERFIL_COMPLETO, PERFIL_LIGERO)
+
+TAMANO_VENTANA = os.getenv('CHROME_WINDOW_SIZE', '1024,768')
+PLANTILLA_DIRECTORIO = os.getenv('CHROME_USER_DATA_DIR', '/tmp/chrome-rpa/{pid}-{ranura}')
+
+# Banderas del perfil ligero además de las comunes
+BANDERAS_LIGERO = (
+    '--headless=new',
+    '--disable-gpu',
+    '--disable-extensions',
+    '--disable-component-extensions-with-background-pages',
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication',
+    '--metrics-recording-only',
+    '--no-first-run',
+    '--mute-audio',
+    '--autoplay-policy=user-gesture-required',
+    '--disable-remote-fonts',
+    '--blink-settings=imagesEnabled=false',
+)
+
+PREFERENCIAS_LIGERO = {
+    'profile.managed_default_content_settings.images': 2,
+    'profile.default_content_setting_values.notifications': 2,
+}
+
+_directorios_reservados = set()
+_lock_directorios = threading.Lock()
+
+
+def resolver_perfil(perfil=None):
+    """
+    Determina el perfil de arranque de Chrome
+
+    Args:
+        perfil (str): Perfil explícito. Si es None se usa CHROME_PROFILE
+
+    Returns:
+        str: 'completo' o 'ligero'
+
+    Raises:
+        ValueError: Si el perfil no es válido
+    """
+    perfil = (perfil or os.getenv('CHROME_PROFILE') or PERFIL_COMPLETO).strip().lower()
+    if perfil not in PERFILES_CHROME:
+        raise ValueError(f"Perfil de Chrome inválido: '{perfil}'. Opciones: {', '.join(PERFILES_CHROME)}")
+    return perfil
+
+
+def reservar_directorio(plantilla=PLANTILLA_DIRECTORIO):
+    """
+    Reserva un directorio de perfil libre a partir de la plantilla
+
+    La reserva dura hasta `liberar_directorio`, que se llama cuando Chrome ya
+    arrancó (desde ahí su SingletonLock marca el directorio como ocupado).
+
+    Returns:
+        str: Ruta del directorio, o None si la plantilla está vacía
+    """
+    if not plantilla:
+        return None
+    with _lock_directorios:
+        ranura = 0
+        while True:
+            ruta = plantilla.format(pid=os.getpid(), ranura=ranura)
+            if ruta not in _directorios_reservados and not os.path.lexists(os.path.join(ruta, 'SingletonLock')):
+                _directorios_reservados.add(ruta)
+                return ruta
+            if '{ranura}' not in plantilla:
+                raise RuntimeError(f"El directorio de perfil {ruta} ya está en uso y la plantilla no tiene {{ranura}}")
+            ranura += 1
+
+
+def liberar_directorio(ruta):
+    """Termina la reserva de `reservar_directorio`"""
+    with _lock_directorios:
+        _directorios_reservados.discard(ruta)
+
+
+def limpiar_directorios(plantilla=PLANTILLA_DIRECTORIO):
+    """
+    Borra los directorios de perfil de este proceso (plantillas con `{pid}`)
+
+    Se llama al cerrar el pool: los procesos hijos del worker se reciclan y
+    sus perfiles no se vuelven a usar.
+    """
+    if not plantilla or '{pid}' not in plantilla:
+        return
+    patron = plantilla.format(pid=os.getpid(), ranura='*')
+    for ruta in glob.glob(patron):
+        shutil.rmtree(ruta, ignore_errors=True)
+
+
+def opciones_chrome(perfil=None, directorio=None):
+    """
+    Opciones de Chrome de un perfil
+
+    Args:
+        perfil (str): 'completo' o 'ligero'. Si es None se usa CHROME_PROFILE
+        directorio (str): Directorio de perfil (--user-data-dir), sólo en el perfil ligero
+
+    Returns:
+        Options: Opciones listas para webdriver.Chrome
+    """
+    perfil = resolver_perfil(perfil)
+
+    chrome_options = Options()
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    # Tope de memoria por slot: heap de JS acotado y un solo renderer por navegador
+    chrome_options.add_argument(f'--js-flags=--max-old-space-size={max(128, LIMITE_MEMORIA_CHROME_MB // 2)}')
+    chrome_options.add_argument('--renderer-process-limit=1')
+    # Las pestañas en segundo plano deben seguir avanzando (ver app/tabs.py)
+    chrome_options.add_argument('--disable-background-timer-throttling')
+    chrome_options.add_argument('--disable-backgrounding-occluded-windows')
+    chrome_options.add_argument('--disable-renderer-backgrounding')
+    if estadisticas_activas():
+        # Sólo eventos de red: peticiones y bytes por formulario
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        chrome_options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+
+    if perfil == PERFIL_LIGERO:
+        for bandera in BANDERAS_LIGERO:
+            chrome_options.add_argument(bandera)
+        chrome_options.add_argument(f'--window-size={TAMANO_VENTANA}')
+        chrome_options.add_experimental_option('prefs', PREFERENCIAS_LIGERO)
+        chrome_options.page_load_strategy = 'eager'
+        if directorio:
+            chrome_options.add_argument(f'--user-data-dir={directorio}')
+
+    return chrome_options
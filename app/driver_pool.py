@@ -0,0 +1,442 @@
+"""
+Pool de navegadores Chrome reutilizables para los workers de Celery
+
+Lanzar un webdriver.Chrome nuevo por cada formulario cuesta varios segundos
+de arranque y es el principal pico de CPU en los workers. Este módulo mantiene,
+por proceso, un conjunto de drivers precalentados que los fillers toman
+prestados (lease) y devuelven al terminar.
+
+Configuración por variables de entorno:
+    DRIVER_POOL_SIZE: Número máximo de navegadores por proceso (default 1)
+    DRIVER_MAX_USES: Formularios que atiende un driver antes de reciclarse (default 25)
+    DRIVER_IDLE_TIMEOUT: Segundos de inactividad tras los cuales se cierra un driver (default 600)
+    DRIVER_LEASE_TIMEOUT: Segundos máximos esperando un driver libre (default 300)
+
+El límite de memoria por navegador (CHROME_MEMORY_LIMIT_MB) se define en
+`app.worker_capacity`, junto con el resto del dimensionamiento del worker, y
+las opciones de arranque de Chrome (CHROME_PROFILE) en `app.chrome_profile` y
+el bloqueo de peticiones (REQUEST_FILTER) en `app.request_filter`.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+
+from app.chrome_profile import (
+    PERFIL_LIGERO,
+    liberar_directorio,
+    limpiar_directorios,
+    opciones_chrome,
+    reservar_directorio,
+    resolver_perfil,
+)
+from app.logs import obtener_logger
+from app.metrics import ARRANQUE_DRIVER
+from app.request_filter import aplicar_bloqueo
+from app.worker_capacity import LIMITE_MEMORIA_CHROME_MB, memoria_arbol_mb
+
+
+log = obtener_logger(__name__)
+
+
+POOL_SIZE = int(os.getenv('DRIVER_POOL_SIZE', '1'))
+MAX_USOS = int(os.getenv('DRIVER_MAX_USES', '25'))
+TIEMPO_INACTIVO = float(os.getenv('DRIVER_IDLE_TIMEOUT', '600'))
+TIEMPO_ESPERA_LEASE = float(os.getenv('DRIVER_LEASE_TIMEOUT', '300'))
+
+
+def crear_driver(perfil=None):
+    """
+    Lanza un navegador Chrome con el perfil de arranque configurado y el
+    bloqueo de peticiones activo
+
+    Args:
+        perfil (str): 'completo' o 'ligero' (app/chrome_profile.py). Si es
+                      None se usa CHROME_PROFILE
+    """
+    perfil = resolver_perfil(perfil)
+    directorio = reservar_directorio() if perfil == PERFIL_LIGERO else None
+    try:
+        with ARRANQUE_DRIVER.labels(perfil=perfil).time():
+            driver = webdriver.Chrome(options=opciones_chrome(perfil, directorio))
+    finally:
+        if directorio is not None:
+            liberar_directorio(directorio)
+    aplicar_bloqueo(driver)
+    return driver
+
+
+class _EntradaPool:
+    """Driver administrado por el pool junto con sus contadores de uso"""
+
+    __slots__ = ('driver', 'usos', 'creado', 'ultimo_uso')
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.usos = 0
+        self.creado = time.monotonic()
+        self.ultimo_uso = self.creado
+
+
+class DriverPool:
+    """
+    Pool de drivers de Chrome precalentados y verificados
+
+    Los drivers se prestan con `prestar()` (context manager) o con el par
+    `adquirir()`/`liberar()`. Entre préstamos se borran cookies y storage,
+    y un driver se descarta cuando falla el health-check, alcanza
+    `max_usos`, supera `limite_memoria_mb` o lleva más de `tiempo_inactivo`
+    segundos sin usarse.
+    """
+
+    def __init__(self, tamano=POOL_SIZE, max_usos=MAX_USOS,
+                 tiempo_inactivo=TIEMPO_INACTIVO, fabrica=crear_driver,
+                 limite_memoria_mb=LIMITE_MEMORIA_CHROME_MB):
+        """
+        Args:
+            tamano (int): Número máximo de drivers vivos
+            max_usos (int): Préstamos por driver antes de reciclarlo
+            tiempo_inactivo (float): Segundos de inactividad antes de cerrar un driver libre
+            fabrica (callable): Función que crea un driver nuevo
+            limite_memoria_mb (int): RSS máximo de un navegador antes de reciclarlo
+        """
+        self.tamano = max(1, tamano)
+        self.max_usos = max(1, max_usos)
+        self.tiempo_inactivo = tiempo_inactivo
+        self.fabrica = fabrica
+        self.limite_memoria_mb = limite_memoria_mb
+
+        self._libres = []
+        self._prestados = {}
+        self._creando = 0
+        # Entradas fuera de _libres y _prestados mientras se revisan, limpian
+        # o cierran sin el lock: siguen ocupando un lugar del pool
+        self._en_revision = 0
+        self._cerrado = False
+        self._condicion = threading.Condition()
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida de cada driver
+    # ------------------------------------------------------------------
+
+    def _esta_sano(self, entrada):
+        """Verifica que el navegador siga respondiendo"""
+        try:
+            return entrada.driver.execute_script("return 1;") == 1
+        except Exception:
+            return False
+
+    def _memoria_mb(self, driver):
+        """Memoria residente del navegador (chromedriver + Chrome), o None si no se puede medir"""
+        servicio = getattr(driver, 'service', None)
+        proceso = getattr(servicio, 'process', None)
+        if proceso is None:
+            return None
+        return memoria_arbol_mb(proceso.pid)
+
+    def _excede_memoria(self, driver):
+        memoria = self._memoria_mb(driver)
+        if memoria is not None and memoria > self.limite_memoria_mb:
+            log.warning("⚠ Navegador usa %.0f MB (límite %s MB), reciclándolo...", memoria, self.limite_memoria_mb)
+            return True
+        return False
+
+    def _limpiar(self, driver):
+        """Borra cookies, storage y pestañas extra para el siguiente préstamo"""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        try:
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except Exception:
+            # about:blank y páginas de error no tienen storage accesible
+            pass
+
+        try:
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        except Exception:
+            driver.delete_all_cookies()
+
+        driver.get('about:blank')
+
+    def _destruir(self, entrada):
+        """Cierra el navegador ignorando errores de un proceso ya caído"""
+        try:
+            entrada.driver.quit()
+        except Exception:
+            pass
+
+    def _revisar_devuelto(self, entrada, descartar):
+        """
+        Limpia y revisa un driver devuelto, fuera del lock
+
+        Returns:
+            bool: True si vuelve a quedar libre; si no, ya quedó cerrado
+        """
+        driver = entrada.driver
+        entrada.usos += 1
+        entrada.ultimo_uso = time.monotonic()
+
+        if not descartar and entrada.usos < self.max_usos and not self._cerrado \
+                and not self._excede_memoria(driver):
+            try:
+                self._limpiar(driver)
+            except Exception as e:
+                log.warning("⚠ No se pudo limpiar el driver (%s), descartándolo...", e)
+                descartar = True
+        else:
+            descartar = True
+
+        if descartar or not self._esta_sano(entrada):
+            self._destruir(entrada)
+            return False
+        return True
+
+    def _crear_entrada(self, prestado):
+        """
+        Crea un driver nuevo fuera del lock (el arranque tarda segundos)
+
+        La entrada se registra como libre o prestada en el mismo paso en que
+        se descuenta de `_creando`, para no exceder nunca el tamaño del pool.
+        """
+        entrada = None
+        try:
+            entrada = _EntradaPool(self.fabrica())
+            return entrada
+        finally:
+            with self._condicion:
+                self._creando -= 1
+                if entrada is not None:
+                    if prestado:
+                        self._prestados[id(entrada.driver)] = entrada
+                    else:
+                        self._libres.append(entrada)
+                self._condicion.notify_all()
+
+    def _total(self):
+        return len(self._libres) + len(self._prestados) + self._creando + self._en_revision
+
+    def _desalojar_inactivos(self):
+        """Retira del pool los drivers libres que superaron el tiempo inactivo"""
+        ahora = time.monotonic()
+        vencidos = [e for e in self._libres if ahora - e.ultimo_uso > self.tiempo_inactivo]
+        self._libres = [e for e in self._libres if e not in vencidos]
+        return vencidos
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def calentar(self, cantidad=None):
+        """
+        Lanza drivers por adelantado hasta llenar el pool
+
+        Args:
+            cantidad (int): Drivers a precalentar. Si es None, llena el pool completo
+        """
+        objetivo = self.tamano if cantidad is None else min(cantidad, self.tamano)
+
+        while True:
+            with self._condicion:
+                if self._cerrado or self._total() >= objetivo:
+                    return
+                self._creando += 1
+
+            self._crear_entrada(prestado=False)
+
+    def adquirir(self, timeout=TIEMPO_ESPERA_LEASE):
+        """
+        Toma un driver sano del pool, creando uno si hay capacidad
+
+        Args:
+            timeout (float): Segundos máximos de espera por un driver libre
+
+        Returns:
+            WebDriver: Driver listo para usar
+
+        Raises:
+            TimeoutError: Si no se libera ningún driver a tiempo
+            RuntimeError: Si el pool ya fue cerrado
+        """
+        limite = time.monotonic() + timeout
+
+        while True:
+            crear = False
+            descartados = []
+            with self._condicion:
+                if self._cerrado:
+                    raise RuntimeError("El pool de drivers está cerrado")
+
+                descartados.extend(self._desalojar_inactivos())
+                self._en_revision += len(descartados)
+
+                if self._libres:
+                    entrada = self._libres.pop()
+                    self._en_revision += 1
+                elif self._total() < self.tamano:
+                    self._creando += 1
+                    crear = True
+                    entrada = None
+                else:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        raise TimeoutError(
+                            f"No hay drivers libres tras {timeout}s (tamaño del pool: {self.tamano})"
+                        )
+                    self._condicion.wait(restante)
+                    continue
+
+            for vencido in descartados:
+                self._destruir(vencido)
+            if descartados:
+                with self._condicion:
+                    self._en_revision -= len(descartados)
+                    self._condicion.notify_all()
+
+            if crear:
+                return self._crear_entrada(prestado=True).driver
+
+            sano = False
+            try:
+                sano = self._esta_sano(entrada)
+                if not sano:
+                    log.warning("⚠ Driver del pool no responde, descartándolo...")
+                    self._destruir(entrada)
+            finally:
+                with self._condicion:
+                    self._en_revision -= 1
+                    if sano:
+                        self._prestados[id(entrada.driver)] = entrada
+                    self._condicion.notify_all()
+
+            if sano:
+                return entrada.driver
+
+    def liberar(self, driver, descartar=False):
+        """
+        Devuelve un driver al pool
+
+        Args:
+            driver (WebDriver): Driver obtenido con `adquirir()`
+            descartar (bool): Si es True, el driver se cierra en lugar de reutilizarse
+        """
+        with self._condicion:
+            entrada = self._prestados.pop(id(driver), None)
+            if entrada is None:
+                return
+            self._en_revision += 1
+
+        reutilizable = False
+        try:
+            reutilizable = self._revisar_devuelto(entrada, descartar)
+        finally:
+            with self._condicion:
+                self._en_revision -= 1
+                if reutilizable:
+                    self._libres.append(entrada)
+                self._condicion.notify_all()
+
+    @contextmanager
+    def prestar(self, timeout=TIEMPO_ESPERA_LEASE):
+        """
+        Context manager que presta un driver y lo devuelve al salir
+
+        Si el bloque lanza una excepción el driver se descarta, ya que su
+        estado (página, diálogos abiertos) deja de ser confiable.
+        """
+        driver = self.adquirir(timeout=timeout)
+        descartar = False
+        try:
+            yield driver
+        except BaseException:
+            descartar = True
+            raise
+        finally:
+            self.liberar(driver, descartar=descartar)
+
+    def cerrar(self):
+        """Cierra todos los drivers libres y marca el pool como cerrado"""
+        with self._condicion:
+            self._cerrado = True
+            libres, self._libres = self._libres, []
+            prestados = list(self._prestados.values())
+            self._prestados.clear()
+            self._condicion.notify_all()
+
+        for entrada in libres + prestados:
+            self._destruir(entrada)
+
+    def desalojar_inactivos(self):
+        """Cierra los drivers libres que superaron el tiempo de inactividad"""
+        with self._condicion:
+            vencidos = self._desalojar_inactivos()
+            self._en_revision += len(vencidos)
+        try:
+            for entrada in vencidos:
+                self._destruir(entrada)
+        finally:
+            with self._condicion:
+                self._en_revision -= len(vencidos)
+                self._condicion.notify_all()
+        return len(vencidos)
+
+    def iniciar_vigilante(self):
+        """
+        Inicia un hilo daemon que desaloja drivers inactivos periódicamente
+
+        Sin él, un worker ocioso mantendría sus navegadores abiertos hasta
+        el siguiente préstamo.
+        """
+        intervalo = max(5.0, self.tiempo_inactivo / 2)
+
+        def vigilar():
+            while not self._cerrado:
+                time.sleep(intervalo)
+                self.desalojar_inactivos()
+
+        hilo = threading.Thread(target=vigilar, name='driver-pool-vigilante', daemon=True)
+        hilo.start()
+        return hilo
+
+    def estadisticas(self):
+        """Resumen del estado del pool para diagnósticos"""
+        with self._condicion:
+            return {
+                'tamano': self.tamano,
+                'libres': len(self._libres),
+                'prestados': len(self._prestados),
+                'creando': self._creando,
+                'en_revision': self._en_revision,
+                'max_usos': self.max_usos,
+                'limite_memoria_mb': self.limite_memoria_mb,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    """Retorna el pool del proceso actual, creándolo la primera vez"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool._cerrado:
+            _pool = DriverPool()
+            _pool.iniciar_vigilante()
+        return _pool
+
+
+def cerrar_driver_pool():
+    """Cierra el pool del proceso actual si existe"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.cerrar()
+        limpiar_directorios()
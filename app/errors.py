@@ -0,0 +1,207 @@
+"""
+Errores tipados del llenado y reporte de respuestas por formulario
+
+Antes, cada respuesta que fallaba (celda de matriz, Si/No, checkbox, texto)
+se imprimía y el llenado seguía: el formulario se enviaba incompleto, la
+tarea lo daba por completado, y cada campo siguiente que también fallaba
+esperaba su WebDriverWait completo.
+
+Ahora cada filler lleva un `ReporteRespuestas`: cada campo queda como
+respondido (y verificado, si el llenado en lote lo comprobó en el DOM) o
+como fallido con un error tipado:
+
+    CampoNoEncontrado      El campo no apareció en la página (selector)
+    CampoNoInteractuable   Estaba pero cubierto, oculto u obsoleto (transitorio)
+    DatosInvalidos         El dato no corresponde a ninguna opción (validacion)
+    EnvioIncierto          Falló algo tras el clic de envío final: la encuesta
+                           pudo quedar registrada (envio_incierto)
+
+La categoría de cada error es la de app/retries.py, así que un error tipado
+se reintenta o no según su tipo.
+
+Modo fallo rápido (default): el primer campo que no se pudo responder
+detiene el formulario antes de enviarlo, con su error tipado. Sin él, el
+formulario se envía y la tarea termina como 'partial' con el reporte.
+
+Configuración por variables de entorno:
+    FORM_FAIL_FAST / FORM{N}_FAIL_FAST: 1/0, detener el formulario en el primer
+                                        campo fallido (default 1)
+"""
+
+import os
+from contextlib import contextmanager
+
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+
+from app.logs import obtener_logger
+from app.retries import DESCONOCIDO, ENVIO_INCIERTO, SELECTOR, TRANSITORIO, VALIDACION
+
+
+log = obtener_logger(__name__)
+
+
+class ErrorFormulario(Exception):
+    """Error al responder un campo del formulario"""
+
+    categoria = DESCONOCIDO
+
+    def __init__(self, mensaje, campo=None):
+        super().__init__(mensaje)
+        self.campo = campo
+
+
+class CampoNoEncontrado(ErrorFormulario):
+    """El campo no apareció en la página"""
+
+    categoria = SELECTOR
+
+
+class CampoNoInteractuable(ErrorFormulario):
+    """El campo estaba en la página pero no se pudo usar (cubierto, oculto u obsoleto)"""
+
+    categoria = TRANSITORIO
+
+
+class DatosInvalidos(ErrorFormulario):
+    """El dato no corresponde a ninguna opción del formulario"""
+
+    categoria = VALIDACION
+
+
+class EnvioIncierto(ErrorFormulario):
+    """Falló algo después del clic de envío final; no se sabe si la encuesta lo registró"""
+
+    categoria = ENVIO_INCIERTO
+
+
+# Excepciones de Selenium -> error tipado
+ERRORES_TIPADOS = (
+    ((NoSuchElementException, TimeoutException), CampoNoEncontrado),
+    ((ElementNotInteractableException, ElementClickInterceptedException,
+      StaleElementReferenceException), CampoNoInteractuable),
+    ((ValueError, KeyError, TypeError), DatosInvalidos),
+)
+
+
+def tipificar(error, campo=None):
+    """
+    Error tipado equivalente a `error`
+
+    Returns:
+        ErrorFormulario: El mismo error si ya es tipado; si no, uno nuevo
+                         cuyo `__cause__` es el original
+    """
+    if isinstance(error, ErrorFormulario):
+        if error.campo is None:
+            error.campo = campo
+        return error
+    tipo = next((tipo for origen, tipo in ERRORES_TIPADOS if isinstance(error, origen)), ErrorFormulario)
+    tipado = tipo(str(error).strip() or type(error).__name__, campo)
+    tipado.__cause__ = error
+    return tipado
+
+
+def resolver_fallo_rapido(form_type=None, activo=None):
+    """
+    Determina si un formulario se detiene en el primer campo fallido
+
+    Args:
+        form_type (str): Tipo de formulario ('form1'...'form4')
+        activo (bool): Valor explícito; tiene prioridad sobre el entorno
+
+    Returns:
+        bool: True en modo fallo rápido
+    """
+    if activo is not None:
+        return bool(activo)
+
+    valor = os.getenv(f'{form_type.upper()}_FAIL_FAST') if form_type else None
+    if valor is None:
+        valor = os.getenv('FORM_FAIL_FAST', '1')
+    return valor.strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+class ReporteRespuestas:
+    """
+    Estado de cada campo de un formulario: respondido, verificado o fallido
+
+    El estado es por campo: si un campo que falló se responde después
+    (reintento de Selenium, reanudación de la página) deja de contar como
+    fallido.
+    """
+
+    def __init__(self, form_type=None, fallo_rapido=None):
+        """
+        Args:
+            form_type (str): Tipo de formulario
+            fallo_rapido (bool): Detener en el primer fallo. Si es None se toma
+                                 de FORM{N}_FAIL_FAST / FORM_FAIL_FAST
+        """
+        self.form_type = form_type
+        self.fallo_rapido = resolver_fallo_rapido(form_type, fallo_rapido)
+        self._campos = {}
+
+    def respondida(self, campo, verificada=False):
+        """Marca el campo como respondido (y verificado en el DOM, si se comprobó)"""
+        self._campos[campo] = verificada or self._campos.get(campo) is True
+
+    def fallida(self, campo, error):
+        """
+        Marca el campo como fallido
+
+        Raises:
+            ErrorFormulario: El error tipado, en modo fallo rápido. Un error que
+                             ya detuvo el formulario se relanza sin registrarlo
+                             de nuevo (atraviesa los `except` de los fillers)
+        """
+        if getattr(error, 'detiene', False):
+            raise error
+
+        tipado = tipificar(error, campo)
+        self._campos[campo] = tipado
+        log.warning("✗ No se pudo responder '%s' (%s): %s", campo, type(tipado).__name__, tipado)
+        if self.fallo_rapido:
+            tipado.detiene = True
+            raise tipado
+
+    @contextmanager
+    def campo(self, nombre):
+        """
+        Responde un campo: sin errores queda respondido; con error, fallido
+
+        Uso:
+            with self.respuestas.campo('sugerencias'):
+                campo = self.driver.find_element(By.ID, 'QR~QID51')
+                campo.send_keys(texto)
+        """
+        try:
+            yield
+        except Exception as e:
+            self.fallida(nombre, e)
+        else:
+            self.respondida(nombre)
+
+    @property
+    def fallos(self):
+        """Errores tipados de los campos que siguen fallidos"""
+        return [estado for estado in self._campos.values() if isinstance(estado, ErrorFormulario)]
+
+    def como_dict(self):
+        """Reporte para el resultado de la tarea"""
+        fallos = self.fallos
+        return {
+            'answered': len(self._campos) - len(fallos),
+            'verified': sum(1 for estado in self._campos.values() if estado is True),
+            'failed': len(fallos),
+            'failures': [
+                {'field': error.campo, 'error_type': type(error).__name__,
+                 'category': error.categoria, 'message': str(error)}
+                for error in fallos
+            ],
+        }
@@ -0,0 +1,203 @@
+"""
+Resolución de campos lógicos a localizadores estables
+
+Las preguntas de escala, las Si/No y los botones de navegación se ubicaban
+con XPaths absolutos (`/html/body/div[3]/div/form/...`). Esas expresiones
+recorren todo el documento y se rompen en cuanto Qualtrics mueve un div.
+Este módulo resuelve cada campo lógico (p. ej. "form3.recomendacion") al
+localizador más rápido y estable disponible, en este orden:
+
+    1. Los candidatos por id o label declarados (p. ej. `#NextButton`, o el
+       `label[for=...]` de una escala o Si/No con 'qid' en su especificación)
+    2. El CSS por id o `label[for=...]` aprendido en una resolución anterior
+    3. El XPath absoluto, como último recurso
+
+Los QIDs de las preguntas de escala y Si/No de los formularios 1 a 4 no se
+conocen (el código original sólo tenía sus XPaths), así que sus
+especificaciones no declaran 'qid' y en ellas el XPath sigue siendo el
+localizador principal hasta que se aprende el CSS equivalente. Al conocer un
+QID basta con declararlo en la especificación.
+
+El orden no depende de cómo el llamador liste los candidatos: los XPath
+siempre van al final. Cuando un campo sólo se encuentra por XPath, se lee del
+elemento su id (o el `for` de su label) y se recuerda el CSS equivalente para
+el resto del proceso; como sólo se aprende cuando los candidatos declarados
+fallaron, en las operaciones el aprendido reemplaza al declarado. Los
+elementos resueltos (botones y campos de las operaciones) se guardan
+mientras dure la página y se descartan al navegar (`invalidar`).
+
+Todo el motor pasa por aquí: botones (`elemento`), operaciones del llenado
+por página (`preparar`), del respaldo con Selenium (`elemento_operacion`) y
+la comprobación de la página al reanudar (`presente`).
+"""
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from app.logs import obtener_logger
+
+
+log = obtener_logger(__name__)
+
+
+# Recibe un elemento y retorna un selector CSS estable (id o label[for]) o null
+SCRIPT_SELECTOR_ESTABLE = """
+var el = arguments[0];
+if (el.tagName === 'LABEL' && el.htmlFor) { return 'label[for="' + el.htmlFor + '"]'; }
+if (el.id) { return '#' + CSS.escape(el.id); }
+return null;
+"""
+
+# CSS estables aprendidos, compartidos por todos los fillers del proceso:
+# {(form_type, campo): selector}
+LOCALIZADORES_APRENDIDOS = {}
+
+
+def selector_label(entrada):
+    """CSS del label de un input por su id"""
+    return 'label[for="' + entrada.replace('\\', '\\\\').replace('"', '\\"') + '"]'
+
+
+class ResolutorLocalizadores:
+    """
+    Localizadores de los campos de un formulario y caché de elementos por página
+
+    Uso:
+        localizadores = ResolutorLocalizadores(driver, 'form2')
+        boton = localizadores.elemento('siguiente', [(By.ID, 'NextButton'), (By.XPATH, xpath)])
+        boton.click()
+        localizadores.invalidar()
+    """
+
+    def __init__(self, driver, form_type, aprendidos=None):
+        """
+        Args:
+            driver (WebDriver): Driver con la página del formulario
+            form_type (str): Tipo de formulario (prefijo de los campos lógicos)
+            aprendidos (dict): Selectores aprendidos. Si es None se usa la caché del proceso
+        """
+        self.driver = driver
+        self.form_type = form_type
+        self.aprendidos = LOCALIZADORES_APRENDIDOS if aprendidos is None else aprendidos
+        self._elementos = {}
+
+    def _aprender(self, campo, elemento):
+        """Guarda el CSS estable de un elemento que sólo se encontró por XPath"""
+        try:
+            selector = self.driver.execute_script(SCRIPT_SELECTOR_ESTABLE, elemento)
+        except Exception:
+            return
+        if selector:
+            self.aprendidos[(self.form_type, campo)] = selector
+            log.info("✓ %s.%s: XPath reemplazado por '%s'", self.form_type, campo, selector)
+
+    @staticmethod
+    def _orden(aprendido, candidatos):
+        """Candidatos por id/label, luego el CSS aprendido y al final los XPath"""
+        estables = [(por, valor) for por, valor in candidatos if por != By.XPATH]
+        xpaths = [(por, valor) for por, valor in candidatos if por == By.XPATH]
+        return estables + ([(By.CSS_SELECTOR, aprendido)] if aprendido else []) + xpaths
+
+    @staticmethod
+    def _campo(op):
+        """Nombre del campo de una operación: su XPath (clave de lo aprendido) o su id"""
+        return op['xpath'] if op['tipo'] == 'label_xpath' else op['id']
+
+    @staticmethod
+    def _declarados(op):
+        """Localizadores que declara una operación: id, o label y XPath"""
+        if op['tipo'] != 'label_xpath':
+            return [(By.ID, op['id'])]
+        declarados = [(By.CSS_SELECTOR, selector_label(op['entrada']))] if op.get('entrada') else []
+        return declarados + [(By.XPATH, op['xpath'])]
+
+    def candidatos(self, op):
+        """
+        Localizadores de una operación del plan (app/bulk_fill.py), en orden de preferencia
+
+        Returns:
+            list: Pares (By, valor): id o label declarado, CSS aprendido, XPath
+        """
+        return self._orden(self.aprendidos.get((self.form_type, self._campo(op))), self._declarados(op))
+
+    def elemento_operacion(self, op):
+        """
+        Elemento de una operación en la página actual: el input (texto, radio,
+        checkbox) o el label (escala, Si/No), cacheado hasta `invalidar`
+
+        Raises:
+            NoSuchElementException: Si el campo no está en la página
+        """
+        return self.elemento(self._campo(op), self._declarados(op))
+
+    def presente(self, op):
+        """True si el campo de la operación está en la página abierta"""
+        try:
+            self.elemento_operacion(op)
+        except NoSuchElementException:
+            return False
+        return True
+
+    def elemento(self, campo, candidatos):
+        """
+        Elemento del campo lógico en la página actual
+
+        Args:
+            campo (str): Nombre lógico del campo (p. ej. 'siguiente')
+            candidatos (list): Localizadores (By, valor) en orden de preferencia;
+                               los XPath se prueban al final en cualquier caso
+
+        Returns:
+            WebElement: Primer elemento encontrado
+
+        Raises:
+            NoSuchElementException: Si ningún localizador encuentra el campo
+        """
+        if campo in self._elementos:
+            return self._elementos[campo]
+
+        for por, valor in self._orden(self.aprendidos.get((self.form_type, campo)), candidatos):
+            encontrados = self.driver.find_elements(por, valor)
+            if not encontrados:
+                continue
+            if por == By.XPATH:
+                self._aprender(campo, encontrados[0])
+            self._elementos[campo] = encontrados[0]
+            return encontrados[0]
+
+        raise NoSuchElementException(f"{self.form_type}.{campo}: ningún localizador encontró el campo")
+
+    def preparar(self, operaciones):
+        """
+        Agrega a las operaciones por XPath su CSS estable: el aprendido o, si
+        no lo hay, el `label[for=...]` de su 'entrada' declarada
+
+        El script de página y el respaldo con Selenium prueban ese CSS antes
+        que el XPath. Las operaciones originales no se modifican (pueden estar
+        compartidas por el plan del formulario).
+        """
+        preparadas = []
+        for op in operaciones:
+            selector = None
+            if op['tipo'] == 'label_xpath':
+                # El aprendido sólo existe si el declarado no se encontró
+                selector = self.aprendidos.get((self.form_type, op['xpath']))
+                if selector is None and op.get('entrada'):
+                    selector = selector_label(op['entrada'])
+            preparadas.append({**op, 'css': selector} if selector else op)
+        return preparadas
+
+    def aprender(self, operaciones, reporte):
+        """Guarda los CSS estables que `aplicar_operaciones` reportó para las operaciones por XPath"""
+        for op, resultado in zip(operaciones, reporte):
+            selector = resultado.get('selector')
+            if selector and op['tipo'] == 'label_xpath':
+                self.aprendidos[(self.form_type, op['xpath'])] = selector
+
+    def olvidar(self, op):
+        """Descarta el elemento cacheado de una operación (p. ej. quedó obsoleto)"""
+        self._elementos.pop(self._campo(op), None)
+
+    def invalidar(self):
+        """Descarta los elementos resueltos: la página cambió"""
+        self._elementos.clear()
@@ -0,0 +1,798 @@
+"""
+Motor de llenado de formularios a partir de especificaciones declarativas
+
+Los formularios form1–form4 comparten casi todo su código; lo que cambia son
+los datos: QIDs, choice ids, posición de cada pregunta, qué secciones dependen
+de una respuesta Si/No y cuántas páginas hay. Este módulo recorre cualquier
+formulario descrito con un `SPEC` (app/form_specs) con un único filler, así
+cada optimización del llenado se hace una sola vez.
+
+Cada especificación se compila una vez por proceso a un plan: por página, una
+lista ordenada de pasos (condición, enlazador de operaciones) con los ids de
+celda, XPaths y opciones ya resueltos. Los pasos activos para cada forma de
+datos (qué ramas condicionales se toman) se guardan en una caché LRU; en cada
+tarea sólo se evalúan las condiciones y se enlazan los valores. La página se
+aplica con `aplicar_operaciones` (app/bulk_fill.py) y las operaciones no
+verificadas se reintentan con Selenium.
+
+Los modos de llenado son los de app/bulk_fill.py: con FORM{N}_PAGE_FILL=0
+cada matriz se llena con un solo script (`llenar_celdas_matriz`) y el resto
+campo a campo; con FORM{N}_BULK_FILL=0 también las matrices van celda a
+celda. En todos los modos el avance se informa por sección de matriz
+(`seccion_iniciada`, `celdas_completadas`, `seccion_completada`).
+
+El envío final se confirma siempre con el marcador de fin de encuesta
+(`#EndOfSurvey`), también en modo 'sleep': si tras el clic de envío la página
+de cierre no llega, o falla cualquier otra cosa, el error se informa como
+`EnvioIncierto` (la encuesta pudo quedar registrada) y la tarea no repite el
+formulario. Sólo un mensaje de validación de Qualtrics visible lo deja como
+error de validación.
+
+Formato de una especificación:
+
+    SPEC = {
+        'form_type': 'form2',
+        'url': "https://...",
+        'secciones': SECCIONES_CONFIG,         # secciones de matriz por nombre
+        'paginas': [{
+            'numero': 1,
+            'datos': None,                      # clave del sub-dict de datos ('pagina_2'); None = raíz
+            'ancla': 'QR~QID57',                # campo que confirma la carga (sólo la primera página)
+            'campos': [...],                    # en el orden en que se responden
+            'navegacion': 'siguiente',          # 'siguiente' o 'enviar'
+        }],
+    }
+
+Tipos de campo (todos aceptan 'fuente' si la clave de datos difiere de
+'clave', 'defecto' para valores ausentes y 'si' con una condición):
+
+    {'tipo': 'texto', 'clave', 'id'}
+    {'tipo': 'escala', 'clave', 'pregunta', 'desplazamiento' (default 1), 'qid'}
+    {'tipo': 'si_no', 'clave', 'pregunta', 'qid'}
+
+'pregunta' es la posición de la pregunta en la página (su XPath absoluto). Si
+se declara el 'qid' opcional, la respuesta se ubica primero por el
+`label[for="QR~QID{qid}~{columna}"]` y el XPath queda de respaldo. Los
+formularios 1 a 4 no lo declaran porque sus QIDs de escala y Si/No no se
+conocen: ahí el XPath es el localizador principal hasta que se aprende su CSS.
+    {'tipo': 'matriz', 'seccion'}
+    {'tipo': 'checkboxes', 'clave', 'qid', 'opciones'}
+
+Condiciones ('si'), evaluadas sobre los datos de la misma página:
+
+    {'campo': 'apoyo_piscosocial', 'igual': 'si'}   Sin distinguir mayúsculas
+    {'campo': 'recomendacion', 'no_en': [9, 10]}
+    {'campo': 'satisfaccion', 'hasta': 6}
+    {'presente': 'pqrs_medios'}                     La clave viene en los datos
+
+Configuración por variables de entorno:
+    FORM_PLAN_CACHE_SIZE: Esqueletos de plan en la caché LRU (default 256)
+"""
+
+import os
+import time
+from functools import lru_cache
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from app.bulk_fill import (
+    aplicar_operacion_webdriver,
+    aplicar_operaciones,
+    buscar_opcion,
+    llenar_celdas_matriz,
+    normalizar_valores,
+    op_checkbox,
+    op_escala,
+    op_radio,
+    op_si_no,
+    op_texto,
+    resolver_llenado_lote,
+    resolver_llenado_pagina,
+)
+from app.driver_pool import crear_driver
+from app.errors import CampoNoEncontrado, EnvioIncierto, ReporteRespuestas
+from app.field_locators import ResolutorLocalizadores
+from app.form_specs import FORM_SPECS, obtener_spec, url_formulario
+from app.logs import obtener_logger, seguir_evento
+from app.metrics import (
+    DURACION_NAVEGACION,
+    DURACION_PAGINA,
+    DURACION_SECCION,
+    cronometrar,
+    registrar_celda,
+    registrar_clic,
+)
+from app.retries import VALIDACION, ReanudacionImposible, clasificar_error
+from app.tabs import EjecutorPestanas
+from app.waits import Esperas
+
+
+log = obtener_logger(__name__)
+
+
+# Botones de navegación de Qualtrics: la primera página sólo tiene Siguiente,
+# las demás tienen Atrás y Siguiente. El id va primero; el XPath absoluto
+# queda como último recurso (app/field_locators.py).
+XPATH_BOTON_INICIAL = "/html/body/div[3]/div/form/div/div[2]/div[1]/div[3]/div[2]/input"
+XPATH_BOTON_SIGUIENTE = "/html/body/div[3]/div/form/div/div[2]/div[1]/div[3]/div[2]/input[2]"
+
+CANDIDATOS_BOTON = {
+    'siguiente': [(By.ID, 'NextButton'), (By.XPATH, XPATH_BOTON_INICIAL)],
+    'enviar': [(By.ID, 'NextButton'), (By.XPATH, XPATH_BOTON_SIGUIENTE)],
+}
+
+NAVEGACIONES = ('siguiente', 'enviar')
+
+# Esqueletos de plan (pasos activos por forma de los datos) que se conservan
+TAMANO_CACHE_PLANES = int(os.getenv('FORM_PLAN_CACHE_SIZE', '256'))
+
+# Columnas de escala precalculadas (escalas 0-10 y 1-10)
+VALORES_ESCALA = range(0, 11)
+
+# Textos de opción cuya resolución se memoriza por campo de checkboxes
+MAX_OPCIONES_MEMORIZADAS = 256
+
+
+def _valor(datos, fuente, defecto):
+    valor = datos.get(fuente)
+    return defecto if valor is None else valor
+
+
+def _compilar_condicion(si, campos):
+    """
+    Convierte una condición declarativa en una función `condicion(datos)`
+
+    Args:
+        si (dict): Condición del campo, o None
+        campos (dict): Campos de la página por clave (para resolver fuente y defecto)
+    """
+    if si is None:
+        return None
+
+    if 'presente' in si:
+        clave = si['presente']
+        return lambda datos: clave in datos
+
+    referido = campos.get(si['campo'], {})
+    fuente = referido.get('fuente', si['campo'])
+    defecto = referido.get('defecto')
+
+    if 'igual' in si:
+        esperado = str(si['igual']).lower()
+        return lambda datos: str(_valor(datos, fuente, defecto) or '').lower() == esperado
+    if 'no_en' in si:
+        excluidos = tuple(si['no_en'])
+        return lambda datos: _valor(datos, fuente, defecto) not in excluidos
+    if 'hasta' in si:
+        limite = si['hasta']
+        return lambda datos: _valor(datos, fuente, defecto) <= limite
+
+    raise ValueError(f"Condición no soportada: {si}")
+
+
+def _compilar_campo(campo, secciones):
+    """
+    Convierte un campo declarativo en una función `enlazar(datos)` -> operaciones
+
+    Todo lo que no depende de los datos se resuelve aquí, una sola vez: el
+    prefijo del id de cada celda de matriz, los XPaths de cada columna de
+    escala y de ambas respuestas Si/No, y el choice id de cada texto de
+    opción ya visto. Al enlazar sólo se insertan los valores.
+
+    Las operaciones constantes se comparten entre tareas: no deben modificarse.
+    """
+    tipo = campo['tipo']
+
+    if tipo == 'matriz':
+        nombre = campo['seccion']
+        if nombre not in secciones:
+            raise ValueError(f"Sección '{nombre}' no encontrada")
+        config = secciones[nombre]
+        fuente = campo.get('fuente', nombre)
+        filas = [
+            (f"QR~QID{config['QID']}#{config['question_id']}~{choice_id}~",
+             f"{nombre}[{choice_id}]",
+             (config['QID'], config['question_id'], choice_id))
+            for choice_id in config['choice_ids']
+        ]
+
+        def enlazar_matriz(datos):
+            valores = normalizar_valores(len(filas), datos.get(fuente), nombre)
+            return [op_radio(f"{prefijo}{valor}", clave, celda + (valor,), nombre)
+                    for (prefijo, clave, celda), valor in zip(filas, valores)]
+
+        return enlazar_matriz
+
+    clave = campo['clave']
+    fuente = campo.get('fuente', clave)
+    defecto = campo.get('defecto')
+
+    if tipo == 'texto':
+        elemento_id = campo['id']
+        return lambda datos: [op_texto(elemento_id, _valor(datos, fuente, defecto), clave)]
+
+    if tipo == 'escala':
+        pregunta = campo['pregunta']
+        qid = campo.get('qid')
+        desplazamiento = campo.get('desplazamiento', 1)
+        columnas = {valor: op_escala(pregunta, valor + desplazamiento, clave, qid) for valor in VALORES_ESCALA}
+
+        def enlazar_escala(datos):
+            valor = _valor(datos, fuente, defecto)
+            op = columnas.get(valor)
+            return [op if op is not None else op_escala(pregunta, valor + desplazamiento, clave, qid)]
+
+        return enlazar_escala
+
+    if tipo == 'si_no':
+        si = op_si_no(campo['pregunta'], 'Si', clave, campo.get('qid'))
+        no = op_si_no(campo['pregunta'], 'No', clave, campo.get('qid'))
+        return lambda datos: [si if str(_valor(datos, fuente, defecto) or '').lower() == 'si' else no]
+
+    if tipo == 'checkboxes':
+        qid = campo['qid']
+        opciones = campo['opciones']
+        resueltas = {}
+
+        def enlazar_checkboxes(datos):
+            operaciones = []
+            for opcion in datos.get(fuente) or []:
+                if opcion in resueltas:
+                    choice_id = resueltas[opcion]
+                else:
+                    choice_id = buscar_opcion(opcion, opciones)
+                    if len(resueltas) < MAX_OPCIONES_MEMORIZADAS:
+                        resueltas[opcion] = choice_id
+                if choice_id is None:
+                    log.warning("⚠ Opción '%s' no reconocida. Saltando...", opcion)
+                    continue
+                operaciones.append(op_checkbox(f"QR~QID{qid}~{choice_id}", clave=f"{clave}:{opcion}"))
+            return operaciones
+
+        return enlazar_checkboxes
+
+    raise ValueError(f"Tipo de campo no soportado: {tipo}")
+
+
+class PlanPagina:
+    """Pasos compilados de una página: condición y enlazador de operaciones de cada campo"""
+
+    def __init__(self, numero, datos, ancla, navegacion, pasos):
+        self.numero = numero
+        self.datos = datos
+        self.ancla = ancla
+        self.navegacion = navegacion
+        self.pasos = pasos
+        self.condiciones = [condicion for condicion, _ in pasos if condicion is not None]
+
+    def valores(self, datos):
+        """Datos de la página: la raíz o el sub-dict indicado en la especificación"""
+        return datos if self.datos is None else (datos.get(self.datos) or {})
+
+    def forma(self, valores):
+        """Ramas tomadas en la página: el resultado de cada condición, en orden"""
+        return tuple(bool(condicion(valores)) for condicion in self.condiciones)
+
+    def activos(self, forma):
+        """Enlazadores de los campos que se responden con esta forma de datos"""
+        ramas = iter(forma)
+        return tuple(enlazar for condicion, enlazar in self.pasos
+                     if condicion is None or next(ramas))
+
+    def operaciones(self, datos):
+        """
+        Operaciones de la página para los datos de un formulario
+
+        Args:
+            datos (dict): Datos completos del formulario (mismo formato que `ejecutar`)
+
+        Returns:
+            list: Operaciones para `aplicar_operaciones`, en orden
+        """
+        valores = self.valores(datos)
+        return [op for enlazar in self.activos(self.forma(valores)) for op in enlazar(valores)]
+
+
+class PlanFormulario:
+    """Especificación compilada de un formulario"""
+
+    def __init__(self, spec):
+        self.form_type = spec['form_type']
+        self.url = spec['url']
+        # Nombre para mostrar y QID de cada sección de matriz
+        self.secciones = {nombre: config.get('nombre', nombre) for nombre, config in spec.get('secciones', {}).items()}
+        self.qids = {nombre: config['QID'] for nombre, config in spec.get('secciones', {}).items()}
+        # Campos que Qualtrics muestra por display logic según otra respuesta:
+        # secciones de matriz por nombre y el resto por clave
+        self.condicionales = frozenset(
+            campo.get('seccion') or campo['clave']
+            for pagina in spec['paginas'] for campo in pagina['campos']
+            if 'campo' in (campo.get('si') or {})
+        )
+        self.paginas = [self._compilar_pagina(p, spec.get('secciones', {})) for p in spec['paginas']]
+
+    @staticmethod
+    def _compilar_pagina(pagina, secciones):
+        navegacion = pagina.get('navegacion', 'enviar')
+        if navegacion not in NAVEGACIONES:
+            raise ValueError(f"Navegación inválida en la página {pagina['numero']}: {navegacion}")
+
+        campos = {c['clave']: c for c in pagina['campos'] if 'clave' in c}
+        pasos = [
+            (_compilar_condicion(campo.get('si'), campos), _compilar_campo(campo, secciones))
+            for campo in pagina['campos']
+        ]
+        return PlanPagina(pagina['numero'], pagina.get('datos'), pagina.get('ancla'), navegacion, pasos)
+
+
+@lru_cache(maxsize=None)
+def plan_formulario(form_type):
+    """Plan compilado del formulario (una vez por proceso)"""
+    return PlanFormulario(obtener_spec(form_type))
+
+
+@lru_cache(maxsize=TAMANO_CACHE_PLANES)
+def _esqueleto(form_type, forma):
+    """Enlazadores activos de cada página para una forma de datos"""
+    plan = plan_formulario(form_type)
+    return tuple(pagina.activos(ramas) for pagina, ramas in zip(plan.paginas, forma))
+
+
+def operaciones_formulario(form_type, datos):
+    """
+    Compila los datos de un formulario a operaciones DOM, página por página
+
+    La forma de los datos (qué ramas condicionales se toman, p. ej.
+    `apoyo_piscosocial` o `contacto_nutricionista`) selecciona un esqueleto
+    de pasos guardado en una caché LRU; con él sólo queda enlazar los valores.
+
+    Args:
+        form_type (str): Tipo de formulario registrado
+        datos (dict | BaseModel): Datos del formulario o su Form{N}Request validado
+
+    Returns:
+        list: Por cada página, la lista ordenada de operaciones para `aplicar_operaciones`
+    """
+    if hasattr(datos, 'model_dump'):
+        datos = datos.model_dump()
+
+    plan = plan_formulario(form_type)
+    valores = [pagina.valores(datos) for pagina in plan.paginas]
+    forma = tuple(pagina.forma(v) for pagina, v in zip(plan.paginas, valores))
+
+    return [
+        [op for enlazar in activos for op in enlazar(v)]
+        for activos, v in zip(_esqueleto(form_type, forma), valores)
+    ]
+
+
+def estadisticas_planes():
+    """Aciertos, fallos y ocupación de la caché de esqueletos de plan"""
+    info = _esqueleto.cache_info()
+    return {'aciertos': info.hits, 'fallos': info.misses, 'tamano': info.currsize, 'maximo': info.maxsize}
+
+
+def _grupos_seccion(operaciones):
+    """
+    Divide las operaciones de una página en grupos consecutivos por sección
+
+    Returns:
+        list: Pares (sección, operaciones); la sección es None para los campos sueltos
+    """
+    grupos = []
+    for op in operaciones:
+        seccion = op.get('seccion')
+        if grupos and grupos[-1][0] == seccion:
+            grupos[-1][1].append(op)
+        else:
+            grupos.append((seccion, [op]))
+    return grupos
+
+
+class FormularioDeclarativo:
+    """
+    Filler genérico que llena cualquier formulario registrado en app/form_specs
+
+    Expone `pasos`, `ejecutar` y `ejecutar_en_pestanas`, así que sirve en las
+    tareas de Celery y en `EjecutorPestanas`. Cada formulario es una subclase
+    creada por `filler_para(form_type)`; los `ColsubsidioFormFiller` de
+    form1.py–form4.py son subclases de nombre fijo.
+    """
+
+    FORM_TYPE = None
+    # Puede reanudar en el mismo navegador desde una página (app/retries.py)
+    REANUDABLE = True
+
+    def __init__(self, driver=None, modo_espera=None, notificar=None, respuestas=None,
+                 llenado_lote=None, llenado_pagina=None):
+        """
+        Args:
+            driver (WebDriver): Driver prestado (p. ej. por el pool del worker).
+                                Si es None se lanza un Chrome propio que se
+                                cierra al terminar `ejecutar`.
+            modo_espera (str): 'condiciones' o 'sleep'. Si es None se toma de
+                               FORM{N}_WAIT_MODE / FORM_WAIT_MODE
+            notificar (callable): Función `notificar(evento, **datos)` que recibe
+                                  el avance del llenado (app/task_progress.py)
+            respuestas (ReporteRespuestas): Reporte de respuestas (app/errors.py),
+                                            p. ej. compartido entre reanudaciones.
+                                            Si es None se crea uno
+            llenado_lote (bool): Llenar cada matriz con un solo script. Si es
+                                 None se toma de FORM{N}_BULK_FILL / FORM_BULK_FILL
+            llenado_pagina (bool): Aplicar cada página completa con un solo script.
+                                   Si es None se toma de FORM{N}_PAGE_FILL / FORM_PAGE_FILL
+        """
+        self.plan = plan_formulario(self.FORM_TYPE)
+        self.driver_propio = driver is None
+        self.driver = crear_driver() if driver is None else driver
+        self.wait = WebDriverWait(self.driver, 10)
+        self.esperas = Esperas(self.driver, self.FORM_TYPE, modo_espera, notificar=self._notificar)
+        self.localizadores = ResolutorLocalizadores(self.driver, self.FORM_TYPE)
+        self.llenado_lote = resolver_llenado_lote(self.FORM_TYPE, llenado_lote)
+        self.llenado_pagina = resolver_llenado_pagina(self.FORM_TYPE, llenado_pagina)
+        self.notificar = notificar
+        self.respuestas = respuestas if respuestas is not None else ReporteRespuestas(self.FORM_TYPE)
+        self.url = url_formulario(self.FORM_TYPE, self.plan.url)
+        # True desde el clic de envío final: un fallo posterior es un envío incierto
+        self.envio_final_iniciado = False
+
+    def _notificar(self, evento, **datos):
+        """Informa el avance al callback `notificar`, si lo hay, y lo sigue en el contexto de log"""
+        seguir_evento(evento, **datos)
+        if self.notificar is not None:
+            self.notificar(evento, form_type=self.FORM_TYPE, **datos)
+
+    def llenar_pagina(self, pagina, operaciones):
+        """
+        Aplica las respuestas de una página según el modo de llenado
+
+        Con llenado por página todas las respuestas van en un solo script;
+        sin él, cada matriz va en un script (o celda a celda sin llenado en
+        lote) y el resto campo a campo. Lo que no se pudo aplicar o verificar
+        se reintenta una a una con Selenium y cada respuesta queda en
+        `self.respuestas`. En modo fallo rápido, un campo que el script de
+        página esperó sin que apareciera detiene el formulario sin reintentarlo.
+
+        Fuera del llenado por página se usan las esperas del llenado campo a
+        campo (app/waits.py): display logic antes de cada campo condicional,
+        confirmación de cada clic y, en modo 'sleep', las pausas originales.
+
+        Args:
+            pagina (PlanPagina): Página compilada
+            operaciones (list): Operaciones de la página (`operaciones_formulario`)
+        """
+        with DURACION_PAGINA.labels(form_type=self.FORM_TYPE, pagina=pagina.numero).time():
+            operaciones = self.localizadores.preparar(operaciones)
+            if self.llenado_pagina:
+                log.debug("Llenando página %s en lote (%s respuestas)...", pagina.numero, len(operaciones))
+                reporte = aplicar_operaciones(self.driver, operaciones)
+                self.localizadores.aprender(operaciones, reporte)
+                verificadas = sum(1 for resultado in reporte if resultado['verificado'])
+                log.debug("✓ %s/%s respuestas aplicadas y verificadas en un solo script", verificadas, len(operaciones))
+            else:
+                reporte = None
+
+            inicio = 0
+            for seccion, grupo in _grupos_seccion(operaciones):
+                resultados = reporte[inicio:inicio + len(grupo)] if reporte is not None else None
+                inicio += len(grupo)
+                if seccion is None:
+                    self._llenar_campos(pagina, grupo, resultados)
+                else:
+                    self._llenar_seccion(seccion, grupo, resultados)
+
+            if reporte is None:
+                self.esperas.pausa('pagina_completada')
+
+    def _llenar_campos(self, pagina, operaciones, reporte):
+        """
+        Campos sueltos (textos, escalas, Si/No, checkboxes) de una página
+
+        Args:
+            reporte (list): Resultado de `aplicar_operaciones` para estas
+                            operaciones, o None si se llenan campo a campo
+        """
+        if reporte is None:
+            for op in operaciones:
+                self._aplicar_con_selenium(op)
+            completadas = len(operaciones)
+            if any(op['tipo'] == 'checkbox' for op in operaciones):
+                self.esperas.pausa('checkboxes_completados')
+        else:
+            fallidas = self._verificadas(operaciones, reporte)
+            completadas = len(operaciones) - len(fallidas)
+            self._reintentar(fallidas, esperadas=True)
+        self._notificar('celdas_completadas', seccion=None, nombre=f"página {pagina.numero}",
+                        completadas=completadas, celdas=len(operaciones))
+
+    @cronometrar(DURACION_SECCION, etiqueta_argumento='seccion')
+    def _llenar_seccion(self, seccion, operaciones, reporte):
+        """
+        Celdas de una sección de matriz, con su avance
+
+        Args:
+            reporte (list): Resultado de `aplicar_operaciones` para estas
+                            celdas, o None si la página no se llenó en lote
+        """
+        celdas = len(operaciones)
+        por_pagina = reporte is not None
+        self._notificar('seccion_iniciada', seccion=seccion, nombre=self.plan.secciones.get(seccion, seccion),
+                        celdas=celdas)
+
+        if not por_pagina and seccion in self.plan.condicionales:
+            # La sección aparece por display logic tras la respuesta anterior
+            self.esperas.logica_visualizacion(self.plan.qids.get(seccion))
+
+        if reporte is None and self.llenado_lote:
+            # Todas las celdas en un solo round-trip
+            reporte = [dict(resultado, verificado=resultado['ok'])
+                       for resultado in llenar_celdas_matriz(self.driver, [op['celda'] for op in operaciones])]
+
+        if reporte is not None:
+            fallidas = self._verificadas(operaciones, reporte)
+            self._notificar('celdas_completadas', seccion=seccion, completadas=celdas - len(fallidas), celdas=celdas)
+            # El script de página espera a cada campo; el de la sección no
+            self._reintentar(fallidas, esperadas=por_pagina)
+        else:
+            for i, op in enumerate(operaciones, 1):
+                self._aplicar_con_selenium(op)
+                self._notificar('celdas_completadas', seccion=seccion, completadas=i, celdas=celdas)
+
+        if not por_pagina:
+            self.esperas.pausa('seccion_completada')
+        self._notificar('seccion_completada', seccion=seccion)
+
+    def _verificadas(self, operaciones, reporte):
+        """
+        Anota las operaciones verificadas por un script
+
+        Las celdas de matriz se cuentan por el método con el que las marcó el
+        script: el de `llenar_celdas_matriz` ('label', 'input', 'evento') o
+        'pagina' si fue `aplicar_operaciones`.
+
+        Returns:
+            list: Pares (operación, resultado) de las que quedan por reintentar
+        """
+        fallidas = []
+        for op, resultado in zip(operaciones, reporte):
+            if resultado['verificado']:
+                self.respuestas.respondida(op['clave'], verificada=True)
+                if op['tipo'] == 'radio':
+                    registrar_celda(self.FORM_TYPE, resultado.get('metodo') or 'pagina')
+            else:
+                fallidas.append((op, resultado))
+        return fallidas
+
+    def _reintentar(self, fallidas, esperadas):
+        """
+        Aplica una a una con Selenium las operaciones que un script no pudo aplicar o verificar
+
+        Args:
+            fallidas (list): Pares (operación, resultado) de `_verificadas`
+            esperadas (bool): True si el script ya esperó a que cada campo
+                              apareciera (`aplicar_operaciones`); las celdas de
+                              `llenar_celdas_matriz` no esperan y se reintentan
+                              siempre, con la espera del camino de Selenium
+        """
+        for op, resultado in fallidas:
+            if esperadas and resultado['error'] == 'no_encontrado' and self.respuestas.fallo_rapido:
+                # El script ya esperó el campo: reintentarlo sólo agotaría otra
+                # espera. En fallo rápido `fallida` lanza y detiene el formulario
+                self.respuestas.fallida(op['clave'], CampoNoEncontrado("El campo no apareció en la página"))
+                continue
+            log.debug("Reintentando '%s' (%s)...", op['clave'], resultado['error'] or 'no verificado')
+            self._aplicar_con_selenium(op)
+
+    def _aplicar_con_selenium(self, op):
+        """
+        Aplica una operación con llamadas normales de Selenium y anota el resultado
+
+        Espera antes a un texto condicional y confirma después el clic, con
+        las mismas condiciones (o pausas, en modo 'sleep') del llenado campo
+        a campo original. Las celdas de matriz se miden y cuentan como
+        'selenium', o 'error' si no se pudieron marcar.
+        """
+        inicio = time.monotonic()
+        metodo = 'error'
+        try:
+            with self.respuestas.campo(op['clave']):
+                if op['tipo'] == 'texto' and op['clave'] in self.plan.condicionales:
+                    self.esperas.campo_visible((By.ID, op['id']))
+                elif op['tipo'] == 'checkbox':
+                    self.esperas.pausa('scroll')
+
+                self._aplicar_webdriver(op)
+
+                if op['tipo'] == 'radio':
+                    self.esperas.celda_marcada(op['id'])
+                elif op['tipo'] == 'checkbox':
+                    self.esperas.opcion_marcada(op['id'])
+                elif op['tipo'] == 'label_xpath':
+                    self.esperas.opcion_marcada(op.get('entrada'))
+                metodo = 'selenium'
+        finally:
+            if op['tipo'] == 'radio':
+                registrar_celda(self.FORM_TYPE, metodo, inicio)
+
+    def _aplicar_webdriver(self, op):
+        """
+        Aplica la operación sobre su elemento cacheado en la página, o lo busca
+        con espera si todavía no está; un elemento obsoleto se descarta y se
+        vuelve a buscar una vez
+        """
+        try:
+            elemento = self.localizadores.elemento_operacion(op)
+        except NoSuchElementException:
+            elemento = None
+        try:
+            aplicar_operacion_webdriver(self.driver, op, elemento=elemento)
+        except StaleElementReferenceException:
+            self.localizadores.olvidar(op)
+            aplicar_operacion_webdriver(self.driver, op)
+
+    def navegar(self, pagina):
+        """
+        Sale de la página con su botón Siguiente y espera la transición
+
+        'siguiente' espera a que se renderice la página siguiente; 'enviar'
+        espera a que Qualtrics procese el envío de la página.
+        """
+        campo = f"boton_{pagina.navegacion}"
+        candidatos = CANDIDATOS_BOTON[pagina.navegacion]
+
+        with DURACION_NAVEGACION.labels(form_type=self.FORM_TYPE, boton=pagina.navegacion).time():
+            if pagina.navegacion == 'siguiente':
+                marcador = self.esperas.marcar_pagina()
+                self.localizadores.elemento(campo, candidatos).click()
+                self.localizadores.invalidar()
+                self.esperas.pagina_renderizada(pagina.numero + 1, marcador)
+                return
+
+            log.debug("Haciendo clic en botón siguiente...")
+            boton = self.wait.until(lambda driver: self.localizadores.elemento(campo, candidatos))
+            boton = self.wait.until(EC.element_to_be_clickable(boton))
+            self.driver.execute_script("arguments[0].scrollIntoView(true);", boton)
+            self.esperas.boton_siguiente_listo(boton)
+            marcador = self.esperas.marcar_pagina()
+
+            self.envio_final_iniciado = True
+            try:
+                boton.click()
+                log.debug("✓ Clic en botón siguiente exitoso")
+                registrar_clic(self.FORM_TYPE, 'click')
+            except Exception:
+                log.debug("Método 1 falló, intentando con JavaScript...")
+                self.driver.execute_script("arguments[0].click();", boton)
+                log.debug("✓ Clic en botón siguiente exitoso (JavaScript)")
+                registrar_clic(self.FORM_TYPE, 'javascript')
+
+            self.localizadores.invalidar()
+            self.esperas.envio_confirmado(marcador)
+
+    def _pagina_presente(self, operaciones):
+        """True si el campo de la primera operación está en la página abierta"""
+        return not operaciones or self.localizadores.presente(operaciones[0])
+
+    def pasos(self, datos, desde_pagina=None):
+        """
+        Flujo completo del formulario como máquina de estados
+
+        Cede una `Espera` en cada transición de página, que
+        `EjecutorPestanas` difiere para alternar entre pestañas.
+
+        Args:
+            datos (dict): Diccionario con todos los datos del formulario
+            desde_pagina (int): Reanudar en esta página, que debe estar abierta
+                                en el navegador (app/retries.py). Si es None se
+                                empieza desde la URL de la encuesta
+
+        Raises:
+            ReanudacionImposible: Si la página abierta no es `desde_pagina`
+        """
+        operaciones = operaciones_formulario(self.FORM_TYPE, datos)
+
+        self.envio_final_iniciado = False
+        self.localizadores.invalidar()
+        if desde_pagina is None:
+            log.info("Navegando a: %s", self.url)
+            self.esperas.abrir(self.url)
+            ancla = self.plan.paginas[0].ancla
+            yield self.esperas.diferir(self.esperas.pagina_cargada, ancla=(By.ID, ancla) if ancla else None)
+        else:
+            log.info("Reanudando en la página %s", desde_pagina)
+            yield self.esperas.diferir(self.esperas.pagina_renderizada, desde_pagina)
+
+        for pagina, operaciones_pagina in zip(self.plan.paginas, operaciones):
+            if desde_pagina is not None:
+                if pagina.numero < desde_pagina:
+                    continue
+                if pagina.numero == desde_pagina and not self._pagina_presente(operaciones_pagina):
+                    raise ReanudacionImposible(f"La página abierta no es la página {desde_pagina}")
+            self._notificar('pagina_iniciada', pagina=pagina.numero)
+            self.llenar_pagina(pagina, operaciones_pagina)
+            yield self.esperas.diferir(self.navegar, pagina)
+            self._notificar('pagina_completada', pagina=pagina.numero)
+            log.info("✓ Página %s completada", pagina.numero)
+
+        log.info("¡Formulario %s completado exitosamente!", self.FORM_TYPE)
+
+    def ejecutar(self, datos, desde_pagina=None):
+        """
+        Ejecuta el llenado completo del formulario
+
+        Args:
+            datos (dict): Diccionario con todos los datos del formulario
+            desde_pagina (int): Página desde la cual reanudar (ver `pasos`)
+
+        Raises:
+            EnvioIncierto: Si falló algo después del clic de envío final
+            Exception: El error que detuvo el llenado, para que la tarea lo
+                       clasifique y decida si reintenta (app/retries.py)
+        """
+        try:
+            for espera in self.pasos(datos, desde_pagina):
+                self.esperas.cumplir(espera)
+
+        except Exception as e:
+            log.exception("Error durante la ejecución: %s", e)
+            error = self.error_envio(e)
+            if error is e:
+                raise
+            raise error from e
+        finally:
+            # Un driver prestado lo devuelve quien lo prestó (el pool)
+            if self.driver_propio:
+                self.driver.quit()
+
+    def error_envio(self, error):
+        """
+        Error con el que se informa un fallo del llenado
+
+        Antes del clic de envío final es el mismo error. Después, salvo que
+        Qualtrics muestre un mensaje de validación, es un `EnvioIncierto`: la
+        encuesta pudo quedar registrada y no debe repetirse.
+        """
+        if not self.envio_final_iniciado or isinstance(error, EnvioIncierto) \
+                or clasificar_error(error, self.driver) == VALIDACION:
+            return error
+        incierto = EnvioIncierto(f"No se confirmó el envío final: {error}")
+        incierto.__cause__ = error
+        return incierto
+
+    def ejecutar_en_pestanas(self, lista_datos, pestanas=None, al_terminar=None):
+        """
+        Llena varios formularios intercalados en pestañas de este navegador
+
+        Args:
+            lista_datos (list): Datos de cada formulario (mismo formato que `ejecutar`)
+            pestanas (int): Pestañas simultáneas. Si es None se usa DRIVER_TABS
+            al_terminar (callable): Recibe el resultado de cada formulario apenas termina
+
+        Returns:
+            list: Resultado de cada formulario, en el orden de `lista_datos`
+        """
+        try:
+            return EjecutorPestanas(self.driver, type(self), pestanas, al_terminar=al_terminar).ejecutar(lista_datos)
+        finally:
+            if self.driver_propio:
+                self.driver.quit()
+
+
+@lru_cache(maxsize=None)
+def filler_para(form_type):
+    """
+    Clase filler del formulario `form_type`
+
+    Compila su especificación al crearla, así un error en la especificación
+    aparece al cargar el worker y no en la primera tarea.
+    """
+    plan_formulario(form_type)
+    return type(f"Formulario{form_type.capitalize()}", (FormularioDeclarativo,), {'FORM_TYPE': form_type})
+
+
+def fillers_registrados():
+    """Clase filler de cada formulario registrado, por tipo"""
+    return {form_type: filler_para(form_type) for form_type in FORM_SPECS}
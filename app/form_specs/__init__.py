@@ -0,0 +1,67 @@
+"""
+Registro de especificaciones declarativas de formularios
+
+Cada formulario se describe con un dict `SPEC` (ver app/form_engine.py para
+el formato): URL, secciones de matriz y, por página, los campos en orden con
+sus QIDs, choice ids, condiciones de display logic y la navegación al final.
+Agregar un formulario es agregar su módulo de especificación y registrarlo
+aquí (más su modelo Pydantic en app/models para la API).
+
+La URL de cada formulario se puede redirigir (p. ej. a la encuesta simulada
+de app/survey_stub.py) con variables de entorno:
+    FORM{N}_URL: URL completa de un formulario (p. ej. FORM3_URL)
+    FORM_BASE_URL: Esquema y host para todos; se conserva la ruta /jfe/form/SV_...
+"""
+
+import os
+from urllib.parse import urlsplit
+
+from . import form1, form2, form3, form4
+
+
+FORM_SPECS = {
+    spec['form_type']: spec
+    for spec in (form1.SPEC, form2.SPEC, form3.SPEC, form4.SPEC)
+}
+
+
+def obtener_spec(form_type):
+    """
+    Especificación registrada de un formulario
+
+    Raises:
+        ValueError: Si el formulario no está registrado
+    """
+    spec = FORM_SPECS.get(form_type)
+    if spec is None:
+        raise ValueError(f"Tipo de formulario inválido: {form_type}")
+    return spec
+
+
+def url_formulario(form_type, url=None):
+    """
+    URL a la que navega un formulario, con las redirecciones del entorno aplicadas
+
+    Args:
+        form_type (str): Tipo de formulario ('form1'...'form4')
+        url (str): URL original. Si es None se usa la de la especificación
+
+    Returns:
+        str: FORM{N}_URL, o la URL original con el host de FORM_BASE_URL, o la original
+    """
+    if url is None:
+        url = obtener_spec(form_type)['url']
+
+    propia = os.getenv(f'{form_type.upper()}_URL')
+    if propia:
+        return propia
+
+    base = os.getenv('FORM_BASE_URL')
+    if base:
+        partes = urlsplit(url)
+        ruta = partes.path + (f"?{partes.query}" if partes.query else '')
+        return base.rstrip('/') + ruta
+    return url
+
+
+__all__ = ["FORM_SPECS", "obtener_spec", "url_formulario"]
@@ -0,0 +1,112 @@
+"""
+Especificación del formulario 1 (Preescolar Integrales de Colsubsidio)
+
+Secciones de matriz, opciones de PQRS y páginas que recorre el motor de
+formularios (app/form_engine.py). `form1.py` y las tareas de Celery llenan
+el formulario sólo a través de ese motor.
+"""
+
+
+SECCIONES_CONFIG = {
+    'atencion': {
+        'QID': '27',
+        'question_id': '1',
+        'choice_ids': [3, 61, 62, 63, 64, 65, 66],
+        'nombre': 'Atención del programa'
+    },
+    'talento_humano': {
+        'QID': '54',
+        'question_id': '1',
+        'choice_ids': [61, 63, 64, 65, 66, 67, 68, 69, 70],
+        'nombre': 'Habilidades del talento humano'
+    },
+    'psicosocial': {
+        'QID': '72',
+        'question_id': '1',
+        'choice_ids': [61, 66, 67, 68, 69, 70, 71],
+        'nombre': 'Profesional psicosocial'
+    },
+    'dinamizadores': {
+        'QID': '73',
+        'question_id': '1',
+        'choice_ids': [61, 71, 75, 76, 77, 78, 79],
+        'nombre': 'Dinamizadores pedagógicos'
+    },
+    'desarrollo_propuesta': {
+        'QID': '70',
+        'question_id': '1',
+        'choice_ids': [61, 99, 100, 101, 102, 103, 104],
+        'nombre': 'Desarrollo de la propuesta'
+    },
+    'aspectos_satisfaccion': {  # NUEVA SECCIÓN
+        'QID': '63',
+        'question_id': '1',
+        'choice_ids': [93, 90, 92, 61, 91],  # 5 filas
+        'nombre': 'Aspectos de satisfacción'
+    },
+    'aspectos_dinamizador': {  # Segunda sección condicional - NUEVA
+        'QID': '62',
+        'question_id': '1',
+        'choice_ids': [86, 87, 88, 61, 83, 84, 85],  # 7 filas
+        'nombre': 'Aspectos de dinamizador'
+    }
+}
+
+
+# Mapeo de textos simplificados de medios PQRS (QID65) a choice IDs
+MEDIOS_PQRS = {
+    'call center': '1',
+    'correo electronico': '4',
+    'telefonicamente': '5',
+    'verbalmente': '6',
+    'pagina web': '7',
+    'codigo qr': '8',
+    'ninguna': '3'
+}
+
+
+SPEC = {
+    'form_type': 'form1',
+    'url': "https://colsubsidio.az1.qualtrics.com/jfe/form/SV_dhz8RuGCTqJm1Ui",
+    'secciones': SECCIONES_CONFIG,
+    'paginas': [
+        {
+            'numero': 1,
+            'ancla': 'QR~QID57',
+            'campos': [
+                {'tipo': 'texto', 'clave': 'institucion', 'id': 'QR~QID57'},
+                {'tipo': 'texto', 'clave': 'proyecto', 'id': 'QR~QID43'},
+                # Este formulario marca la columna igual al valor (sin desplazamiento)
+                {'tipo': 'escala', 'clave': 'recomendacion', 'pregunta': 8, 'desplazamiento': 0, 'defecto': 10},
+                {'tipo': 'texto', 'clave': 'recomendacion_text', 'id': 'QR~QID13',
+                 'si': {'campo': 'recomendacion', 'no_en': [9, 10]}},
+                {'tipo': 'escala', 'clave': 'satisfaccion', 'pregunta': 12, 'defecto': 10},
+                {'tipo': 'texto', 'clave': 'satisfaccion_text', 'id': 'QR~QID53',
+                 'si': {'campo': 'satisfaccion', 'hasta': 6}},
+            ],
+            'navegacion': 'siguiente',
+        },
+        {
+            'numero': 2,
+            'datos': 'pagina_2',
+            'campos': [
+                {'tipo': 'matriz', 'seccion': 'atencion'},
+                {'tipo': 'matriz', 'seccion': 'talento_humano'},
+                {'tipo': 'matriz', 'seccion': 'psicosocial'},
+                {'tipo': 'matriz', 'seccion': 'dinamizadores'},
+                {'tipo': 'si_no', 'clave': 'contacto_dinamizador', 'pregunta': 10, 'defecto': 'No'},
+                {'tipo': 'matriz', 'seccion': 'aspectos_dinamizador',
+                 'si': {'campo': 'contacto_dinamizador', 'igual': 'si'}},
+                {'tipo': 'si_no', 'clave': 'contacto_coordinador', 'pregunta': 14, 'defecto': 'Si'},
+                {'tipo': 'matriz', 'seccion': 'aspectos_satisfaccion',
+                 'si': {'campo': 'contacto_coordinador', 'igual': 'si'}},
+                {'tipo': 'checkboxes', 'clave': 'pqrs', 'fuente': 'pqrs_medios', 'qid': '65',
+                 'opciones': MEDIOS_PQRS, 'si': {'presente': 'pqrs_medios'}},
+                {'tipo': 'si_no', 'clave': 'ha_reclamado', 'pregunta': 20, 'defecto': 'No'},
+                {'tipo': 'matriz', 'seccion': 'desarrollo_propuesta'},
+                {'tipo': 'texto', 'clave': 'sugerencias', 'id': 'QR~QID51'},
+            ],
+            'navegacion': 'enviar',
+        },
+    ],
+}
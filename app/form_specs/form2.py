@@ -0,0 +1,134 @@
+"""
+Especificación del formulario 2 (Preescolar Integrales de Colsubsidio)
+
+Secciones de matriz, opciones de PQRS y páginas que recorre el motor de
+formularios (app/form_engine.py). `form2.py` y las tareas de Celery llenan
+el formulario sólo a través de ese motor.
+"""
+
+
+SECCIONES_CONFIG = {
+    'proceso_aprendizaje': {
+        'QID': '27',
+        'question_id': '1',
+        'choice_ids': [3, 67, 68, 69,70],
+        'nombre': 'Proceso de aprendizaje de los niños'
+    },
+    'habilidades_docentes': {
+        'QID': '54',
+        'question_id': '1',
+        'choice_ids': [61, 71, 72, 73, 74, 75, 76],
+        'nombre': 'Habilidades de los docentes'
+    },
+    'auxiliar_salud_nutricion': {
+        'QID': '73',
+        'question_id': '1',
+        'choice_ids': [72, 73, 74, 75],
+        'nombre': 'Auxiliar de apoyo en salud y nutrición'
+    },
+    'personal_administrativo': {
+        'QID': '74',
+        'question_id': '1',
+        'choice_ids': [72, 73, 74, 75],
+        'nombre': 'Personal administrativo'
+    },
+    'actividades_administrativas': {
+        'QID': '75',
+        'question_id': '1',
+        'choice_ids': [61, 95, 96, 97],
+        'nombre': 'Actividades administrativas'
+    },
+    'alimentacion': {
+        'QID': '76',
+        'question_id': '1',
+        'choice_ids': [61, 99, 100,101],
+        'nombre': 'Alimentación brindada en el jardín'
+    },
+    'desarrollo_propuesta': {
+        'QID': '70',
+        'question_id': '1',
+        'choice_ids': [61, 105, 106, 107],
+        'nombre': 'Desarrollo de la propuesta'
+    },
+    'profesionales_psicosocial': {
+        'QID': '55',
+        'question_id': '1',
+        'choice_ids': [61, 76, 77, 78, 79],
+        'nombre': 'Profesionales de apoyo psicosocial'
+    },
+    'nutricionista': {
+        'QID': '59',
+        'question_id': '1',
+        'choice_ids': [72, 73, 74, 75, 76],
+        'nombre': 'Habilidades del nutricionista'
+    },
+    'evaluacion_aspectos': {
+        'QID': '63',
+        'question_id': '1',
+        'choice_ids': [61, 90, 91, 92, 93],
+        'nombre': 'Evaluación de aspectos'
+    }
+}
+
+# Mapeo de textos simplificados de medios PQRS (QID65) a choice IDs
+MEDIOS_PQRS = {
+    'call center': '1',
+    'correo electronico': '4',
+    'telefonicamente': '5',
+    'verbalmente': '6',
+    'pagina web': '7',
+    'codigo qr': '8',
+    'ninguna': '3'
+}
+
+
+SPEC = {
+    'form_type': 'form2',
+    'url': "https://colsubsidio.az1.qualtrics.com/jfe/form/SV_6VaaNLR3jmRV4pw",
+    'secciones': SECCIONES_CONFIG,
+    'paginas': [
+        {
+            'numero': 1,
+            'ancla': 'QR~QID57',
+            'campos': [
+                {'tipo': 'texto', 'clave': 'institucion', 'id': 'QR~QID57', 'fuente': 'lugar'},
+                {'tipo': 'texto', 'clave': 'proyecto', 'id': 'QR~QID43', 'fuente': 'nombre_proyecto'},
+                {'tipo': 'escala', 'clave': 'recomendacion', 'pregunta': 8, 'defecto': 10},
+                {'tipo': 'texto', 'clave': 'recomendacion_text', 'id': 'QR~QID13',
+                 'si': {'campo': 'recomendacion', 'no_en': [9, 10]}},
+                {'tipo': 'escala', 'clave': 'satisfaccion', 'pregunta': 12, 'defecto': 10},
+                {'tipo': 'texto', 'clave': 'satisfaccion_text', 'id': 'QR~QID53',
+                 'si': {'campo': 'satisfaccion', 'hasta': 6}},
+            ],
+            'navegacion': 'siguiente',
+        },
+        {
+            'numero': 2,
+            'datos': 'pagina_2',
+            'campos': [
+                {'tipo': 'matriz', 'seccion': 'proceso_aprendizaje'},
+                {'tipo': 'matriz', 'seccion': 'habilidades_docentes'},
+                {'tipo': 'si_no', 'clave': 'apoyo_piscosocial', 'pregunta': 6},
+                {'tipo': 'matriz', 'seccion': 'profesionales_psicosocial',
+                 'si': {'campo': 'apoyo_piscosocial', 'igual': 'si'}},
+                {'tipo': 'si_no', 'clave': 'contacto_nutricionista', 'pregunta': 10},
+                {'tipo': 'matriz', 'seccion': 'nutricionista',
+                 'si': {'campo': 'contacto_nutricionista', 'igual': 'si'}},
+                {'tipo': 'matriz', 'seccion': 'auxiliar_salud_nutricion'},
+                {'tipo': 'matriz', 'seccion': 'personal_administrativo'},
+                {'tipo': 'si_no', 'clave': 'especialista_desarrollo', 'pregunta': 18},
+                {'tipo': 'matriz', 'seccion': 'evaluacion_aspectos',
+                 'si': {'campo': 'especialista_desarrollo', 'igual': 'si'}},
+                {'tipo': 'matriz', 'seccion': 'actividades_administrativas'},
+                {'tipo': 'matriz', 'seccion': 'alimentacion'},
+                {'tipo': 'checkboxes', 'clave': 'pqrs', 'fuente': 'pqrs_medios', 'qid': '65',
+                 'opciones': MEDIOS_PQRS, 'si': {'presente': 'pqrs_medios'}},
+                {'tipo': 'si_no', 'clave': 'ha_reclamado', 'pregunta': 28},
+                {'tipo': 'matriz', 'seccion': 'desarrollo_propuesta'},
+                {'tipo': 'texto', 'clave': 'sugerencias', 'id': 'QR~QID51',
+                 'si': {'presente': 'sugerencias'}},
+            ],
+            'navegacion': 'enviar',
+        },
+    ],
+}
@@ -0,0 +1,608 @@
+"""
+Motor de envío directo por HTTP (sin navegador)
+
+Llenar un formulario con Chrome cuesta segundos de CPU por página, pero lo
+que Qualtrics recibe al final son unas pocas peticiones HTTP. Este motor
+reproduce esa sesión sin navegador:
+
+    1. Inicio de sesión: GET a la URL de la encuesta (cookies y campos
+       ocultos de la sesión)
+    2. Por cada página: POST del formulario de la página con las respuestas
+    3. Envío final: el POST de la última página ('enviar' en la especificación)
+
+Las respuestas salen del mismo plan que usa el motor con navegador
+(`operaciones_formulario` en app/form_engine.py), así que los QIDs y choice
+ids de `SECCIONES_CONFIG` se mapean igual. Cada operación se resuelve sobre
+el HTML recibido a un par (name, value) del formulario:
+
+    texto        name del campo `id`, con el valor del dato
+    radio        name/value del input `QR~QID27#1~3~10`
+    checkbox     name/value del input `QR~QID65~7`
+    label_xpath  el input de su 'entrada' (QID declarado) o, si no está, el
+                 `for` del label que ubica el XPath evaluado sobre el HTML
+
+Si una página no trae lo que el plan espera (cambió el formulario, la
+respuesta no es HTML, Qualtrics rechaza la página), el envío se repite con el
+motor Selenium (FormularioDeclarativo). El respaldo sólo se usa si el POST
+final todavía no salió, para no enviar dos veces el mismo formulario; si el
+envío final falla se lanza `ErrorEnvioIncierto` y la tarea no lo reintenta
+(app/retries.py).
+
+Alcance (experimental, sólo encuesta simulada): el protocolo implementado
+(campos `QR~...` en un <form> por página, POST a su `action`, fin de encuesta
+marcado con `EndOfSurvey`) es el de la encuesta simulada (app/survey_stub.py),
+no el de Qualtrics JFE, que arma las páginas con JavaScript y envía cada
+sección a sus propios endpoints con tokens de sesión. No hay grabaciones de
+JFE con qué implementarlo ni probarlo. Por eso el motor se niega a apuntar a
+las encuestas reales: el filler lanza `MotorHTTPNoPermitido` si la URL del
+formulario (ya con FORM{N}_URL / FORM_BASE_URL aplicados) es la de su
+especificación o cualquier host de Qualtrics, y con FORM_ENGINE=http esos
+formularios siguen con el motor Selenium (app/tasks.py).
+
+Las conexiones salen de un `urllib3.PoolManager` por proceso, compartido por
+todas las sesiones y thread-safe. Sólo se reintentan los GET: un POST
+reintentado podría registrar la misma página dos veces.
+
+Configuración por variables de entorno:
+    HTTP_POOL_SIZE: Conexiones reutilizables por host (default 10)
+    HTTP_TIMEOUT: Segundos máximos por petición (default 30)
+    HTTP_RETRIES: Reintentos de cada GET ante errores de conexión (default 2)
+    HTTP_CONCURRENCY: Envíos simultáneos en `ejecutar_en_pestanas` (default 8)
+    HTTP_SELENIUM_FALLBACK: 1/0, repetir con Selenium si falla el HTTP (default 1)
+"""
+
+import codecs
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from html.parser import HTMLParser
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urljoin, urlsplit
+
+import urllib3
+
+from app.driver_pool import get_driver_pool
+from app.errors import ReporteRespuestas
+from app.form_engine import filler_para, operaciones_formulario, plan_formulario
+from app.form_specs import FORM_SPECS, obtener_spec, url_formulario
+from app.logs import contexto_actual, contexto_log, obtener_logger, seguir_evento
+from app.metrics import DURACION_NAVEGACION
+from app.rate_limit import turno
+from app.retries import ENVIO_INCIERTO, SELECTOR, clasificar_error
+
+
+log = obtener_logger(__name__)
+
+
+TAMANO_POOL_HTTP = int(os.getenv('HTTP_POOL_SIZE', '10'))
+TIEMPO_MAXIMO_HTTP = float(os.getenv('HTTP_TIMEOUT', '30'))
+REINTENTOS_HTTP = int(os.getenv('HTTP_RETRIES', '2'))
+CONCURRENCIA_HTTP = int(os.getenv('HTTP_CONCURRENCY', '8'))
+RESPALDO_SELENIUM = os.getenv('HTTP_SELENIUM_FALLBACK', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+MAX_REDIRECCIONES = 5
+REDIRECCIONES = (301, 302, 303, 307, 308)
+
+# El navegador que usan los workers; Qualtrics sirve el mismo HTML
+AGENTE_USUARIO = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/116.0 Safari/537.36"
+)
+
+# Elementos HTML sin etiqueta de cierre
+ELEMENTOS_VACIOS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr',
+})
+
+# Id de la página de fin de encuesta en Qualtrics
+ID_FIN_ENCUESTA = 'EndOfSurvey'
+
+# Hosts de las encuestas reales, a los que el motor no envía nada
+DOMINIO_QUALTRICS = 'qualtrics.com'
+
+
+class MotorHTTPNoPermitido(ValueError):
+    """El motor HTTP (experimental) apunta a una encuesta real y no a la simulada"""
+
+
+class ErrorProtocoloHTTP(Exception):
+    """La sesión HTTP no corresponde a lo que espera el plan del formulario"""
+
+    categoria = SELECTOR
+
+
+class ErrorEnvioIncierto(ErrorProtocoloHTTP):
+    """Falló el envío final: Qualtrics pudo haberlo registrado, no se repite"""
+
+    categoria = ENVIO_INCIERTO
+
+
+class Nodo:
+    """Elemento del HTML recibido: etiqueta, atributos e hijos"""
+
+    __slots__ = ('tag', 'attrs', 'hijos', 'padre')
+
+    def __init__(self, tag, attrs, padre):
+        self.tag = tag
+        self.attrs = attrs
+        self.hijos = []
+        self.padre = padre
+
+    def descendientes(self):
+        """Recorre el subárbol en orden de documento"""
+        pendientes = list(reversed(self.hijos))
+        while pendientes:
+            nodo = pendientes.pop()
+            yield nodo
+            pendientes.extend(reversed(nodo.hijos))
+
+
+class _ConstructorDOM(HTMLParser):
+    """Arma el árbol de `Nodo` y el índice de ids de una página"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.raiz = Nodo('#document', {}, None)
+        self.actual = self.raiz
+        self.ids = {}
+
+    def handle_starttag(self, tag, attrs):
+        nodo = Nodo(tag, {nombre: valor or '' for nombre, valor in attrs}, self.actual)
+        self.actual.hijos.append(nodo)
+        if 'id' in nodo.attrs:
+            self.ids.setdefault(nodo.attrs['id'], nodo)
+        if tag not in ELEMENTOS_VACIOS:
+            self.actual = nodo
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in ELEMENTOS_VACIOS:
+            self.actual = self.actual.padre
+
+    def handle_endtag(self, tag):
+        # HTML tolerante: cierra hasta el ancestro abierto con esa etiqueta
+        nodo = self.actual
+        while nodo is not self.raiz and nodo.tag != tag:
+            nodo = nodo.padre
+        if nodo is not self.raiz:
+            self.actual = nodo.padre
+
+
+@lru_cache(maxsize=1024)
+def _pasos_xpath(xpath):
+    """Divide un XPath absoluto `/html/body/div[3]/...` en pasos (tag, posición)"""
+    pasos = []
+    for paso in xpath.strip('/').split('/'):
+        tag, _, indice = paso.partition('[')
+        pasos.append((tag, int(indice.rstrip(']')) if indice else 1))
+    return tuple(pasos)
+
+
+class PaginaHTML:
+    """Página de la encuesta recibida por HTTP"""
+
+    def __init__(self, html, url):
+        constructor = _ConstructorDOM()
+        constructor.feed(html)
+        constructor.close()
+        self.url = url
+        self.raiz = constructor.raiz
+        self.ids = constructor.ids
+        self.formulario = next((n for n in self.raiz.descendientes() if n.tag == 'form'), None)
+
+    def elemento(self, elemento_id):
+        """Elemento con el id dado, o None"""
+        return self.ids.get(elemento_id)
+
+    def xpath(self, xpath):
+        """
+        Evalúa un XPath absoluto de pasos por posición (los de app/bulk_fill.py)
+
+        Returns:
+            Nodo: Elemento encontrado, o None
+        """
+        nodo = self.raiz
+        for tag, posicion in _pasos_xpath(xpath):
+            hermanos = [hijo for hijo in nodo.hijos if hijo.tag == tag]
+            if len(hermanos) < posicion:
+                return None
+            nodo = hermanos[posicion - 1]
+        return nodo
+
+    @property
+    def finalizada(self):
+        """
+        True si es la página de fin de encuesta: sólo con el marcador EndOfSurvey
+
+        Una página sin formulario y sin el marcador (error, mantenimiento,
+        captcha) no cuenta como fin de encuesta.
+        """
+        return ID_FIN_ENCUESTA in self.ids
+
+    def firma(self):
+        """Nombres de los campos visibles del formulario: identifica la página"""
+        if self.formulario is None:
+            return frozenset()
+        return frozenset(
+            n.attrs['name'] for n in self.formulario.descendientes()
+            if n.tag in ('input', 'textarea', 'select') and n.attrs.get('name')
+            and n.attrs.get('type') != 'hidden'
+        )
+
+    def campos_ocultos(self):
+        """Pares (name, value) de los inputs ocultos del formulario (sesión, página)"""
+        return [
+            (n.attrs['name'], n.attrs.get('value', ''))
+            for n in self.formulario.descendientes()
+            if n.tag == 'input' and n.attrs.get('type') == 'hidden' and n.attrs.get('name')
+        ]
+
+    def boton_siguiente(self):
+        """Par (name, value) del botón Siguiente si tiene name, como lo envía el navegador"""
+        boton = self.elemento('NextButton')
+        if boton is None or not boton.attrs.get('name'):
+            return []
+        return [(boton.attrs['name'], boton.attrs.get('value', ''))]
+
+    def campo(self, op):
+        """
+        Par (name, value) que envía el navegador para una operación del plan
+
+        Raises:
+            ErrorProtocoloHTTP: Si la página no tiene el elemento de la operación
+        """
+        if op['tipo'] == 'label_xpath':
+            entrada = self.elemento(op['entrada']) if op.get('entrada') else None
+            if entrada is None:
+                label = self.xpath(op['xpath'])
+                if label is None or not label.attrs.get('for'):
+                    raise ErrorProtocoloHTTP(f"'{op['clave']}': no hay label en {op['xpath']}")
+                entrada = self.elemento(label.attrs['for'])
+        else:
+            entrada = self.elemento(op['id'])
+
+        if entrada is None:
+            raise ErrorProtocoloHTTP(f"'{op['clave']}': el campo no está en la página")
+
+        nombre = entrada.attrs.get('name') or entrada.attrs.get('id')
+        valor = op['valor'] if op['tipo'] == 'texto' else entrada.attrs.get('value', 'on')
+        return nombre, valor
+
+
+def destino_simulado(form_type):
+    """
+    True si el formulario está redirigido fuera de Qualtrics (p. ej. a la
+    encuesta simulada), el único destino en el que se permite el motor HTTP
+
+    La URL es la de `url_formulario`: con FORM{N}_URL / FORM_BASE_URL aplicados.
+    """
+    host = (urlsplit(url_formulario(form_type)).hostname or '').lower()
+    real = (urlsplit(obtener_spec(form_type)['url']).hostname or '').lower()
+    return bool(host) and host != real and not (host == DOMINIO_QUALTRICS or host.endswith('.' + DOMINIO_QUALTRICS))
+
+
+def _charset(tipo_contenido):
+    """Codificación del Content-Type (sin comillas); utf-8 si falta o no se conoce"""
+    charset = tipo_contenido.partition('charset=')[2].split(';')[0].strip().strip('"\'')
+    try:
+        return codecs.lookup(charset).name if charset else 'utf-8'
+    except LookupError:
+        return 'utf-8'
+
+
+_pool_http = None
+_lock_pool_http = threading.Lock()
+
+
+def get_pool_http():
+    """PoolManager de urllib3 del proceso (se crea la primera vez)"""
+    global _pool_http
+    with _lock_pool_http:
+        if _pool_http is None:
+            _pool_http = urllib3.PoolManager(
+                maxsize=TAMANO_POOL_HTTP,
+                timeout=urllib3.Timeout(total=TIEMPO_MAXIMO_HTTP),
+                headers={'User-Agent': AGENTE_USUARIO},
+            )
+        return _pool_http
+
+
+class SesionEncuesta:
+    """
+    Sesión HTTP de una encuesta: cookies, URL actual y página recibida
+
+    Las redirecciones se siguen aquí y no en urllib3 para conservar las
+    cookies que Qualtrics asigna en cada salto.
+    """
+
+    def __init__(self, pool=None):
+        self.pool = get_pool_http() if pool is None else pool
+        self.cookies = {}
+        self.peticiones = 0
+
+    def _guardar_cookies(self, respuesta):
+        for cabecera in respuesta.headers.getlist('Set-Cookie'):
+            galleta = SimpleCookie()
+            galleta.load(cabecera)
+            self.cookies.update({nombre: morsel.value for nombre, morsel in galleta.items()})
+
+    def _peticion(self, metodo, url, campos=None):
+        cuerpo = urlencode(campos) if campos is not None else None
+        for _ in range(MAX_REDIRECCIONES + 1):
+            cabeceras = {}
+            if self.cookies:
+                cabeceras['Cookie'] = '; '.join(f"{k}={v}" for k, v in self.cookies.items())
+            if cuerpo is not None:
+                cabeceras['Content-Type'] = 'application/x-www-form-urlencoded'
+
+            respuesta = self.pool.request(
+                metodo, url, body=cuerpo, headers=cabeceras, redirect=False,
+                retries=urllib3.Retry(REINTENTOS_HTTP, backoff_factor=0.2) if metodo == 'GET' else False,
+            )
+            self.peticiones += 1
+            self._guardar_cookies(respuesta)
+
+            if respuesta.status in REDIRECCIONES and respuesta.headers.get('Location'):
+                url = urljoin(url, respuesta.headers['Location'])
+                if respuesta.status in (301, 302, 303):
+                    metodo, cuerpo = 'GET', None
+                continue
+
+            if respuesta.status >= 400:
+                raise ErrorProtocoloHTTP(f"{metodo} {url}: HTTP {respuesta.status}")
+            if 'html' not in respuesta.headers.get('Content-Type', 'text/html'):
+                raise ErrorProtocoloHTTP(f"{metodo} {url}: la respuesta no es HTML")
+
+            charset = _charset(respuesta.headers.get('Content-Type', ''))
+            return PaginaHTML(respuesta.data.decode(charset, errors='replace'), url)
+
+        raise ErrorProtocoloHTTP(f"{metodo} {url}: demasiadas redirecciones")
+
+    def abrir(self, url):
+        """Inicia la sesión de la encuesta y retorna la primera página"""
+        return self._peticion('GET', url)
+
+    def enviar(self, pagina, campos):
+        """
+        Envía el formulario de una página con las respuestas dadas
+
+        Args:
+            pagina (PaginaHTML): Página actual
+            campos (list): Pares (name, value) de las respuestas
+
+        Returns:
+            PaginaHTML: Página siguiente (o la de fin de encuesta)
+        """
+        if pagina.formulario is None:
+            raise ErrorProtocoloHTTP(f"{pagina.url}: la página no tiene formulario")
+        accion = urljoin(pagina.url, pagina.formulario.attrs.get('action') or pagina.url)
+        metodo = (pagina.formulario.attrs.get('method') or 'post').upper()
+        return self._peticion(metodo, accion, pagina.campos_ocultos() + campos + pagina.boton_siguiente())
+
+
+class FormularioHTTP:
+    """
+    Filler que envía un formulario registrado en app/form_specs sin navegador
+
+    Tiene la interfaz de FormularioDeclarativo (`ejecutar`,
+    `ejecutar_en_pestanas`). `USA_NAVEGADOR = False` indica a las tareas que
+    no tomen un driver del pool; sólo el respaldo con Selenium lo pide.
+
+    Es experimental: sólo funciona contra la encuesta simulada (ver el alcance
+    en la documentación del módulo).
+    """
+
+    FORM_TYPE = None
+    USA_NAVEGADOR = False
+
+    def __init__(self, driver=None, modo_espera=None, notificar=None, respaldo=None, pool=None,
+                 respuestas=None):
+        """
+        Args:
+            driver (WebDriver): Driver para el respaldo con Selenium. Si es None
+                                el respaldo toma uno prestado del pool del proceso
+            modo_espera (str): Modo de espera del respaldo con Selenium
+            notificar (callable): Función `notificar(evento, **datos)` que recibe
+                                  el avance del envío (app/task_progress.py)
+            respaldo (bool): Repetir con Selenium si falla el HTTP. Si es None
+                             se toma de HTTP_SELENIUM_FALLBACK
+            pool (urllib3.PoolManager): Conexiones a usar. Si es None, las del proceso
+            respuestas (ReporteRespuestas): Reporte de respuestas (app/errors.py),
+                                            compartido con el respaldo. Si es None se crea uno
+
+        Raises:
+            MotorHTTPNoPermitido: Si el formulario apunta a la encuesta real
+        """
+        if not destino_simulado(self.FORM_TYPE):
+            raise MotorHTTPNoPermitido(
+                f"El motor HTTP es experimental y sólo envía a la encuesta simulada; "
+                f"{self.FORM_TYPE} apunta a {url_formulario(self.FORM_TYPE)} (ver FORM_BASE_URL)"
+            )
+        self.plan = plan_formulario(self.FORM_TYPE)
+        self.url = url_formulario(self.FORM_TYPE, self.plan.url)
+        self.driver = driver
+        self.modo_espera = modo_espera
+        self.notificar = notificar
+        self.respaldo = RESPALDO_SELENIUM if respaldo is None else respaldo
+        self.pool = pool
+        self.respuestas = respuestas if respuestas is not None else ReporteRespuestas(self.FORM_TYPE)
+        self.envio_final_iniciado = False
+
+    def _notificar(self, evento, **datos):
+        """Informa el avance al callback `notificar`, si lo hay, y lo sigue en el contexto de log"""
+        seguir_evento(evento, **datos)
+        if self.notificar is not None:
+            self.notificar(evento, form_type=self.FORM_TYPE, **datos)
+
+    def enviar(self, datos):
+        """
+        Envía el formulario completo por HTTP
+
+        Args:
+            datos (dict): Diccionario con todos los datos del formulario
+
+        Returns:
+            SesionEncuesta: Sesión usada (cookies y número de peticiones)
+
+        Raises:
+            ErrorProtocoloHTTP: Si una página no corresponde al plan o es rechazada
+            ErrorEnvioIncierto: Si tras el POST final no llega la página con EndOfSurvey
+            urllib3.exceptions.HTTPError: Si falla la conexión
+        """
+        operaciones = operaciones_formulario(self.FORM_TYPE, datos)
+        self.envio_final_iniciado = False
+        sesion = SesionEncuesta(self.pool)
+
+        log.info("Iniciando sesión HTTP: %s", self.url)
+        pagina = sesion.abrir(self.url)
+
+        for plan_pagina, operaciones_pagina in zip(self.plan.paginas, operaciones):
+            self._notificar('pagina_iniciada', pagina=plan_pagina.numero)
+            if pagina.finalizada:
+                raise ErrorProtocoloHTTP(f"La encuesta terminó antes de la página {plan_pagina.numero}")
+
+            campos = [pagina.campo(op) for op in operaciones_pagina]
+            self._notificar('celdas_completadas', seccion=None, nombre=f"página {plan_pagina.numero}",
+                            completadas=len(campos), celdas=len(operaciones_pagina))
+
+            self.envio_final_iniciado = plan_pagina.navegacion == 'enviar'
+            inicio = time.monotonic()
+            with DURACION_NAVEGACION.labels(form_type=self.FORM_TYPE, boton=plan_pagina.navegacion).time():
+                siguiente = sesion.enviar(pagina, campos)
+            self._notificar('navegacion', condicion=plan_pagina.navegacion, resultado='respuesta',
+                            duracion=time.monotonic() - inicio)
+            if not siguiente.finalizada and siguiente.formulario is None:
+                self._fallo_respuesta(f"La página {plan_pagina.numero} llevó a una página sin formulario "
+                                      f"ni marcador {ID_FIN_ENCUESTA}")
+            if not siguiente.finalizada and siguiente.firma() == pagina.firma():
+                raise ErrorProtocoloHTTP(f"Qualtrics rechazó la página {plan_pagina.numero}")
+            pagina = siguiente
+            # Qualtrics aceptó la página: sus campos quedan respondidos
+            for op in operaciones_pagina:
+                self.respuestas.respondida(op['clave'])
+            self._notificar('pagina_completada', pagina=plan_pagina.numero)
+
+        if not pagina.finalizada:
+            self._fallo_respuesta(f"El envío final no llegó a la página de fin de encuesta ({ID_FIN_ENCUESTA})")
+
+        log.info("✓ Formulario %s enviado por HTTP (%s peticiones)", self.FORM_TYPE, sesion.peticiones)
+        return sesion
+
+    def _fallo_respuesta(self, mensaje):
+        """
+        Respuesta inesperada de Qualtrics
+
+        Raises:
+            ErrorEnvioIncierto: Si ya salió el POST final (pudo quedar registrado)
+            ErrorProtocoloHTTP: Si no
+        """
+        if self.envio_final_iniciado:
+            raise ErrorEnvioIncierto(mensaje)
+        raise ErrorProtocoloHTTP(mensaje)
+
+    def _ejecutar_con_selenium(self, datos):
+        """Repite el llenado con el motor de navegador (FormularioDeclarativo)"""
+        filler_selenium = filler_para(self.FORM_TYPE)
+        if self.driver is not None:
+            filler_selenium(self.driver, self.modo_espera, self.notificar, self.respuestas).ejecutar(datos)
+            return
+        with get_driver_pool().prestar() as driver:
+            filler_selenium(driver, self.modo_espera, self.notificar, self.respuestas).ejecutar(datos)
+
+    def ejecutar(self, datos):
+        """
+        Ejecuta el envío completo del formulario, con respaldo en Selenium
+
+        Args:
+            datos (dict): Diccionario con todos los datos del formulario
+
+        Raises:
+            ErrorEnvioIncierto: Si falló el envío final (no se repite con Selenium)
+            Exception: El error del HTTP sin respaldo, o el del respaldo con Selenium
+        """
+        try:
+            self.enviar(datos)
+            return
+        except (ErrorProtocoloHTTP, urllib3.exceptions.HTTPError) as e:
+            error = e
+
+        if self.envio_final_iniciado:
+            # Qualtrics pudo haber registrado el envío: repetirlo lo duplicaría
+            log.error("✗ Error en el envío final por HTTP (%s); no se repite con Selenium", error)
+            if isinstance(error, ErrorEnvioIncierto):
+                raise error
+            raise ErrorEnvioIncierto(f"Error en el envío final por HTTP: {error}") from error
+        if not self.respaldo:
+            log.error("✗ Error durante el envío por HTTP: %s", error)
+            raise error
+
+        log.warning("⚠ Envío por HTTP falló (%s). Repitiendo con Selenium...", error)
+        self._ejecutar_con_selenium(datos)
+
+    def _ejecutar_uno(self, indice, datos, contexto, al_terminar=None):
+        """
+        Envía un formulario de `ejecutar_en_pestanas` y arma su resultado
+
+        `contexto` es el contexto de log del hilo que lanzó el lote: los
+        hilos del ejecutor no lo heredan. Cada formulario espera su propio
+        turno de la encuesta (app/rate_limit.py). El resultado se pasa a
+        `al_terminar` desde el hilo del formulario.
+        """
+        inicio = time.monotonic()
+        error = None
+        with contexto_log(**contexto):
+            try:
+                with turno(self.FORM_TYPE) as turno_encuesta:
+                    type(self)(self.driver, self.modo_espera, notificar=turno_encuesta.registrar,
+                               respaldo=False, pool=self.pool).enviar(datos)
+            except Exception as e:
+                error = e
+                log.warning("✗ Formulario %s falló: %s", indice, e)
+
+        resultado = {
+            'indice': indice,
+            'status': 'completed' if error is None else 'failed',
+            'duracion': round(time.monotonic() - inicio, 3),
+        }
+        if error is not None:
+            resultado['error'] = str(error)
+            resultado['error_type'] = clasificar_error(error)
+        if al_terminar is not None:
+            with contexto_log(**contexto):
+                al_terminar(resultado)
+        return resultado
+
+    def ejecutar_en_pestanas(self, lista_datos, pestanas=None, al_terminar=None):
+        """
+        Envía varios formularios por HTTP en paralelo
+
+        Equivale a `FormularioDeclarativo.ejecutar_en_pestanas`, pero cada
+        "pestaña" es una sesión HTTP en un hilo. Sin respaldo con Selenium:
+        el formulario que falla queda como 'failed' en su resultado.
+
+        Args:
+            lista_datos (list): Datos de cada formulario (mismo formato que `ejecutar`)
+            pestanas (int): Envíos simultáneos. Si es None se usa HTTP_CONCURRENCY
+            al_terminar (callable): Recibe el resultado de cada formulario apenas termina
+
+        Returns:
+            list: Resultado de cada formulario, en el orden de `lista_datos`
+        """
+        with ThreadPoolExecutor(max_workers=pestanas or CONCURRENCIA_HTTP) as ejecutor:
+            contextos = [contexto_actual()] * len(lista_datos)
+            return list(ejecutor.map(self._ejecutar_uno, range(len(lista_datos)), lista_datos, contextos,
+                                     [al_terminar] * len(lista_datos)))
+
+
+@lru_cache(maxsize=None)
+def filler_http_para(form_type):
+    """Clase filler HTTP del formulario `form_type`"""
+    plan_formulario(form_type)
+    return type(f"FormularioHTTP{form_type.capitalize()}", (FormularioHTTP,), {'FORM_TYPE': form_type})
+
+
+def fillers_http_registrados():
+    """Clase filler HTTP de cada formulario registrado, por tipo"""
+    return {form_type: filler_http_para(form_type) for form_type in FORM_SPECS}
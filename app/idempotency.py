@@ -0,0 +1,148 @@
+"""
+Envíos idempotentes: claves de deduplicación y registro de envíos
+
+Un mismo formulario puede llegar dos veces al worker:
+    - El cliente repite el POST a /api/forms/form{N} (timeout, reintento propio).
+    - Un worker se cae con la tarea en curso: con `task_acks_late` y
+      `task_reject_on_worker_lost` el broker la entrega de nuevo.
+Cada repetición gastaba un navegador y enviaba la encuesta otra vez.
+
+Clave de idempotencia: la cabecera `Idempotency-Key` del cliente. Dos
+encuestados pueden dar exactamente las mismas respuestas, así que el
+contenido sólo se usa como clave si el cliente lo pide (`por_contenido`,
+parámetro `dedupe_by_content` de la API): un hash del formulario validado
+(`Form{N}Request`). Sin clave explícita cada POST es un envío nuevo.
+
+    1. La API reserva la clave con SET NX y TTL antes de encolar. Si ya
+       existía, retorna el task_id original sin encolar nada.
+    2. Al enviar el formulario, el worker lo anota en el registro de envíos
+       con la clave de la API o, si no hay, con el task_id (`clave_tarea`).
+       Una tarea ya registrada (entrega repetida por el broker, POST repetido
+       con la misma clave) termina sin abrir el navegador.
+    3. Si la tarea falla definitivamente se libera la reserva, para que el
+       cliente pueda volver a enviarlo. Un envío incierto no la libera.
+
+Los errores de Redis en el worker se informan pero no detienen el llenado:
+sin registro se llena como antes.
+
+Claves en Redis:
+    idempotency:{form_type}:{clave}  task_id de la tarea encolada con esa clave
+    submitted:{form_type}:{clave}    Envío registrado (JSON con task_id y fecha)
+
+Configuración por variables de entorno:
+    IDEMPOTENCY: 1 deduplica los envíos (default), 0 lo desactiva
+    IDEMPOTENCY_TTL: Segundos que se conservan reservas y registros (default 86400)
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from app.logs import obtener_logger
+from app.redis_client import get_redis
+
+
+log = obtener_logger(__name__)
+
+
+TTL_IDEMPOTENCIA = int(os.getenv('IDEMPOTENCY_TTL', '86400'))
+
+# Longitud máxima aceptada de la cabecera Idempotency-Key
+MAX_LONGITUD_CLAVE = 255
+
+
+def idempotencia_activa():
+    """True si IDEMPOTENCY está activo"""
+    return os.getenv('IDEMPOTENCY', '1').strip().lower() not in ('0', 'false', 'no', '')
+
+
+def clave_idempotencia(form_type, datos, cabecera=None, por_contenido=False):
+    """
+    Clave de deduplicación de un formulario
+
+    Args:
+        form_type (str): Tipo de formulario
+        datos (dict): Datos validados (`model_dump()` del modelo del formulario)
+        cabecera (str): Idempotency-Key del cliente; tiene prioridad sobre el contenido
+        por_contenido (bool): Sin cabecera, deduplicar por el hash de `datos`
+
+    Returns:
+        str: Hash SHA-256 en hexadecimal, o None si no hay clave explícita
+    """
+    if cabecera:
+        origen = f"key:{cabecera}"
+    elif por_contenido:
+        origen = 'data:' + json.dumps(datos, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    else:
+        return None
+    return hashlib.sha256(f"{form_type}|{origen}".encode('utf-8')).hexdigest()
+
+
+def clave_tarea(task_id):
+    """Clave del registro de envíos de una tarea sin clave de idempotencia"""
+    return f"task:{task_id}"
+
+
+def clave_reserva(form_type, clave):
+    return f"idempotency:{form_type}:{clave}"
+
+
+def clave_envio(form_type, clave):
+    return f"submitted:{form_type}:{clave}"
+
+
+def reservar(form_type, clave, task_id, ttl=TTL_IDEMPOTENCIA):
+    """
+    Reserva la clave para `task_id` si nadie la tiene
+
+    Returns:
+        str: task_id de la tarea que ya tenía la clave, o None si quedó reservada
+    """
+    redis = get_redis()
+    if redis.set(clave_reserva(form_type, clave), task_id, nx=True, ex=ttl):
+        return None
+    return redis.get(clave_reserva(form_type, clave)) or None
+
+
+def liberar(form_type, clave, task_id=None):
+    """
+    Libera la reserva de la clave (sólo si sigue siendo de `task_id`, si se pasa)
+
+    Los errores de Redis se informan pero no se propagan.
+    """
+    try:
+        redis = get_redis()
+        if task_id is None or redis.get(clave_reserva(form_type, clave)) == task_id:
+            redis.delete(clave_reserva(form_type, clave))
+    except Exception as e:
+        log.warning("⚠ No se pudo liberar la clave de idempotencia de %s: %s", form_type, e)
+
+
+def envio_registrado(form_type, clave):
+    """
+    Envío ya registrado con esta clave
+
+    Returns:
+        dict: 'task_id' y 'submitted_at' del envío original, o None si no hay
+              registro (o la idempotencia está desactivada o Redis falló)
+    """
+    if not idempotencia_activa():
+        return None
+    try:
+        registro = get_redis().get(clave_envio(form_type, clave))
+    except Exception as e:
+        log.warning("⚠ No se pudo consultar el registro de envíos de %s: %s", form_type, e)
+        return None
+    return json.loads(registro) if registro else None
+
+
+def registrar_envio(form_type, clave, task_id, ttl=TTL_IDEMPOTENCIA):
+    """Anota que el formulario con esta clave ya se envió"""
+    if not idempotencia_activa():
+        return
+    registro = json.dumps({'task_id': task_id, 'submitted_at': time.time()})
+    try:
+        get_redis().set(clave_envio(form_type, clave), registro, ex=ttl)
+    except Exception as e:
+        log.warning("⚠ No se pudo registrar el envío de %s: %s", form_type, e)
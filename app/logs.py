@@ -0,0 +1,231 @@
+"""
+Logging estructurado de los fillers, las tareas y la API
+
+Reemplaza los print() del llenado. Cada registro lleva su nivel y el
+contexto de quien lo emite (task_id, form_type, página y sección actuales).
+Los registros se encolan y un hilo aparte los escribe (QueueHandler +
+QueueListener), así que el llenado no se bloquea escribiendo en stdout. Se
+escribe en el stdout real del proceso y no en el que redirige Celery, que
+convertiría cada línea en otro registro del worker.
+
+Los mensajes usan formato perezoso (`log.debug("Fila %s/%s", i, total)`):
+con el nivel desactivado no se formatean.
+
+Niveles:
+    DEBUG    Cada sección, celda, opción, clic y método de respaldo
+    INFO     Navegación, páginas completadas, formulario enviado
+    WARNING  Campos o celdas que no se pudieron responder, reintentos
+    ERROR    Errores que detienen el formulario
+
+El contexto vive en contextvars: cada tarea, cada hilo del motor HTTP y
+cada pestaña (app/tabs.py) tiene el suyo. Los fillers lo actualizan desde
+sus eventos de avance (`seguir_evento`).
+
+Configuración por variables de entorno:
+    LOG_LEVEL: Nivel de los logs (default INFO; DEBUG muestra cada celda)
+    LOG_FORMAT: 'texto' (una línea legible, default) o 'json' (un objeto por línea)
+"""
+
+import atexit
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+
+NIVEL_LOG = os.getenv('LOG_LEVEL', 'INFO').upper()
+FORMATO_LOG = os.getenv('LOG_FORMAT', 'texto').lower()
+FORMATOS_LOG = ('texto', 'json')
+
+LOGGER_RAIZ = 'rpa'
+
+# Campos de contexto y su clave en el formato JSON
+CAMPOS_CONTEXTO = {
+    'task_id': 'task_id',
+    'form_type': 'form_type',
+    'pagina': 'page',
+    'seccion': 'section',
+}
+
+_contexto = contextvars.ContextVar('contexto_log', default={})
+
+_estado = {'listener': None, 'configuracion': None, 'pid': None}
+
+
+def contexto_actual():
+    """Copia del contexto de log vigente"""
+    return dict(_contexto.get())
+
+
+def actualizar_contexto(**campos):
+    """Cambia campos del contexto hasta que termine la tarea/pestaña/hilo actual"""
+    _contexto.set({**_contexto.get(), **campos})
+
+
+@contextlib.contextmanager
+def contexto_log(**campos):
+    """
+    Contexto de log para un bloque (p. ej. una tarea de Celery)
+
+    Uso:
+        with contexto_log(task_id=task_id, form_type='form2'):
+            filler.ejecutar(datos)
+    """
+    token = _contexto.set({**_contexto.get(), **campos})
+    try:
+        yield
+    finally:
+        _contexto.reset(token)
+
+
+def seguir_evento(evento, **datos):
+    """
+    Actualiza página y sección del contexto a partir de un evento de avance
+    de los fillers (ver app/task_progress.py)
+    """
+    if evento == 'pagina_iniciada':
+        actualizar_contexto(pagina=datos.get('pagina'), seccion=None)
+    elif evento == 'seccion_iniciada':
+        actualizar_contexto(seccion=datos.get('seccion'))
+    elif evento == 'seccion_completada':
+        actualizar_contexto(seccion=None)
+
+
+class _FiltroContexto(logging.Filter):
+    """Copia el contexto al registro en el hilo que lo emite, antes de encolarlo"""
+
+    def filter(self, record):
+        record.contexto = _contexto.get()
+        return True
+
+
+class FormatoTexto(logging.Formatter):
+    """`hora NIVEL [form2 task_id=... pagina=2 seccion=...] mensaje`"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(etiqueta_contexto)s%(message)s')
+
+    def format(self, record):
+        contexto = getattr(record, 'contexto', {})
+        campos = [str(contexto['form_type'])] if contexto.get('form_type') else []
+        campos += [f"{campo}={contexto[campo]}" for campo in ('task_id', 'pagina', 'seccion')
+                   if contexto.get(campo) is not None]
+        record.etiqueta_contexto = f"[{' '.join(campos)}] " if campos else ''
+        return super().format(record)
+
+
+class FormatoJSON(logging.Formatter):
+    """Un objeto JSON por línea, con el contexto como campos"""
+
+    def format(self, record):
+        entrada = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        contexto = getattr(record, 'contexto', {})
+        for campo, clave in CAMPOS_CONTEXTO.items():
+            if contexto.get(campo) is not None:
+                entrada[clave] = contexto[campo]
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entrada['exc_info'] = record.exc_text
+        return json.dumps(entrada, ensure_ascii=False, default=str)
+
+
+class _EncoladorContexto(QueueHandler):
+    """
+    QueueHandler que no formatea el mensaje en el hilo que emite
+
+    El QueueHandler estándar aplica su formato antes de encolar; aquí sólo
+    se resuelven los argumentos y la traza se pasa a texto (los objetos de
+    traza no deben cruzar de hilo). El formato lo aplica el hilo escritor.
+    """
+
+    def prepare(self, record):
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configurar_logging(nivel=None, formato=None, stream=None):
+    """
+    Configura el logger 'rpa' con escritura en un hilo aparte
+
+    Se llama sola la primera vez que un proceso pide un logger
+    (`obtener_logger`) y de nuevo en cada proceso hijo tras un fork, donde el
+    hilo escritor del padre no existe.
+
+    Args:
+        nivel (str): Nivel de log. Si es None se usa LOG_LEVEL
+        formato (str): 'texto' o 'json'. Si es None se usa LOG_FORMAT
+        stream: Destino. Si es None, el stdout original del proceso
+    """
+    nivel = (nivel or NIVEL_LOG).upper()
+    formato = (formato or FORMATO_LOG).lower()
+    if formato not in FORMATOS_LOG:
+        raise ValueError(f"LOG_FORMAT inválido: '{formato}'. Opciones: {', '.join(FORMATOS_LOG)}")
+
+    detener_logging()
+
+    escritor = logging.StreamHandler(stream or sys.__stdout__ or sys.stdout)
+    escritor.setFormatter(FormatoJSON() if formato == 'json' else FormatoTexto())
+    cola = queue.SimpleQueue()
+    listener = QueueListener(cola, escritor)
+    listener.start()
+
+    encolador = _EncoladorContexto(cola)
+    encolador.addFilter(_FiltroContexto())
+
+    raiz = logging.getLogger(LOGGER_RAIZ)
+    for anterior in [h for h in raiz.handlers if isinstance(h, _EncoladorContexto)]:
+        raiz.removeHandler(anterior)
+    raiz.addHandler(encolador)
+    raiz.setLevel(nivel)
+    raiz.propagate = False
+
+    _estado.update(listener=listener, configuracion=(nivel, formato, stream), pid=os.getpid())
+
+
+def detener_logging():
+    """Escribe los registros pendientes y detiene el hilo escritor"""
+    listener = _estado['listener']
+    _estado['listener'] = None
+    if listener is not None and _estado['pid'] == os.getpid():
+        listener.stop()
+
+
+def _reconfigurar_en_hijo():
+    """Tras un fork el hilo escritor no existe en el hijo: se crea otro"""
+    if _estado['configuracion'] is None:
+        return
+    _estado['listener'] = None
+    configurar_logging(*_estado['configuracion'])
+
+
+os.register_at_fork(after_in_child=_reconfigurar_en_hijo)
+atexit.register(detener_logging)
+
+
+def obtener_logger(nombre):
+    """
+    Logger de un módulo o filler (`rpa.<nombre>`)
+
+    Uso:
+        log = obtener_logger(__name__)
+        log.debug("Seleccionando %s", radio_id)
+    """
+    if _estado['pid'] != os.getpid():
+        configurar_logging()
+    return logging.getLogger(f"{LOGGER_RAIZ}.{nombre}")
@@ -5,8 +5,11 @@ Este servidor proporciona endpoints REST para llenar automáticamente
 los formularios de evaluación de Preescolar Integrales usando Selenium.
 """
 
-from fastapi import FastAPI
+import time
+
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from app.metrics import DURACION_API, PETICIONES_API, exportar
 from app.routers import forms_router
 
 # Crear la aplicación FastAPI
@@ -50,6 +53,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def medir_peticiones(request: Request, call_next):
+    """
+    Mide cada petición por método y plantilla de ruta (/api/forms/task/{task_id}),
+    no por la URL concreta, para no crear una serie por cada id
+    """
+    inicio = time.monotonic()
+    status = 500
+    try:
+        respuesta = await call_next(request)
+        status = respuesta.status_code
+        return respuesta
+    finally:
+        ruta = request.scope.get("route")
+        plantilla = ruta.path if ruta is not None else "sin_ruta"
+        DURACION_API.labels(method=request.method, route=plantilla).observe(time.monotonic() - inicio)
+        PETICIONES_API.labels(method=request.method, route=plantilla, status=str(status)).inc()
+
+
 # Incluir routers
 app.include_router(forms_router)
 
@@ -69,7 +92,8 @@ async def root():
             "form2": "/api/forms/form2",
             "form3": "/api/forms/form3",
             "form4": "/api/forms/form4",
-            "health": "/api/forms/health"
+            "health": "/api/forms/health",
+            "metrics": "/metrics"
         }
     }
 
@@ -85,6 +109,16 @@ async def health():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Métricas de Prometheus de la API (y de los workers si comparten
+    PROMETHEUS_MULTIPROC_DIR, ver app/metrics.py)
+    """
+    contenido, tipo = exportar()
+    return Response(content=contenido, media_type=tipo)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
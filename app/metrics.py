@@ -0,0 +1,208 @@
+"""
+Métricas de Prometheus de los fillers, el worker y la API
+
+Histogramas de tiempo por paso del llenado y contadores de los caminos de
+respaldo, para saber qué secciones, esperas y métodos de clic dominan el
+tiempo de cada formulario:
+
+    rpa_driver_startup_seconds{perfil}          Arranque de Chrome (crear_driver), por perfil de arranque
+    rpa_wait_seconds{condicion,resultado}       Esperas con nombre (carga tras driver.get,
+                                                página renderizada, envío confirmado...)
+    rpa_page_fill_seconds{pagina}               Página del motor (llenar_pagina)
+    rpa_section_fill_seconds{seccion}           Sección de matriz del motor, en cualquier modo
+    rpa_matrix_cell_seconds{metodo}             Celda marcada con Selenium (selenium, error)
+    rpa_matrix_cell_method_total{metodo}        Celdas por método: label, input o evento (script
+                                                por sección), pagina (script de página),
+                                                selenium (celda a celda o reintento), error
+    rpa_navigation_seconds{boton}               Botones Siguiente / enviar (y los POST del motor HTTP)
+    rpa_navigation_click_method_total{metodo}   click (Método 1), javascript (2), actions (3)
+    rpa_form_seconds{motor,estado}              Formulario completo en la tarea de Celery
+    rpa_forms_total{motor,estado}
+    rpa_rate_limit_wait_seconds{resultado}      Espera por turno de la encuesta (concedido, excedido)
+    rpa_api_request_seconds{method,route}       Peticiones a la API
+    rpa_api_requests_total{method,route,status}
+
+Todas las métricas de los fillers llevan la etiqueta `form_type`.
+
+Exportación:
+    - API: GET /metrics (app/main.py)
+    - Worker: servidor HTTP propio en METRICS_PORT, iniciado al arrancar el worker
+
+Con el pool prefork cada proceso hijo tiene sus propias métricas. Si se
+define PROMETHEUS_MULTIPROC_DIR (antes de arrancar el worker), los hijos las
+escriben en ese directorio y el exportador del proceso principal las agrega.
+
+Configuración por variables de entorno:
+    METRICS_PORT: Puerto del exportador del worker (default 9808; 0 lo desactiva)
+    PROMETHEUS_MULTIPROC_DIR: Directorio compartido para el modo multiproceso
+"""
+
+import functools
+import glob
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+from app.logs import obtener_logger
+
+
+log = obtener_logger(__name__)
+
+
+PUERTO_METRICAS = int(os.getenv('METRICS_PORT', '9808'))
+DIRECTORIO_MULTIPROCESO = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+
+BUCKETS_PASO = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+BUCKETS_CELDA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_FORMULARIO = (1, 5, 10, 20, 30, 45, 60, 90, 120, 180, 300, 600)
+BUCKETS_API = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+
+ARRANQUE_DRIVER = Histogram(
+    'rpa_driver_startup_seconds', 'Arranque de un navegador Chrome', ['perfil'], buckets=BUCKETS_PASO)
+DURACION_ESPERA = Histogram(
+    'rpa_wait_seconds', 'Esperas con nombre, desde que se crean hasta que se cumplen o vencen',
+    ['form_type', 'condicion', 'resultado'], buckets=BUCKETS_PASO)
+DURACION_PAGINA = Histogram(
+    'rpa_page_fill_seconds', 'Llenado de una página',
+    ['form_type', 'pagina'], buckets=BUCKETS_PASO)
+DURACION_SECCION = Histogram(
+    'rpa_section_fill_seconds', 'Llenado de una sección de matriz',
+    ['form_type', 'seccion'], buckets=BUCKETS_PASO)
+DURACION_CELDA = Histogram(
+    'rpa_matrix_cell_seconds', 'Celda de matriz marcada con Selenium, por resultado',
+    ['form_type', 'metodo'], buckets=BUCKETS_CELDA)
+CELDAS_POR_METODO = Counter(
+    'rpa_matrix_cell_method_total', 'Celdas de matriz por método de selección que funcionó',
+    ['form_type', 'metodo'])
+DURACION_NAVEGACION = Histogram(
+    'rpa_navigation_seconds', 'Clic en Siguiente / enviar (POST de la página en el motor HTTP)',
+    ['form_type', 'boton'], buckets=BUCKETS_PASO)
+CLICS_POR_METODO = Counter(
+    'rpa_navigation_click_method_total', 'Clics de navegación por método que funcionó',
+    ['form_type', 'metodo'])
+DURACION_FORMULARIO = Histogram(
+    'rpa_form_seconds', 'Formulario completo dentro de la tarea de Celery',
+    ['form_type', 'motor', 'estado'], buckets=BUCKETS_FORMULARIO)
+FORMULARIOS = Counter(
+    'rpa_forms_total', 'Formularios ejecutados por las tareas de Celery',
+    ['form_type', 'motor', 'estado'])
+DURACION_API = Histogram(
+    'rpa_api_request_seconds', 'Peticiones a la API', ['method', 'route'], buckets=BUCKETS_API)
+PETICIONES_API = Counter(
+    'rpa_api_requests_total', 'Peticiones a la API', ['method', 'route', 'status'])
+PETICIONES_RED = Counter(
+    'rpa_requests_loaded_total', 'Peticiones de red completadas por Chrome durante los formularios',
+    ['form_type'])
+PETICIONES_BLOQUEADAS = Counter(
+    'rpa_requests_blocked_total', 'Peticiones de red bloqueadas por el filtro (app/request_filter.py)',
+    ['form_type'])
+BYTES_RED = Counter(
+    'rpa_bytes_loaded_total', 'Bytes descargados por Chrome durante los formularios', ['form_type'])
+ESPERA_LIMITE = Histogram(
+    'rpa_rate_limit_wait_seconds', 'Espera por un turno de la encuesta (app/rate_limit.py)',
+    ['form_type', 'resultado'], buckets=BUCKETS_PASO)
+
+
+def cronometrar(histograma, etiqueta_argumento=None, **etiquetas):
+    """
+    Decorador de métodos de filler: observa su duración en `histograma`
+
+    La etiqueta `form_type` se toma de `self.FORM_TYPE`.
+
+    Args:
+        histograma (Histogram): Métrica con la etiqueta form_type
+        etiqueta_argumento (str): Etiqueta cuyo valor es el primer argumento
+                                  del método (p. ej. 'seccion' en _llenar_seccion)
+        **etiquetas: Valores fijos del resto de etiquetas (p. ej. pagina=2)
+    """
+    def decorador(metodo):
+        @functools.wraps(metodo)
+        def envoltura(self, *args, **kwargs):
+            valores = dict(etiquetas)
+            if etiqueta_argumento is not None:
+                valores[etiqueta_argumento] = args[0] if args else next(iter(kwargs.values()))
+            with histograma.labels(form_type=self.FORM_TYPE, **valores).time():
+                return metodo(self, *args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def registrar_celda(form_type, metodo, inicio=None):
+    """
+    Cuenta una celda de matriz según el método que la marcó
+
+    Args:
+        metodo (str): 'label', 'input', 'evento', 'pagina', 'selenium' o 'error'
+        inicio (float): `time.monotonic()` al empezar la celda, para medirla;
+                        None en las celdas de un script, que no tienen duración propia
+    """
+    CELDAS_POR_METODO.labels(form_type=form_type, metodo=metodo).inc()
+    if inicio is not None:
+        DURACION_CELDA.labels(form_type=form_type, metodo=metodo).observe(time.monotonic() - inicio)
+
+
+def registrar_clic(form_type, metodo):
+    """Cuenta un clic de navegación según el método que funcionó ('click', 'javascript', 'actions')"""
+    CLICS_POR_METODO.labels(form_type=form_type, metodo=metodo).inc()
+
+
+def registrar_formulario(form_type, motor, estado, duracion):
+    """Cuenta y mide un formulario completo ejecutado por una tarea ('completed', 'error')"""
+    FORMULARIOS.labels(form_type=form_type, motor=motor, estado=estado).inc()
+    DURACION_FORMULARIO.labels(form_type=form_type, motor=motor, estado=estado).observe(duracion)
+
+
+def registro_exportable():
+    """Registro a exportar: con PROMETHEUS_MULTIPROC_DIR, el agregado de todos los procesos"""
+    if DIRECTORIO_MULTIPROCESO:
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+        return registro
+    return REGISTRY
+
+
+def exportar():
+    """
+    Métricas en el formato de texto de Prometheus
+
+    Returns:
+        tuple: (contenido en bytes, content type)
+    """
+    return generate_latest(registro_exportable()), CONTENT_TYPE_LATEST
+
+
+def iniciar_exportador_worker(puerto=None):
+    """
+    Inicia el servidor HTTP de métricas del worker (proceso principal)
+
+    Con el modo multiproceso borra antes los archivos de una ejecución
+    anterior, que sumarían contadores de procesos que ya no existen.
+    """
+    puerto = PUERTO_METRICAS if puerto is None else puerto
+    if not puerto:
+        return
+    if DIRECTORIO_MULTIPROCESO:
+        for archivo in glob.glob(os.path.join(DIRECTORIO_MULTIPROCESO, '*.db')):
+            os.remove(archivo)
+    try:
+        start_http_server(puerto, registry=registro_exportable())
+        log.info("✓ Métricas del worker en :%s/metrics", puerto)
+    except OSError as e:
+        log.warning("⚠ No se pudo iniciar el exportador de métricas en :%s: %s", puerto, e)
+
+
+def marcar_proceso_terminado(pid):
+    """Descarta las métricas en vivo de un proceso hijo que terminó (modo multiproceso)"""
+    if DIRECTORIO_MULTIPROCESO:
+        multiprocess.mark_process_dead(pid)
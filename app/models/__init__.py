@@ -6,6 +6,17 @@ from .form1_models import Form1Request, Pagina2Form1, FormResponse, TaskStatusRe
 from .form2_models import Form2Request, Pagina2Form2
 from .form3_models import Form3Request, Pagina2Form3
 from .form4_models import Form4Request, Pagina2Form4
+from .batch_models import (
+    FORM_MODELS,
+    BatchItem,
+    BatchItemResult,
+    BatchResponse,
+    BatchCounters,
+    BatchFailure,
+    BatchStatusResponse,
+    TabsRequest,
+    TabsResponse,
+)
 
 __all__ = [
     "Form1Request",
@@ -18,4 +29,13 @@ __all__ = [
     "Pagina2Form4",
     "FormResponse",
     "TaskStatusResponse",
+    "FORM_MODELS",
+    "BatchItem",
+    "BatchItemResult",
+    "BatchResponse",
+    "BatchCounters",
+    "BatchFailure",
+    "BatchStatusResponse",
+    "TabsRequest",
+    "TabsResponse",
 ]
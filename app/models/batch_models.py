@@ -0,0 +1,98 @@
+"""
+Modelos Pydantic para el envío de formularios en lote
+"""
+
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+from .form1_models import Form1Request
+from .form2_models import Form2Request
+from .form3_models import Form3Request
+from .form4_models import Form4Request
+
+
+# Modelo de validación de cada tipo de formulario
+FORM_MODELS = {
+    'form1': Form1Request,
+    'form2': Form2Request,
+    'form3': Form3Request,
+    'form4': Form4Request,
+}
+
+
+class BatchItem(BaseModel):
+    """Un formulario dentro de un lote"""
+    form_type: str = Field(..., description="Tipo de formulario: form1, form2, form3 o form4")
+    data: Dict[str, Any] = Field(..., description="Datos del formulario, con la misma estructura que su endpoint individual")
+
+
+class BatchItemResult(BaseModel):
+    """Resultado de encolar un elemento del lote"""
+    index: int = Field(..., description="Posición del elemento en el lote (desde 0)")
+    form_type: Optional[str] = None
+    task_id: Optional[str] = Field(None, description="ID de la tarea de Celery si el elemento fue encolado")
+    errors: Optional[List[Dict[str, Any]]] = Field(None, description="Errores de validación si el elemento fue rechazado")
+
+
+class BatchResponse(BaseModel):
+    """Respuesta al encolar un lote de formularios"""
+    success: bool
+    message: str
+    batch_id: str
+    total: int = Field(..., description="Elementos recibidos")
+    accepted: int = Field(..., description="Elementos válidos encolados")
+    rejected: int = Field(..., description="Elementos rechazados por validación")
+    items: List[BatchItemResult]
+
+
+class BatchCounters(BaseModel):
+    """Contadores de estado de las tareas de un lote"""
+    pending: int = Field(0, description="Encoladas y aún sin empezar")
+    started: int = Field(0, description="Ejecutándose en un worker")
+    retrying: int = Field(0, description="Fallaron y esperan un reintento")
+    success: int = Field(0, description="Formularios enviados")
+    failed: int = Field(0, description="Agotaron sus reintentos")
+
+
+class BatchFailure(BaseModel):
+    """Formulario de un lote que falló definitivamente"""
+    task_id: str
+    form_type: str
+    error: str
+    failed_at: float = Field(..., description="Marca de tiempo Unix del fallo")
+
+
+class BatchStatusResponse(BaseModel):
+    """Estado agregado de un lote de formularios"""
+    batch_id: str
+    total: int = Field(..., description="Elementos recibidos")
+    accepted: int = Field(..., description="Elementos encolados")
+    rejected: int = Field(..., description="Elementos rechazados por validación")
+    counters: BatchCounters
+    completed: bool = Field(..., description="True cuando todas las tareas encoladas terminaron")
+    created_at: Optional[float] = None
+    started_at: Optional[float] = Field(None, description="Inicio de la primera tarea")
+    updated_at: Optional[float] = Field(None, description="Fin de la última tarea terminada")
+    throughput_per_minute: Optional[float] = Field(None, description="Formularios terminados por minuto")
+    eta_seconds: Optional[float] = Field(None, description="Segundos estimados para terminar el lote")
+    failures_total: int
+    failures_offset: int
+    failures_limit: int
+    failures: List[BatchFailure]
+
+
+class TabsRequest(BaseModel):
+    """Formularios de un mismo tipo a llenar en pestañas de un solo navegador"""
+    form_type: str = Field(..., description="Tipo de formulario: form1, form2, form3 o form4")
+    items: List[Dict[str, Any]] = Field(..., min_length=1, description="Datos de cada formulario, con la misma estructura que su endpoint individual")
+
+
+class TabsResponse(BaseModel):
+    """Respuesta al encolar formularios en pestañas"""
+    success: bool
+    message: str
+    form_type: str
+    task_id: str = Field(..., description="ID de la tarea de Celery con el resultado de todos los formularios")
+    batch_id: str = Field(..., description="Lote con el progreso de cada formulario (/api/forms/batch/{batch_id})")
+    total: int = Field(..., description="Formularios encolados")
+    duplicate: bool = Field(False, description="True si la lista ya estaba encolada con la misma clave de idempotencia; task_id y batch_id son los de la tarea original")
@@ -84,6 +84,7 @@ class FormResponse(BaseModel):
     message: str
     form_type: str
     task_id: Optional[str] = Field(None, description="ID de la tarea de Celery para seguimiento")
+    duplicate: bool = Field(False, description="True si el formulario ya estaba encolado con la misma clave de idempotencia; task_id es el de la tarea original")
 
 
 class TaskStatusResponse(BaseModel):
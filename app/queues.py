@@ -0,0 +1,108 @@
+"""
+Colas de Celery por prioridad y, opcionalmente, por tipo de formulario
+
+Antes todo iba a la cola por defecto: un lote de 10.000 formularios dejaba
+detrás a un envío individual urgente. Ahora hay dos prioridades:
+
+    interactive  Envíos individuales (POST /api/forms/form{N}); default de la API
+    bulk         Elementos de lotes y tareas en pestañas; default de /batch
+
+Las reglas de enrutamiento (`enrutar_tarea`, registrada en app/celery_app.py)
+eligen la cola de cada tarea; la API puede forzar la prioridad con el
+parámetro `priority`. Con QUEUE_PER_FORM cada prioridad se divide por tipo de
+formulario (`interactive.form2`, `bulk.form2`...), para dedicar workers a un
+formulario.
+
+Un worker consume por defecto todas las colas, siempre las interactivas
+antes que las masivas (`queue_order_strategy='priority'` del transporte
+Redis). Con WORKER_QUEUES se suscribe sólo a un subconjunto, p. ej. un
+worker dedicado a lo interactivo y otros que atienden ambas.
+
+Configuración por variables de entorno:
+    QUEUE_PER_FORM: 1 divide cada prioridad por tipo de formulario (default 0)
+    WORKER_QUEUES: Colas que consume el worker, separadas por comas y en orden
+                   de preferencia; admite prioridades ('interactive') que se
+                   expanden a sus colas (default: todas)
+"""
+
+import os
+
+from kombu import Queue
+
+
+COLA_INTERACTIVA = 'interactive'
+COLA_MASIVA = 'bulk'
+
+# Orden de preferencia de los workers
+PRIORIDADES = (COLA_INTERACTIVA, COLA_MASIVA)
+
+TIPOS_FORMULARIO = ('form1', 'form2', 'form3', 'form4')
+
+# Tareas que siempre son masivas
+TAREAS_MASIVAS = ('app.tasks.execute_form_tabs_task',)
+
+
+def colas_por_formulario():
+    """True si QUEUE_PER_FORM está activo"""
+    return os.getenv('QUEUE_PER_FORM', '0').strip().lower() not in ('0', 'false', 'no', '')
+
+
+def nombre_cola(prioridad, form_type=None):
+    """
+    Cola de una prioridad (y tipo de formulario, con QUEUE_PER_FORM)
+
+    Raises:
+        ValueError: Si la prioridad no es 'interactive' ni 'bulk'
+    """
+    if prioridad not in PRIORIDADES:
+        raise ValueError(f"Prioridad inválida: {prioridad}. Opciones: {', '.join(PRIORIDADES)}")
+    if colas_por_formulario() and form_type in TIPOS_FORMULARIO:
+        return f"{prioridad}.{form_type}"
+    return prioridad
+
+
+def colas_prioridad(prioridad):
+    """Todas las colas de una prioridad"""
+    if colas_por_formulario():
+        return [f"{prioridad}.{form_type}" for form_type in TIPOS_FORMULARIO]
+    return [prioridad]
+
+
+def colas_declaradas():
+    """Colas de `task_queues`, las interactivas primero"""
+    return [Queue(nombre) for prioridad in PRIORIDADES for nombre in colas_prioridad(prioridad)]
+
+
+def colas_worker():
+    """
+    Colas que consume este worker, en orden de preferencia
+
+    Returns:
+        list: Nombres de WORKER_QUEUES (las prioridades se expanden) o todas
+    """
+    pedidas = [c.strip() for c in os.getenv('WORKER_QUEUES', '').split(',') if c.strip()]
+    if not pedidas:
+        return [cola.name for cola in colas_declaradas()]
+
+    colas = []
+    for cola in pedidas:
+        for nombre in (colas_prioridad(cola) if cola in PRIORIDADES else [cola]):
+            if nombre not in colas:
+                colas.append(nombre)
+    return colas
+
+
+def enrutar_tarea(name, args, kwargs, options, task=None, **kw):
+    """
+    Router de Celery (`task_routes`): cola de cada tarea según su prioridad
+
+    Los formularios de un lote (con batch_id) y las tareas en pestañas van a
+    'bulk'; los individuales a 'interactive'. Una cola explícita en
+    `apply_async(queue=...)` tiene prioridad sobre esta regla.
+    """
+    if not name.startswith('app.tasks.'):
+        return None
+
+    form_type = args[0] if args else kwargs.get('form_type')
+    masiva = name in TAREAS_MASIVAS or kwargs.get('batch_id') or (len(args) > 2 and args[2])
+    return {'queue': nombre_cola(COLA_MASIVA if masiva else COLA_INTERACTIVA, form_type)}
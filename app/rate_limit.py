@@ -0,0 +1,325 @@
+"""
+Límite de ritmo y de concurrencia por encuesta, compartido entre workers
+
+Con varios workers, todos los fillers abren las mismas cuatro encuestas de
+Qualtrics a la vez y sin freno; el host empieza a responder lento o a
+bloquear. Antes de tomar un navegador del pool, cada tarea pide un turno
+para su encuesta (`turno`); en las tareas en pestañas y los envíos HTTP en
+paralelo, cada formulario pide el suyo:
+
+    1. Concurrencia: un lease en un sorted set de Redis con vencimiento;
+       como mucho RATE_MAX_CONCURRENCY formularios a la vez por encuesta.
+    2. Ritmo: un token de un token bucket en Redis; como mucho
+       RATE_LIMIT_PER_MINUTE formularios por minuto, con ráfagas de RATE_BURST.
+
+Ambos se resuelven con scripts Lua (atómicos y con el reloj de Redis, así
+los workers no dependen de sus relojes). Si el turno no llega en
+RATE_MAX_WAIT segundos se lanza `LimiteExcedido` (transitorio): la tarea se
+reintenta con backoff y libera el slot del worker mientras tanto. Esos
+reintentos tienen su propio tope (RATE_MAX_RETRIES) y no gastan los de la
+tarea, que quedan para los errores reales del llenado.
+
+Ajuste adaptativo (AIMD): cada formulario informa al terminar si alguna
+transición de página (la espera tras Siguiente o el POST del motor HTTP)
+tardó más de RATE_SLOW_NAVIGATION_SECONDS o si falló por un error transitorio
+(timeouts). El tiempo de llenado de la página no cuenta: depende del
+formulario y del worker, no del host. En ese caso el factor de la encuesta se multiplica
+por RATE_DECREASE, como mucho una vez por RATE_ADAPT_WINDOW segundos para
+que los workers que notan la misma lentitud no lo hundan juntos. Cada
+formulario sin lentitud lo recupera en RATE_INCREASE, hasta 1. El factor
+escala el ritmo y la concurrencia, así el throughput se mantiene cerca del
+máximo sostenible en lugar de colapsar con timeouts.
+
+Los errores de Redis se informan pero no detienen el llenado: sin Redis se
+llena sin límite, como antes.
+
+Claves en Redis (objetivo = host y ruta de la URL de la encuesta):
+    ratelimit:{objetivo}:tokens   Hash del token bucket (tokens, ts)
+    ratelimit:{objetivo}:leases   Sorted set de leases activos (score = vencimiento)
+    ratelimit:{objetivo}:adapt    Hash del ajuste adaptativo (factor, reduced_at)
+
+Configuración por variables de entorno:
+    RATE_LIMIT: 1 aplica los límites (default), 0 los desactiva
+    RATE_LIMIT_PER_MINUTE: Formularios por minuto por encuesta (default 60; 0 sin límite)
+    RATE_BURST: Formularios que pueden empezar de una vez (default 10)
+    RATE_MAX_CONCURRENCY: Formularios simultáneos por encuesta (default 8; 0 sin límite)
+    RATE_MAX_WAIT: Segundos máximos esperando turno antes de reintentar (default 120)
+    RATE_MAX_RETRIES: Reintentos de una tarea por falta de turno (default 20)
+    RATE_LEASE_TTL: Vencimiento de un lease si el worker muere (default 1800)
+    RATE_SLOW_NAVIGATION_SECONDS: Transición de página que se considera lenta (default 10)
+    RATE_DECREASE: Factor multiplicativo ante lentitud (default 0.7)
+    RATE_INCREASE: Recuperación por formulario sin lentitud (default 0.05)
+    RATE_MIN_FACTOR: Piso del factor (default 0.1)
+    RATE_ADAPT_WINDOW: Segundos mínimos entre reducciones (default 30)
+"""
+
+import os
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from app.form_specs import url_formulario
+from app.logs import obtener_logger
+from app.metrics import ESPERA_LIMITE
+from app.redis_client import get_redis
+from app.retries import TRANSITORIO, clasificar_error
+
+
+log = obtener_logger(__name__)
+
+
+POR_MINUTO = float(os.getenv('RATE_LIMIT_PER_MINUTE', '60'))
+RAFAGA = int(os.getenv('RATE_BURST', '10'))
+MAX_CONCURRENCIA = int(os.getenv('RATE_MAX_CONCURRENCY', '8'))
+ESPERA_MAXIMA = float(os.getenv('RATE_MAX_WAIT', '120'))
+MAX_REINTENTOS_TURNO = int(os.getenv('RATE_MAX_RETRIES', '20'))
+TTL_LEASE = int(os.getenv('RATE_LEASE_TTL', '1800'))
+NAVEGACION_LENTA = float(os.getenv('RATE_SLOW_NAVIGATION_SECONDS', '10'))
+REDUCCION = float(os.getenv('RATE_DECREASE', '0.7'))
+RECUPERACION = float(os.getenv('RATE_INCREASE', '0.05'))
+FACTOR_MINIMO = float(os.getenv('RATE_MIN_FACTOR', '0.1'))
+VENTANA_AJUSTE = float(os.getenv('RATE_ADAPT_WINDOW', '30'))
+
+# Pausa entre intentos de tomar un lease de concurrencia
+INTERVALO_SONDEO = 0.5
+
+# Los hashes del token bucket y del ajuste se descartan si nadie los usa en un día
+TTL_ESTADO = 86400
+
+_AHORA = """
+local t = redis.call('TIME')
+local ahora = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local factor = tonumber(redis.call('HGET', KEYS[2], 'factor') or '1')
+"""
+
+# KEYS: leases, adapt | ARGV: lease, concurrencia base, ttl -> 1 si tomó el lease
+_SCRIPT_LEASE = _AHORA + """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ahora)
+local limite = math.max(1, math.floor(tonumber(ARGV[2]) * factor))
+if redis.call('ZCARD', KEYS[1]) >= limite then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ahora + tonumber(ARGV[3]), ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+# KEYS: tokens, adapt | ARGV: tokens por segundo base, capacidad, ttl -> segundos de espera ('0' si tomó el token)
+_SCRIPT_TOKEN = _AHORA + """
+local tasa = tonumber(ARGV[1]) * factor
+local capacidad = tonumber(ARGV[2])
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens') or ARGV[2])
+local ts = tonumber(redis.call('HGET', KEYS[1], 'ts') or ahora)
+tokens = math.min(capacidad, tokens + math.max(0, ahora - ts) * tasa)
+local espera = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    espera = (1 - tokens) / tasa
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', ahora)
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return tostring(espera)
+"""
+
+# KEYS: adapt, adapt | ARGV: lento (0/1), reducción, recuperación, piso, ventana, ttl -> factor nuevo
+_SCRIPT_AJUSTE = _AHORA + """
+if ARGV[1] == '1' then
+    local reducido = tonumber(redis.call('HGET', KEYS[1], 'reduced_at') or '0')
+    if ahora - reducido >= tonumber(ARGV[5]) then
+        factor = math.max(tonumber(ARGV[4]), factor * tonumber(ARGV[2]))
+        redis.call('HSET', KEYS[1], 'reduced_at', ahora)
+    end
+else
+    factor = math.min(1, factor + tonumber(ARGV[3]))
+end
+redis.call('HSET', KEYS[1], 'factor', factor)
+redis.call('EXPIRE', KEYS[1], ARGV[6])
+return tostring(factor)
+"""
+
+
+class LimiteExcedido(Exception):
+    """La encuesta no dio turno dentro de RATE_MAX_WAIT"""
+
+    categoria = TRANSITORIO
+
+
+def limite_activo():
+    """True si RATE_LIMIT está activo"""
+    return os.getenv('RATE_LIMIT', '1').strip().lower() not in ('0', 'false', 'no', '')
+
+
+def objetivo_formulario(form_type):
+    """Host y ruta de la encuesta del formulario: formularios con la misma URL comparten límite"""
+    partes = urlsplit(url_formulario(form_type))
+    return f"{partes.netloc}{partes.path}"
+
+
+def clave_limite(objetivo, sufijo):
+    return f"ratelimit:{objetivo}:{sufijo}"
+
+
+def _tomar_lease(redis, objetivo, lease):
+    claves = [clave_limite(objetivo, 'leases'), clave_limite(objetivo, 'adapt')]
+    return bool(redis.eval(_SCRIPT_LEASE, 2, *claves, lease, MAX_CONCURRENCIA, TTL_LEASE))
+
+
+def _tomar_token(redis, objetivo):
+    claves = [clave_limite(objetivo, 'tokens'), clave_limite(objetivo, 'adapt')]
+    return float(redis.eval(_SCRIPT_TOKEN, 2, *claves, POR_MINUTO / 60, RAFAGA, TTL_ESTADO))
+
+
+def ajustar(objetivo, lento):
+    """
+    Informa el resultado de un formulario al ajuste adaptativo de la encuesta
+
+    Returns:
+        float: Factor nuevo (entre RATE_MIN_FACTOR y 1)
+    """
+    clave = clave_limite(objetivo, 'adapt')
+    factor = float(get_redis().eval(_SCRIPT_AJUSTE, 2, clave, clave, '1' if lento else '0',
+                                    REDUCCION, RECUPERACION, FACTOR_MINIMO, VENTANA_AJUSTE, TTL_ESTADO))
+    if lento:
+        log.warning("⚠ Encuesta %s lenta: factor de ritmo %.2f", objetivo, factor)
+    return factor
+
+
+def adquirir(objetivo, lease, espera_maxima=ESPERA_MAXIMA, dormir=time.sleep, reloj=time.monotonic):
+    """
+    Espera un lease de concurrencia y luego un token de la encuesta
+
+    Returns:
+        float: Segundos esperados
+
+    Raises:
+        LimiteExcedido: Si no hubo turno dentro de `espera_maxima` (sin lease tomado)
+    """
+    redis = get_redis()
+    inicio = reloj()
+    limite = inicio + espera_maxima
+
+    while MAX_CONCURRENCIA > 0 and not _tomar_lease(redis, objetivo, lease):
+        if reloj() >= limite:
+            raise LimiteExcedido(f"{objetivo}: sin turno de concurrencia en {espera_maxima:.0f}s")
+        dormir(INTERVALO_SONDEO * random.uniform(0.5, 1.5))
+
+    try:
+        while POR_MINUTO > 0:
+            espera = _tomar_token(redis, objetivo)
+            if espera <= 0:
+                return reloj() - inicio
+            if reloj() + espera > limite:
+                raise LimiteExcedido(f"{objetivo}: sin token de ritmo en {espera_maxima:.0f}s")
+            # Jitter para que los workers que esperan el mismo token no despierten juntos
+            dormir(espera * random.uniform(1.0, 1.2))
+        return reloj() - inicio
+    except BaseException:
+        redis.zrem(clave_limite(objetivo, 'leases'), lease)
+        raise
+
+
+class Turno:
+    """
+    Turno de un formulario en su encuesta; vigila la duración de sus transiciones
+
+    `registrar` tiene la firma de `notificar` de los fillers: recibe los
+    eventos `navegacion` de las esperas tras Siguiente (app/waits.py).
+
+    Se toma con `tomar` y se devuelve con `soltar`; `turno` los envuelve en un
+    context manager. El planificador de pestañas (app/tabs.py) toma uno por
+    formulario.
+    """
+
+    def __init__(self, form_type=None):
+        self.form_type = form_type
+        self.objetivo = None
+        self.lease = None
+        self.espera = 0.0
+        self.lento = False
+
+    def registrar(self, evento, **datos):
+        if evento == 'navegacion' and datos.get('duracion', 0) > NAVEGACION_LENTA:
+            self.lento = True
+
+    def tomar(self, espera_maxima=ESPERA_MAXIMA, dormir=time.sleep):
+        """
+        Espera el turno de la encuesta
+
+        Sin límite activo, sin form_type o si Redis falla, queda concedido
+        sin límite. Con `espera_maxima=0` sólo se intenta, sin esperar.
+
+        Returns:
+            Turno: El mismo turno
+
+        Raises:
+            LimiteExcedido: Si no hubo turno dentro de `espera_maxima`
+        """
+        if self.form_type is None or not limite_activo():
+            return self
+
+        objetivo = objetivo_formulario(self.form_type)
+        lease = str(uuid.uuid4())
+        try:
+            espera = adquirir(objetivo, lease, espera_maxima, dormir)
+        except LimiteExcedido:
+            if espera_maxima > 0:
+                ESPERA_LIMITE.labels(form_type=self.form_type, resultado='excedido').observe(espera_maxima)
+            raise
+        except Exception as e:
+            log.warning("⚠ No se pudo aplicar el límite de %s; se continúa sin límite: %s", objetivo, e)
+            return self
+
+        ESPERA_LIMITE.labels(form_type=self.form_type, resultado='concedido').observe(espera)
+        if espera >= 1:
+            log.info("Turno de %s tras %.1fs", objetivo, espera)
+        self.objetivo = objetivo
+        self.lease = lease
+        self.espera = espera
+        return self
+
+    def soltar(self, error=None):
+        """
+        Libera el lease e informa el resultado al ajuste adaptativo
+
+        Args:
+            error (Exception): Error que terminó el formulario; uno transitorio
+                               (timeout) cuenta como lentitud
+        """
+        if self.lease is None:
+            return
+        if error is not None and clasificar_error(error) == TRANSITORIO:
+            self.lento = True
+
+        lease, self.lease = self.lease, None
+        try:
+            get_redis().zrem(clave_limite(self.objetivo, 'leases'), lease)
+            ajustar(self.objetivo, self.lento)
+        except Exception as e:
+            log.warning("⚠ No se pudo liberar el turno de %s: %s", self.objetivo, e)
+
+
+@contextmanager
+def turno(form_type, espera_maxima=ESPERA_MAXIMA, dormir=time.sleep):
+    """
+    Ejecuta el bloque con un turno de la encuesta del formulario
+
+    Uso:
+        with turno('form2') as t, get_driver_pool().prestar() as driver:
+            filler = Form2Filler(driver=driver, notificar=t.registrar)
+            filler.ejecutar(datos)
+
+    Raises:
+        LimiteExcedido: Si no hubo turno dentro de `espera_maxima`
+    """
+    actual = Turno(form_type).tomar(espera_maxima, dormir)
+    error = None
+    try:
+        yield actual
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        actual.soltar(error)
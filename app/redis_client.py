@@ -0,0 +1,27 @@
+"""
+Cliente Redis compartido para el estado que la API y los workers mantienen
+fuera de Celery (lotes, progreso, claves de idempotencia...)
+
+Usa la misma instancia que el broker (REDIS_URL). El cliente es perezoso y
+uno por proceso: redis-py mantiene su propio pool de conexiones y es seguro
+entre hilos.
+"""
+
+import threading
+
+import redis
+
+from app.celery_app import REDIS_URL
+
+
+_cliente = None
+_cliente_lock = threading.Lock()
+
+
+def get_redis():
+    """Retorna el cliente Redis del proceso actual, creándolo la primera vez"""
+    global _cliente
+    with _cliente_lock:
+        if _cliente is None:
+            _cliente = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+        return _cliente
@@ -0,0 +1,221 @@
+"""
+Bloqueo de peticiones innecesarias en las páginas de Qualtrics
+
+Las páginas de la encuesta descargan analítica, fuentes, imágenes y
+gráficos del tema que los fillers nunca usan. Cada navegador (y cada
+pestaña nueva) recibe por CDP una lista de patrones bloqueados
+(`Network.setBlockedURLs`); Chrome corta esas peticiones antes de hacerlas,
+lo que acorta `driver.get` y cada transición de página.
+
+Lo que JFE necesita para pintar y enviar la encuesta está en una lista
+permitida (documento y POST de /jfe/form, scripts de /jfe/static, hojas de
+estilo). `validar_patrones` rechaza cualquier patrón bloqueado que
+coincida con una URL permitida, incluidos los de REQUEST_BLOCK_EXTRA.
+
+Estadísticas por formulario (`medir_red`): con REQUEST_STATS activo,
+chromedriver guarda los eventos de red en su log 'performance'; al terminar
+cada formulario se cuentan las peticiones cargadas, sus bytes y las
+bloqueadas. Las peticiones bloqueadas nunca se descargan, así que el ahorro
+en bytes es la diferencia de `bytes_loaded` con el filtro activo y sin él
+(ver run_benchmark.py). Con varias pestañas en un navegador el log es
+compartido; las estadísticas se toman por tarea, no por formulario.
+
+Configuración por variables de entorno:
+    REQUEST_FILTER: 1 bloquea las peticiones innecesarias (default), 0 lo desactiva
+    REQUEST_BLOCK_EXTRA: Patrones adicionales separados por comas (comodín '*')
+    REQUEST_STATS: 1 registra peticiones y bytes por formulario (default), 0 lo desactiva
+"""
+
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+from app.logs import obtener_logger
+from app.metrics import BYTES_RED, PETICIONES_BLOQUEADAS, PETICIONES_RED
+
+
+log = obtener_logger(__name__)
+
+
+# Patrones de Network.setBlockedURLs ('*' es el único comodín), por motivo
+PATRONES_BLOQUEADOS = {
+    'analitica': (
+        '*google-analytics.com*',
+        '*googletagmanager.com*',
+        '*doubleclick.net*',
+        '*facebook.net*',
+        '*hotjar.com*',
+        '*siteintercept.qualtrics.com*',
+        '*/WRSiteInterceptEngine/*',
+    ),
+    'imagenes': (
+        '*.png', '*.png?*',
+        '*.jpg', '*.jpg?*',
+        '*.jpeg', '*.jpeg?*',
+        '*.gif', '*.gif?*',
+        '*.svg', '*.svg?*',
+        '*.webp', '*.webp?*',
+        '*.ico', '*.ico?*',
+        # Logos y fondos del tema de la encuesta
+        '*/ControlPanel/Graphic.php*',
+        '*/CP/Graphic.php*',
+    ),
+    'fuentes': (
+        '*fonts.googleapis.com*',
+        '*fonts.gstatic.com*',
+        '*.woff', '*.woff?*',
+        '*.woff2', '*.woff2?*',
+        '*.ttf', '*.ttf?*',
+        '*.otf', '*.otf?*',
+        '*.eot', '*.eot?*',
+    ),
+    'medios': (
+        '*.mp4', '*.mp4?*',
+        '*.webm', '*.webm?*',
+        '*.mp3', '*.mp3?*',
+    ),
+}
+
+# Ejemplos de lo que JFE necesita; ningún patrón bloqueado puede coincidir con ellos
+URLS_PERMITIDAS = (
+    'https://colsubsidio.az1.qualtrics.com/jfe/form/SV_6VaaNLR3jmRV4pw',
+    'https://colsubsidio.az1.qualtrics.com/jfe/form/SV_6VaaNLR3jmRV4pw/next?rand=1&tid=1&t=1',
+    'https://colsubsidio.az1.qualtrics.com/jfe/static/dist/jfeLib.2c8f1a.min.js',
+    'https://colsubsidio.az1.qualtrics.com/jfe/static/dist/jfe.7b1e0d.min.js',
+    'https://colsubsidio.az1.qualtrics.com/jfe/static/dist/jfe.7b1e0d.min.css',
+    'https://colsubsidio.az1.qualtrics.com/jfe/themes/templated-skins/qualtrics.2014:null.css',
+    'https://colsubsidio.az1.qualtrics.com/jfe/static/dist/survey-runtime.js?v=2',
+)
+
+
+def filtro_activo():
+    """True si REQUEST_FILTER está activo"""
+    return os.getenv('REQUEST_FILTER', '1').strip().lower() not in ('0', 'false', 'no', '')
+
+
+def estadisticas_activas():
+    """True si REQUEST_STATS está activo"""
+    return os.getenv('REQUEST_STATS', '1').strip().lower() not in ('0', 'false', 'no', '')
+
+
+@lru_cache(maxsize=None)
+def _expresion(patron):
+    return re.compile('.*'.join(re.escape(parte) for parte in patron.split('*')) + r'\Z')
+
+
+def coincide(patron, url):
+    """Misma regla que Chrome para setBlockedURLs: '*' equivale a cualquier texto"""
+    return _expresion(patron).match(url) is not None
+
+
+def validar_patrones(patrones, permitidas=URLS_PERMITIDAS):
+    """
+    Verifica que ningún patrón bloqueado coincida con una URL permitida
+
+    Raises:
+        ValueError: Con el primer patrón que bloquearía algo que JFE necesita
+    """
+    for patron in patrones:
+        for url in permitidas:
+            if coincide(patron, url):
+                raise ValueError(f"El patrón bloqueado '{patron}' coincide con la URL permitida {url}")
+    return patrones
+
+
+def patrones_bloqueados():
+    """Patrones a bloquear: los de PATRONES_BLOQUEADOS más REQUEST_BLOCK_EXTRA, validados"""
+    extra = [p.strip() for p in os.getenv('REQUEST_BLOCK_EXTRA', '').split(',') if p.strip()]
+    patrones = [p for grupo in PATRONES_BLOQUEADOS.values() for p in grupo] + extra
+    return validar_patrones(patrones)
+
+
+def aplicar_bloqueo(driver):
+    """
+    Activa el bloqueo en la pestaña actual del driver
+
+    Se llama al crear cada navegador y al abrir cada pestaña (el bloqueo de
+    CDP es por pestaña). Si el navegador no soporta CDP el llenado sigue
+    sin bloqueo.
+
+    Returns:
+        bool: True si el bloqueo quedó activo
+    """
+    if not filtro_activo():
+        return False
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patrones_bloqueados()})
+        return True
+    except Exception as e:
+        log.warning("⚠ No se pudo activar el bloqueo de peticiones: %s", e)
+        return False
+
+
+def resumir_eventos_red(entradas):
+    """
+    Cuenta peticiones y bytes a partir de las entradas del log 'performance'
+
+    Args:
+        entradas (list): Entradas de `driver.get_log('performance')`
+
+    Returns:
+        dict: 'requests_loaded', 'requests_blocked' y 'bytes_loaded'
+    """
+    resumen = {'requests_loaded': 0, 'requests_blocked': 0, 'bytes_loaded': 0}
+    for entrada in entradas:
+        try:
+            mensaje = json.loads(entrada['message'])['message']
+        except (KeyError, TypeError, ValueError):
+            continue
+        metodo, parametros = mensaje.get('method'), mensaje.get('params', {})
+        if metodo == 'Network.loadingFinished':
+            resumen['requests_loaded'] += 1
+            resumen['bytes_loaded'] += int(parametros.get('encodedDataLength') or 0)
+        elif metodo == 'Network.loadingFailed' and (
+                parametros.get('blockedReason') == 'inspector'
+                or parametros.get('errorText') == 'net::ERR_BLOCKED_BY_CLIENT'):
+            resumen['requests_blocked'] += 1
+    return resumen
+
+
+def _leer_log_red(driver):
+    """Entradas pendientes del log 'performance' (lo vacía), o None si no está disponible"""
+    try:
+        return driver.get_log('performance')
+    except Exception:
+        return None
+
+
+@contextmanager
+def medir_red(driver, form_type):
+    """
+    Mide las peticiones de un formulario llenado dentro del bloque
+
+    Uso:
+        with medir_red(driver, 'form2') as red:
+            filler.ejecutar(datos)
+        red  # {'requests_loaded': 41, 'requests_blocked': 23, 'bytes_loaded': 812345}
+
+    Si las estadísticas están desactivadas o el driver no tiene el log
+    'performance', `red` queda vacío.
+    """
+    red = {}
+    if driver is None or not estadisticas_activas() or _leer_log_red(driver) is None:
+        yield red
+        return
+
+    inicio = time.monotonic()
+    try:
+        yield red
+    finally:
+        entradas = _leer_log_red(driver) or []
+        red.update(resumir_eventos_red(entradas))
+        PETICIONES_RED.labels(form_type=form_type).inc(red['requests_loaded'])
+        PETICIONES_BLOQUEADAS.labels(form_type=form_type).inc(red['requests_blocked'])
+        BYTES_RED.labels(form_type=form_type).inc(red['bytes_loaded'])
+        log.info("Red: %s peticiones (%.0f KB) en %.1fs, %s bloqueadas",
+                 red['requests_loaded'], red['bytes_loaded'] / 1024, time.monotonic() - inicio,
+                 red['requests_blocked'])
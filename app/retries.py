@@ -0,0 +1,217 @@
+"""
+Política de reintentos de las tareas de formularios
+
+Antes, cualquier error reintentaba la tarea completa tras 60 s fijos: un
+fallo en la página 3 repetía las páginas 1 y 2 en otro navegador. Ahora:
+
+    1. Cada error se clasifica (`clasificar_error`):
+           transitorio     Timeouts, elementos obsoletos, caídas de conexión
+                           o del navegador
+           selector        Un campo o botón que el plan espera no está en la página
+           validacion      Datos inválidos o Qualtrics rechazó la página
+                           (mensaje .ValidationError visible)
+           envio_incierto  Falló el envío final y Qualtrics pudo haberlo registrado
+       Sólo se reintentan 'transitorio', 'selector' y los errores sin
+       clasificar; repetir un error de validación o un envío incierto sólo
+       gasta tiempo (o duplica la respuesta).
+    2. El filler deja un punto de control (`PuntoControl`) con la última
+       página y sección completadas, a partir de sus eventos de avance.
+    3. Si el filler puede reanudar (`REANUDABLE`, el motor declarativo) y ya
+       completó alguna página, se reanuda en el mismo navegador desde la
+       página siguiente: la sesión de Qualtrics vive en ese navegador y la
+       página que falló sigue abierta. Si la página abierta no es la esperada
+       el filler lanza `ReanudacionImposible` y la tarea se reintenta.
+    4. El reintento de la tarea de Celery (otro préstamo del pool, con
+       cookies limpias, empieza de cero) espera un backoff exponencial con
+       jitter en lugar de 60 s fijos.
+
+Un error puede declarar su categoría con el atributo de clase `categoria`
+(p. ej. los errores del motor HTTP).
+
+Configuración por variables de entorno:
+    RETRY_BACKOFF_BASE: Segundos del primer reintento de la tarea (default 15)
+    RETRY_BACKOFF_MAX: Tope de segundos entre reintentos de la tarea (default 300)
+    RETRY_RESUME_ATTEMPTS: Reanudaciones en el mismo navegador por intento (default 2)
+    RETRY_RESUME_DELAY: Segundos base antes de cada reanudación (default 2)
+"""
+
+import os
+import random
+import time
+
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    InvalidSelectorException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+from urllib3.exceptions import HTTPError
+
+from app.logs import obtener_logger
+
+
+log = obtener_logger(__name__)
+
+
+TRANSITORIO = 'transitorio'
+SELECTOR = 'selector'
+VALIDACION = 'validacion'
+ENVIO_INCIERTO = 'envio_incierto'
+DESCONOCIDO = 'desconocido'
+
+CATEGORIAS_REINTENTABLES = (TRANSITORIO, SELECTOR, DESCONOCIDO)
+
+BASE_BACKOFF = float(os.getenv('RETRY_BACKOFF_BASE', '15'))
+MAX_BACKOFF = float(os.getenv('RETRY_BACKOFF_MAX', '300'))
+REANUDACIONES = int(os.getenv('RETRY_RESUME_ATTEMPTS', '2'))
+BASE_REANUDACION = float(os.getenv('RETRY_RESUME_DELAY', '2'))
+
+# Mensajes de validación de Qualtrics JFE junto a la pregunta rechazada
+SELECTOR_VALIDACION = '.ValidationError'
+
+_SCRIPT_VALIDACION_VISIBLE = """
+return Array.prototype.some.call(document.querySelectorAll(arguments[0]), function (el) {
+    return el.offsetParent !== null && el.textContent.trim() !== '';
+});
+"""
+
+# Orden importa: las subclases de WebDriverException antes que la genérica
+ERRORES_SELENIUM = (
+    (TimeoutException, TRANSITORIO),
+    (StaleElementReferenceException, TRANSITORIO),
+    (ElementClickInterceptedException, TRANSITORIO),
+    (NoSuchElementException, SELECTOR),
+    (ElementNotInteractableException, SELECTOR),
+    (InvalidSelectorException, SELECTOR),
+    (WebDriverException, TRANSITORIO),
+)
+
+
+class ReanudacionImposible(Exception):
+    """La página abierta en el navegador no es la del punto de control"""
+
+    categoria = TRANSITORIO
+
+
+def _validacion_visible(driver):
+    try:
+        return bool(driver.execute_script(_SCRIPT_VALIDACION_VISIBLE, SELECTOR_VALIDACION))
+    except Exception:
+        return False
+
+
+def clasificar_error(error, driver=None):
+    """
+    Categoría de un error del llenado
+
+    Args:
+        error (Exception): Error capturado
+        driver (WebDriver): Navegador del formulario; si se pasa, un mensaje de
+                            validación de Qualtrics visible convierte un
+                            timeout o selector faltante en 'validacion'
+
+    Returns:
+        str: 'transitorio', 'selector', 'validacion', 'envio_incierto' o 'desconocido'
+    """
+    categoria = getattr(error, 'categoria', None)
+    if categoria is None:
+        if isinstance(error, (ValueError, KeyError, TypeError)):
+            categoria = VALIDACION
+        elif isinstance(error, (HTTPError, ConnectionError)):
+            categoria = TRANSITORIO
+        else:
+            categoria = next((c for tipo, c in ERRORES_SELENIUM if isinstance(error, tipo)), DESCONOCIDO)
+
+    if categoria in (TRANSITORIO, SELECTOR) and driver is not None and _validacion_visible(driver):
+        return VALIDACION
+    return categoria
+
+
+def es_reintentable(categoria):
+    """True si vale la pena repetir un formulario que falló con esta categoría"""
+    return categoria in CATEGORIAS_REINTENTABLES
+
+
+def espera_reintento(intento, base=BASE_BACKOFF, maximo=MAX_BACKOFF):
+    """
+    Segundos antes del reintento número `intento` (0 = primero)
+
+    Backoff exponencial con jitter: la mitad fija y la otra mitad al azar,
+    para que las tareas que fallaron juntas no reintenten juntas.
+    """
+    tope = min(maximo, base * 2 ** intento)
+    return tope / 2 + random.uniform(0, tope / 2)
+
+
+class PuntoControl:
+    """
+    Última página y sección completadas de un formulario
+
+    Se alimenta con los eventos de avance del filler (`registrar` tiene la
+    firma de `notificar`).
+    """
+
+    def __init__(self):
+        self.pagina = None
+        self.seccion = None
+        self.reanudaciones = 0
+
+    def registrar(self, evento, **datos):
+        if evento == 'pagina_completada':
+            self.pagina = datos.get('pagina')
+            self.seccion = None
+        elif evento == 'seccion_completada':
+            self.seccion = datos.get('seccion')
+
+    @property
+    def pagina_siguiente(self):
+        """Página desde la cual reanudar, o None si no hay ninguna completa"""
+        return None if self.pagina is None else self.pagina + 1
+
+    def como_dict(self):
+        """Punto de control para el meta y el resultado de la tarea"""
+        return {'last_page': self.pagina, 'last_section': self.seccion, 'resumes': self.reanudaciones}
+
+
+def ejecutar_reanudable(crear_filler, datos, punto_control, reanudaciones=REANUDACIONES, dormir=time.sleep):
+    """
+    Ejecuta un formulario y, ante errores reintentables, lo reanuda en el
+    mismo navegador desde la página siguiente al punto de control
+
+    Args:
+        crear_filler (callable): Crea un filler nuevo ligado al navegador de la tarea
+        datos (dict): Datos del formulario
+        punto_control (PuntoControl): Alimentado por el `notificar` del filler
+        reanudaciones (int): Reanudaciones máximas antes de propagar el error
+        dormir (callable): Pausa entre reanudaciones
+
+    Raises:
+        Exception: El último error, si no se pudo reanudar; su categoría queda
+                   en el atributo `categoria_reintento`
+    """
+    desde_pagina = None
+    while True:
+        filler = crear_filler()
+        try:
+            if desde_pagina is None:
+                filler.ejecutar(datos)
+            else:
+                filler.ejecutar(datos, desde_pagina=desde_pagina)
+            return
+        except Exception as e:
+            categoria = clasificar_error(e, getattr(filler, 'driver', None))
+            e.categoria_reintento = categoria
+            desde_pagina = punto_control.pagina_siguiente
+            if (not es_reintentable(categoria) or isinstance(e, ReanudacionImposible)
+                    or not getattr(filler, 'REANUDABLE', False) or desde_pagina is None
+                    or punto_control.reanudaciones >= reanudaciones):
+                raise
+
+            punto_control.reanudaciones += 1
+            espera = espera_reintento(punto_control.reanudaciones - 1, BASE_REANUDACION, MAX_BACKOFF)
+            log.warning("⚠ Error %s (%s); reanudando en la página %s en %.1fs (%s/%s)",
+                        categoria, e, desde_pagina, espera, punto_control.reanudaciones, reanudaciones)
+            dormir(espera)
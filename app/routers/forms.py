@@ -2,16 +2,47 @@
 Endpoints de la API para llenar los formularios automatizados
 """
 
-from fastapi import APIRouter, HTTPException
+import uuid
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from app.models import (
     Form1Request,
     Form2Request,
     Form3Request,
     Form4Request,
     FormResponse,
-    TaskStatusResponse
+    TaskStatusResponse,
+    BatchResponse,
+    BatchCounters,
+    BatchStatusResponse,
+    TabsRequest,
+    TabsResponse
+)
+from app.batch import (
+    MAX_ELEMENTOS,
+    TIPOS_NDJSON,
+    EncoladorLote,
+    LoteDemasiadoGrande,
+    elementos_json,
+    elementos_ndjson,
+    registrar_lote,
+    validar_elemento
 )
-from app.tasks import execute_form_task
+from app.batch_progress import estado_lote
+from app.idempotency import MAX_LONGITUD_CLAVE, clave_idempotencia, idempotencia_activa, liberar, reservar
+from app.queues import nombre_cola
+from app.task_events import (
+    EVENTOS_FINALES,
+    canal_lote,
+    canal_tarea,
+    formato_sse,
+    suscribir,
+    ultimo_evento
+)
+from app.tasks import execute_form_tabs_task, execute_form_task
 from app.celery_app import celery_app
 
 router = APIRouter(
@@ -19,39 +50,135 @@ router = APIRouter(
     tags=["Formularios"]
 )
 
+# Prioridad de cola que puede pedir el cliente (app/queues.py)
+Prioridad = Optional[Literal['interactive', 'bulk']]
 
-@router.post("/form1", response_model=FormResponse)
-async def llenar_formulario_1(request: Form1Request):
+
+def _encolar_formulario(form_type, datos, idempotency_key=None, prioridad=None, por_contenido=False):
     """
-    Llena el Formulario 1 - Evaluación Preescolar Integrales v1
+    Encola un formulario una sola vez por clave de idempotencia
 
-    **Descripción**: Este endpoint recibe los datos del formulario 1 y ejecuta
-    el proceso de llenado automático usando Selenium.
+    La clave (cabecera Idempotency-Key o, con `por_contenido`, hash de
+    `datos`) se reserva en Redis antes de encolar; si ya estaba reservada no
+    se encola nada (app/idempotency.py). Sin clave se encola siempre. Sin
+    `prioridad`, la cola la eligen las reglas de enrutamiento (app/queues.py).
 
-    **URL del formulario**: https://colsubsidio.az1.qualtrics.com/jfe/form/SV_dhz8RuGCTqJm1Ui
-    
-    **Retorna**: Un objeto con el task_id que puede usarse para consultar el estado
-    de la tarea en el endpoint /api/forms/task/{task_id}
+    Returns:
+        tuple: (task_id, duplicado)
+    """
+    opciones = {'queue': nombre_cola(prioridad, form_type)} if prioridad else {}
+    clave = clave_idempotencia(form_type, datos, idempotency_key, por_contenido) if idempotencia_activa() else None
+    if clave is None:
+        return execute_form_task.apply_async((form_type, datos), **opciones).id, False
+
+    task_id = str(uuid.uuid4())
+    original = reservar(form_type, clave, task_id)
+    if original is not None:
+        return original, True
+
+    try:
+        execute_form_task.apply_async((form_type, datos), {'idempotency_key': clave}, task_id=task_id, **opciones)
+    except Exception:
+        liberar(form_type, clave, task_id)
+        raise
+    return task_id, False
+
+
+def _encolar_pestanas(form_type, lista_datos, idempotency_key=None, prioridad=None, por_contenido=False):
+    """
+    Encola una lista de formularios en pestañas una sola vez por clave de idempotencia
+
+    Como `_encolar_formulario`, pero la clave cubre toda la lista. Antes de
+    encolar se crea el lote con un formulario pendiente por elemento; su
+    batch_id es el task_id de la tarea.
+
+    Returns:
+        tuple: (task_id, duplicado)
     """
+    opciones = {'queue': nombre_cola(prioridad, form_type)} if prioridad else {}
+    clave = None
+    if idempotencia_activa():
+        # Otro prefijo: la misma cabecera en el endpoint individual no choca con la lista
+        clave = clave_idempotencia(f"{form_type}:tabs", {'items': lista_datos}, idempotency_key, por_contenido)
+
+    task_id = str(uuid.uuid4())
+    if clave is not None:
+        original = reservar(form_type, clave, task_id)
+        if original is not None:
+            return original, True
+
+    try:
+        registrar_lote(task_id, len(lista_datos))
+        execute_form_tabs_task.apply_async((form_type, lista_datos), {'batch_id': task_id, 'idempotency_key': clave},
+                                           task_id=task_id, **opciones)
+    except Exception:
+        if clave is not None:
+            liberar(form_type, clave, task_id)
+        raise
+    return task_id, False
+
+
+async def _respuesta_encolado(form_type, numero, request, idempotency_key, prioridad, por_contenido):
+    """Encola el formulario validado y arma la respuesta común de los endpoints form1–form4"""
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_LONGITUD_CLAVE:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key debe tener entre 1 y {MAX_LONGITUD_CLAVE} caracteres")
     try:
         # Convertir el modelo Pydantic a diccionario
         datos = request.model_dump()
 
         # Ejecutar el formulario en Celery
-        task = execute_form_task.delay('form1', datos)
+        task_id, duplicado = await run_in_threadpool(_encolar_formulario, form_type, datos, idempotency_key, prioridad,
+                                                   por_contenido)
 
+        if duplicado:
+            mensaje = f"Formulario {numero} ya encolado con la misma clave de idempotencia. Se retorna la tarea original."
+        else:
+            mensaje = f"Formulario {numero} encolado exitosamente. Use el task_id para consultar el estado."
         return FormResponse(
             success=True,
-            message="Formulario 1 encolado exitosamente. Use el task_id para consultar el estado.",
-            form_type="form1",
-            task_id=task.id
+            message=mensaje,
+            form_type=form_type,
+            task_id=task_id,
+            duplicate=duplicado
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error procesando formulario: {str(e)}")
 
 
+@router.post("/form1", response_model=FormResponse)
+async def llenar_formulario_1(
+    request: Form1Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    priority: Prioridad = Query(None, description="Cola: 'interactive' (default) o 'bulk'"),
+    dedupe_by_content: bool = Query(False, description="Sin Idempotency-Key, deduplicar por el contenido")
+):
+    """
+    Llena el Formulario 1 - Evaluación Preescolar Integrales v1
+
+    **Descripción**: Este endpoint recibe los datos del formulario 1 y ejecuta
+    el proceso de llenado automático usando Selenium.
+
+    **URL del formulario**: https://colsubsidio.az1.qualtrics.com/jfe/form/SV_dhz8RuGCTqJm1Ui
+    
+    **Retorna**: Un objeto con el task_id que puede usarse para consultar el estado
+    de la tarea en el endpoint /api/forms/task/{task_id}
+
+    **Idempotencia**: Un reenvío con la misma cabecera `Idempotency-Key` (o,
+    sin ella y con `?dedupe_by_content=true`, con los mismos datos) retorna
+    el task_id original con `duplicate: true` sin encolar de nuevo.
+
+    **Prioridad**: `?priority=bulk` lo encola detrás de los envíos interactivos.
+    """
+    return await _respuesta_encolado('form1', 1, request, idempotency_key, priority, dedupe_by_content)
+
+
 @router.post("/form2", response_model=FormResponse)
-async def llenar_formulario_2(request: Form2Request):
+async def llenar_formulario_2(
+    request: Form2Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    priority: Prioridad = Query(None, description="Cola: 'interactive' (default) o 'bulk'"),
+    dedupe_by_content: bool = Query(False, description="Sin Idempotency-Key, deduplicar por el contenido")
+):
     """
     Llena el Formulario 2 - Evaluación Preescolar Integrales v2
 
@@ -62,26 +189,23 @@ async def llenar_formulario_2(request: Form2Request):
     
     **Retorna**: Un objeto con el task_id que puede usarse para consultar el estado
     de la tarea en el endpoint /api/forms/task/{task_id}
-    """
-    try:
-        # Convertir el modelo Pydantic a diccionario
-        datos = request.model_dump()
 
-        # Ejecutar el formulario en Celery
-        task = execute_form_task.delay('form2', datos)
+    **Idempotencia**: Un reenvío con la misma cabecera `Idempotency-Key` (o,
+    sin ella y con `?dedupe_by_content=true`, con los mismos datos) retorna
+    el task_id original con `duplicate: true` sin encolar de nuevo.
 
-        return FormResponse(
-            success=True,
-            message="Formulario 2 encolado exitosamente. Use el task_id para consultar el estado.",
-            form_type="form2",
-            task_id=task.id
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error procesando formulario: {str(e)}")
+    **Prioridad**: `?priority=bulk` lo encola detrás de los envíos interactivos.
+    """
+    return await _respuesta_encolado('form2', 2, request, idempotency_key, priority, dedupe_by_content)
 
 
 @router.post("/form3", response_model=FormResponse)
-async def llenar_formulario_3(request: Form3Request):
+async def llenar_formulario_3(
+    request: Form3Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    priority: Prioridad = Query(None, description="Cola: 'interactive' (default) o 'bulk'"),
+    dedupe_by_content: bool = Query(False, description="Sin Idempotency-Key, deduplicar por el contenido")
+):
     """
     Llena el Formulario 3 - Evaluación Preescolar Integrales v3
 
@@ -92,26 +216,23 @@ async def llenar_formulario_3(request: Form3Request):
     
     **Retorna**: Un objeto con el task_id que puede usarse para consultar el estado
     de la tarea en el endpoint /api/forms/task/{task_id}
-    """
-    try:
-        # Convertir el modelo Pydantic a diccionario
-        datos = request.model_dump()
 
-        # Ejecutar el formulario en Celery
-        task = execute_form_task.delay('form3', datos)
+    **Idempotencia**: Un reenvío con la misma cabecera `Idempotency-Key` (o,
+    sin ella y con `?dedupe_by_content=true`, con los mismos datos) retorna
+    el task_id original con `duplicate: true` sin encolar de nuevo.
 
-        return FormResponse(
-            success=True,
-            message="Formulario 3 encolado exitosamente. Use el task_id para consultar el estado.",
-            form_type="form3",
-            task_id=task.id
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error procesando formulario: {str(e)}")
+    **Prioridad**: `?priority=bulk` lo encola detrás de los envíos interactivos.
+    """
+    return await _respuesta_encolado('form3', 3, request, idempotency_key, priority, dedupe_by_content)
 
 
 @router.post("/form4", response_model=FormResponse)
-async def llenar_formulario_4(request: Form4Request):
+async def llenar_formulario_4(
+    request: Form4Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    priority: Prioridad = Query(None, description="Cola: 'interactive' (default) o 'bulk'"),
+    dedupe_by_content: bool = Query(False, description="Sin Idempotency-Key, deduplicar por el contenido")
+):
     """
     Llena el Formulario 4 - Evaluación Preescolar Integrales v4
 
@@ -122,22 +243,281 @@ async def llenar_formulario_4(request: Form4Request):
     
     **Retorna**: Un objeto con el task_id que puede usarse para consultar el estado
     de la tarea en el endpoint /api/forms/task/{task_id}
+
+    **Idempotencia**: Un reenvío con la misma cabecera `Idempotency-Key` (o,
+    sin ella y con `?dedupe_by_content=true`, con los mismos datos) retorna
+    el task_id original con `duplicate: true` sin encolar de nuevo.
+
+    **Prioridad**: `?priority=bulk` lo encola detrás de los envíos interactivos.
+    """
+    return await _respuesta_encolado('form4', 4, request, idempotency_key, priority, dedupe_by_content)
+
+
+@router.post("/batch", response_model=BatchResponse)
+async def llenar_formularios_lote(
+    request: Request,
+    priority: Prioridad = Query(None, description="Cola: 'bulk' (default) o 'interactive'")
+):
+    """
+    Encola un lote de formularios de distintos tipos en una sola petición
+
+    **Descripción**: Recibe una lista de formularios form1–form4, cada uno con la
+    forma `{"form_type": "form2", "data": {...}}`, donde `data` tiene la misma
+    estructura que el endpoint individual del formulario.
+
+    **Formatos aceptados**:
+    - `application/json`: arreglo JSON de elementos
+    - `application/x-ndjson`: un elemento por línea (se procesa en streaming)
+
+    Cada elemento se valida por separado: los inválidos se reportan con sus
+    errores en `items` sin rechazar el resto del lote.
+
+    Un lote con más de BATCH_MAX_ITEMS elementos se rechaza entero con 413,
+    sin encolar ninguno.
+
+    Los elementos van a la cola 'bulk' salvo que se pida `?priority=interactive`.
+
+    **Retorna**: El batch_id del lote y el task_id de cada elemento encolado
     """
+    encolador = EncoladorLote(prioridad=priority)
+    tipo = request.headers.get('content-type', '').split(';')[0].strip().lower()
+
     try:
-        # Convertir el modelo Pydantic a diccionario
-        datos = request.model_dump()
+        if tipo in TIPOS_NDJSON:
+            indice = 0
+            async for crudo in elementos_ndjson(request.stream()):
+                await run_in_threadpool(encolador.agregar, indice, crudo)
+                indice += 1
+        else:
+            elementos = elementos_json(await request.body())
+            encolador.verificar_tamano(len(elementos))
+            for indice, crudo in enumerate(elementos):
+                await run_in_threadpool(encolador.agregar, indice, crudo)
 
-        # Ejecutar el formulario en Celery
-        task = execute_form_task.delay('form4', datos)
+        await run_in_threadpool(encolador.cerrar)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except LoteDemasiadoGrande as e:
+        raise HTTPException(status_code=413, detail=f"{e}. No se encoló ningún elemento del lote")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error procesando lote: {str(e)}")
 
-        return FormResponse(
-            success=True,
-            message="Formulario 4 encolado exitosamente. Use el task_id para consultar el estado.",
-            form_type="form4",
-            task_id=task.id
-        )
+    return BatchResponse(
+        success=encolador.rechazados == 0,
+        message=f"Lote encolado: {encolador.aceptados} formularios aceptados, {encolador.rechazados} rechazados.",
+        batch_id=encolador.batch_id,
+        total=encolador.total,
+        accepted=encolador.aceptados,
+        rejected=encolador.rechazados,
+        items=encolador.resultados
+    )
+
+
+@router.post("/tabs", response_model=TabsResponse)
+async def llenar_formularios_pestanas(
+    request: TabsRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    priority: Prioridad = Query(None, description="Cola: 'bulk' (default) o 'interactive'"),
+    dedupe_by_content: bool = Query(False, description="Sin Idempotency-Key, deduplicar por el contenido")
+):
+    """
+    Llena varios formularios de un mismo tipo en pestañas de un solo navegador
+
+    **Descripción**: Recibe `{"form_type": "form2", "items": [{...}, {...}]}`,
+    donde cada elemento de `items` tiene la misma estructura que el endpoint
+    individual del formulario. Todos se llenan en una sola tarea
+    (`execute_form_tabs_task`), intercalados en las pestañas de un navegador.
+
+    Todos los elementos se validan antes de encolar: si alguno es inválido se
+    rechaza la lista entera (422) con los errores de cada uno.
+
+    **Retorna**: El task_id de la tarea (su resultado trae el de cada
+    formulario) y el batch_id, con el progreso de cada formulario en
+    /api/forms/batch/{batch_id}.
+
+    **Idempotencia**: Un reenvío con la misma `Idempotency-Key` (o, con
+    `?dedupe_by_content=true`, con la misma lista) retorna la tarea original
+    con `duplicate: true`. En una entrega repetida por el broker, los
+    formularios ya enviados no se repiten.
+    """
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_LONGITUD_CLAVE:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key debe tener entre 1 y {MAX_LONGITUD_CLAVE} caracteres")
+    if len(request.items) > MAX_ELEMENTOS:
+        raise HTTPException(status_code=413, detail=f"La lista supera el máximo de {MAX_ELEMENTOS} formularios")
+
+    validados = [validar_elemento(indice, {'form_type': request.form_type, 'data': datos})
+                 for indice, datos in enumerate(request.items)]
+    rechazados = [resultado.model_dump() for resultado, datos in validados if datos is None]
+    if rechazados:
+        raise HTTPException(status_code=422, detail=rechazados)
+
+    try:
+        task_id, duplicado = await run_in_threadpool(_encolar_pestanas, request.form_type,
+                                                   [datos for _, datos in validados], idempotency_key, priority,
+                                                   dedupe_by_content)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error procesando formulario: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error procesando formularios: {str(e)}")
+
+    if duplicado:
+        mensaje = "Formularios ya encolados con la misma clave de idempotencia. Se retorna la tarea original."
+    else:
+        mensaje = f"{len(validados)} formularios {request.form_type} encolados en pestañas. Use el task_id para consultar el estado."
+    return TabsResponse(
+        success=True,
+        message=mensaje,
+        form_type=request.form_type,
+        task_id=task_id,
+        batch_id=task_id,
+        total=len(validados),
+        duplicate=duplicado
+    )
+
+
+def _respuesta_estado_lote(estado, failures_offset, failures_limit):
+    """Convierte el estado de `estado_lote` en la respuesta pública del lote"""
+    contadores = estado['contadores']
+    return BatchStatusResponse(
+        batch_id=estado['batch_id'],
+        total=estado['total'],
+        accepted=estado['aceptados'],
+        rejected=estado['rechazados'],
+        counters=BatchCounters(
+            pending=contadores['pendientes'],
+            started=contadores['en_curso'],
+            retrying=contadores['reintentando'],
+            success=contadores['exitosos'],
+            failed=contadores['fallidos']
+        ),
+        completed=estado['completado'],
+        created_at=estado['creado'],
+        started_at=estado['iniciado'],
+        updated_at=estado['actualizado'],
+        throughput_per_minute=estado['por_minuto'],
+        eta_seconds=estado['eta_segundos'],
+        failures_total=estado['total_fallos'],
+        failures_offset=failures_offset,
+        failures_limit=failures_limit,
+        failures=estado['fallos']
+    )
+
+
+@router.get("/batch/{batch_id}", response_model=BatchStatusResponse)
+async def get_batch_status(
+    batch_id: str,
+    failures_offset: int = Query(0, ge=0, description="Primer fallo a retornar"),
+    failures_limit: int = Query(50, ge=1, le=500, description="Fallos por página")
+):
+    """
+    Consulta el estado agregado de un lote
+
+    **Descripción**: Retorna los contadores del lote (pending, started,
+    retrying, success, failed), el rendimiento en formularios por minuto, el
+    tiempo estimado para terminar y una página de los formularios fallidos.
+
+    Los contadores los actualiza cada tarea al cambiar de estado, así que la
+    consulta cuesta lo mismo para un lote de 10 que de 10.000 formularios.
+    """
+    try:
+        estado = await run_in_threadpool(estado_lote, batch_id, failures_offset, failures_limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error consultando lote: {str(e)}")
+
+    if estado is None:
+        raise HTTPException(status_code=404, detail=f"Lote no encontrado o expirado: {batch_id}")
+
+    return _respuesta_estado_lote(estado, failures_offset, failures_limit)
+
+
+@router.websocket("/batch/{batch_id}/ws")
+async def batch_events_ws(websocket: WebSocket, batch_id: str):
+    """
+    Canal WebSocket con los cambios de estado de todas las tareas de un lote
+
+    Al conectarse se envía el estado agregado del lote (`event: SNAPSHOT`, con
+    la misma forma que `GET /api/forms/batch/{batch_id}`). Luego se reenvía
+    cada evento de las tareas (STARTED, PROGRESS, PAGE_COMPLETED, RETRY,
+    SUCCESS, FAILURE). Cuando el lote termina se envía un último SNAPSHOT y se
+    cierra la conexión.
+    """
+    await websocket.accept()
+    suscripcion = suscribir(canal_lote(batch_id))
+
+    async def enviar_estado():
+        estado = await run_in_threadpool(estado_lote, batch_id)
+        if estado is None:
+            await websocket.send_json({'event': 'NOT_FOUND', 'batch_id': batch_id})
+            return True
+        respuesta = _respuesta_estado_lote(estado, 0, 50)
+        await websocket.send_json({'event': 'SNAPSHOT', **respuesta.model_dump()})
+        return respuesta.completed
+
+    try:
+        # Suscritos antes de leer el estado actual, para no perder eventos
+        await suscripcion.__anext__()
+        if await enviar_estado():
+            return
+
+        async for evento in suscripcion:
+            if evento is None:
+                await websocket.send_json({'event': 'HEARTBEAT', 'batch_id': batch_id})
+                continue
+            await websocket.send_json(evento)
+            if evento['event'] in EVENTOS_FINALES and await enviar_estado():
+                return
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await suscripcion.aclose()
+        try:
+            await websocket.close()
+        except RuntimeError:
+            # El cliente ya cerró la conexión
+            pass
+
+
+@router.get("/task/{task_id}/events")
+async def stream_task_events(task_id: str, request: Request):
+    """
+    Stream de Server-Sent Events con los cambios de estado de una tarea
+
+    **Descripción**: Envía primero el estado actual de la tarea y luego cada
+    evento publicado por el worker (STARTED, PROGRESS, PAGE_COMPLETED, RETRY,
+    SUCCESS, FAILURE). El stream se cierra tras SUCCESS o FAILURE.
+
+    Reemplaza el sondeo periódico de `/api/forms/task/{task_id}`: el cliente
+    se suscribe una sola vez.
+    """
+    async def eventos():
+        suscripcion = suscribir(canal_tarea(task_id))
+        try:
+            # Suscritos antes de leer el estado actual, para no perder eventos
+            await suscripcion.__anext__()
+
+            actual = await ultimo_evento(task_id)
+            if actual is None:
+                estado = await run_in_threadpool(lambda: celery_app.AsyncResult(task_id).status)
+                actual = {'task_id': task_id, 'event': estado}
+            yield formato_sse(actual)
+            if actual['event'] in EVENTOS_FINALES:
+                return
+
+            async for evento in suscripcion:
+                if await request.is_disconnected():
+                    return
+                if evento is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield formato_sse(evento)
+                if evento['event'] in EVENTOS_FINALES:
+                    return
+        finally:
+            await suscripcion.aclose()
+
+    return StreamingResponse(
+        eventos(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/task/{task_id}", response_model=TaskStatusResponse)
@@ -191,7 +571,11 @@ async def health_check():
                 "/api/forms/form2",
                 "/api/forms/form3",
                 "/api/forms/form4",
-                "/api/forms/task/{task_id}"
+                "/api/forms/batch",
+                "/api/forms/batch/{batch_id}",
+                "/api/forms/batch/{batch_id}/ws",
+                "/api/forms/task/{task_id}",
+                "/api/forms/task/{task_id}/events"
             ]
         }
     except Exception as e:
@@ -204,7 +588,11 @@ async def health_check():
                 "/api/forms/form2",
                 "/api/forms/form3",
                 "/api/forms/form4",
-                "/api/forms/task/{task_id}"
+                "/api/forms/batch",
+                "/api/forms/batch/{batch_id}",
+                "/api/forms/batch/{batch_id}/ws",
+                "/api/forms/task/{task_id}",
+                "/api/forms/task/{task_id}/events"
             ]
         }
 
@@ -0,0 +1,506 @@
+"""
+Encuesta simulada: servidor local que reemplaza a Qualtrics en pruebas y benchmarks
+
+Sirve cada formulario registrado en app/form_specs con el mismo DOM que
+esperan los fillers: los ids de Qualtrics (`QR~QID57`, `QR~QID27#1~3~10`,
+`QR~QID65~7`), las preguntas de escala y Si/No en la posición que indican
+sus XPaths absolutos, el botón `#NextButton` en la posición de
+`XPATH_BOTON_INICIAL` / `XPATH_BOTON_SIGUIENTE` y contenedores
+`.QuestionOuter`. Las secciones condicionales de la especificación (`'si'`)
+se ocultan y muestran con display logic en el navegador y se vuelven a
+evaluar en el servidor: las respuestas de preguntas ocultas se descartan,
+igual que en Qualtrics, y una página con matrices visibles sin responder se
+rechaza (se vuelve a mostrar con un error).
+
+Rutas:
+    GET  /jfe/form/{SV}           Inicia una sesión y muestra la página 1
+    POST /jfe/form/{SV}/next      Envía la página actual
+    GET  /__stub__/respuestas     Formularios completados (JSON)
+    DELETE /__stub__/respuestas   Borra los formularios registrados
+
+Cada formulario completado se registra con sus respuestas por página, con
+las mismas claves de la especificación (p. ej. `{'recomendacion': 9,
+'proceso_aprendizaje': [10, 9, 10, 10]}`), para comparar con los datos
+enviados.
+
+Uso:
+    with EncuestaSimulada(latencia_ms=200, jitter_ms=50) as encuesta:
+        os.environ['FORM_BASE_URL'] = encuesta.url_base
+        ...
+        encuesta.respuestas
+
+Configuración por variables de entorno (run_stub.py):
+    STUB_HOST: Interfaz de escucha (default 127.0.0.1)
+    STUB_PORT: Puerto (default 8090)
+    STUB_LATENCY_MS: Latencia media de cada respuesta (default 0)
+    STUB_JITTER_MS: Variación uniforme ± sobre la latencia (default 0)
+"""
+
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from html import escape
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from app.form_engine import VALORES_ESCALA
+from app.form_specs import FORM_SPECS
+
+
+HOST_SIMULADA = os.getenv('STUB_HOST', '127.0.0.1')
+PUERTO_SIMULADA = int(os.getenv('STUB_PORT', '8090'))
+LATENCIA_MS = float(os.getenv('STUB_LATENCY_MS', '0'))
+JITTER_MS = float(os.getenv('STUB_JITTER_MS', '0'))
+
+COOKIE_SESION = 'QSIStubSession'
+RUTA_RESPUESTAS = '/__stub__/respuestas'
+
+# Display logic en el navegador: misma semántica que `_cumple`
+SCRIPT_LOGICA_VISUALIZACION = """
+(function () {
+    function valores() {
+        var v = {};
+        document.querySelectorAll('[data-clave]').forEach(function (el) {
+            if ((el.type === 'radio' || el.type === 'checkbox') && !el.checked) { return; }
+            if (el.type === 'text' && el.value === '') { return; }
+            v[el.dataset.clave] = el.dataset.valor !== undefined ? el.dataset.valor : el.value;
+        });
+        return v;
+    }
+    function cumple(si, v) {
+        if ('presente' in si) { return true; }
+        if (!(si.campo in v)) { return false; }
+        var x = v[si.campo];
+        if ('igual' in si) { return String(x).toLowerCase() === String(si.igual).toLowerCase(); }
+        if ('no_en' in si) { return si.no_en.indexOf(Number(x)) < 0; }
+        if ('hasta' in si) { return Number(x) <= si.hasta; }
+        return true;
+    }
+    function aplicar() {
+        var v = valores();
+        document.querySelectorAll('[data-si]').forEach(function (q) {
+            q.style.display = cumple(JSON.parse(q.dataset.si), v) ? '' : 'none';
+        });
+    }
+    document.addEventListener('change', aplicar);
+    document.addEventListener('input', aplicar);
+    aplicar();
+})();
+"""
+
+
+def _cumple(si, respuestas):
+    """
+    Evalúa la display logic de un campo sobre las respuestas de su página
+
+    Las condiciones 'presente' dependen de los datos enviados, no de la
+    encuesta: esos campos siempre se muestran.
+    """
+    if si is None or 'presente' in si:
+        return True
+    if si['campo'] not in respuestas:
+        return False
+    valor = respuestas[si['campo']]
+    if 'igual' in si:
+        return str(valor).lower() == str(si['igual']).lower()
+    if 'no_en' in si:
+        return valor not in si['no_en']
+    if 'hasta' in si:
+        return valor <= si['hasta']
+    return True
+
+
+def _opcion(input_id, nombre, valor, tipo, texto, clave=None, dato=None):
+    """Label + input como los renderiza Qualtrics (el XPath apunta al label)"""
+    datos = ''
+    if clave is not None:
+        datos = f' data-clave="{escape(clave)}" data-valor="{escape(str(dato))}"'
+    return (f'<span><label for="{escape(input_id)}">{escape(str(texto))}</label>'
+            f'<input type="{tipo}" id="{escape(input_id)}" name="{escape(nombre)}" '
+            f'value="{escape(str(valor))}"{datos}></span>')
+
+
+class _PreguntaSimulada:
+    """Un campo de la especificación: su HTML y cómo leer su respuesta del POST"""
+
+    def __init__(self, campo, secciones, pagina):
+        self.tipo = campo['tipo']
+        self.si = campo.get('si')
+        self.pregunta = campo.get('pregunta')
+
+        if self.tipo == 'matriz':
+            self.clave = campo['seccion']
+            config = secciones[self.clave]
+            self.contenedor = f"QID{config['QID']}"
+            self.filas = [(choice_id, f"QR~QID{config['QID']}#{config['question_id']}~{choice_id}")
+                          for choice_id in config['choice_ids']]
+        elif self.tipo == 'texto':
+            self.clave = campo['clave']
+            self.id = campo['id']
+            self.contenedor = self.id.split('~')[1]
+        elif self.tipo == 'checkboxes':
+            self.clave = campo['clave']
+            self.contenedor = f"QID{campo['qid']}"
+            self.opciones = [(texto, f"QR~QID{campo['qid']}~{choice_id}") for texto, choice_id in campo['opciones'].items()]
+        else:
+            # Escala y Si/No: su QID si la especificación lo declara; si no,
+            # sólo se ubican por posición y llevan un QID sintético de la página
+            self.clave = campo['clave']
+            self.contenedor = f"QID{campo['qid']}" if 'qid' in campo else f"QIDP{pagina}_{self.pregunta}"
+            self.desplazamiento = campo.get('desplazamiento', 1)
+
+    @property
+    def nombre(self):
+        """name del input de las preguntas de una sola respuesta"""
+        return f"QR~{self.contenedor}"
+
+    def cuerpo(self):
+        """Contenido de `div[3]/div/fieldset/div` del contenedor de la pregunta"""
+        if self.tipo == 'texto':
+            return (f'<input type="text" id="{escape(self.id)}" name="{escape(self.id)}" '
+                    f'data-clave="{escape(self.clave)}">')
+
+        if self.tipo == 'escala':
+            columnas = [v + self.desplazamiento for v in VALORES_ESCALA if v + self.desplazamiento >= 1]
+            celdas = ''.join(
+                f'<td>{_opcion(f"{self.nombre}~{c}", self.nombre, c, "radio", c - self.desplazamiento, self.clave, c - self.desplazamiento)}</td>'
+                for c in columnas
+            )
+            return f'<table><tbody><tr>{"<th></th>" * len(columnas)}</tr><tr>{celdas}</tr></tbody></table>'
+
+        if self.tipo == 'si_no':
+            celdas = ''.join(
+                f'<td>{_opcion(f"{self.nombre}~{c}", self.nombre, c, "radio", texto, self.clave, texto)}</td>'
+                for c, texto in ((1, 'Si'), (2, 'No'))
+            )
+            return f'<table><tbody><tr>{celdas}</tr></tbody></table>'
+
+        if self.tipo == 'matriz':
+            filas = ''.join(
+                f'<tr><th>{escape(str(choice_id))}</th>'
+                + ''.join(f'<td>{_opcion(f"{nombre}~{v}", nombre, v, "radio", v)}</td>' for v in VALORES_ESCALA)
+                + '</tr>'
+                for choice_id, nombre in self.filas
+            )
+            return f'<table><tbody>{filas}</tbody></table>'
+
+        # checkboxes
+        return ''.join(_opcion(nombre, nombre, '1', 'checkbox', texto) for texto, nombre in self.opciones)
+
+    def html(self):
+        """Contenedor `.QuestionOuter`; las preguntas condicionales empiezan ocultas"""
+        logica = ''
+        if self.si is not None and 'presente' not in self.si:
+            logica = f' data-si="{escape(json.dumps(self.si))}" style="display:none"'
+        return (f'<div class="QuestionOuter" id="{escape(self.contenedor)}"{logica}>'
+                f'<div class="QuestionText"></div><div></div>'
+                f'<div class="QuestionBody"><div><fieldset><div>{self.cuerpo()}</div></fieldset></div></div>'
+                f'</div>')
+
+    def leer(self, formulario):
+        """Respuesta enviada para el campo, o None si no se respondió"""
+        if self.tipo == 'texto':
+            return formulario.get(self.id) or None
+        if self.tipo == 'escala':
+            valor = formulario.get(self.nombre)
+            return int(valor) - self.desplazamiento if valor else None
+        if self.tipo == 'si_no':
+            return {'1': 'Si', '2': 'No'}.get(formulario.get(self.nombre))
+        if self.tipo == 'matriz':
+            valores = [formulario.get(nombre) for _, nombre in self.filas]
+            return [int(v) if v else None for v in valores]
+        marcadas = [texto for texto, nombre in self.opciones if nombre in formulario]
+        return marcadas or None
+
+
+class _PaginaSimulada:
+    """Página de la encuesta: preguntas en sus posiciones y validación del envío"""
+
+    def __init__(self, pagina, secciones, accion):
+        self.numero = pagina['numero']
+        self.primera = self.numero == 1
+        self.accion = accion
+        self.preguntas = [_PreguntaSimulada(c, secciones, self.numero) for c in pagina['campos']]
+
+        # Escalas y Si/No van en el div[{pregunta}] de su XPath; el resto llena los huecos
+        posiciones = {p.pregunta: p for p in self.preguntas if p.pregunta is not None}
+        libres = (i for i in range(1, len(self.preguntas) + len(posiciones) + 1) if i not in posiciones)
+        for pregunta in self.preguntas:
+            if pregunta.pregunta is None:
+                posiciones[next(libres)] = pregunta
+        # Las preguntas no cambian entre sesiones: se renderizan una vez
+        self.preguntas_html = ''.join(
+            posiciones[i].html() if i in posiciones
+            else '<div class="QuestionOuter DB"><div></div><div></div><div></div></div>'
+            for i in range(1, max(posiciones) + 1)
+        )
+
+    def html(self, sesion_id, error=None):
+        # Primera página: sólo Siguiente (input); las demás: Atrás y Siguiente (input[2])
+        atras = '' if self.primera else '<input type="button" id="PreviousButton" value="←">'
+        aviso = f'<div class="ValidationError">{escape(error)}</div>' if error else '<div></div>'
+        return (
+            '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Encuesta simulada</title></head><body>'
+            '<div id="SkinContent"></div><div id="Overlay"></div>'
+            f'<div id="SurveyEngineBody"><div><form id="Page" method="post" action="{escape(self.accion)}">'
+            f'<input type="hidden" name="SessionId" value="{escape(sesion_id)}">'
+            f'<input type="hidden" name="PageNumber" value="{self.numero}">'
+            '<div><div id="Header"></div><div><div>'
+            f'{aviso}<div></div>'
+            f'<div><div id="Questions">{self.preguntas_html}</div>'
+            f'<div id="Buttons">{atras}<input type="submit" id="NextButton" value="→"></div></div>'
+            '</div></div></div></form></div></div>'
+            f'<script>{SCRIPT_LOGICA_VISUALIZACION}</script></body></html>'
+        )
+
+    def leer(self, formulario):
+        """
+        Respuestas de la página según la display logic
+
+        Returns:
+            tuple: (respuestas por clave, error de validación o None)
+        """
+        respuestas = {}
+        for pregunta in self.preguntas:
+            if pregunta.si is None or 'presente' in pregunta.si:
+                valor = pregunta.leer(formulario)
+                if valor is not None:
+                    respuestas[pregunta.clave] = valor
+
+        for pregunta in self.preguntas:
+            if pregunta.si is not None and 'presente' not in pregunta.si and _cumple(pregunta.si, respuestas):
+                valor = pregunta.leer(formulario)
+                if valor is not None:
+                    respuestas[pregunta.clave] = valor
+
+        for pregunta in self.preguntas:
+            if pregunta.tipo != 'matriz' or not _cumple(pregunta.si, respuestas):
+                continue
+            if None in respuestas.get(pregunta.clave, [None]):
+                return respuestas, f"Responda todas las filas de '{pregunta.clave}'"
+        return respuestas, None
+
+
+class _FormularioSimulado:
+    """Páginas de un formulario registrado, servidas en la ruta de su URL"""
+
+    def __init__(self, spec):
+        self.form_type = spec['form_type']
+        self.ruta = urlsplit(spec['url']).path.rstrip('/')
+        accion = f"{self.ruta}/next"
+        self.paginas = [_PaginaSimulada(p, spec.get('secciones', {}), accion) for p in spec['paginas']]
+
+
+PAGINA_FIN = (
+    '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Encuesta simulada</title></head><body>'
+    '<div id="SurveyEngineBody"><div id="EndOfSurvey">Gracias por completar la encuesta.</div></div>'
+    '</body></html>'
+)
+
+
+class EncuestaSimulada:
+    """
+    Servidor HTTP local con los formularios registrados
+
+    Atiende cada petición en un hilo. Las sesiones y los formularios
+    completados viven en memoria.
+    """
+
+    def __init__(self, latencia_ms=None, jitter_ms=None, host=None, puerto=0, specs=None, semilla=None):
+        """
+        Args:
+            latencia_ms (float): Latencia media por respuesta. Si es None, STUB_LATENCY_MS
+            jitter_ms (float): Variación uniforme ± de la latencia. Si es None, STUB_JITTER_MS
+            host (str): Interfaz de escucha. Si es None, STUB_HOST
+            puerto (int): Puerto; 0 elige uno libre
+            specs (dict): Especificaciones por form_type. Si es None, FORM_SPECS
+            semilla (int): Semilla del jitter, para corridas reproducibles
+        """
+        self.latencia_ms = LATENCIA_MS if latencia_ms is None else latencia_ms
+        self.jitter_ms = JITTER_MS if jitter_ms is None else jitter_ms
+        self.host = HOST_SIMULADA if host is None else host
+        self.puerto = puerto
+        self.formularios = {f.ruta: f for f in map(_FormularioSimulado, (FORM_SPECS if specs is None else specs).values())}
+        self.respuestas = []
+        self._sesiones = {}
+        self._lock = threading.Lock()
+        self._azar = random.Random(semilla)
+        self._servidor = None
+        self._hilo = None
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    @property
+    def url_base(self):
+        """URL del servidor, para FORM_BASE_URL"""
+        return f"http://{self.host}:{self.puerto}"
+
+    def url(self, form_type):
+        """URL de la encuesta de un formulario"""
+        ruta = next(f.ruta for f in self.formularios.values() if f.form_type == form_type)
+        return f"{self.url_base}{ruta}"
+
+    def _crear_servidor(self):
+        self._servidor = ThreadingHTTPServer((self.host, self.puerto), _ManejadorEncuesta)
+        self._servidor.daemon_threads = True
+        self._servidor.encuesta = self
+        self.puerto = self._servidor.server_address[1]
+
+    def iniciar(self):
+        """Empieza a atender en un hilo de fondo y retorna la URL base"""
+        self._crear_servidor()
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, name='encuesta-simulada', daemon=True)
+        self._hilo.start()
+        return self.url_base
+
+    def atender(self):
+        """Atiende en el hilo actual hasta Ctrl+C (run_stub.py)"""
+        self._crear_servidor()
+        try:
+            self._servidor.serve_forever()
+        finally:
+            self._servidor.server_close()
+
+    def detener(self):
+        """Detiene el servidor iniciado con `iniciar`"""
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *exc):
+        self.detener()
+
+    def limpiar(self):
+        """Borra los formularios completados registrados"""
+        with self._lock:
+            self.respuestas.clear()
+
+    def esperar_latencia(self):
+        """Duerme la latencia configurada, con su jitter"""
+        with self._lock:
+            variacion = self._azar.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        retraso = max(0.0, self.latencia_ms + variacion) / 1000
+        if retraso:
+            time.sleep(retraso)
+
+    # ------------------------------------------------------------------
+    # Protocolo de la encuesta
+    # ------------------------------------------------------------------
+
+    def abrir(self, ruta):
+        """
+        Inicia una sesión
+
+        Returns:
+            tuple: (status, html, id de sesión) ; id None si la ruta no existe
+        """
+        formulario = self.formularios.get(ruta.rstrip('/'))
+        if formulario is None:
+            return 404, 'Encuesta no encontrada', None
+
+        sesion_id = f"FS_{uuid.uuid4().hex[:16]}"
+        with self._lock:
+            self._sesiones[sesion_id] = {
+                'formulario': formulario, 'pagina': 0, 'paginas': {}, 'inicio': time.time(),
+            }
+        return 200, formulario.paginas[0].html(sesion_id), sesion_id
+
+    def enviar(self, ruta, campos, cookie_sesion):
+        """
+        Procesa el envío de la página actual de una sesión
+
+        Returns:
+            tuple: (status, html)
+        """
+        sesion_id = campos.get('SessionId')
+        with self._lock:
+            sesion = self._sesiones.get(sesion_id)
+        if sesion is None or sesion_id != cookie_sesion or f"{sesion['formulario'].ruta}/next" != ruta:
+            return 400, 'Sesión inválida'
+
+        formulario = sesion['formulario']
+        pagina = formulario.paginas[sesion['pagina']]
+        if campos.get('PageNumber') != str(pagina.numero):
+            # Envío repetido o de una página anterior: se vuelve a mostrar la actual
+            return 200, pagina.html(sesion_id)
+
+        respuestas, error = pagina.leer(campos)
+        if error:
+            return 200, pagina.html(sesion_id, error)
+
+        sesion['paginas'][pagina.numero] = respuestas
+        sesion['pagina'] += 1
+        if sesion['pagina'] < len(formulario.paginas):
+            return 200, formulario.paginas[sesion['pagina']].html(sesion_id)
+
+        with self._lock:
+            self._sesiones.pop(sesion_id, None)
+            self.respuestas.append({
+                'form_type': formulario.form_type,
+                'sesion': sesion_id,
+                'paginas': sesion['paginas'],
+                'duracion': round(time.time() - sesion['inicio'], 3),
+            })
+        return 200, PAGINA_FIN
+
+
+class _ManejadorEncuesta(BaseHTTPRequestHandler):
+    """Peticiones HTTP de la encuesta simulada (keep-alive, como Qualtrics)"""
+
+    protocol_version = 'HTTP/1.1'
+
+    @property
+    def encuesta(self):
+        return self.server.encuesta
+
+    def _responder(self, status, cuerpo, tipo='text/html; charset=utf-8', cookie=None):
+        datos = cuerpo.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(datos)))
+        if cookie is not None:
+            self.send_header('Set-Cookie', f"{COOKIE_SESION}={cookie}; Path=/; HttpOnly")
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def _cookie_sesion(self):
+        galleta = SimpleCookie(self.headers.get('Cookie', ''))
+        return galleta[COOKIE_SESION].value if COOKIE_SESION in galleta else None
+
+    def do_GET(self):
+        ruta = urlsplit(self.path).path
+        if ruta == RUTA_RESPUESTAS:
+            self._responder(200, json.dumps(self.encuesta.respuestas), 'application/json')
+            return
+        self.encuesta.esperar_latencia()
+        status, html, sesion_id = self.encuesta.abrir(ruta)
+        self._responder(status, html, cookie=sesion_id)
+
+    def do_POST(self):
+        longitud = int(self.headers.get('Content-Length') or 0)
+        campos = dict(parse_qsl(self.rfile.read(longitud).decode('utf-8'), keep_blank_values=True))
+        self.encuesta.esperar_latencia()
+        status, html = self.encuesta.enviar(urlsplit(self.path).path, campos, self._cookie_sesion())
+        self._responder(status, html)
+
+    def do_DELETE(self):
+        if urlsplit(self.path).path != RUTA_RESPUESTAS:
+            self._responder(404, 'No encontrado')
+            return
+        self.encuesta.limpiar()
+        self._responder(200, '[]', 'application/json')
+
+    def log_message(self, formato, *args):
+        # Sin una línea por petición: en benchmarks serían miles
+        pass
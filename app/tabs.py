@@ -0,0 +1,281 @@
+"""
+Llenado intercalado de varios formularios en pestañas de un mismo navegador
+
+El proceso de Chrome es lo costoso de cada slot; las pestañas adicionales
+cuestan poco. Este módulo abre N pestañas en un driver y avanza un
+formulario en cada una de forma cooperativa. Cada filler expone su flujo
+como máquina de estados (`pasos()`), que cede una `Espera` en cada
+transición de página. Mientras Qualtrics procesa el Siguiente de una
+pestaña, el planificador atiende las demás.
+
+Cada pestaña es independiente: si su formulario falla se registra el error,
+la pestaña vuelve a about:blank y toma el siguiente formulario pendiente.
+El resultado de cada formulario se entrega a `al_terminar` apenas termina,
+así la tarea lo anota en el registro de envíos y en el progreso del lote
+sin esperar a los demás.
+
+Cada formulario toma su propio turno de la encuesta (app/rate_limit.py) al
+asignarse a una pestaña y lo suelta al terminar. Mientras otras pestañas
+avanzan, el turno sólo se intenta sin esperar y la pestaña queda libre hasta
+la siguiente ronda; sin pestañas activas se espera como una tarea normal y,
+si no llega a tiempo, los formularios pendientes fallan con `LimiteExcedido`.
+
+Configuración por variables de entorno:
+    DRIVER_TABS: Pestañas por navegador (default 4)
+"""
+
+import contextvars
+import os
+import time
+
+from app.logs import obtener_logger
+from app.rate_limit import INTERVALO_SONDEO, LimiteExcedido, Turno
+from app.request_filter import aplicar_bloqueo
+from app.retries import clasificar_error
+
+
+log = obtener_logger(__name__)
+
+
+PESTANAS_POR_DRIVER = int(os.getenv('DRIVER_TABS', '4'))
+
+# Pausa cuando ninguna pestaña pudo avanzar en una ronda completa
+INTERVALO_RONDA = 0.05
+
+
+class _Pestana:
+    """Estado de una pestaña: formulario asignado, paso actual y espera pendiente"""
+
+    __slots__ = ('handle', 'indice', 'filler', 'pasos', 'espera', 'inicio', 'contexto', 'respuestas', 'turno')
+
+    def __init__(self, handle):
+        self.handle = handle
+        self.indice = None
+        self.filler = None
+        self.pasos = None
+        self.espera = None
+        self.inicio = None
+        self.contexto = None
+        self.respuestas = None
+        self.turno = None
+
+    @property
+    def libre(self):
+        return self.pasos is None
+
+
+class EjecutorPestanas:
+    """
+    Planificador cooperativo de formularios sobre las pestañas de un driver
+
+    Uso:
+        resultados = EjecutorPestanas(driver, Form2Filler).ejecutar(lista_datos)
+    """
+
+    def __init__(self, driver, form_filler_class, pestanas=None, filler_kwargs=None, al_terminar=None):
+        """
+        Args:
+            driver (WebDriver): Navegador compartido por todas las pestañas
+            form_filler_class (type): Clase ColsubsidioFormFiller del formulario
+            pestanas (int): Pestañas simultáneas. Si es None se usa DRIVER_TABS
+            filler_kwargs (dict): Argumentos extra para el constructor del filler
+            al_terminar (callable): Recibe el resultado de cada formulario al terminar
+        """
+        self.driver = driver
+        self.form_filler_class = form_filler_class
+        self.pestanas = max(1, pestanas or PESTANAS_POR_DRIVER)
+        self.filler_kwargs = filler_kwargs or {}
+        self.al_terminar = al_terminar
+        # Sin FORM_TYPE (fillers de prueba) no hay encuesta que limitar
+        self.form_type = getattr(form_filler_class, 'FORM_TYPE', None)
+        self._proximo_turno = 0.0
+
+    def _abrir_pestanas(self, cantidad):
+        """Reutiliza la pestaña actual y abre las que falten"""
+        pestanas = [_Pestana(self.driver.current_window_handle)]
+        for _ in range(cantidad - 1):
+            self.driver.switch_to.new_window('tab')
+            # El bloqueo de peticiones de CDP es por pestaña
+            aplicar_bloqueo(self.driver)
+            pestanas.append(_Pestana(self.driver.current_window_handle))
+        return pestanas
+
+    def _cerrar_pestanas(self, pestanas):
+        """Cierra las pestañas extra y deja el driver en la primera"""
+        for pestana in pestanas[1:]:
+            self.driver.switch_to.window(pestana.handle)
+            self.driver.close()
+        self.driver.switch_to.window(pestanas[0].handle)
+
+    def _tomar_turno(self, esperar):
+        """
+        Turno de la encuesta para el siguiente formulario
+
+        Args:
+            esperar (bool): False si hay otras pestañas activas: sólo se
+                            intenta, como mucho cada INTERVALO_SONDEO
+
+        Returns:
+            Turno: Turno tomado, o None si no lo hubo sin esperar
+
+        Raises:
+            LimiteExcedido: Si esperando no hubo turno dentro de RATE_MAX_WAIT
+        """
+        if esperar:
+            return Turno(self.form_type).tomar()
+        if time.monotonic() < self._proximo_turno:
+            return None
+        try:
+            return Turno(self.form_type).tomar(espera_maxima=0)
+        except LimiteExcedido:
+            self._proximo_turno = time.monotonic() + INTERVALO_SONDEO
+            return None
+
+    def _asignar(self, pestana, indice, datos, turno):
+        """Crea el filler del formulario `indice` ligado a esta pestaña y a su turno"""
+        pestana.turno = turno
+        kwargs = self.filler_kwargs
+        if self.form_type is not None:
+            notificar = kwargs.get('notificar')
+
+            def notificar_pestana(evento, **datos):
+                turno.registrar(evento, **datos)
+                if notificar is not None:
+                    notificar(evento, **datos)
+
+            kwargs = {**kwargs, 'notificar': notificar_pestana}
+        filler = self.form_filler_class(driver=self.driver, **kwargs)
+        pestana.indice = indice
+        pestana.filler = filler
+        pestana.pasos = filler.pasos(datos)
+        pestana.respuestas = getattr(filler, 'respuestas', None)
+        pestana.espera = None
+        pestana.inicio = time.monotonic()
+        # Contexto de log propio: página y sección de una pestaña no se mezclan con las demás
+        pestana.contexto = contextvars.copy_context()
+
+    def _entregar(self, resultados, resultado):
+        """Guarda el resultado de un formulario y lo pasa a `al_terminar`"""
+        resultados[resultado['indice']] = resultado
+        if self.al_terminar is not None:
+            self.al_terminar(resultado)
+
+    def _terminar(self, pestana, resultados, error=None):
+        """
+        Registra el resultado del formulario de la pestaña y la deja libre
+
+        Un formulario enviado con campos sin responder (sin fallo rápido)
+        queda 'partial', como en `execute_form_task`.
+        """
+        resultado = {
+            'indice': pestana.indice,
+            'status': 'completed' if error is None else 'failed',
+            'duracion': round(time.monotonic() - pestana.inicio, 3),
+        }
+        if pestana.respuestas is not None:
+            resultado['answers'] = pestana.respuestas.como_dict()
+            if error is None and resultado['answers']['failed']:
+                resultado['status'] = 'partial'
+        if error is not None:
+            resultado['error'] = str(error)
+            resultado['error_type'] = clasificar_error(error)
+            log.error("✗ Pestaña %s: formulario %s falló: %s", pestana.handle[-6:], pestana.indice, error, exc_info=error)
+            # Una página a medio llenar no debe confundirse con la siguiente carga
+            try:
+                self.driver.get('about:blank')
+            except Exception:
+                pass
+        else:
+            log.info("✓ Pestaña %s: formulario %s completado", pestana.handle[-6:], pestana.indice)
+
+        pestana.filler = None
+        pestana.pasos = None
+        pestana.espera = None
+        pestana.turno.soltar(error)
+        pestana.turno = None
+        self._entregar(resultados, resultado)
+
+    def _sin_turno(self, pendientes, resultados, error):
+        """Marca como fallidos los formularios que no alcanzaron turno"""
+        log.error("✗ Sin turno de la encuesta: %s formularios pendientes fallan (%s)", len(pendientes), error)
+        fallidos, pendientes[:] = pendientes[:], []
+        for indice, _ in fallidos:
+            self._entregar(resultados, {'indice': indice, 'status': 'failed', 'duracion': 0.0, 'error': str(error),
+                                        'error_type': clasificar_error(error)})
+
+    def _avanzar(self, pestana, resultados):
+        """
+        Atiende una pestaña: sondea su espera y, si está lista, ejecuta su siguiente paso
+
+        Returns:
+            bool: True si la pestaña avanzó
+        """
+        try:
+            if pestana.espera is not None and not pestana.contexto.run(pestana.espera.sondear, self.driver):
+                return False
+            pestana.espera = pestana.contexto.run(next, pestana.pasos)
+        except StopIteration:
+            self._terminar(pestana, resultados)
+        except Exception as e:
+            # El filler decide si un fallo tras el envío final es un envío incierto
+            error_envio = getattr(pestana.filler, 'error_envio', None)
+            self._terminar(pestana, resultados, error=e if error_envio is None else error_envio(e))
+        return True
+
+    def ejecutar(self, lista_datos):
+        """
+        Llena todos los formularios de `lista_datos` intercalándolos en pestañas
+
+        Args:
+            lista_datos (list): Datos de cada formulario (mismo formato que `ejecutar`)
+
+        Returns:
+            list: Un dict por formulario, en el orden de `lista_datos`, con
+                  'indice', 'status' ('completed', 'partial' o 'failed'), 'duracion', 'error',
+                  'error_type' (categoría de app/retries.py) y 'answers' (app/errors.py)
+        """
+        pendientes = list(enumerate(lista_datos))
+        resultados = [None] * len(pendientes)
+        if not pendientes:
+            return resultados
+
+        pestanas = self._abrir_pestanas(min(self.pestanas, len(pendientes)))
+        log.info("Llenando %s formularios en %s pestañas...", len(pendientes), len(pestanas))
+
+        try:
+            while True:
+                avanzo = False
+                activas = 0
+                for pestana in pestanas:
+                    if pestana.libre:
+                        if not pendientes:
+                            continue
+                        try:
+                            turno = self._tomar_turno(esperar=all(p.libre for p in pestanas))
+                        except LimiteExcedido as e:
+                            self._sin_turno(pendientes, resultados, e)
+                            continue
+                        if turno is None:
+                            continue
+                        self.driver.switch_to.window(pestana.handle)
+                        self._asignar(pestana, *pendientes.pop(0), turno)
+                    else:
+                        self.driver.switch_to.window(pestana.handle)
+
+                    avanzo = self._avanzar(pestana, resultados) or avanzo
+                    activas += not pestana.libre
+
+                if not activas and not pendientes:
+                    break
+                if not avanzo:
+                    time.sleep(INTERVALO_RONDA)
+        finally:
+            for pestana in pestanas:
+                if pestana.turno is not None:
+                    pestana.turno.soltar()
+            try:
+                self._cerrar_pestanas(pestanas)
+            except Exception as e:
+                log.warning("⚠ No se pudieron cerrar las pestañas extra: %s", e)
+
+        return resultados
@@ -0,0 +1,125 @@
+"""
+Eventos de estado de las tareas publicados por Redis pub/sub
+
+Los workers publican cada cambio de estado de una tarea (STARTED, PROGRESS,
+PAGE_COMPLETED, RETRY, SUCCESS, FAILURE) en el canal de la tarea y, si
+pertenece a un lote, también en el canal del lote. La API reenvía esos
+canales por SSE (una tarea) y WebSocket (un lote completo), así los
+clientes se suscriben una vez en lugar de consultar cada segundo.
+
+El último evento de cada tarea se guarda además en una clave con TTL. Un
+cliente que se conecta tarde recibe primero ese estado, sin esperar al
+siguiente cambio.
+
+Claves y canales en Redis:
+    task:{id}:events      Canal pub/sub de la tarea
+    task:{id}:last_event  Último evento publicado (JSON, expira con EVENTOS_TTL)
+    batch:{id}:events     Canal pub/sub del lote
+
+Configuración por variables de entorno:
+    TASK_EVENTS_TTL: Segundos que se conserva el último evento (default 3600)
+"""
+
+import json
+import os
+import time
+
+import redis.asyncio as redis_async
+
+from app.celery_app import REDIS_URL
+from app.logs import obtener_logger
+from app.redis_client import get_redis
+
+
+log = obtener_logger(__name__)
+
+
+EVENTOS_TTL = int(os.getenv('TASK_EVENTS_TTL', '3600'))
+
+# Estados tras los cuales no habrá más eventos de la tarea
+EVENTOS_FINALES = ('SUCCESS', 'FAILURE')
+
+
+def canal_tarea(task_id):
+    return f"task:{task_id}:events"
+
+
+def canal_lote(batch_id):
+    return f"batch:{batch_id}:events"
+
+
+def clave_ultimo_evento(task_id):
+    return f"task:{task_id}:last_event"
+
+
+def publicar_evento(task_id, evento, batch_id=None, **datos):
+    """
+    Publica un evento de la tarea en su canal y en el de su lote
+
+    Los errores de Redis se informan pero no se propagan: perder un evento
+    de seguimiento no debe hacer fallar el llenado del formulario.
+
+    Args:
+        task_id (str): ID de la tarea de Celery
+        evento (str): STARTED, PROGRESS, PAGE_COMPLETED, RETRY, SUCCESS o FAILURE
+        batch_id (str): Lote de la tarea, si pertenece a uno
+        **datos: Campos adicionales del evento (serializables a JSON)
+    """
+    mensaje = json.dumps({
+        'task_id': task_id,
+        'batch_id': batch_id,
+        'event': evento,
+        'timestamp': time.time(),
+        **datos,
+    })
+
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.set(clave_ultimo_evento(task_id), mensaje, ex=EVENTOS_TTL)
+        pipe.publish(canal_tarea(task_id), mensaje)
+        if batch_id:
+            pipe.publish(canal_lote(batch_id), mensaje)
+        pipe.execute()
+    except Exception as e:
+        log.warning("⚠ No se pudo publicar el evento %s de la tarea %s: %s", evento, task_id, e)
+
+
+def formato_sse(evento):
+    """Serializa un evento en el formato de Server-Sent Events"""
+    return f"event: {evento['event']}\ndata: {json.dumps(evento)}\n\n"
+
+
+async def ultimo_evento(task_id):
+    """Último evento publicado de la tarea (dict), o None si no hay ninguno"""
+    cliente = redis_async.from_url(REDIS_URL, decode_responses=True)
+    try:
+        mensaje = await cliente.get(clave_ultimo_evento(task_id))
+    finally:
+        await cliente.aclose()
+    return json.loads(mensaje) if mensaje else None
+
+
+async def suscribir(canal, latido=15.0):
+    """
+    Generador asíncrono con los eventos publicados en `canal`
+
+    La suscripción queda activa antes de ceder el primer valor (None), para
+    que el llamador pueda leer el estado actual sin perder eventos que se
+    publiquen entretanto. Si no llega nada en `latido` segundos cede None,
+    lo que permite enviar keep-alives y detectar clientes desconectados.
+
+    Yields:
+        dict | None: Evento decodificado, o None al suscribirse y en cada latido
+    """
+    cliente = redis_async.from_url(REDIS_URL, decode_responses=True)
+    pubsub = cliente.pubsub()
+    try:
+        await pubsub.subscribe(canal)
+        yield None
+        while True:
+            mensaje = await pubsub.get_message(ignore_subscribe_messages=True, timeout=latido)
+            yield json.loads(mensaje['data']) if mensaje else None
+    finally:
+        await pubsub.unsubscribe(canal)
+        await pubsub.aclose()
+        await cliente.aclose()
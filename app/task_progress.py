@@ -0,0 +1,136 @@
+"""
+Progreso detallado de una tarea a partir de los eventos de su filler
+
+Los fillers informan su avance con `notificar(evento, **datos)`: páginas y
+secciones de `SECCIONES_CONFIG` iniciadas/completadas y celdas marcadas.
+`ProgresoTarea` acumula esos eventos en el `meta` de la tarea (página y
+sección actuales, celdas hechas/total, duración de cada paso) y lo escribe
+con un intervalo mínimo entre escrituras. Un formulario marca decenas de
+celdas por segundo; escribir cada una en el backend de resultados
+convertiría el seguimiento en la carga principal de Redis.
+
+Las páginas completadas se escriben siempre, sin esperar el intervalo.
+
+Eventos del filler:
+    pagina_iniciada(pagina)
+    seccion_iniciada(seccion, nombre, celdas)
+    celdas_completadas(seccion, completadas, celdas[, nombre])
+    seccion_completada(seccion)
+    pagina_completada(pagina)
+    navegacion(condicion, resultado, duracion)    Espera de cada transición (no se escribe en el meta)
+
+Configuración por variables de entorno:
+    TASK_PROGRESS_INTERVAL: Segundos mínimos entre escrituras del progreso (default 1.0)
+"""
+
+import os
+import time
+
+
+INTERVALO_PROGRESO = float(os.getenv('TASK_PROGRESS_INTERVAL', '1.0'))
+
+# Eventos que se escriben de inmediato aunque no haya pasado el intervalo
+EVENTOS_INMEDIATOS = ('pagina_completada',)
+
+
+class ProgresoTarea:
+    """
+    Callback `notificar` de un filler que escribe su avance de forma espaciada
+
+    Uso:
+        progreso = ProgresoTarea(lambda meta: task.update_state(state='PROGRESS', meta=meta))
+        filler = Form2Filler(driver=driver, notificar=progreso)
+    """
+
+    def __init__(self, escribir, form_type=None, intervalo=INTERVALO_PROGRESO, reloj=time.monotonic):
+        """
+        Args:
+            escribir (callable): Recibe el dict `meta` en cada escritura
+            form_type (str): Tipo de formulario, incluido en el meta
+            intervalo (float): Segundos mínimos entre escrituras
+            reloj (callable): Fuente de tiempo (inyectable en pruebas)
+        """
+        self.escribir = escribir
+        self.intervalo = intervalo
+        self.reloj = reloj
+        self.inicio = reloj()
+        self.meta = {
+            'status': f'Ejecutando {form_type}...' if form_type else 'Ejecutando...',
+            'form_type': form_type,
+            'page': None,
+            'section': None,
+            'section_name': None,
+            'cells_done': 0,
+            'cells_total': 0,
+            'elapsed': 0.0,
+            'steps': [],
+        }
+        self._inicio_pagina = None
+        self._inicio_seccion = None
+        self._ultima_escritura = None
+        self.escrituras = 0
+
+    def __call__(self, evento, **datos):
+        self._aplicar(evento, datos)
+
+        ahora = self.reloj()
+        if (evento in EVENTOS_INMEDIATOS
+                or self._ultima_escritura is None
+                or ahora - self._ultima_escritura >= self.intervalo):
+            self.volcar(ahora)
+
+    def _paso(self, nombre, inicio, ahora):
+        """Registra la duración de un paso (página o sección) terminado"""
+        if inicio is not None:
+            self.meta['steps'].append({
+                'step': nombre,
+                'page': self.meta['page'],
+                'seconds': round(ahora - inicio, 3),
+            })
+
+    def _aplicar(self, evento, datos):
+        """Actualiza el meta con un evento del filler"""
+        ahora = self.reloj()
+        meta = self.meta
+
+        if evento == 'pagina_iniciada':
+            meta.update(page=datos['pagina'], section=None, section_name=None, cells_done=0, cells_total=0)
+            self._inicio_pagina = ahora
+        elif evento == 'seccion_iniciada':
+            meta.update(section=datos['seccion'], section_name=datos.get('nombre'),
+                        cells_done=0, cells_total=datos.get('celdas', 0))
+            self._inicio_seccion = ahora
+        elif evento == 'celdas_completadas':
+            if datos.get('seccion') != meta['section']:
+                # Llenado por página: no hay seccion_iniciada previa
+                meta.update(section=datos.get('seccion'), section_name=datos.get('nombre'))
+            meta.update(cells_done=datos['completadas'], cells_total=datos['celdas'])
+        elif evento == 'seccion_completada':
+            meta['cells_done'] = meta['cells_total']
+            self._paso(datos['seccion'], self._inicio_seccion, ahora)
+            self._inicio_seccion = None
+        elif evento == 'pagina_completada':
+            meta['page'] = datos['pagina']
+            self._paso(f"pagina_{datos['pagina']}", self._inicio_pagina, ahora)
+            self._inicio_pagina = None
+
+        meta['status'] = self._descripcion()
+
+    def _descripcion(self):
+        meta = self.meta
+        if meta['page'] is None:
+            return meta['status']
+        texto = f"Página {meta['page']}"
+        if meta['section_name']:
+            texto += f": {meta['section_name']}"
+        if meta['cells_total']:
+            texto += f" ({meta['cells_done']}/{meta['cells_total']} celdas)"
+        return texto
+
+    def volcar(self, ahora=None):
+        """Escribe el meta actual sin esperar el intervalo"""
+        ahora = self.reloj() if ahora is None else ahora
+        self.meta['elapsed'] = round(ahora - self.inicio, 3)
+        self._ultima_escritura = ahora
+        self.escrituras += 1
+        self.escribir({**self.meta, 'steps': list(self.meta['steps'])})
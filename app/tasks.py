@@ -6,8 +6,23 @@ automático de los formularios de Colsubsidio.
 """
 
 from app.celery_app import celery_app
+from app.batch_progress import marcar_exito, marcar_fallo, marcar_inicio, marcar_reintento
+from app.driver_pool import get_driver_pool, cerrar_driver_pool
+from app.errors import ReporteRespuestas
+from app.form_engine import fillers_registrados
+from app.http_engine import destino_simulado, fillers_http_registrados
+from app.idempotency import clave_tarea, envio_registrado, liberar, registrar_envio
+from app.logs import actualizar_contexto, detener_logging, obtener_logger
+from app.metrics import iniciar_exportador_worker, marcar_proceso_terminado, registrar_formulario
+from app.rate_limit import MAX_REINTENTOS_TURNO, LimiteExcedido, turno
+from app.request_filter import medir_red
+from app.retries import ENVIO_INCIERTO, PuntoControl, clasificar_error, ejecutar_reanudable, es_reintentable, espera_reintento
+from app.task_events import publicar_evento
+from app.task_progress import ProgresoTarea
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown, worker_ready, worker_shutdown
 import sys
 import os
+import time
 
 # Agregar el directorio raíz al path para importar los scripts de formularios
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
@@ -19,17 +34,118 @@ from form3 import ColsubsidioFormFiller as Form3Filler
 from form4 import ColsubsidioFormFiller as Form4Filler
 
 
-# Mapeo de tipos de formulario a sus clases
-FORM_FILLERS = {
+log = obtener_logger(__name__)
+
+
+# Eventos de avance de los fillers -> eventos publicados (app/task_events.py)
+EVENTOS_FILLER = {
+    'pagina_completada': 'PAGE_COMPLETED',
+}
+
+
+# Clases de los scripts form*.py: subclases del motor declarativo, se conservan
+# para FORM_ENGINE=legacy
+FORM_FILLERS_LEGACY = {
     'form1': Form1Filler,
     'form2': Form2Filler,
     'form3': Form3Filler,
     'form4': Form4Filler,
 }
 
+# Mapeo de tipos de formulario a sus clases. Por defecto se usa el motor
+# declarativo (app/form_engine.py); FORM_ENGINE=legacy usa las clases de los
+# scripts, que llenan con el mismo motor, y FORM_ENGINE=http envía por HTTP
+# sin navegador (app/http_engine.py), con Selenium como respaldo. El motor
+# HTTP es experimental y sólo habla el protocolo de la encuesta simulada
+# (app/survey_stub.py): los formularios que apuntan a Qualtrics lo rechazan
+# y siguen con el motor declarativo.
+MOTOR_FORMULARIOS = os.getenv('FORM_ENGINE', 'spec')
+if MOTOR_FORMULARIOS == 'legacy':
+    FORM_FILLERS = FORM_FILLERS_LEGACY
+elif MOTOR_FORMULARIOS == 'http':
+    FORM_FILLERS = fillers_registrados()
+    for _form_type, _filler_http in fillers_http_registrados().items():
+        if destino_simulado(_form_type):
+            FORM_FILLERS[_form_type] = _filler_http
+        else:
+            log.error("✗ FORM_ENGINE=http rechazado para %s: el motor HTTP es experimental y sólo "
+                      "envía a la encuesta simulada (FORM_BASE_URL). Se usa el motor Selenium", _form_type)
+else:
+    FORM_FILLERS = fillers_registrados()
+
+
+def usa_navegador(form_filler_class):
+    """True si el filler necesita un driver del pool (todos salvo el motor HTTP)"""
+    return getattr(form_filler_class, 'USA_NAVEGADOR', True)
+
+
+def motor_formulario(form_filler_class):
+    """Motor con el que se etiqueta un formulario en las métricas"""
+    if MOTOR_FORMULARIOS == 'http' and usa_navegador(form_filler_class):
+        # Formulario que rechazó el motor HTTP: se llena con el declarativo
+        return 'spec'
+    return MOTOR_FORMULARIOS
+
+
+# Sólo con FORM_ENGINE=http y todos los formularios en la encuesta simulada
+# el worker no necesita navegadores precalentados
+SIN_NAVEGADORES = not any(usa_navegador(filler) for filler in FORM_FILLERS.values())
+
+
+@worker_init.connect
+def iniciar_metricas(**kwargs):
+    """Expone las métricas de Prometheus del worker en METRICS_PORT (app/metrics.py)"""
+    iniciar_exportador_worker()
+
+
+@worker_process_init.connect
+def calentar_pool_proceso(**kwargs):
+    """
+    Precalienta los navegadores de cada proceso hijo (pool prefork)
+
+    Con el motor HTTP no se precalientan: el respaldo con Selenium pide un
+    driver sólo cuando lo necesita.
+    """
+    if not SIN_NAVEGADORES:
+        get_driver_pool().calentar()
+
+
+@worker_ready.connect
+def calentar_pool_solo(sender=None, **kwargs):
+    """
+    Precalienta los navegadores cuando el worker ejecuta las tareas en su
+    propio proceso (pool solo/threads). Con prefork lo hace cada hijo.
+    """
+    pool = getattr(sender, 'pool', None)
+    if SIN_NAVEGADORES:
+        return
+    if pool is not None and type(pool).__module__.endswith(('solo', 'thread')):
+        get_driver_pool().calentar()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def cerrar_pool(**kwargs):
+    """Cierra los navegadores del pool al apagar el worker"""
+    cerrar_driver_pool()
+
+
+@worker_process_shutdown.connect
+def descartar_metricas_proceso(pid=None, **kwargs):
+    """Descarta las métricas en vivo del proceso hijo que termina (modo multiproceso)"""
+    marcar_proceso_terminado(pid or os.getpid())
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def vaciar_logs(**kwargs):
+    """Escribe los logs pendientes antes de que termine el proceso (app/logs.py)"""
+    detener_logging()
+
 
 @celery_app.task(bind=True, name='app.tasks.execute_form_task', max_retries=3)
-def execute_form_task(self, form_type: str, data: dict):
+def execute_form_task(self, form_type: str, data: dict, batch_id: str = None, idempotency_key: str = None,
+                      throttle_retries: int = 0):
     """
     Tarea de Celery para ejecutar el llenado de un formulario
     
@@ -37,6 +153,42 @@ def execute_form_task(self, form_type: str, data: dict):
         self: Referencia a la tarea (bind=True)
         form_type: Tipo de formulario ('form1', 'form2', 'form3', 'form4')
         data: Datos del formulario en formato diccionario
+        batch_id: Lote al que pertenece la tarea; sus contadores de progreso
+                  se actualizan en cada cambio de estado (app/batch_progress.py)
+        idempotency_key: Clave de deduplicación reservada por la API. Si es
+                         None el envío se registra con el task_id, así sólo
+                         se deduplican las entregas repetidas de esta tarea
+                         (app/idempotency.py)
+        throttle_retries: Reintentos ya hechos por falta de turno de la
+                          encuesta; no cuentan en max_retries
+
+    Cada cambio de estado se publica además por Redis pub/sub en el canal de
+    la tarea y en el del lote (app/task_events.py). Durante el llenado, el
+    avance del filler (página, sección, celdas, duración de cada paso) se
+    escribe en el meta de PROGRESS con un intervalo mínimo (app/task_progress.py).
+
+    Los errores se clasifican (app/retries.py): los transitorios y de
+    selector se reanudan primero en el mismo navegador desde la última página
+    completada y luego reintentan la tarea con backoff exponencial; los de
+    validación y los envíos inciertos fallan sin reintentar.
+
+    Con navegador, el resultado incluye en 'network' las peticiones y bytes
+    del formulario (app/request_filter.py).
+
+    Antes de tomar el navegador se espera turno de la encuesta: límite de
+    ritmo y de concurrencia compartido entre workers (app/rate_limit.py). Sin
+    turno dentro de RATE_MAX_WAIT la tarea se reintenta con backoff, hasta
+    RATE_MAX_RETRIES veces y sin gastar los reintentos de los errores del
+    llenado (max_retries).
+
+    El resultado incluye en 'answers' el reporte de campos respondidos,
+    verificados y fallidos (app/errors.py). En modo fallo rápido el primer
+    campo fallido detiene el formulario con su error tipado; sin él, el
+    formulario se envía y el status queda 'partial'.
+
+    Un formulario cuya clave ya está en el registro de envíos (entrega
+    repetida por el broker, POST repetido con la misma clave) no se vuelve
+    a llenar: el status queda 'duplicate' con el task_id original.
         
     Returns:
         dict: Resultado de la ejecución con status y mensaje
@@ -44,6 +196,47 @@ def execute_form_task(self, form_type: str, data: dict):
     Raises:
         Exception: Si ocurre un error durante la ejecución
     """
+    task_id = self.request.id
+    # El proceso (o hilo) del worker se reutiliza: el contexto de log se reemplaza completo
+    actualizar_contexto(task_id=task_id, form_type=form_type, pagina=None, seccion=None)
+    marcar_inicio(batch_id, task_id, self.request.retries, form_type)
+    publicar_evento(task_id, 'STARTED', batch_id, form_type=form_type, retries=self.request.retries)
+
+    clave = idempotency_key or clave_tarea(task_id)
+    envio = envio_registrado(form_type, clave)
+    if envio is not None:
+        log.warning("⚠ Formulario %s ya enviado por la tarea %s; no se repite", form_type, envio['task_id'])
+        marcar_exito(batch_id, task_id)
+        resultado = {
+            'status': 'duplicate',
+            'message': f'Formulario {form_type} ya enviado por la tarea {envio["task_id"]}',
+            'form_type': form_type,
+            'original_task_id': envio['task_id']
+        }
+        publicar_evento(task_id, 'SUCCESS', batch_id, result=resultado)
+        return resultado
+
+    def escribir_progreso(meta):
+        self.update_state(state='PROGRESS', meta=meta)
+        publicar_evento(task_id, 'PROGRESS', batch_id, **meta)
+
+    progreso = ProgresoTarea(escribir_progreso, form_type)
+    punto_control = PuntoControl()
+    # Compartido entre reanudaciones: un campo respondido después deja de contar como fallido
+    respuestas = ReporteRespuestas(form_type)
+
+    # Además del punto de control, el turno de la encuesta vigila sus transiciones
+    observadores = [punto_control.registrar]
+
+    def notificar(evento, **datos):
+        for observador in observadores:
+            observador(evento, **datos)
+        if evento in EVENTOS_FILLER:
+            publicar_evento(task_id, EVENTOS_FILLER[evento], batch_id, **datos)
+        progreso(evento, **datos)
+
+    inicio = time.monotonic()
+    red = {}
     try:
         # Actualizar estado de la tarea
         self.update_state(
@@ -57,34 +250,237 @@ def execute_form_task(self, form_type: str, data: dict):
             raise ValueError(f"Tipo de formulario inválido: {form_type}")
         
         # Ejecutar el llenado del formulario
-        self.update_state(
-            state='PROGRESS',
-            meta={'status': f'Ejecutando {form_type}...'}
-        )
+        progreso.volcar()
         
-        filler = form_filler_class()
-        filler.ejecutar(data)
+        # Esperar turno de la encuesta (app/rate_limit.py) y tomar prestado un
+        # navegador precalentado del pool del worker (el motor HTTP no lo necesita)
+        with turno(form_type) as turno_encuesta:
+            observadores.append(turno_encuesta.registrar)
+            if usa_navegador(form_filler_class):
+                with get_driver_pool().prestar() as driver, medir_red(driver, form_type) as red:
+                    ejecutar_reanudable(
+                        lambda: form_filler_class(driver=driver, notificar=notificar, respuestas=respuestas),
+                        data, punto_control)
+            else:
+                form_filler_class(notificar=notificar, respuestas=respuestas).ejecutar(data)
         
-        # Retornar resultado exitoso
-        return {
-            'status': 'completed',
-            'message': f'Formulario {form_type} completado exitosamente',
-            'form_type': form_type
-        }
+        registrar_envio(form_type, clave, task_id)
+        registrar_formulario(form_type, motor_formulario(form_filler_class), 'completed', time.monotonic() - inicio)
+        marcar_exito(batch_id, task_id)
+
+        # Retornar resultado exitoso. Sin fallo rápido el formulario se envía
+        # aunque falten campos: queda 'partial' y no se reintenta (ya se envió)
+        reporte = respuestas.como_dict()
+        if reporte['failed']:
+            resultado = {
+                'status': 'partial',
+                'message': f"Formulario {form_type} enviado con {reporte['failed']} campos sin responder",
+                'form_type': form_type
+            }
+        else:
+            resultado = {
+                'status': 'completed',
+                'message': f'Formulario {form_type} completado exitosamente',
+                'form_type': form_type
+            }
+        resultado['answers'] = reporte
+        if red:
+            resultado['network'] = red
+        publicar_evento(task_id, 'SUCCESS', batch_id, result=resultado)
+        return resultado
         
+    except LimiteExcedido as e:
+        # Sin turno de la encuesta no hubo llenado: se reintenta por un camino
+        # propio, sin gastar los reintentos reservados a errores del formulario
+        if throttle_retries < MAX_REINTENTOS_TURNO:
+            countdown = espera_reintento(throttle_retries)
+            log.warning("⚠ Sin turno para %s; reintentando en %.0fs: %s", form_type, countdown, e)
+            marcar_reintento(batch_id, task_id, self.request.retries)
+            publicar_evento(task_id, 'RETRY', batch_id, error=str(e), error_type=e.categoria, throttled=True,
+                            retries=self.request.retries + 1, countdown=round(countdown, 1))
+            raise self.retry(exc=e, countdown=countdown, max_retries=self.request.retries + 1,
+                             kwargs={**self.request.kwargs, 'throttle_retries': throttle_retries + 1})
+        error_message = f"Sin turno para {form_type} tras {throttle_retries} reintentos: {e}"
+        log.error(error_message)
+        liberar(form_type, clave, task_id)
+        marcar_fallo(batch_id, task_id, form_type, e)
+        resultado = {
+            'status': 'failed',
+            'message': error_message,
+            'form_type': form_type,
+            'error': str(e),
+            'error_type': e.categoria
+        }
+        publicar_evento(task_id, 'FAILURE', batch_id, result=resultado)
+        return resultado
+
     except Exception as e:
         # Registrar el error
         error_message = f"Error ejecutando {form_type}: {str(e)}"
-        print(error_message)
+        categoria = getattr(e, 'categoria_reintento', None) or clasificar_error(e)
+        log.error("%s (%s)", error_message, categoria)
+        if form_type in FORM_FILLERS:
+            registrar_formulario(form_type, motor_formulario(FORM_FILLERS[form_type]), 'error', time.monotonic() - inicio)
         
-        # Reintentar la tarea si no se ha alcanzado el máximo de reintentos
-        try:
-            raise self.retry(exc=e, countdown=60)  # Reintentar después de 60 segundos
-        except self.MaxRetriesExceededError:
-            # Si se excedieron los reintentos, retornar error
-            return {
-                'status': 'failed',
-                'message': error_message,
-                'form_type': form_type,
-                'error': str(e)
-            }
+        # Reintentar la tarea si el error lo amerita y no se ha alcanzado el
+        # máximo de reintentos. Se decide aquí y no con MaxRetriesExceededError:
+        # al pasar `exc`, Celery relanza la excepción original en vez de esa.
+        # Los reintentos por falta de turno no se descuentan.
+        intentos = self.request.retries - throttle_retries
+        if es_reintentable(categoria) and intentos < self.max_retries:
+            countdown = espera_reintento(intentos)
+            marcar_reintento(batch_id, task_id, self.request.retries)
+            publicar_evento(task_id, 'RETRY', batch_id, error=str(e), error_type=categoria,
+                            retries=self.request.retries + 1, countdown=round(countdown, 1),
+                            checkpoint=punto_control.como_dict())
+            raise self.retry(exc=e, countdown=countdown, max_retries=self.max_retries + throttle_retries)
+
+        # Si el error no se reintenta o se excedieron los reintentos, retornar error.
+        # El cliente puede volver a enviarlo con la misma clave, salvo que el
+        # envío final haya podido quedar registrado en Qualtrics
+        if categoria != ENVIO_INCIERTO:
+            liberar(form_type, clave, task_id)
+        marcar_fallo(batch_id, task_id, form_type, e)
+        resultado = {
+            'status': 'failed',
+            'message': error_message,
+            'form_type': form_type,
+            'error': str(e),
+            'error_type': categoria,
+            'checkpoint': punto_control.como_dict(),
+            'answers': respuestas.como_dict()
+        }
+        publicar_evento(task_id, 'FAILURE', batch_id, result=resultado)
+        return resultado
+
+
+def id_formulario(task_id, indice):
+    """Id de un formulario de `execute_form_tabs_task` en el progreso del lote"""
+    return f"{task_id}:{indice}"
+
+
+@celery_app.task(bind=True, name='app.tasks.execute_form_tabs_task')
+def execute_form_tabs_task(self, form_type: str, data_list: list, batch_id: str = None,
+                           idempotency_key: str = None):
+    """
+    Tarea de Celery que llena varios formularios en pestañas de un solo navegador
+
+    Los formularios se intercalan de forma cooperativa (ver app/tabs.py). Cada
+    uno tiene su propio resultado y su propio turno de la encuesta
+    (app/rate_limit.py); el fallo de uno no detiene a los demás ni reintenta
+    la tarea completa.
+
+    Cada formulario pasa por los mismos registros que una `execute_form_task`
+    propia, con id `{task_id}:{indice}` (`id_formulario`): el registro de
+    envíos (app/idempotency.py), los contadores del lote
+    (app/batch_progress.py) y un evento PROGRESS con su resultado apenas
+    termina (app/task_events.py). En una entrega repetida por el broker los
+    formularios ya enviados quedan 'duplicate' sin volver a llenarse.
+
+    Args:
+        self: Referencia a la tarea (bind=True)
+        form_type: Tipo de formulario ('form1', 'form2', 'form3', 'form4')
+        data_list: Lista de datos de formularios en formato diccionario
+        batch_id: Lote al que pertenecen los formularios (uno por elemento de
+                  `data_list` en sus contadores)
+        idempotency_key: Clave reservada por la API para toda la lista; cada
+                         formulario se registra con `{clave}:{indice}`. Si es
+                         None se registra con el id del formulario
+
+    Returns:
+        dict: Resumen con el resultado de cada formulario en 'results'
+              ('completed', 'partial', 'failed' o 'duplicate'), 'status'
+              'completed' si todos se enviaron completos, 'failed' si no se
+              envió ninguno y 'partial' en otro caso y, con navegador, las
+              peticiones y bytes de toda la tarea en 'network'
+    """
+    task_id = self.request.id
+    actualizar_contexto(task_id=task_id, form_type=form_type, pagina=None, seccion=None)
+    form_filler_class = FORM_FILLERS.get(form_type)
+    if not form_filler_class:
+        raise ValueError(f"Tipo de formulario inválido: {form_type}")
+
+    total = len(data_list)
+    ids = [id_formulario(task_id, indice) for indice in range(total)]
+    claves = [f"{idempotency_key}:{indice}" if idempotency_key else clave_tarea(ids[indice]) for indice in range(total)]
+    for id_form in ids:
+        marcar_inicio(batch_id, id_form, self.request.retries, form_type)
+    publicar_evento(task_id, 'STARTED', batch_id, form_type=form_type, total=total, retries=self.request.retries)
+
+    resultados = [None] * total
+    pendientes = []
+    for indice in range(total):
+        envio = envio_registrado(form_type, claves[indice])
+        if envio is None:
+            pendientes.append(indice)
+            continue
+        log.warning("⚠ Formulario %s %s ya enviado por la tarea %s; no se repite", form_type, indice, envio['task_id'])
+        marcar_exito(batch_id, ids[indice])
+        resultados[indice] = {'indice': indice, 'status': 'duplicate', 'duracion': 0.0,
+                              'original_task_id': envio['task_id']}
+
+    def escribir_progreso(meta):
+        self.update_state(state='PROGRESS', meta=meta)
+        publicar_evento(task_id, 'PROGRESS', batch_id, **meta)
+
+    motor = motor_formulario(form_filler_class)
+
+    def al_terminar(resultado):
+        # El ejecutor numera sólo los pendientes: se devuelve el índice de `data_list`
+        indice = pendientes[resultado['indice']]
+        resultado['indice'] = indice
+        resultados[indice] = resultado
+        if resultado['status'] == 'failed':
+            registrar_formulario(form_type, motor, 'error', resultado['duracion'])
+            marcar_fallo(batch_id, ids[indice], form_type, resultado.get('error'))
+        else:
+            registrar_envio(form_type, claves[indice], task_id)
+            registrar_formulario(form_type, motor, 'completed', resultado['duracion'])
+            marcar_exito(batch_id, ids[indice])
+        terminados = sum(1 for r in resultados if r is not None)
+        escribir_progreso({'status': f'{terminados}/{total} formularios {form_type} terminados',
+                           'completed': terminados, 'total': total, 'form': resultado})
+
+    escribir_progreso({'status': f'Ejecutando {len(pendientes)} formularios {form_type} en pestañas...',
+                       'completed': total - len(pendientes), 'total': total})
+
+    red = {}
+    try:
+        # Cada formulario toma su propio turno de la encuesta (app/tabs.py, app/rate_limit.py)
+        lista_datos = [data_list[indice] for indice in pendientes]
+        if lista_datos and usa_navegador(form_filler_class):
+            with get_driver_pool().prestar() as driver, medir_red(driver, form_type) as red:
+                form_filler_class(driver=driver).ejecutar_en_pestanas(lista_datos, al_terminar=al_terminar)
+        elif lista_datos:
+            form_filler_class().ejecutar_en_pestanas(lista_datos, al_terminar=al_terminar)
+    except Exception as e:
+        # Sin navegador (o con el ejecutor caído) los que no terminaron fallan
+        log.error("✗ Error ejecutando formularios %s en pestañas: %s", form_type, e)
+        for posicion, indice in enumerate(pendientes):
+            if resultados[indice] is None:
+                al_terminar({'indice': posicion, 'status': 'failed', 'duracion': 0.0, 'error': str(e),
+                             'error_type': clasificar_error(e)})
+
+    enviados = sum(1 for r in resultados if r['status'] != 'failed')
+    completos = sum(1 for r in resultados if r['status'] in ('completed', 'duplicate'))
+    if completos == total:
+        estado = 'completed'
+    elif enviados == 0:
+        estado = 'failed'
+    else:
+        estado = 'partial'
+
+    # Sin ningún envío (ni incierto) el cliente puede repetir la lista con la misma clave
+    if idempotency_key and enviados == 0 and not any(r.get('error_type') == ENVIO_INCIERTO for r in resultados):
+        liberar(form_type, idempotency_key, task_id)
+
+    resumen = {
+        'status': estado,
+        'message': f'{enviados}/{total} formularios {form_type} enviados, {completos} completos',
+        'form_type': form_type,
+        'results': resultados
+    }
+    if red:
+        resumen['network'] = red
+    publicar_evento(task_id, 'FAILURE' if estado == 'failed' else 'SUCCESS', batch_id, result=resumen)
+    return resumen
@@ -0,0 +1,507 @@
+"""
+Esperas por condición para los fillers de Qualtrics
+
+Reemplaza los `time.sleep` fijos (`esperar_carga(3)` tras `driver.get`,
+`esperar_carga(2)` al pasar de página, `time.sleep(0.3)` tras cada celda de
+matriz...) por condiciones de readiness con nombre, cada una con su propio
+timeout e intervalo de sondeo.
+
+El modo se elige por formulario para poder comparar rendimiento:
+    - 'condiciones' (default): espera sólo lo necesario según el DOM
+    - 'sleep': reproduce las pausas fijas originales
+
+Resolución del modo (primera que aplique):
+    1. Argumento `modo` del constructor
+    2. Variable de entorno FORM{N}_WAIT_MODE (p. ej. FORM3_WAIT_MODE=sleep)
+    3. Variable de entorno FORM_WAIT_MODE
+    4. 'condiciones'
+
+Las esperas de transición de página (carga, Siguiente, envío) se pueden
+diferir con `Esperas.diferir`: en lugar de bloquear se devuelven como un
+objeto `Espera` que el llamador sondea cuando quiera. Así `app.tabs` atiende
+otra pestaña mientras Qualtrics procesa la transición.
+
+Al terminar cada espera de transición se informa su duración con el evento
+`navegacion(condicion, resultado, duracion)` al callback `notificar` (la
+misma firma que el de los fillers); el límite por encuesta la usa como señal
+de lentitud del host (app/rate_limit.py).
+"""
+
+import os
+import time
+from collections import namedtuple
+
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from app.logs import obtener_logger
+from app.metrics import DURACION_ESPERA
+
+
+log = obtener_logger(__name__)
+
+
+MODO_CONDICIONES = 'condiciones'
+MODO_SLEEP = 'sleep'
+MODOS_ESPERA = (MODO_CONDICIONES, MODO_SLEEP)
+
+
+Condicion = namedtuple('Condicion', ['timeout', 'intervalo', 'sleep_legacy'])
+Condicion.__doc__ = """
+Parámetros de una condición de espera
+
+    timeout: Segundos máximos esperando la condición
+    intervalo: Segundos entre cada sondeo al DOM
+    sleep_legacy: Pausa fija equivalente del código original (modo 'sleep')
+"""
+
+
+CONDICIONES = {
+    # Carga inicial tras driver.get (antes esperar_carga(3))
+    'pagina_cargada': Condicion(timeout=30, intervalo=0.1, sleep_legacy=3),
+    # Transición de página tras el botón Siguiente (antes esperar_carga(2))
+    'pagina_renderizada': Condicion(timeout=20, intervalo=0.1, sleep_legacy=2),
+    # Envío final de la encuesta (antes esperar_carga(1))
+    'envio_confirmado': Condicion(timeout=20, intervalo=0.1, sleep_legacy=1),
+    # Botón Siguiente de Qualtrics habilitado (antes esperar_carga(0.5) tras el scroll)
+    'boton_siguiente_listo': Condicion(timeout=10, intervalo=0.05, sleep_legacy=0.5),
+    # Display logic asentada tras responder una pregunta (antes 0.3 + 0.5)
+    'logica_visualizacion': Condicion(timeout=5, intervalo=0.05, sleep_legacy=0.5),
+    # Campo de texto condicional visible (antes esperar_carga(0.7))
+    'campo_visible': Condicion(timeout=5, intervalo=0.05, sleep_legacy=0.7),
+    # Radio de matriz marcado tras el clic (antes time.sleep(0.3))
+    'celda_marcada': Condicion(timeout=2, intervalo=0.02, sleep_legacy=0.3),
+    # Checkbox / opción Si-No marcada tras el clic (antes esperar_carga(0.3))
+    'opcion_marcada': Condicion(timeout=2, intervalo=0.02, sleep_legacy=0.3),
+}
+
+# Pausas del código original que no esperan ninguna condición del DOM
+# (scrollIntoView es síncrono, el fin de sección no dispara cambios).
+# En modo 'condiciones' no esperan nada.
+PAUSAS_LEGACY = {
+    'scroll': 0.3,
+    'seccion_completada': 0.5,
+    'pagina_completada': 1,
+    'checkboxes_completados': 0.5,
+}
+
+# Milisegundos sin mutaciones del DOM para considerar asentada la display logic
+MS_DOM_ESTABLE = 150
+
+_SCRIPT_MS_SIN_MUTACIONES = """
+if (!window.__rpaMutaciones) {
+    window.__rpaMutaciones = {t: Date.now()};
+    new MutationObserver(function () { window.__rpaMutaciones.t = Date.now(); })
+        .observe(document.documentElement, {subtree: true, childList: true, attributes: true});
+    return 0;
+}
+return Date.now() - window.__rpaMutaciones.t;
+"""
+
+# Esperas de transición de página: su duración es la latencia del host
+TRANSICIONES = ('pagina_cargada', 'pagina_renderizada', 'envio_confirmado')
+
+# Contenedores de pregunta de Qualtrics JFE (usados como marcador de página)
+SELECTOR_PREGUNTAS = '.QuestionOuter'
+
+# Página de fin de encuesta (mensaje de agradecimiento) de Qualtrics JFE
+SELECTOR_FIN_ENCUESTA = '#EndOfSurvey'
+
+
+class Espera:
+    """
+    Condición pendiente que se puede sondear sin bloquear
+
+    `Esperas.cumplir` la espera bloqueando; el planificador de pestañas la
+    sondea una vez por ronda. El timeout corre desde que se creó la espera
+    (normalmente, justo después del clic que dispara la transición).
+    """
+
+    def __init__(self, nombre, condicion, obligatoria=False, mensaje=None, por_condiciones=True,
+                 form_type=None, al_registrar=None, comprobacion=None):
+        """
+        Args:
+            nombre (str): Clave en CONDICIONES
+            condicion (callable): Función driver -> valor truthy cuando está lista
+            obligatoria (bool): Si es True, vencer el timeout lanza TimeoutException
+            mensaje (str): Mensaje de la excepción al vencer una espera obligatoria
+            por_condiciones (bool): False en modo 'sleep' (sólo cuenta el tiempo)
+            form_type (str): Tipo de formulario, para la métrica rpa_wait_seconds
+            al_registrar (callable): Recibe (nombre, resultado, duración) al terminar
+            comprobacion (callable): En modo 'sleep', función driver -> bool que
+                                     se evalúa una vez al terminar la pausa; si
+                                     da False la espera vence
+        """
+        self.nombre = nombre
+        self.form_type = form_type
+        self.inicio = time.monotonic()
+        self.registrada = False
+        self.condicion = condicion
+        self.obligatoria = obligatoria
+        self.mensaje = mensaje
+        self.por_condiciones = por_condiciones
+        self.al_registrar = al_registrar
+        self.comprobacion = comprobacion
+        self.config = CONDICIONES[nombre]
+        duracion = self.config.timeout if por_condiciones else self.config.sleep_legacy
+        self.limite = self.inicio + duracion
+
+    def restante(self):
+        """Segundos que quedan antes del timeout"""
+        return max(0.0, self.limite - time.monotonic())
+
+    def registrar(self, resultado):
+        """Observa la duración de la espera una sola vez ('cumplida', 'vencida' o 'sleep')"""
+        if self.registrada:
+            return
+        self.registrada = True
+        duracion = time.monotonic() - self.inicio
+        DURACION_ESPERA.labels(form_type=self.form_type or 'desconocido', condicion=self.nombre,
+                               resultado=resultado).observe(duracion)
+        if self.al_registrar is not None:
+            self.al_registrar(self.nombre, resultado, duracion)
+
+    def vencer(self):
+        """Aplica la política de timeout: excepción si es obligatoria, aviso si no"""
+        self.registrar('vencida')
+        if self.obligatoria:
+            raise TimeoutException(
+                self.mensaje or f"Condición '{self.nombre}' no se cumplió en {self.config.timeout}s"
+            )
+        log.warning("⚠ Condición '%s' no se cumplió en %ss, continuando...", self.nombre, self.config.timeout)
+        return False
+
+    def terminar_pausa(self, driver):
+        """
+        Fin de la pausa fija del modo 'sleep': evalúa la `comprobacion`, si la hay
+
+        Returns:
+            bool: True si se puede continuar
+        """
+        if self.comprobacion is not None:
+            try:
+                comprobada = self.comprobacion(driver)
+            except (NoSuchElementException, StaleElementReferenceException):
+                comprobada = False
+            if not comprobada:
+                return self.vencer()
+        self.registrar('sleep')
+        return True
+
+    def sondear(self, driver):
+        """
+        Evalúa la condición una sola vez
+
+        Returns:
+            bool: True si ya se puede continuar (cumplida, o vencida sin ser obligatoria)
+        """
+        if not self.por_condiciones:
+            if self.restante() == 0:
+                return self.terminar_pausa(driver)
+            return False
+
+        try:
+            if self.condicion(driver):
+                self.registrar('cumplida')
+                return True
+        except (NoSuchElementException, StaleElementReferenceException):
+            pass
+
+        if self.restante() == 0:
+            self.vencer()
+            return True
+        return False
+
+
+def resolver_modo(form_type=None, modo=None):
+    """
+    Determina el modo de espera para un formulario
+
+    Args:
+        form_type (str): Tipo de formulario ('form1'...'form4')
+        modo (str): Modo explícito; tiene prioridad sobre el entorno
+
+    Returns:
+        str: 'condiciones' o 'sleep'
+    """
+    if modo is None and form_type:
+        modo = os.getenv(f'{form_type.upper()}_WAIT_MODE')
+    if modo is None:
+        modo = os.getenv('FORM_WAIT_MODE', MODO_CONDICIONES)
+
+    modo = modo.strip().lower()
+    if modo not in MODOS_ESPERA:
+        raise ValueError(f"Modo de espera inválido: '{modo}'. Opciones: {', '.join(MODOS_ESPERA)}")
+    return modo
+
+
+class Esperas:
+    """
+    Motor de esperas con nombre ligado a un driver
+
+    Cada método corresponde a una condición de readiness de Qualtrics. En modo
+    'sleep' todos se reducen a la pausa fija original de su punto de llamada.
+    """
+
+    def __init__(self, driver, form_type=None, modo=None, notificar=None):
+        """
+        Args:
+            driver (WebDriver): Driver sobre el que se evalúan las condiciones
+            form_type (str): Tipo de formulario, para leer FORM{N}_WAIT_MODE
+            modo (str): 'condiciones' o 'sleep'. Si es None se toma del entorno
+            notificar (callable): Recibe `navegacion(condicion, resultado, duracion)`
+                                  al terminar cada espera de transición
+        """
+        self.driver = driver
+        self.form_type = form_type
+        self.modo = resolver_modo(form_type, modo)
+        self.notificar = notificar
+        self._diferidas = None
+
+    def _transicion_registrada(self, nombre, resultado, duracion):
+        """Informa la duración de una transición (en modo 'sleep' es la pausa fija: no se informa)"""
+        if self.notificar is not None and resultado != 'sleep':
+            self.notificar('navegacion', condicion=nombre, resultado=resultado, duracion=duracion)
+
+    @property
+    def por_condiciones(self):
+        return self.modo == MODO_CONDICIONES
+
+    def _esperar(self, nombre, condicion, obligatoria=False, mensaje=None, diferible=False, comprobacion=None):
+        """
+        Espera una condición con los parámetros configurados para `nombre`
+
+        Args:
+            nombre (str): Clave en CONDICIONES
+            condicion (callable): Función driver -> valor truthy cuando está lista
+            obligatoria (bool): Si es True, un timeout se propaga como excepción
+            mensaje (str): Mensaje de la excepción de timeout
+            diferible (bool): Si es True y hay un `diferir` en curso, no bloquea
+            comprobacion (callable): Condición que también se exige en modo 'sleep',
+                                     al terminar la pausa fija
+
+        Returns:
+            bool: True si la condición se cumplió (o en modo 'sleep')
+        """
+        al_registrar = self._transicion_registrada if nombre in TRANSICIONES else None
+        espera = Espera(nombre, condicion, obligatoria, mensaje, self.por_condiciones, self.form_type, al_registrar,
+                        comprobacion)
+
+        if diferible and self._diferidas is not None:
+            self._diferidas.append(espera)
+            return True
+        return self.cumplir(espera)
+
+    def cumplir(self, espera):
+        """
+        Bloquea hasta que `espera` se cumpla o venza su timeout
+
+        Args:
+            espera (Espera): Espera a cumplir. None se considera ya cumplida
+
+        Returns:
+            bool: True si la condición se cumplió (o en modo 'sleep')
+        """
+        if espera is None:
+            return True
+
+        if not espera.por_condiciones:
+            time.sleep(espera.restante())
+            return espera.terminar_pausa(self.driver)
+
+        try:
+            WebDriverWait(
+                self.driver,
+                espera.restante(),
+                poll_frequency=espera.config.intervalo,
+                ignored_exceptions=(StaleElementReferenceException,)
+            ).until(espera.condicion)
+            espera.registrar('cumplida')
+            return True
+        except TimeoutException:
+            return espera.vencer()
+
+    def diferir(self, funcion, *args, **kwargs):
+        """
+        Ejecuta `funcion` sin bloquear en su transición de página final
+
+        Las esperas de página que `funcion` dispare se devuelven en lugar de
+        cumplirse; si dispara más de una, las anteriores se cumplen bloqueando
+        y sólo se difiere la última.
+
+        Returns:
+            Espera: Transición pendiente, o None si `funcion` no disparó ninguna
+        """
+        anteriores, self._diferidas = self._diferidas, []
+        try:
+            funcion(*args, **kwargs)
+            diferidas = self._diferidas
+        finally:
+            self._diferidas = anteriores
+
+        for espera in diferidas[:-1]:
+            self.cumplir(espera)
+        return diferidas[-1] if diferidas else None
+
+    def _dom_estable(self, driver):
+        """True cuando el DOM lleva MS_DOM_ESTABLE ms sin mutaciones"""
+        return driver.execute_script(_SCRIPT_MS_SIN_MUTACIONES) >= MS_DOM_ESTABLE
+
+    def _documento_completo(self, driver):
+        return driver.execute_script("return document.readyState;") == 'complete'
+
+    # ------------------------------------------------------------------
+    # Condiciones de página
+    # ------------------------------------------------------------------
+
+    def marcar_pagina(self):
+        """
+        Toma un elemento de la página actual para detectar luego la transición
+
+        Returns:
+            WebElement: Primer contenedor de pregunta, o None si no hay ninguno
+        """
+        if not self.por_condiciones:
+            return None
+        preguntas = self.driver.find_elements(By.CSS_SELECTOR, SELECTOR_PREGUNTAS)
+        return preguntas[0] if preguntas else None
+
+    def abrir(self, url):
+        """
+        Navega a `url`
+
+        En modo 'condiciones' la navegación se lanza por JavaScript y vuelve de
+        inmediato: la carga la confirma luego `pagina_cargada` (que necesita un
+        ancla), y mientras tanto se pueden atender otras pestañas. En modo
+        'sleep' se conserva `driver.get`, que bloquea hasta el evento load.
+        """
+        if self.por_condiciones:
+            self.driver.execute_script("window.location.href = arguments[0];", url)
+        else:
+            self.driver.get(url)
+
+    def pagina_cargada(self, ancla=None):
+        """
+        Página inicial lista tras `driver.get`
+
+        Args:
+            ancla (tuple): Locator (By, valor) de un campo que debe existir en la página
+        """
+        def lista(driver):
+            if not self._documento_completo(driver):
+                return False
+            if ancla is not None and not driver.find_elements(*ancla):
+                return False
+            return self._dom_estable(driver)
+
+        return self._esperar('pagina_cargada', lista, obligatoria=True, diferible=True)
+
+    def pagina_renderizada(self, numero, marcador=None, ancla=None):
+        """
+        Página N de Qualtrics renderizada tras pulsar Siguiente
+
+        Args:
+            numero (int): Número de la página esperada (sólo para el log)
+            marcador (WebElement): Elemento de la página anterior (de `marcar_pagina`)
+            ancla (tuple): Locator (By, valor) de un campo de la página N
+        """
+        def renderizada(driver):
+            if marcador is not None and not EC.staleness_of(marcador)(driver):
+                return False
+            if ancla is not None:
+                if not driver.find_elements(*ancla):
+                    return False
+            elif not driver.find_elements(By.CSS_SELECTOR, SELECTOR_PREGUNTAS):
+                return False
+            return self._documento_completo(driver) and self._dom_estable(driver)
+
+        return self._esperar('pagina_renderizada', renderizada, obligatoria=True,
+                             mensaje=f"La página {numero} no terminó de renderizarse", diferible=True)
+
+    def envio_confirmado(self, marcador=None):
+        """
+        Qualtrics procesó el último Siguiente y mostró la página de cierre
+
+        Es obligatoria y exige el marcador de fin de encuesta (`#EndOfSurvey`)
+        también en modo 'sleep': una página que se vuelve a dibujar con un
+        error de validación, o que no cambia, no cuenta como enviada.
+
+        Args:
+            marcador (WebElement): Elemento de la última página (de `marcar_pagina`)
+        """
+        def fin_encuesta(driver):
+            return bool(driver.find_elements(By.CSS_SELECTOR, SELECTOR_FIN_ENCUESTA))
+
+        def confirmado(driver):
+            if marcador is not None and not EC.staleness_of(marcador)(driver):
+                return False
+            return fin_encuesta(driver) and self._dom_estable(driver)
+
+        return self._esperar('envio_confirmado', confirmado, obligatoria=True,
+                             mensaje="Qualtrics no confirmó el envío final: no apareció la página "
+                                     f"de fin de encuesta ({SELECTOR_FIN_ENCUESTA})",
+                             diferible=True, comprobacion=fin_encuesta)
+
+    def boton_siguiente_listo(self, boton):
+        """El botón Siguiente de Qualtrics está visible y habilitado"""
+        def listo(driver):
+            return boton.is_displayed() and boton.is_enabled() \
+                and 'disabled' not in (boton.get_attribute('class') or '')
+
+        return self._esperar('boton_siguiente_listo', listo)
+
+    # ------------------------------------------------------------------
+    # Condiciones de preguntas
+    # ------------------------------------------------------------------
+
+    def logica_visualizacion(self, qid=None):
+        """
+        Display logic asentada tras responder una pregunta
+
+        Args:
+            qid (str): QID de la pregunta que debe quedar visible (ej: '62').
+                       Si es None sólo se espera a que el DOM deje de mutar.
+        """
+        def asentada(driver):
+            if qid is not None:
+                contenedores = driver.find_elements(By.ID, f"QID{qid}")
+                if not contenedores or not contenedores[0].is_displayed():
+                    return False
+            return self._dom_estable(driver)
+
+        return self._esperar('logica_visualizacion', asentada)
+
+    def campo_visible(self, locator):
+        """Campo condicional (ej: justificación de la recomendación) visible e interactuable"""
+        return self._esperar('campo_visible', EC.element_to_be_clickable(locator))
+
+    def celda_marcada(self, radio_id):
+        """El radio `radio_id` de una matriz quedó marcado"""
+        return self._esperar('celda_marcada', lambda d: d.find_element(By.ID, radio_id).is_selected())
+
+    def opcion_marcada(self, elemento_id=None):
+        """
+        Checkbox u opción quedó marcada
+
+        Args:
+            elemento_id (str): ID del input. Si es None (opciones ubicadas por
+                               XPath) se espera a que el DOM se asiente.
+        """
+        if elemento_id is None:
+            return self._esperar('opcion_marcada', self._dom_estable)
+        return self._esperar('opcion_marcada', lambda d: d.find_element(By.ID, elemento_id).is_selected())
+
+    def pausa(self, nombre):
+        """
+        Pausa del flujo original que no corresponde a ninguna condición del DOM
+
+        En modo 'condiciones' no espera; en modo 'sleep' duerme lo que dormía antes.
+        """
+        if not self.por_condiciones:
+            time.sleep(PAUSAS_LEGACY[nombre])
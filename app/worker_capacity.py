@@ -0,0 +1,210 @@
+"""
+Dimensionamiento del worker de Celery según la capacidad del nodo
+
+Cada slot del worker (proceso hijo de prefork) es dueño de su propio pool de
+navegadores, así que la concurrencia útil la limita lo que Chrome consume:
+CPU por navegador y memoria por navegador. Este módulo lee los recursos
+disponibles (respetando los límites del cgroup en Docker) y calcula cuántos
+slots caben en el nodo.
+
+Configuración por variables de entorno:
+    WORKER_POOL: Pool de Celery ('prefork' por defecto, 'solo' en Windows)
+    WORKER_CONCURRENCY: Fija la concurrencia y omite el cálculo automático
+    WORKER_CPUS_PER_BROWSER: CPUs reservadas por navegador (default 1.0)
+    WORKER_BROWSER_MEMORY_MB: Memoria reservada por navegador (default 700)
+    WORKER_RESERVED_MEMORY_MB: Memoria para el SO, Redis y el proceso padre (default 512)
+    WORKER_MAX_CONCURRENCY: Tope de slots aunque sobren recursos (default 16)
+    CHROME_MEMORY_LIMIT_MB: Memoria máxima de un navegador antes de reciclarlo
+                            (default: WORKER_BROWSER_MEMORY_MB)
+"""
+
+import os
+import sys
+
+
+POOL_POR_DEFECTO = 'solo' if sys.platform == 'win32' else 'prefork'
+
+CPUS_POR_NAVEGADOR = float(os.getenv('WORKER_CPUS_PER_BROWSER', '1.0'))
+MEMORIA_POR_NAVEGADOR_MB = int(os.getenv('WORKER_BROWSER_MEMORY_MB', '700'))
+MEMORIA_RESERVADA_MB = int(os.getenv('WORKER_RESERVED_MEMORY_MB', '512'))
+CONCURRENCIA_MAXIMA = int(os.getenv('WORKER_MAX_CONCURRENCY', '16'))
+LIMITE_MEMORIA_CHROME_MB = int(os.getenv('CHROME_MEMORY_LIMIT_MB', str(MEMORIA_POR_NAVEGADOR_MB)))
+
+# Pools en los que todas las tareas comparten un único proceso
+POOLS_UN_PROCESO = ('solo', 'threads')
+
+
+def _leer(ruta):
+    try:
+        with open(ruta) as archivo:
+            return archivo.read().strip()
+    except OSError:
+        return None
+
+
+def cpus_disponibles():
+    """
+    CPUs utilizables por el worker
+
+    Considera la afinidad del proceso y la cuota de CPU del cgroup (v2 o v1),
+    que es lo que realmente limita a un contenedor con `--cpus`.
+    """
+    try:
+        cpus = float(len(os.sched_getaffinity(0)))
+    except AttributeError:
+        cpus = float(os.cpu_count() or 1)
+
+    cuota = None
+    cpu_max = _leer('/sys/fs/cgroup/cpu.max')
+    if cpu_max:
+        limite, periodo = cpu_max.split()
+        if limite != 'max':
+            cuota = int(limite) / int(periodo)
+    else:
+        limite = _leer('/sys/fs/cgroup/cpu/cpu.cfs_quota_us')
+        periodo = _leer('/sys/fs/cgroup/cpu/cpu.cfs_period_us')
+        if limite and periodo and int(limite) > 0:
+            cuota = int(limite) / int(periodo)
+
+    return min(cpus, cuota) if cuota else cpus
+
+
+def memoria_disponible_mb():
+    """
+    Memoria utilizable por el worker en MB
+
+    Usa el menor valor entre la memoria física total y el límite del cgroup.
+    Retorna None si no se puede determinar (p. ej. en Windows).
+    """
+    candidatos = []
+
+    meminfo = _leer('/proc/meminfo')
+    if meminfo:
+        for linea in meminfo.splitlines():
+            if linea.startswith('MemTotal:'):
+                candidatos.append(int(linea.split()[1]) // 1024)
+                break
+
+    for ruta in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        limite = _leer(ruta)
+        if limite and limite.isdigit():
+            candidatos.append(int(limite) // (1024 * 1024))
+            break
+
+    return min(candidatos) if candidatos else None
+
+
+def calcular_concurrencia(cpus=None, memoria_mb=None, navegadores_por_slot=None):
+    """
+    Número de slots que caben en el nodo
+
+    Args:
+        cpus (float): CPUs disponibles. Si es None se detectan
+        memoria_mb (int): Memoria disponible. Si es None se detecta
+        navegadores_por_slot (int): Navegadores que abre cada slot (DRIVER_POOL_SIZE)
+
+    Returns:
+        int: Concurrencia entre 1 y WORKER_MAX_CONCURRENCY
+    """
+    fija = os.getenv('WORKER_CONCURRENCY')
+    if fija:
+        return max(1, int(fija))
+
+    if navegadores_por_slot is None:
+        navegadores_por_slot = int(os.getenv('DRIVER_POOL_SIZE', '1'))
+    navegadores_por_slot = max(1, navegadores_por_slot)
+
+    cpus = cpus_disponibles() if cpus is None else cpus
+    memoria_mb = memoria_disponible_mb() if memoria_mb is None else memoria_mb
+
+    navegadores = int(cpus / CPUS_POR_NAVEGADOR)
+    if memoria_mb is not None:
+        navegadores = min(navegadores, (memoria_mb - MEMORIA_RESERVADA_MB) // MEMORIA_POR_NAVEGADOR_MB)
+
+    return max(1, min(CONCURRENCIA_MAXIMA, navegadores // navegadores_por_slot))
+
+
+def pool_worker():
+    """Pool de Celery configurado (WORKER_POOL) o el de la plataforma"""
+    return os.getenv('WORKER_POOL', POOL_POR_DEFECTO)
+
+
+def configuracion_worker():
+    """
+    Parámetros de Celery para el worker según pool y capacidad del nodo
+
+    `worker_max_tasks_per_child` se alinea con DRIVER_MAX_USES: cada hijo se
+    recicla cuando su navegador ya cumplió su ciclo de usos, así el proceso
+    Python y el Chrome que administra se renuevan juntos.
+    """
+    pool = pool_worker()
+    max_usos_driver = int(os.getenv('DRIVER_MAX_USES', '25'))
+
+    return {
+        'worker_pool': pool,
+        'worker_concurrency': 1 if pool == 'solo' else calcular_concurrencia(),
+        'worker_max_tasks_per_child': max_usos_driver,
+        # Límite del proceso Python del slot (Chrome se controla en el pool de drivers)
+        'worker_max_memory_per_child': MEMORIA_POR_NAVEGADOR_MB * 1024 // 2,
+    }
+
+
+def _hijos(pid):
+    """PIDs de los procesos hijos directos de `pid` (Linux)"""
+    hijos = _leer(f'/proc/{pid}/task/{pid}/children')
+    return [int(h) for h in hijos.split()] if hijos else []
+
+
+def memoria_arbol_mb(pid):
+    """
+    Memoria residente (RSS) de un proceso y todos sus descendientes
+
+    Se usa para medir un navegador completo: chromedriver, el proceso
+    principal de Chrome, renderers y GPU.
+
+    Returns:
+        float: MB residentes, o None si /proc no está disponible
+    """
+    total_kb = 0
+    pendientes = [pid]
+    encontrado = False
+
+    while pendientes:
+        actual = pendientes.pop()
+        status = _leer(f'/proc/{actual}/status')
+        if status is None:
+            continue
+        encontrado = True
+        for linea in status.splitlines():
+            if linea.startswith('VmRSS:'):
+                total_kb += int(linea.split()[1])
+                break
+        pendientes.extend(_hijos(actual))
+
+    return total_kb / 1024 if encontrado else None
+
+
+def cpu_arbol_segundos(pid):
+    """
+    Tiempo de CPU (usuario + sistema) de un proceso y todos sus descendientes vivos
+
+    Returns:
+        float: Segundos de CPU, o None si /proc no está disponible
+    """
+    ticks_por_segundo = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+    total_ticks = 0
+    pendientes = [pid]
+    encontrado = False
+
+    while pendientes:
+        actual = pendientes.pop()
+        stat = _leer(f'/proc/{actual}/stat')
+        if stat is None:
+            continue
+        encontrado = True
+        # El nombre del proceso (campo 2) puede tener espacios: se corta tras ')'
+        campos = stat.rsplit(')', 1)[1].split()
+        total_ticks += int(campos[11]) + int(campos[12])
+        pendientes.extend(_hijos(actual))
+
+    return total_ticks / ticks_por_segundo if encontrado else None
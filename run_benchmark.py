@@ -0,0 +1,107 @@
+"""
+Script para medir el rendimiento de los formularios contra la encuesta simulada
+
+Levanta la encuesta simulada (run_stub.py) en un proceso aparte, ejecuta
+cada formulario N veces con cada modo (ver app/benchmark.py) y guarda el
+reporte en JSON. Con --baseline compara contra un reporte anterior y
+termina con código 1 si alguna métrica empeoró más que la tolerancia.
+
+Uso:
+    python run_benchmark.py -n 20 --modos condiciones lote http --salida benchmark.json
+    python run_benchmark.py --modos http --baseline benchmark.json --tolerancia 0.15
+    python run_benchmark.py --url-base http://127.0.0.1:8090   # encuesta ya iniciada
+    python run_benchmark.py --modos lote --perfil-chrome ligero
+    python run_benchmark.py --modos lote --sin-filtro --salida sin_filtro.json   # bytes sin bloqueo
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import urllib3
+
+# Asegurar que el directorio raíz está en el path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.benchmark import MODOS, comparar, ejecutar_benchmark, guardar
+from app.chrome_profile import PERFILES_CHROME
+from app.form_specs import FORM_SPECS
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _iniciar_encuesta(latencia_ms, jitter_ms):
+    """Lanza run_stub.py en un puerto libre y espera a que responda"""
+    puerto = _puerto_libre()
+    entorno = dict(os.environ, STUB_HOST='127.0.0.1', STUB_PORT=str(puerto),
+                   STUB_LATENCY_MS=str(latencia_ms), STUB_JITTER_MS=str(jitter_ms))
+    raiz = os.path.dirname(os.path.abspath(__file__))
+    proceso = subprocess.Popen([sys.executable, os.path.join(raiz, 'run_stub.py')], env=entorno,
+                               stdout=subprocess.DEVNULL)
+    url_base = f"http://127.0.0.1:{puerto}"
+
+    http = urllib3.PoolManager()
+    for _ in range(100):
+        try:
+            http.request('GET', f"{url_base}/__stub__/respuestas", retries=False)
+            return proceso, url_base
+        except urllib3.exceptions.HTTPError:
+            time.sleep(0.1)
+    proceso.terminate()
+    raise RuntimeError("La encuesta simulada no respondió")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark de los formularios contra la encuesta simulada')
+    parser.add_argument('-n', '--repeticiones', type=int, default=5, help='Formularios por modo y tipo')
+    parser.add_argument('--modos', nargs='+', choices=MODOS, default=list(MODOS))
+    parser.add_argument('--formularios', nargs='+', choices=sorted(FORM_SPECS), default=None)
+    parser.add_argument('--salida', default='benchmark.json', help='Archivo JSON del reporte')
+    parser.add_argument('--latencia-ms', type=float, default=0, help='Latencia de la encuesta simulada')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Jitter de la encuesta simulada')
+    parser.add_argument('--url-base', default=None, help='Usar una encuesta simulada ya iniciada')
+    parser.add_argument('--perfil-chrome', choices=PERFILES_CHROME, default=None,
+                        help='Perfil de arranque de Chrome (default: CHROME_PROFILE)')
+    parser.add_argument('--sin-filtro', action='store_true',
+                        help='Desactivar el bloqueo de peticiones (REQUEST_FILTER=0)')
+    parser.add_argument('--baseline', default=None, help='Reporte anterior contra el cual comparar')
+    parser.add_argument('--tolerancia', type=float, default=0.10, help='Empeoramiento relativo permitido')
+    args = parser.parse_args()
+    if args.perfil_chrome:
+        os.environ['CHROME_PROFILE'] = args.perfil_chrome
+    if args.sin_filtro:
+        os.environ['REQUEST_FILTER'] = '0'
+
+    proceso = None
+    url_base = args.url_base
+    if url_base is None:
+        proceso, url_base = _iniciar_encuesta(args.latencia_ms, args.jitter_ms)
+        print(f"Encuesta simulada en {url_base}")
+
+    try:
+        reporte = ejecutar_benchmark(url_base, args.modos, args.formularios, args.repeticiones,
+                                     args.latencia_ms, args.jitter_ms)
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait()
+
+    guardar(reporte, args.salida)
+    print(f"✓ Reporte guardado en {args.salida}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as archivo:
+            regresiones = comparar(json.load(archivo), reporte, args.tolerancia)
+        for regresion in regresiones:
+            print(f"✗ Regresión: {regresion}")
+        if regresiones:
+            sys.exit(1)
+        print(f"✓ Sin regresiones frente a {args.baseline}")
@@ -2,7 +2,10 @@
 Script para ejecutar el worker de Celery localmente (sin Docker)
 
 Este script inicia un worker de Celery que procesa las tareas de llenado
-de formularios. Usa el pool 'solo' para compatibilidad con Windows.
+de formularios. En Linux/macOS usa el pool 'prefork' con un navegador por
+slot y la concurrencia calculada según CPU/RAM (ver app/worker_capacity.py);
+en Windows usa el pool 'solo'. WORKER_POOL y WORKER_CONCURRENCY lo fuerzan.
+Consume las colas de WORKER_QUEUES, o todas (ver app/queues.py).
 
 Uso:
     python run_celery.py
@@ -15,14 +18,20 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app.celery_app import celery_app
+from app.queues import colas_worker
+from app.worker_capacity import cpus_disponibles, memoria_disponible_mb
 
 if __name__ == '__main__':
     # Configurar argumentos para el worker
+    pool = celery_app.conf.worker_pool
+    concurrencia = celery_app.conf.worker_concurrency
+    colas = colas_worker()
     argv = [
         'worker',
         '--loglevel=info',
-        '--pool=solo',  # Pool 'solo' para Windows
-        '--concurrency=1',
+        f'--pool={pool}',
+        f'--concurrency={concurrencia}',
+        f'--queues={",".join(colas)}',
     ]
     
     print("=" * 60)
@@ -30,6 +39,11 @@ if __name__ == '__main__':
     print("=" * 60)
     print(f"Broker: {celery_app.conf.broker_url}")
     print(f"Backend: {celery_app.conf.result_backend}")
+    memoria = memoria_disponible_mb()
+    print(f"Pool: {pool} | Slots: {concurrencia} | "
+          f"CPUs: {cpus_disponibles():g} | RAM: {f'{memoria} MB' if memoria else 'desconocida'}")
+    print(f"Reciclaje de hijos: cada {celery_app.conf.worker_max_tasks_per_child} tareas")
+    print(f"Colas: {', '.join(colas)}")
     print("=" * 60)
     print("\nPresiona Ctrl+C para detener el worker\n")
     
@@ -0,0 +1,33 @@
+"""
+Script para iniciar la encuesta simulada (app/survey_stub.py)
+
+Sirve los formularios registrados con el mismo DOM que Qualtrics para
+probar y medir los fillers sin tocar las encuestas reales. Para apuntar
+los fillers y el worker a ella:
+
+    FORM_BASE_URL=http://127.0.0.1:8090
+
+Uso:
+    STUB_LATENCY_MS=200 STUB_JITTER_MS=50 python run_stub.py
+"""
+
+import os
+import sys
+
+# Asegurar que el directorio raíz está en el path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.survey_stub import PUERTO_SIMULADA, EncuestaSimulada
+
+if __name__ == '__main__':
+    encuesta = EncuestaSimulada(puerto=PUERTO_SIMULADA)
+    print(f"Encuesta simulada en http://{encuesta.host}:{encuesta.puerto} "
+          f"(latencia {encuesta.latencia_ms} ± {encuesta.jitter_ms} ms)")
+    for formulario in encuesta.formularios.values():
+        print(f"  {formulario.form_type}: {formulario.ruta}")
+    print("Respuestas registradas: GET /__stub__/respuestas")
+
+    try:
+        encuesta.atender()
+    except KeyboardInterrupt:
+        print("\nEncuesta simulada detenida")
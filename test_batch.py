@@ -0,0 +1,80 @@
+"""
+Pruebas de la validación y lectura de lotes (sin Redis ni Celery)
+"""
+
+import asyncio
+import json
+
+import pytest
+
+import app.batch as batch
+from app.batch import EncoladorLote, LoteDemasiadoGrande, elementos_ndjson, validar_elemento
+
+
+def _ejemplo(form_type):
+    with open(f'examples/{form_type}_example.json', 'r') as f:
+        return json.load(f)
+
+
+def test_validacion_por_elemento():
+    """Los elementos inválidos se reportan sin afectar a los válidos"""
+    valido, datos = validar_elemento(0, {'form_type': 'form2', 'data': _ejemplo('form2')})
+    assert valido.errors is None and datos['lugar']
+
+    tipo, datos = validar_elemento(1, {'form_type': 'form9', 'data': {}})
+    assert datos is None and tipo.errors[0]['loc'] == ['form_type']
+
+    incompleto = _ejemplo('form1')
+    del incompleto['proyecto']
+    faltante, datos = validar_elemento(2, {'form_type': 'form1', 'data': incompleto})
+    assert datos is None and faltante.errors[0]['loc'] == ['data', 'proyecto']
+    print("✓ Validación por elemento del lote")
+
+
+def test_ndjson_en_fragmentos():
+    """Las líneas NDJSON se reconstruyen aunque lleguen partidas entre fragmentos"""
+    async def fragmentos():
+        for parte in (b'{"a": 1}\n{"b"', b': 2}\n\nno-json\n', b'{"c": 3}'):
+            yield parte
+
+    async def leer():
+        return [e async for e in elementos_ndjson(fragmentos())]
+
+    elementos = asyncio.run(leer())
+    assert elementos[0] == {'a': 1} and elementos[1] == {'b': 2} and elementos[3] == {'c': 3}
+    assert isinstance(elementos[2], ValueError)
+    print("✓ Lectura NDJSON en streaming")
+
+
+class PipelineNulo:
+    """Redis falso: acepta cualquier comando del pipeline sin guardar nada"""
+
+    def pipeline(self, **kwargs):
+        return self
+
+    def __getattr__(self, nombre):
+        return lambda *args, **kwargs: None
+
+
+def test_lote_demasiado_grande_no_encola_nada(monkeypatch):
+    """Un lote que supera el máximo se rechaza sin haber encolado ningún elemento"""
+    encolados = []
+    monkeypatch.setattr(batch.EncoladorLote, '_encolar_tramo', lambda self, tramo: encolados.append(tramo))
+
+    elemento = {'form_type': 'form2', 'data': _ejemplo('form2')}
+    encolador = EncoladorLote(tamano_tramo=1, max_elementos=2)
+    with pytest.raises(LoteDemasiadoGrande):
+        for indice in range(3):
+            encolador.agregar(indice, elemento)
+    with pytest.raises(LoteDemasiadoGrande):
+        EncoladorLote(max_elementos=2).verificar_tamano(3)
+    assert encolados == []
+
+    monkeypatch.setattr(batch, 'get_redis', lambda: PipelineNulo())
+    encolador = EncoladorLote(tamano_tramo=2, max_elementos=3)
+    for indice in range(3):
+        encolador.agregar(indice, elemento)
+    assert encolados == []
+    encolador.cerrar()
+    assert [len(tramo) for tramo in encolados] == [2, 1]
+    print("✓ Lote demasiado grande rechazado sin encolar")
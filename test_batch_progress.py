@@ -0,0 +1,130 @@
+"""
+Pruebas de los contadores de progreso de lotes con un Redis simulado
+"""
+
+import json
+
+from app import batch_progress
+from app.batch_progress import estado_lote, marcar_exito, marcar_fallo, marcar_inicio, marcar_reintento
+
+
+class RedisFalso:
+    """Subconjunto de comandos de redis-py que usa el progreso de lotes"""
+
+    def __init__(self):
+        self.datos = {}
+
+    def pipeline(self, transaction=True):
+        return PipelineFalso(self)
+
+    def hincrby(self, clave, campo, cantidad):
+        hash_ = self.datos.setdefault(clave, {})
+        hash_[campo] = str(int(hash_.get(campo, 0)) + cantidad)
+
+    def hset(self, clave, campo=None, valor=None, mapping=None):
+        hash_ = self.datos.setdefault(clave, {})
+        hash_.update({k: str(v) for k, v in (mapping or {campo: valor}).items()})
+
+    def hsetnx(self, clave, campo, valor):
+        self.datos.setdefault(clave, {}).setdefault(campo, str(valor))
+
+    def hdel(self, clave, campo):
+        self.datos.get(clave, {}).pop(campo, None)
+
+    def sadd(self, clave, miembro):
+        conjunto = self.datos.setdefault(clave, set())
+        nuevo = miembro not in conjunto
+        conjunto.add(miembro)
+        return int(nuevo)
+
+    def expire(self, clave, segundos):
+        pass
+
+    def hgetall(self, clave):
+        return dict(self.datos.get(clave, {}))
+
+    def rpush(self, clave, *valores):
+        self.datos.setdefault(clave, []).extend(valores)
+
+    def llen(self, clave):
+        return len(self.datos.get(clave, []))
+
+    def lrange(self, clave, inicio, fin):
+        return self.datos.get(clave, [])[inicio:fin + 1]
+
+
+class RedisCaido:
+    def sadd(self, clave, miembro):
+        raise ConnectionError("Redis no disponible")
+
+
+class PipelineFalso:
+    """Acumula comandos y los ejecuta en orden, como un pipeline"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.comandos = []
+
+    def __getattr__(self, nombre):
+        return lambda *args, **kwargs: self.comandos.append((nombre, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.redis, n)(*a, **k) for n, a, k in self.comandos]
+
+
+def test_contadores_de_lote(monkeypatch):
+    """Cada transición mueve una tarea entre contadores y los fallos se paginan"""
+    redis = RedisFalso()
+    monkeypatch.setattr(batch_progress, 'get_redis', lambda: redis)
+    redis.hset('batch:b1', mapping={'creado': 1, 'total': 4, 'aceptados': 3, 'rechazados': 1, 'pendientes': 3})
+
+    marcar_inicio('b1', 't1')
+    marcar_exito('b1', 't1')
+    marcar_inicio('b1', 't2')
+    marcar_reintento('b1', 't2', 0)
+    marcar_inicio('b1', 't2', 1)
+    marcar_fallo('b1', 't2', 'form2', RuntimeError('timeout'))
+
+    estado = estado_lote('b1', offset=0, limite=10)
+    assert estado['contadores'] == {
+        'pendientes': 1, 'en_curso': 0, 'reintentando': 0, 'exitosos': 1, 'fallidos': 1
+    }
+    assert not estado['completado']
+    assert estado['total_fallos'] == 1 and estado['fallos'][0]['task_id'] == 't2'
+    assert estado['por_minuto'] > 0 and estado['eta_segundos'] >= 0
+
+    marcar_inicio('b1', 't3')
+    marcar_exito('b1', 't3')
+    assert estado_lote('b1')['completado']
+    assert estado_lote('otro') is None
+    print("✓ Contadores de lote incrementales")
+
+
+def test_transiciones_idempotentes_y_tareas_vencidas(monkeypatch):
+    """Una entrega repetida no cuenta dos veces y una tarea matada por time limit no queda en curso"""
+    redis = RedisFalso()
+    monkeypatch.setattr(batch_progress, 'get_redis', lambda: redis)
+    redis.hset('batch:b2', mapping={'creado': 1, 'total': 2, 'aceptados': 2, 'pendientes': 2})
+
+    # acks_late: el broker entrega de nuevo la tarea t1 ya terminada
+    for _ in range(2):
+        marcar_inicio('b2', 't1')
+        marcar_exito('b2', 't1')
+    marcar_inicio('b2', 't2', form_type='form3')
+    contadores = estado_lote('b2')['contadores']
+    assert contadores == {'pendientes': 0, 'en_curso': 1, 'reintentando': 0, 'exitosos': 1, 'fallidos': 0}
+
+    # t2 lleva más de BATCH_RUNNING_TIMEOUT en curso: el worker la mató
+    en_curso = json.loads(redis.datos['batch:b2:running']['t2'])
+    redis.datos['batch:b2:running']['t2'] = json.dumps({**en_curso, 'started_at': 0})
+    estado = estado_lote('b2')
+    assert estado['contadores']['en_curso'] == 0 and estado['contadores']['fallidos'] == 1
+    assert estado['completado'] and estado['fallos'][0]['task_id'] == 't2'
+    assert estado['fallos'][0]['form_type'] == 'form3'
+    # Si la tarea reaparece no vuelve a contarse
+    marcar_exito('b2', 't2')
+    assert estado_lote('b2')['contadores']['exitosos'] == 1
+
+    # Sin Redis el formulario sigue: la transición sólo se informa
+    monkeypatch.setattr(batch_progress, 'get_redis', lambda: RedisCaido())
+    marcar_inicio('b2', 't3')
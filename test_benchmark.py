@@ -0,0 +1,30 @@
+"""
+Pruebas del benchmark de formularios (sólo el modo HTTP: sin Chrome)
+"""
+
+from app.benchmark import comparar, ejecutar_benchmark, percentil
+from app.survey_stub import EncuestaSimulada
+
+
+def test_percentiles_por_rango_mas_cercano():
+    valores = [float(v) for v in range(1, 101)]
+    assert (percentil(valores, 50), percentil(valores, 95), percentil(valores, 99)) == (50.0, 95.0, 99.0)
+    assert percentil([3.0], 99) == 3.0
+    assert percentil([], 50) is None
+
+
+def test_reporte_http_contra_encuesta_simulada_y_comparacion():
+    """Cada envío registrado cuenta como exitoso; un p95 mayor a la tolerancia es regresión"""
+    with EncuestaSimulada() as encuesta:
+        reporte = ejecutar_benchmark(encuesta.url_base, modos=('http',), formularios=['form2'], repeticiones=3)
+        assert len(encuesta.respuestas) == 3
+
+    assert reporte['results']['http']['stub_protocol_only']
+    metricas = reporte['results']['http']['forms']['form2']
+    assert (metricas['n'], metricas['errors']) == (3, 0)
+    assert metricas['p50_s'] <= metricas['p95_s'] <= metricas['p99_s']
+    assert metricas['forms_per_hour'] > 0
+
+    peor = {'results': {'http': {'forms': {'form2': dict(metricas, p95_s=metricas['p95_s'] * 2)}}}}
+    assert comparar(reporte, reporte) == []
+    assert any('p95_s' in r for r in comparar(reporte, peor))
@@ -0,0 +1,40 @@
+"""
+Pruebas de los perfiles de arranque de Chrome (sin lanzar el navegador)
+"""
+
+import pytest
+
+from app.chrome_profile import liberar_directorio, opciones_chrome, reservar_directorio, resolver_perfil
+
+
+def test_perfil_ligero_es_headless_y_recortado(monkeypatch):
+    monkeypatch.setenv('CHROME_PROFILE', 'Ligero')
+    opciones = opciones_chrome(directorio='/tmp/perfil-0')
+
+    assert '--headless=new' in opciones.arguments
+    assert '--blink-settings=imagesEnabled=false' in opciones.arguments
+    assert '--user-data-dir=/tmp/perfil-0' in opciones.arguments
+    assert opciones.page_load_strategy == 'eager'
+
+    completo = opciones_chrome('completo', directorio='/tmp/perfil-0')
+    assert not any(a.startswith(('--headless', '--user-data-dir')) for a in completo.arguments)
+    assert '--renderer-process-limit=1' in completo.arguments
+
+    with pytest.raises(ValueError):
+        resolver_perfil('gui')
+
+
+def test_ranura_salta_directorios_en_uso(tmp_path):
+    """Un directorio reservado o con SingletonLock (Chrome corriendo) no se reutiliza"""
+    plantilla = str(tmp_path / 'perfil-{ranura}')
+    (tmp_path / 'perfil-0').mkdir()
+    (tmp_path / 'perfil-0' / 'SingletonLock').symlink_to('host-1234')
+
+    primero = reservar_directorio(plantilla)
+    segundo = reservar_directorio(plantilla)
+    assert (primero, segundo) == (str(tmp_path / 'perfil-1'), str(tmp_path / 'perfil-2'))
+
+    liberar_directorio(primero)
+    assert reservar_directorio(plantilla) == primero
+    liberar_directorio(primero)
+    liberar_directorio(segundo)
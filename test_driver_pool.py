@@ -0,0 +1,127 @@
+"""
+Pruebas del pool de drivers usando navegadores simulados (sin Chrome)
+"""
+
+import threading
+
+from app.driver_pool import DriverPool
+
+
+class DriverFalso:
+    """Imita la parte de la API de WebDriver que usa el pool"""
+
+    def __init__(self):
+        self.window_handles = ['principal']
+        self.sano = True
+        self.cerrado = False
+        self.limpiezas = 0
+        self.switch_to = self
+
+    def window(self, handle):
+        pass
+
+    def execute_script(self, script):
+        if not self.sano:
+            raise RuntimeError("navegador caído")
+        return 1
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.limpiezas += 1
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.cerrado = True
+
+
+def test_pool_reutiliza_y_limpia_drivers():
+    """Un driver devuelto se limpia y se presta de nuevo sin relanzar Chrome"""
+    creados = []
+
+    def fabrica():
+        creados.append(DriverFalso())
+        return creados[-1]
+
+    pool = DriverPool(tamano=1, max_usos=5, fabrica=fabrica)
+
+    with pool.prestar() as d1:
+        pass
+    with pool.prestar() as d2:
+        pass
+
+    assert d1 is d2
+    assert len(creados) == 1
+    assert d1.limpiezas == 2
+    print("✓ Pool reutiliza drivers entre préstamos")
+
+
+def test_pool_recicla_por_usos_y_salud():
+    """Los drivers se reciclan al llegar a max_usos o al fallar el health-check"""
+    pool = DriverPool(tamano=1, max_usos=2, fabrica=DriverFalso)
+
+    d1 = pool.adquirir()
+    pool.liberar(d1)
+    d2 = pool.adquirir()
+    pool.liberar(d2)
+    assert d1 is d2 and d1.cerrado
+
+    d3 = pool.adquirir()
+    assert d3 is not d1
+    pool.liberar(d3)
+    d3.sano = False
+    d4 = pool.adquirir()
+    assert d4 is not d3 and d3.cerrado
+    pool.cerrar()
+    assert d4.cerrado
+    print("✓ Pool recicla drivers agotados o caídos")
+
+
+def test_pool_descarta_driver_si_falla_el_bloque():
+    """Una excepción dentro de prestar() descarta el driver"""
+    pool = DriverPool(tamano=1, fabrica=DriverFalso)
+
+    try:
+        with pool.prestar() as driver:
+            raise ValueError("fallo simulado")
+    except ValueError:
+        pass
+
+    assert driver.cerrado
+    assert pool.estadisticas()['libres'] == 0
+    print("✓ Pool descarta drivers tras un fallo")
+
+
+def test_pool_no_excede_su_tamano_mientras_limpia():
+    """Un driver en limpieza sigue ocupando su lugar: nadie crea otro mientras tanto"""
+    creados = []
+    limpiando = threading.Event()
+    continuar = threading.Event()
+
+    class DriverLento(DriverFalso):
+        def execute_cdp_cmd(self, cmd, params):
+            limpiando.set()
+            continuar.wait(5)
+
+    def fabrica():
+        creados.append(DriverLento())
+        return creados[-1]
+
+    pool = DriverPool(tamano=1, fabrica=fabrica)
+    driver = pool.adquirir()
+    hilo = threading.Thread(target=pool.liberar, args=(driver,))
+    hilo.start()
+    limpiando.wait(5)
+
+    try:
+        pool.adquirir(timeout=0.05)
+        assert False, "El pool prestó un segundo driver"
+    except TimeoutError:
+        pass
+    assert pool.estadisticas()['en_revision'] == 1
+
+    continuar.set()
+    hilo.join(5)
+    assert pool.adquirir(timeout=1) is driver
+    assert len(creados) == 1
+    print("✓ Pool respeta su tamaño durante la limpieza")
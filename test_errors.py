@@ -0,0 +1,54 @@
+"""
+Pruebas de los errores tipados y el reporte de respuestas (sin Chrome)
+"""
+
+import pytest
+from selenium.common.exceptions import ElementClickInterceptedException, NoSuchElementException
+
+from app.errors import (
+    CampoNoEncontrado,
+    CampoNoInteractuable,
+    DatosInvalidos,
+    ReporteRespuestas,
+    tipificar,
+)
+from app.retries import clasificar_error
+
+
+def test_tipificar_y_reporte_sin_fallo_rapido():
+    error = tipificar(NoSuchElementException("QR~QID5"), 'seccion_1[3]')
+    assert isinstance(error, CampoNoEncontrado)
+    assert error.campo == 'seccion_1[3]'
+    assert clasificar_error(error) == 'selector'
+    assert isinstance(tipificar(ElementClickInterceptedException()), CampoNoInteractuable)
+    assert clasificar_error(tipificar(KeyError('opcion'))) == 'validacion'
+
+    respuestas = ReporteRespuestas('form2', fallo_rapido=False)
+    respuestas.respondida('seccion_1[1]', verificada=True)
+    with respuestas.campo('sugerencias'):
+        raise NoSuchElementException("QR~QID51")
+    with respuestas.campo('pqrs'):
+        pass
+    assert respuestas.como_dict()['failed'] == 1
+
+    # Respondido en un reintento: deja de contar como fallido
+    respuestas.respondida('sugerencias')
+    assert respuestas.como_dict() == {'answered': 3, 'verified': 1, 'failed': 0, 'failures': []}
+
+
+def test_fallo_rapido_detiene_en_el_primer_campo(monkeypatch):
+    monkeypatch.setenv('FORM_FAIL_FAST', '0')
+    monkeypatch.setenv('FORM3_FAIL_FAST', '1')
+    assert not ReporteRespuestas('form2').fallo_rapido
+    respuestas = ReporteRespuestas('form3')
+    assert respuestas.fallo_rapido
+
+    # El error atraviesa el `except` del filler que envuelve al campo sin registrarse dos veces
+    with pytest.raises(DatosInvalidos) as error:
+        try:
+            with respuestas.campo('pqrs:Correo'):
+                raise ValueError("Opción sin mapeo")
+        except Exception as e:
+            respuestas.fallida('pqrs', e)
+    assert error.value.campo == 'pqrs:Correo'
+    assert [f['field'] for f in respuestas.como_dict()['failures']] == ['pqrs:Correo']
@@ -0,0 +1,108 @@
+"""
+Pruebas de la resolución de campos a localizadores estables (sin Chrome)
+"""
+
+from selenium.webdriver.common.by import By
+
+from app.field_locators import ResolutorLocalizadores
+from app.form_engine import PlanFormulario
+from app.http_engine import PaginaHTML
+
+
+class DriverFalso:
+    """Sólo encuentra el botón por XPath hasta que se le pregunta por su id"""
+
+    def __init__(self):
+        self.busquedas = []
+
+    def find_elements(self, por, valor):
+        self.busquedas.append((por, valor))
+        if por == By.XPATH or (por == By.CSS_SELECTOR and valor == '#NextButton'):
+            return ['boton']
+        return []
+
+    def execute_script(self, script, elemento):
+        return '#NextButton'
+
+
+def test_xpath_se_reemplaza_por_css_y_se_cachea_por_pagina():
+    """El XPath sólo se usa una vez; luego se cachea el elemento y se aprende su id"""
+    driver = DriverFalso()
+    aprendidos = {}
+    candidatos = [(By.ID, 'NoExiste'), (By.XPATH, '/html/body/div[3]/input')]
+
+    primero = ResolutorLocalizadores(driver, 'form2', aprendidos)
+    assert primero.elemento('boton_enviar', candidatos) == 'boton'
+    assert primero.elemento('boton_enviar', candidatos) == 'boton'
+    assert len(driver.busquedas) == 2
+    assert aprendidos[('form2', 'boton_enviar')] == '#NextButton'
+
+    # Tras navegar (u otro filler del proceso) el CSS aprendido reemplaza al
+    # XPath: se prueba después del id declarado y el XPath ya no se evalúa
+    primero.invalidar()
+    driver.busquedas.clear()
+    assert primero.elemento('boton_enviar', list(reversed(candidatos))) == 'boton'
+    assert driver.busquedas == [(By.ID, 'NoExiste'), (By.CSS_SELECTOR, '#NextButton')]
+
+
+def test_operaciones_xpath_reciben_css_aprendido_sin_modificarse():
+    """El plan compartido no se altera; las copias llevan el CSS aprendido"""
+    aprendidos = {}
+    localizadores = ResolutorLocalizadores(DriverFalso(), 'form3', aprendidos)
+    op = {'tipo': 'label_xpath', 'xpath': '/html/x', 'clave': 'recomendacion'}
+
+    localizadores.aprender([op], [{'selector': 'label[for="QR~QID10~11"]'}])
+    preparada, = localizadores.preparar([op])
+
+    assert preparada['css'] == 'label[for="QR~QID10~11"]'
+    assert 'css' not in op
+
+
+def test_qid_declarado_se_usa_antes_que_el_xpath():
+    """Una escala con 'qid' se ubica por su label[for]; el XPath queda de respaldo"""
+    spec = {
+        'form_type': 'form9',
+        'url': 'https://example.com',
+        'paginas': [{'numero': 1, 'navegacion': 'enviar', 'campos': [
+            {'tipo': 'escala', 'clave': 'recomendacion', 'pregunta': 8, 'qid': 31},
+            {'tipo': 'si_no', 'clave': 'ha_reclamado', 'pregunta': 9},
+        ]}],
+    }
+    escala, si_no = PlanFormulario(spec).paginas[0].operaciones({'recomendacion': 9, 'ha_reclamado': 'No'})
+    assert escala['entrada'] == 'QR~QID31~10' and 'entrada' not in si_no
+
+    driver = DriverFalso()
+    localizadores = ResolutorLocalizadores(driver, 'form9', {})
+    assert localizadores.candidatos(escala) == [(By.CSS_SELECTOR, 'label[for="QR~QID31~10"]'),
+                                                (By.XPATH, escala['xpath'])]
+    preparada, sin_qid = localizadores.preparar([escala, si_no])
+    assert preparada['css'] == 'label[for="QR~QID31~10"]' and 'css' not in sin_qid
+
+    # Al reanudar, la página se reconoce por el XPath sólo si el label no está
+    assert localizadores.presente(escala)
+    assert driver.busquedas == [(By.CSS_SELECTOR, 'label[for="QR~QID31~10"]'), (By.XPATH, escala['xpath'])]
+
+    # El motor HTTP toma el input por su id sin evaluar el XPath
+    pagina = PaginaHTML('<html><body><form><input type="radio" id="QR~QID31~10" name="QR~QID31" value="10">'
+                        '</form></body></html>', 'https://example.com')
+    assert pagina.campo(escala) == ('QR~QID31', '10')
+
+
+def test_elementos_de_operaciones_se_cachean_por_pagina():
+    """Reanudar, reintentar y responder un campo en la misma página lo buscan una sola vez"""
+    driver = DriverFalso()
+    localizadores = ResolutorLocalizadores(driver, 'form2', {})
+    texto = {'tipo': 'texto', 'clave': 'nombre', 'id': 'QR~QID57', 'valor': 'Ana'}
+    escala = {'tipo': 'label_xpath', 'clave': 'recomendacion', 'xpath': '/html/x'}
+
+    assert not localizadores.presente(texto)
+    assert localizadores.presente(escala)
+    assert localizadores.elemento_operacion(escala) == 'boton'
+    assert driver.busquedas == [(By.ID, 'QR~QID57'), (By.XPATH, '/html/x')]
+
+    # Un elemento obsoleto se olvida; al navegar se descartan todos
+    localizadores.olvidar(escala)
+    localizadores.elemento_operacion(escala)
+    localizadores.invalidar()
+    localizadores.elemento_operacion(escala)
+    assert driver.busquedas[2:] == [(By.CSS_SELECTOR, '#NextButton')] * 2
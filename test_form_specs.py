@@ -0,0 +1,254 @@
+"""
+Pruebas del motor de formularios declarativo (sin Chrome)
+"""
+
+import copy
+import time
+import json
+from pathlib import Path
+
+import pytest
+
+from app import form_engine, waits
+from app.bulk_fill import SCRIPT_LLENAR_MATRIZ
+from app.field_locators import SCRIPT_SELECTOR_ESTABLE
+from app.form_engine import (
+    PlanFormulario,
+    _compilar_campo,
+    _esqueleto,
+    filler_para,
+    operaciones_formulario,
+    plan_formulario,
+)
+from app.form_specs.form2 import MEDIOS_PQRS, SECCIONES_CONFIG
+from app.models import Form2Request
+
+
+EJEMPLOS = Path(__file__).parent / 'examples'
+
+# Operaciones que compilaban los scripts form1.py–form4.py originales
+# (`compilar_pagina_N`) para cada variante de `_variantes`, página por página
+OPERACIONES_LEGACY = json.loads((EJEMPLOS / 'legacy_operations.json').read_text(encoding='utf-8'))
+
+
+def _variantes(datos):
+    """El ejemplo tal cual y con todas las respuestas Si/No y escalas invertidas"""
+    invertido = copy.deepcopy(datos)
+    invertido['recomendacion'] = 3 if datos['recomendacion'] in (9, 10) else 10
+    invertido['satisfaccion'] = 4 if datos['satisfaccion'] > 6 else 10
+    for clave, valor in invertido['pagina_2'].items():
+        if isinstance(valor, str) and valor.lower() in ('si', 'no'):
+            invertido['pagina_2'][clave] = 'No' if valor.lower() == 'si' else 'Si'
+    return [datos, invertido]
+
+
+@pytest.mark.parametrize('form_type', ['form1', 'form2', 'form3', 'form4'])
+def test_plan_equivale_a_los_fillers_originales(form_type):
+    """La especificación compila exactamente las operaciones de los compilar_pagina_N originales"""
+    datos = json.loads((EJEMPLOS / f'{form_type}_example.json').read_text(encoding='utf-8'))
+    plan = plan_formulario(form_type)
+
+    for variante, esperadas in zip(_variantes(datos), OPERACIONES_LEGACY[form_type]):
+        obtenidas = [pagina.operaciones(variante) for pagina in plan.paginas]
+        assert obtenidas == esperadas
+    print(f"✓ {form_type}: plan declarativo equivalente")
+
+
+def test_matriz_y_checkboxes_compilados():
+    """Cada celda de matriz es un radio con su celda de reintento; las opciones desconocidas se omiten"""
+    config = SECCIONES_CONFIG['proceso_aprendizaje']
+    ops = _compilar_campo({'tipo': 'matriz', 'seccion': 'proceso_aprendizaje'}, SECCIONES_CONFIG)(
+        {'proceso_aprendizaje': [5]})
+    assert len(ops) == len(config['choice_ids'])
+    assert all(op['tipo'] == 'radio' and 'celda' in op for op in ops)
+    assert ops[0]['id'] == f"QR~QID{config['QID']}#1~3~5" and ops[1]['id'].endswith('~10')
+
+    enlazar = _compilar_campo({'tipo': 'checkboxes', 'clave': 'pqrs', 'qid': '65', 'opciones': MEDIOS_PQRS}, {})
+    ops = enlazar({'pqrs': ['Call Center', 'opción inexistente']})
+    assert len(ops) == 1 and ops[0]['id'].startswith('QR~QID65~')
+
+
+def test_spec_invalida_falla_al_compilar():
+    """Una sección inexistente se detecta al compilar, no durante el llenado"""
+    spec = {
+        'form_type': 'form5',
+        'url': 'https://example.com',
+        'secciones': {},
+        'paginas': [{'numero': 1, 'campos': [{'tipo': 'matriz', 'seccion': 'no_existe'}]}],
+    }
+    with pytest.raises(ValueError):
+        PlanFormulario(spec)
+
+
+def test_plan_memorizado_por_forma_de_los_datos():
+    """Datos con las mismas ramas reutilizan el esqueleto; sólo cambian los valores enlazados"""
+    datos = json.loads((EJEMPLOS / 'form2_example.json').read_text(encoding='utf-8'))
+    otros = copy.deepcopy(datos)
+    otros['pagina_2']['proceso_aprendizaje'] = [7, 7, 7, 7]
+
+    _esqueleto.cache_clear()
+    primeras = operaciones_formulario('form2', Form2Request.model_validate(datos))
+    segundas = operaciones_formulario('form2', otros)
+    info = _esqueleto.cache_info()
+
+    assert (info.misses, info.hits) == (1, 1)
+    assert primeras[1][0]['id'].endswith('~10') and segundas[1][0]['id'].endswith('~7')
+    assert [len(p) for p in primeras] == [len(p) for p in segundas]
+
+
+class ElementoListo:
+    """Elemento visible, habilitado y marcado (para las esperas por condición)"""
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def is_selected(self):
+        return True
+
+
+class DriverScripts:
+    """
+    Responde los scripts de llenado en lote con todas las respuestas
+    verificadas; las esperas encuentran todo listo y el DOM estable
+    """
+
+    def __init__(self):
+        self.scripts = []
+
+    def set_script_timeout(self, segundos):
+        pass
+
+    def execute_async_script(self, script, operaciones, espera_ms):
+        self.scripts.append('pagina')
+        return [{'clave': op['clave'], 'ok': True, 'verificado': True, 'error': None, 'selector': None}
+                for op in operaciones]
+
+    def execute_script(self, script, *args):
+        if script == SCRIPT_SELECTOR_ESTABLE:
+            return None
+        if script != SCRIPT_LLENAR_MATRIZ:
+            return 10_000
+        self.scripts.append('matriz')
+        return [{'id': '', 'ok': True, 'metodo': 'label', 'error': None} for _ in args[0]]
+
+    def find_element(self, por, valor):
+        return ElementoListo()
+
+    def find_elements(self, por, valor):
+        return [ElementoListo()]
+
+
+@pytest.mark.parametrize('llenado_pagina', [True, False])
+def test_avance_por_seccion_en_todos_los_modos(monkeypatch, llenado_pagina):
+    """Cada sección de matriz informa su avance, llenando por página o por sección"""
+    datos = json.loads((EJEMPLOS / 'form2_example.json').read_text(encoding='utf-8'))
+    campo_a_campo = []
+    monkeypatch.setattr(form_engine, 'aplicar_operacion_webdriver', lambda driver, op, elemento=None: campo_a_campo.append(op['clave']))
+    eventos = []
+    driver = DriverScripts()
+    filler = filler_para('form2')(driver=driver, notificar=lambda evento, **d: eventos.append((evento, d.get('seccion'))),
+                                  llenado_lote=True, llenado_pagina=llenado_pagina)
+
+    pagina = plan_formulario('form2').paginas[1]
+    operaciones = operaciones_formulario('form2', datos)[1]
+    filler.llenar_pagina(pagina, operaciones)
+
+    secciones = [op['seccion'] for op in operaciones if 'seccion' in op]
+    iniciadas = [seccion for evento, seccion in eventos if evento == 'seccion_iniciada']
+    assert iniciadas == list(dict.fromkeys(secciones))
+    assert [s for e, s in eventos if e == 'seccion_completada'] == iniciadas
+    assert filler.respuestas.como_dict()['failed'] == 0
+    if llenado_pagina:
+        assert driver.scripts == ['pagina'] and campo_a_campo == []
+    else:
+        # Un script por matriz; el resto de los campos con Selenium
+        assert driver.scripts == ['matriz'] * len(iniciadas)
+        assert len(campo_a_campo) == len(operaciones) - len(secciones)
+
+
+def test_modo_sleep_reproduce_las_pausas_originales(monkeypatch):
+    """Campo a campo en modo 'sleep' duerme lo mismo que los fillers originales"""
+    datos = json.loads((EJEMPLOS / 'form2_example.json').read_text(encoding='utf-8'))
+    monkeypatch.setattr(form_engine, 'aplicar_operacion_webdriver', lambda driver, op, elemento=None: None)
+    pausas = []
+    monkeypatch.setattr(waits.time, 'sleep', pausas.append)
+    filler = filler_para('form2')(driver=DriverScripts(), modo_espera='sleep', llenado_lote=False, llenado_pagina=False)
+
+    pagina = plan_formulario('form2').paginas[1]
+    operaciones = operaciones_formulario('form2', datos)[1]
+    filler.llenar_pagina(pagina, operaciones)
+
+    tipos = [op['tipo'] for op in operaciones]
+    secciones = list(dict.fromkeys(op['seccion'] for op in operaciones if 'seccion' in op))
+    condicionales = [s for s in secciones if s in filler.plan.condicionales]
+    esperado = (0.3 * (tipos.count('radio') + tipos.count('label_xpath'))   # celda / opción marcada
+                + 0.6 * tipos.count('checkbox') + 0.5 * bool(tipos.count('checkbox'))
+                + 0.5 * (len(secciones) + len(condicionales))              # fin de sección, display logic
+                + 1)                                                       # fin de página
+    assert condicionales and sum(pausas) == pytest.approx(esperado, abs=0.05)
+    assert filler.respuestas.como_dict()['failed'] == 0
+
+
+class DriverDisplayLogic(DriverScripts):
+    """
+    Página cuya sección QID55 aparece por display logic 0,2 s después de
+    responder Si a `apoyo_piscosocial`; el script por sección no encuentra
+    las celdas de una sección que todavía no se ve ni las de `ocultas`
+    """
+
+    def __init__(self, ocultas=()):
+        super().__init__()
+        self.ocultas = set(ocultas)
+        self.visible_desde = None
+
+    def responder(self, op):
+        if op['clave'] == 'apoyo_piscosocial':
+            self.visible_desde = time.monotonic() + 0.2
+
+    def visible(self, qid):
+        if qid in self.ocultas:
+            return False
+        return qid != '55' or (self.visible_desde is not None and time.monotonic() >= self.visible_desde)
+
+    def execute_script(self, script, *args):
+        if script != SCRIPT_LLENAR_MATRIZ:
+            return super().execute_script(script, *args)
+        self.scripts.append('matriz')
+        return [{'id': '', 'ok': self.visible(qid), 'metodo': 'label',
+                 'error': None if self.visible(qid) else 'no_encontrado'}
+                for qid, _, _, _ in args[0]]
+
+    def find_elements(self, por, valor):
+        elemento = ElementoListo()
+        if valor.startswith('QID') and not self.visible(valor[3:]):
+            elemento.is_displayed = lambda: False
+        return [elemento]
+
+
+def test_seccion_por_display_logic_en_llenado_por_seccion(monkeypatch):
+    """El script por sección espera a su sección condicional; lo no encontrado se reintenta con Selenium"""
+    datos = json.loads((EJEMPLOS / 'form2_example.json').read_text(encoding='utf-8'))
+    datos['pagina_2']['apoyo_piscosocial'] = 'Si'
+    driver = DriverDisplayLogic(ocultas={'76'})
+    campo_a_campo = []
+
+    def aplicar(driver_, op, elemento=None):
+        driver.responder(op)
+        campo_a_campo.append(op['clave'])
+
+    monkeypatch.setattr(form_engine, 'aplicar_operacion_webdriver', aplicar)
+    filler = filler_para('form2')(driver=driver, llenado_lote=True, llenado_pagina=False)
+    assert filler.respuestas.fallo_rapido
+
+    pagina = plan_formulario('form2').paginas[1]
+    filler.llenar_pagina(pagina, operaciones_formulario('form2', datos)[1])
+
+    # QID55 se llenó en su script tras esperar la display logic; QID76 (alimentacion)
+    # no apareció para el script y se llenó celda a celda en lugar de detener el formulario
+    assert not any(clave.startswith('profesionales_psicosocial') for clave in campo_a_campo)
+    assert sum(clave.startswith('alimentacion[') for clave in campo_a_campo) == \
+        len(SECCIONES_CONFIG['alimentacion']['choice_ids'])
+    assert filler.respuestas.como_dict()['failed'] == 0
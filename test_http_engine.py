@@ -0,0 +1,143 @@
+"""
+Pruebas del motor de envío por HTTP (sin red ni Chrome)
+"""
+
+import pytest
+from urllib3 import HTTPHeaderDict
+
+from app import http_engine
+from app.bulk_fill import op_checkbox, op_radio, op_si_no, op_texto
+from app.http_engine import (
+    ErrorEnvioIncierto,
+    MotorHTTPNoPermitido,
+    PaginaHTML,
+    SesionEncuesta,
+    _charset,
+    _pasos_xpath,
+    filler_http_para,
+)
+
+
+def _anidar(xpath, hoja):
+    """HTML mínimo en el que `xpath` ubica a `hoja` (hermanos vacíos para cada posición)"""
+    pasos = _pasos_xpath(xpath)
+    tag, posicion = pasos[-1]
+    html = f"<{tag}></{tag}>" * (posicion - 1) + hoja
+    for tag, posicion in reversed(pasos[:-1]):
+        html = f"<{tag}></{tag}>" * (posicion - 1) + f"<{tag}>{html}</{tag}>"
+    return html
+
+
+class RespuestaFalsa:
+    def __init__(self, status, html='', **cabeceras):
+        self.status = status
+        self.data = html.encode('utf-8')
+        self.headers = HTTPHeaderDict({'Content-Type': 'text/html; charset=utf-8'})
+        for nombre, valor in cabeceras.items():
+            self.headers.add(nombre.replace('_', '-'), valor)
+
+
+class PoolFalso:
+    """Responde en orden las respuestas preparadas y registra las peticiones"""
+
+    def __init__(self, respuestas):
+        self.respuestas = list(respuestas)
+        self.peticiones = []
+
+    def request(self, metodo, url, body=None, headers=None, **kwargs):
+        self.peticiones.append((metodo, url, body, dict(headers or {})))
+        return self.respuestas.pop(0)
+
+
+def test_operaciones_del_plan_se_resuelven_a_campos_del_formulario():
+    """Radios, checkboxes, textos y labels por XPath se envían como los enviaría el navegador"""
+    op_label = op_si_no(1, 'No', 'apoyo_piscosocial')
+    html = _anidar(op_label['xpath'], '<label for="QR~QID8~2">No</label>').replace(
+        '</body>',
+        '<input type="radio" id="QR~QID8~2" name="QR~QID8" value="2">'
+        '<input type="radio" id="QR~QID27#1~3~10" name="QR~QID27#1~3" value="10">'
+        '<input type="checkbox" id="QR~QID65~7" name="QR~QID65~7" value="Selected">'
+        '<textarea id="QR~QID57" name="QR~QID57"></textarea></body>'
+    )
+    pagina = PaginaHTML(html, 'http://encuesta/jfe/form/SV_x')
+
+    assert pagina.campo(op_label) == ('QR~QID8', '2')
+    assert pagina.campo(op_radio('QR~QID27#1~3~10')) == ('QR~QID27#1~3', '10')
+    assert pagina.campo(op_checkbox('QR~QID65~7')) == ('QR~QID65~7', 'Selected')
+    assert pagina.campo(op_texto('QR~QID57', 'Bogotá')) == ('QR~QID57', 'Bogotá')
+
+
+def test_sesion_conserva_cookies_en_redirecciones_y_envia_campos_ocultos():
+    """La cookie del salto inicial viaja en el POST, junto con los campos ocultos de la página"""
+    primera = (
+        '<html><body><form action="/jfe/form/SV_x/next" method="post">'
+        '<input type="hidden" name="SessionId" value="FS_1">'
+        '<input type="text" id="QR~QID57" name="QR~QID57">'
+        '<input type="submit" id="NextButton" name="NextButton" value="→">'
+        '</form></body></html>'
+    )
+    pool = PoolFalso([
+        RespuestaFalsa(302, Location='/jfe/form/SV_x', Set_Cookie='sesion=abc; Path=/'),
+        RespuestaFalsa(200, primera),
+        RespuestaFalsa(200, '<html><body><div id="EndOfSurvey">Gracias</div></body></html>'),
+    ])
+    sesion = SesionEncuesta(pool)
+
+    pagina = sesion.abrir('http://encuesta/jfe/form/SV_x?Q_CHL=qr')
+    final = sesion.enviar(pagina, [pagina.campo(op_texto('QR~QID57', 'Sede Norte'))])
+
+    metodo, url, cuerpo, cabeceras = pool.peticiones[-1]
+    assert (metodo, url) == ('POST', 'http://encuesta/jfe/form/SV_x/next')
+    assert cabeceras['Cookie'] == 'sesion=abc'
+    assert cuerpo == 'SessionId=FS_1&QR~QID57=Sede+Norte&NextButton=%E2%86%92'
+    assert final.finalizada and sesion.peticiones == 3
+
+
+def test_fin_de_encuesta_exige_el_marcador(monkeypatch):
+    """Una página sin formulario ni EndOfSurvey tras el POST final es un envío incierto"""
+    monkeypatch.setenv('FORM_BASE_URL', 'http://127.0.0.1:8090')
+    assert not PaginaHTML('<html><body><p>Servicio no disponible</p></body></html>', 'http://encuesta').finalizada
+    assert PaginaHTML('<html><body><div id="EndOfSurvey">Gracias</div></body></html>', 'http://encuesta').finalizada
+
+    filler_class = filler_http_para('form1')
+    paginas = len(filler_class(respaldo=False).plan.paginas)
+    monkeypatch.setattr(http_engine, 'operaciones_formulario', lambda form_type, datos: [[]] * paginas)
+    pool = PoolFalso(
+        [RespuestaFalsa(200, f'<html><body><form><input type="text" name="p{i}"></form></body></html>')
+         for i in range(paginas)]
+        + [RespuestaFalsa(200, '<html><body><p>Servicio no disponible</p></body></html>')]
+    )
+    filler = filler_class(respaldo=True, pool=pool)
+
+    with pytest.raises(ErrorEnvioIncierto):
+        filler.ejecutar({})
+    assert filler.envio_final_iniciado and len(pool.respuestas) == 0
+
+
+def test_motor_experimental_se_niega_a_enviar_a_qualtrics(monkeypatch):
+    """Sin redirección a la encuesta simulada (o redirigido a otro host de Qualtrics) el filler no se crea"""
+    monkeypatch.delenv('FORM_BASE_URL', raising=False)
+    monkeypatch.delenv('FORM2_URL', raising=False)
+    with pytest.raises(MotorHTTPNoPermitido):
+        filler_http_para('form2')(respaldo=False)
+
+    monkeypatch.setenv('FORM2_URL', 'https://otra.qualtrics.com/jfe/form/SV_x')
+    with pytest.raises(MotorHTTPNoPermitido):
+        filler_http_para('form2')(respaldo=False)
+
+    monkeypatch.setenv('FORM2_URL', 'http://127.0.0.1:8090/jfe/form/SV_x')
+    assert filler_http_para('form2')(respaldo=False).url.startswith('http://127.0.0.1:8090')
+
+
+def test_charset_con_comillas_o_desconocido():
+    """El charset se lee sin comillas; uno desconocido o ausente se decodifica como utf-8"""
+    assert _charset('text/html; charset="ISO-8859-1"') == 'iso8859-1'
+    assert _charset("text/html; charset='utf-8'; foo=bar") == 'utf-8'
+    assert _charset('text/html; charset=no-existe') == 'utf-8'
+    assert _charset('text/html') == 'utf-8'
+
+    pool = PoolFalso([RespuestaFalsa(200, '')])
+    pool.respuestas[0].data = '<html><body><p id="x">Año</p></body></html>'.encode('latin-1')
+    pool.respuestas[0].headers['Content-Type'] = 'text/html; charset="latin-1"'
+    pagina = SesionEncuesta(pool).abrir('http://encuesta/jfe/form/SV_x')
+    assert pagina.elemento('x') is not None
@@ -0,0 +1,143 @@
+"""
+Pruebas de las claves de idempotencia y el registro de envíos con un Redis simulado
+"""
+
+import json
+from types import SimpleNamespace
+
+from app import idempotency
+from app.idempotency import (
+    clave_idempotencia,
+    clave_tarea,
+    envio_registrado,
+    liberar,
+    registrar_envio,
+    reservar,
+)
+from app.routers import forms
+
+
+class RedisFalso:
+    """Subconjunto de comandos de redis-py que usa la idempotencia (sin expiración)"""
+
+    def __init__(self):
+        self.datos = {}
+
+    def set(self, clave, valor, nx=False, ex=None):
+        if nx and clave in self.datos:
+            return None
+        self.datos[clave] = valor
+        return True
+
+    def get(self, clave):
+        return self.datos.get(clave)
+
+    def delete(self, clave):
+        self.datos.pop(clave, None)
+
+
+class TareaFalsa:
+    """`execute_form_task` que anota lo encolado"""
+
+    def __init__(self):
+        self.encoladas = []
+
+    def apply_async(self, args, kwargs=None, task_id=None, **opciones):
+        self.encoladas.append((kwargs or {}).get('idempotency_key'))
+        return SimpleNamespace(id=task_id or f"t{len(self.encoladas)}")
+
+
+class RedisCaido:
+    def get(self, clave):
+        raise ConnectionError("Redis no disponible")
+
+    set = get
+
+
+def _ejemplo(form_type):
+    with open(f'examples/{form_type}_example.json', 'r') as f:
+        return json.load(f)
+
+
+def test_reserva_retorna_la_tarea_original(monkeypatch):
+    redis = RedisFalso()
+    monkeypatch.setattr(idempotency, 'get_redis', lambda: redis)
+
+    datos = _ejemplo('form2')
+    reordenados = dict(reversed(list(datos.items())))
+    # Sin cabecera el contenido sólo es clave si se pide
+    assert clave_idempotencia('form2', datos) is None
+    clave = clave_idempotencia('form2', datos, por_contenido=True)
+    assert clave == clave_idempotencia('form2', reordenados, por_contenido=True)
+    assert clave != clave_idempotencia('form3', datos, por_contenido=True)
+    # La cabecera del cliente manda sobre el contenido
+    assert clave_idempotencia('form2', datos, 'pedido-7') == clave_idempotencia('form2', {}, 'pedido-7')
+
+    assert reservar('form2', clave, 't1') is None
+    assert reservar('form2', clave, 't2') == 't1'
+
+    # Sólo la tarea dueña de la reserva la libera
+    liberar('form2', clave, 't2')
+    assert reservar('form2', clave, 't3') == 't1'
+    liberar('form2', clave, 't1')
+    assert reservar('form2', clave, 't3') is None
+
+
+def test_registro_de_envios(monkeypatch):
+    redis = RedisFalso()
+    monkeypatch.setattr(idempotency, 'get_redis', lambda: redis)
+
+    clave = clave_idempotencia('form1', _ejemplo('form1'), 'pedido-1')
+    assert envio_registrado('form1', clave) is None
+    registrar_envio('form1', clave, 't1')
+    assert envio_registrado('form1', clave)['task_id'] == 't1'
+
+    monkeypatch.setenv('IDEMPOTENCY', '0')
+    assert envio_registrado('form1', clave) is None
+
+    # Sin Redis el worker llena como antes
+    monkeypatch.delenv('IDEMPOTENCY')
+    monkeypatch.setattr(idempotency, 'get_redis', lambda: RedisCaido())
+    assert envio_registrado('form1', clave) is None
+    registrar_envio('form1', clave, 't2')
+
+
+def test_respuestas_iguales_sin_clave_no_se_deduplican(monkeypatch):
+    """Dos encuestados con las mismas respuestas son dos envíos; la clave explícita sí deduplica"""
+    redis = RedisFalso()
+    tarea = TareaFalsa()
+    monkeypatch.setattr(idempotency, 'get_redis', lambda: redis)
+    monkeypatch.setattr(forms, 'execute_form_task', tarea)
+    datos = _ejemplo('form2')
+
+    primero, duplicado_1 = forms._encolar_formulario('form2', datos)
+    segundo, duplicado_2 = forms._encolar_formulario('form2', datos)
+    assert primero != segundo and not duplicado_1 and not duplicado_2
+    # Sin clave no se reserva nada; el worker registra el envío por task_id
+    assert redis.datos == {} and tarea.encoladas == [None, None]
+    assert clave_tarea(primero) != clave_tarea(segundo)
+
+    original, _ = forms._encolar_formulario('form2', datos, 'pedido-9')
+    assert forms._encolar_formulario('form2', datos, 'pedido-9') == (original, True)
+    original, _ = forms._encolar_formulario('form2', datos, por_contenido=True)
+    assert forms._encolar_formulario('form2', datos, por_contenido=True) == (original, True)
+    assert len(tarea.encoladas) == 4
+
+
+def test_lista_en_pestanas_se_encola_una_vez(monkeypatch):
+    """La lista en pestañas crea su lote y se deduplica con su propia clave"""
+    redis = RedisFalso()
+    tarea = TareaFalsa()
+    lotes = []
+    monkeypatch.setattr(idempotency, 'get_redis', lambda: redis)
+    monkeypatch.setattr(forms, 'execute_form_tabs_task', tarea)
+    monkeypatch.setattr(forms, 'execute_form_task', tarea)
+    monkeypatch.setattr(forms, 'registrar_lote', lambda batch_id, total: lotes.append((batch_id, total)))
+    lista = [_ejemplo('form2')] * 2
+
+    task_id, duplicado = forms._encolar_pestanas('form2', lista, 'pedido-3')
+    assert not duplicado and lotes == [(task_id, 2)]
+    assert forms._encolar_pestanas('form2', lista, 'pedido-3') == (task_id, True)
+    # La misma cabecera en el endpoint individual es otro envío
+    assert not forms._encolar_formulario('form2', lista[0], 'pedido-3')[1]
+    assert tarea.encoladas[0] != clave_idempotencia('form2', lista[0], 'pedido-3')
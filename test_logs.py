@@ -0,0 +1,55 @@
+"""
+Pruebas del logging estructurado (contexto, formato JSON y formato perezoso)
+"""
+
+import io
+import json
+
+import pytest
+
+from app.logs import configurar_logging, contexto_log, detener_logging, obtener_logger, seguir_evento
+
+
+@pytest.fixture
+def salida():
+    destino = io.StringIO()
+    configurar_logging('INFO', 'json', destino)
+    yield destino
+    configurar_logging()
+
+
+class Costoso:
+    """Cuenta cuántas veces se formatea"""
+
+    veces = 0
+
+    def __str__(self):
+        Costoso.veces += 1
+        return 'costoso'
+
+
+def test_contexto_de_tarea_y_pagina_en_cada_registro(salida):
+    log = obtener_logger('prueba')
+    with contexto_log(task_id='t-1', form_type='form2'):
+        seguir_evento('pagina_iniciada', pagina=2)
+        seguir_evento('seccion_iniciada', seccion='talento_humano')
+        log.info("✓ Sección '%s' completada", 'Talento humano')
+    log.warning("sin contexto")
+    detener_logging()
+
+    con_contexto, sin_contexto = [json.loads(linea) for linea in salida.getvalue().splitlines()]
+    assert con_contexto['message'] == "✓ Sección 'Talento humano' completada"
+    assert (con_contexto['task_id'], con_contexto['form_type'], con_contexto['page'], con_contexto['section']) == \
+        ('t-1', 'form2', 2, 'talento_humano')
+    assert 'task_id' not in sin_contexto
+
+
+def test_registros_debug_no_se_formatean_con_nivel_info(salida):
+    log = obtener_logger('prueba')
+    Costoso.veces = 0
+    log.debug("Celda %s", Costoso())
+    assert Costoso.veces == 0
+
+    log.info("Página %s", Costoso())
+    detener_logging()
+    assert json.loads(salida.getvalue())['message'] == 'Página costoso'
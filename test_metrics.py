@@ -0,0 +1,85 @@
+"""
+Pruebas de las métricas de Prometheus de los fillers (sin Chrome)
+"""
+
+from prometheus_client import REGISTRY
+
+from app import form_engine
+from app.bulk_fill import SCRIPT_LLENAR_MATRIZ
+from app.form_engine import filler_para, operaciones_formulario
+from app.metrics import DURACION_SECCION, cronometrar, registrar_celda
+from app.waits import Espera
+
+
+def _muestra(nombre, **etiquetas):
+    return REGISTRY.get_sample_value(nombre, etiquetas) or 0
+
+
+class FillerFalso:
+    FORM_TYPE = 'form_metricas'
+
+    @cronometrar(DURACION_SECCION, etiqueta_argumento='seccion')
+    def llenar_seccion(self, seccion_nombre, valores=None):
+        return seccion_nombre
+
+
+def test_secciones_y_celdas_por_metodo():
+    """La sección se etiqueta con su primer argumento; cada celda con el método que funcionó"""
+    assert FillerFalso().llenar_seccion('talento_humano') == 'talento_humano'
+    FillerFalso().llenar_seccion(seccion_nombre='talento_humano')
+    registrar_celda('form_metricas', 'input', 0)
+
+    etiquetas = {'form_type': 'form_metricas', 'seccion': 'talento_humano'}
+    assert _muestra('rpa_section_fill_seconds_count', **etiquetas) == 2
+    assert _muestra('rpa_matrix_cell_method_total', form_type='form_metricas', metodo='input') == 1
+    assert _muestra('rpa_matrix_cell_method_total', form_type='form_metricas', metodo='label') == 0
+
+
+def test_espera_se_observa_una_sola_vez():
+    """Sondear una espera ya cumplida no vuelve a observar su duración"""
+    espera = Espera('celda_marcada', lambda driver: True, form_type='form_metricas')
+    assert espera.sondear(None) and espera.sondear(None)
+
+    etiquetas = {'form_type': 'form_metricas', 'condicion': 'celda_marcada', 'resultado': 'cumplida'}
+    assert _muestra('rpa_wait_seconds_count', **etiquetas) == 1
+
+
+class DriverMatrizParcial:
+    """El script por sección marca todas las celdas salvo la primera (por 'input')"""
+
+    class Elemento:
+        def is_displayed(self):
+            return True
+
+        def is_selected(self):
+            return True
+
+    def execute_script(self, script, *args):
+        if script != SCRIPT_LLENAR_MATRIZ:
+            return 10_000
+        return [{'id': '', 'ok': i > 0, 'metodo': 'input', 'error': None if i > 0 else 'no_marcado'}
+                for i, _ in enumerate(args[0])]
+
+    def find_element(self, por, valor):
+        return self.Elemento()
+
+    def find_elements(self, por, valor):
+        return [self.Elemento()]
+
+
+def test_motor_mide_secciones_y_metodo_de_cada_celda(monkeypatch):
+    """El motor mide cada sección y cuenta las celdas del script y las reintentadas con Selenium"""
+    monkeypatch.setattr(form_engine, 'aplicar_operacion_webdriver', lambda driver, op, elemento=None: None)
+    operaciones = [op for op in operaciones_formulario('form2', {'pagina_2': {}})[1]
+                   if op.get('seccion') == 'alimentacion']
+
+    def muestras():
+        return (_muestra('rpa_section_fill_seconds_count', form_type='form2', seccion='alimentacion'),
+                _muestra('rpa_matrix_cell_method_total', form_type='form2', metodo='input'),
+                _muestra('rpa_matrix_cell_method_total', form_type='form2', metodo='selenium'))
+
+    antes = muestras()
+    filler = filler_para('form2')(driver=DriverMatrizParcial(), llenado_lote=True, llenado_pagina=False)
+    filler._llenar_seccion('alimentacion', operaciones, None)
+
+    assert [d - a for a, d in zip(antes, muestras())] == [1, len(operaciones) - 1, 1]
@@ -0,0 +1,31 @@
+"""
+Pruebas del enrutamiento de tareas a colas por prioridad (sin broker)
+"""
+
+from app.celery_app import celery_app
+from app.queues import colas_worker, enrutar_tarea
+
+
+def _cola(nombre, args, kwargs=None, opciones=None):
+    return celery_app.amqp.router.route(opciones or {}, nombre, args, kwargs or {})['queue'].name
+
+
+def test_reglas_de_enrutamiento():
+    assert _cola('app.tasks.execute_form_task', ('form2', {})) == 'interactive'
+    assert _cola('app.tasks.execute_form_task', ('form2', {}), {'batch_id': 'b1'}) == 'bulk'
+    assert _cola('app.tasks.execute_form_tabs_task', ('form2', [])) == 'bulk'
+    # La prioridad pedida por la API manda sobre la regla
+    assert _cola('app.tasks.execute_form_task', ('form2', {}), opciones={'queue': 'bulk'}) == 'bulk'
+    # Los workers vacían primero la cola interactiva
+    assert [cola.name for cola in celery_app.conf.task_queues] == ['interactive', 'bulk']
+    assert celery_app.conf.broker_transport_options['queue_order_strategy'] == 'priority'
+
+
+def test_colas_por_formulario(monkeypatch):
+    monkeypatch.setenv('QUEUE_PER_FORM', '1')
+    assert enrutar_tarea('app.tasks.execute_form_task', ('form3', {}, 'b1'), {}, {}) == {'queue': 'bulk.form3'}
+    assert enrutar_tarea('celery.chord_unlock', (), {}, {}) is None
+    assert colas_worker()[:4] == ['interactive.form1', 'interactive.form2', 'interactive.form3', 'interactive.form4']
+
+    monkeypatch.setenv('WORKER_QUEUES', 'interactive.form2, bulk')
+    assert colas_worker() == ['interactive.form2', 'bulk.form1', 'bulk.form2', 'bulk.form3', 'bulk.form4']
@@ -0,0 +1,123 @@
+"""
+Pruebas del turno por encuesta: lease, token y ajuste adaptativo (sin Redis)
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from app import rate_limit
+from app.rate_limit import LimiteExcedido, adquirir, objetivo_formulario, turno
+
+
+class RedisFalso:
+    def __init__(self):
+        self.liberados = []
+
+    def zrem(self, clave, lease):
+        self.liberados.append((clave, lease))
+
+
+class Reloj:
+    """Reloj manual: `dormir` lo adelanta"""
+
+    def __init__(self):
+        self.ahora = 0.0
+        self.pausas = []
+
+    def __call__(self):
+        return self.ahora
+
+    def dormir(self, segundos):
+        self.pausas.append(segundos)
+        self.ahora += segundos
+
+
+def test_espera_lease_y_token(monkeypatch):
+    redis = RedisFalso()
+    monkeypatch.setattr(rate_limit, 'get_redis', lambda: redis)
+    # Dos sondeos sin lease libre y un token disponible en 2 s
+    leases = iter([False, False, True])
+    tokens = iter([2.0, 0.0])
+    monkeypatch.setattr(rate_limit, '_tomar_lease', lambda r, objetivo, lease: next(leases))
+    monkeypatch.setattr(rate_limit, '_tomar_token', lambda r, objetivo: next(tokens))
+
+    reloj = Reloj()
+    espera = adquirir('encuesta', 'l1', espera_maxima=10, dormir=reloj.dormir, reloj=reloj)
+    assert len(reloj.pausas) == 3 and 2.0 <= reloj.pausas[-1] <= 2.4
+    assert espera == reloj.ahora
+    assert redis.liberados == []
+
+    # El token no llega a tiempo: se suelta el lease ya tomado
+    monkeypatch.setattr(rate_limit, '_tomar_lease', lambda r, objetivo, lease: True)
+    monkeypatch.setattr(rate_limit, '_tomar_token', lambda r, objetivo: 30.0)
+    with pytest.raises(LimiteExcedido):
+        adquirir('encuesta', 'l2', espera_maxima=10, dormir=reloj.dormir, reloj=reloj)
+    assert redis.liberados == [('ratelimit:encuesta:leases', 'l2')]
+
+
+def test_turno_informa_lentitud(monkeypatch):
+    redis = RedisFalso()
+    ajustes = []
+    monkeypatch.setattr(rate_limit, 'get_redis', lambda: redis)
+    monkeypatch.setattr(rate_limit, 'adquirir', lambda objetivo, lease, espera_maxima, dormir: 0.0)
+    monkeypatch.setattr(rate_limit, 'ajustar', lambda objetivo, lento: ajustes.append(lento))
+    objetivo = objetivo_formulario('form2')
+    assert objetivo == 'colsubsidio.az1.qualtrics.com/jfe/form/SV_6VaaNLR3jmRV4pw'
+
+    with turno('form2') as t:
+        t.registrar('navegacion', condicion='pagina_renderizada', resultado='cumplida', duracion=2.0)
+    # Un timeout cuenta como página lenta
+    with pytest.raises(TimeoutException):
+        with turno('form2'):
+            raise TimeoutException("La página 2 no cargó")
+    # Transición más lenta que RATE_SLOW_NAVIGATION_SECONDS (el llenado de la página no cuenta)
+    with turno('form2') as t:
+        t.registrar('pagina_iniciada', pagina=1)
+        t.registrar('navegacion', condicion='pagina_renderizada', resultado='cumplida', duracion=12.0)
+        t.registrar('pagina_completada', pagina=1)
+
+    assert ajustes == [False, True, True]
+    assert len(redis.liberados) == 3 and all(clave == f'ratelimit:{objetivo}:leases' for clave, _ in redis.liberados)
+
+    monkeypatch.setenv('RATE_LIMIT', '0')
+    with turno('form2') as t:
+        assert t.objetivo is None
+    assert len(ajustes) == 3
+
+
+def test_falta_de_turno_no_gasta_reintentos(monkeypatch):
+    """Los reintentos por falta de turno tienen su propio tope y no cuentan en max_retries"""
+    from celery.exceptions import Retry
+
+    from app import tasks
+
+    @contextmanager
+    def sin_turno(form_type):
+        raise LimiteExcedido("sin turno")
+        yield
+
+    monkeypatch.setattr(tasks, 'turno', sin_turno)
+    monkeypatch.setattr(tasks, 'envio_registrado', lambda form_type, clave: None)
+    monkeypatch.setattr(tasks, 'publicar_evento', lambda *args, **kwargs: None)
+    monkeypatch.setattr(tasks, 'liberar', lambda *args: None)
+    monkeypatch.setattr(tasks.execute_form_task, 'update_state', lambda **kwargs: None)
+
+    tarea = tasks.execute_form_task
+    # Cuarto intento de la tarea: tres reintentos previos fueron por falta de turno
+    tarea.push_request(id='t1', retries=3, args=('form2', {}), kwargs={'throttle_retries': 3}, is_eager=True, called_directly=False)
+    try:
+        with pytest.raises(Retry) as reintento:
+            tarea.run('form2', {}, throttle_retries=3)
+    finally:
+        tarea.pop_request()
+    assert reintento.value.sig.kwargs['throttle_retries'] == 4
+
+    monkeypatch.setattr(tasks, 'MAX_REINTENTOS_TURNO', 4)
+    tarea.push_request(id='t2', retries=4, args=('form2', {}), kwargs={'throttle_retries': 4}, is_eager=True, called_directly=False)
+    try:
+        resultado = tarea.run('form2', {}, throttle_retries=4)
+    finally:
+        tarea.pop_request()
+    assert resultado['status'] == 'failed' and resultado['error_type'] == 'transitorio'
@@ -0,0 +1,52 @@
+"""
+Pruebas del bloqueo de peticiones y del conteo de red por formulario (sin Chrome)
+"""
+
+import json
+
+import pytest
+
+from app.request_filter import URLS_PERMITIDAS, aplicar_bloqueo, coincide, medir_red, patrones_bloqueados
+
+
+class DriverFalso:
+    """Registra los comandos de CDP y devuelve eventos de red preparados"""
+
+    def __init__(self, eventos=()):
+        self.comandos = []
+        self.eventos = list(eventos)
+
+    def execute_cdp_cmd(self, comando, parametros):
+        self.comandos.append((comando, parametros))
+
+    def get_log(self, tipo):
+        entradas, self.eventos = self.eventos, []
+        return [{'message': json.dumps({'message': {'method': metodo, 'params': parametros}})}
+                for metodo, parametros in entradas]
+
+
+def test_bloqueo_respeta_la_lista_permitida(monkeypatch):
+    driver = DriverFalso()
+    assert aplicar_bloqueo(driver)
+    (_, _), (comando, parametros) = driver.comandos
+    assert comando == 'Network.setBlockedURLs'
+    assert any(coincide(p, 'https://www.google-analytics.com/collect?v=1') for p in parametros['urls'])
+    assert any(coincide(p, 'https://x.qualtrics.com/ControlPanel/Graphic.php?IM=IM_1') for p in parametros['urls'])
+    assert not any(coincide(p, url) for p in parametros['urls'] for url in URLS_PERMITIDAS)
+
+    monkeypatch.setenv('REQUEST_BLOCK_EXTRA', '*/jfe/static/*')
+    with pytest.raises(ValueError):
+        patrones_bloqueados()
+
+
+def test_medir_red_cuenta_peticiones_bloqueadas_y_bytes():
+    driver = DriverFalso([('Network.loadingFinished', {'encodedDataLength': 100})])
+    with medir_red(driver, 'form_red') as red:
+        driver.eventos = [
+            ('Network.loadingFinished', {'encodedDataLength': 2048}),
+            ('Network.loadingFinished', {'encodedDataLength': 512}),
+            ('Network.loadingFailed', {'blockedReason': 'inspector', 'errorText': 'net::ERR_BLOCKED_BY_CLIENT'}),
+            ('Network.requestWillBeSent', {}),
+        ]
+    # Los eventos anteriores al formulario se descartan
+    assert red == {'requests_loaded': 2, 'requests_blocked': 1, 'bytes_loaded': 2560}
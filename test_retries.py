@@ -0,0 +1,105 @@
+"""
+Pruebas de la clasificación de errores y la reanudación desde el punto de control (sin Chrome)
+"""
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+from app.errors import EnvioIncierto
+from app.form_engine import filler_para
+from app.http_engine import ErrorEnvioIncierto
+from app.retries import (
+    PuntoControl,
+    clasificar_error,
+    ejecutar_reanudable,
+    espera_reintento,
+)
+
+
+class DriverConValidacion:
+    def __init__(self, validacion=True):
+        self.validacion = validacion
+
+    def execute_script(self, script, *args):
+        return self.validacion
+
+
+class FillerFalso:
+    """Falla en la página 2 las primeras `fallos` veces"""
+
+    REANUDABLE = True
+    driver = None
+    llamadas = []
+
+    def __init__(self, notificar, fallos):
+        self.notificar = notificar
+        self.fallos = fallos
+
+    def ejecutar(self, datos, desde_pagina=None):
+        FillerFalso.llamadas.append(desde_pagina)
+        for pagina in range(desde_pagina or 1, 4):
+            if pagina == 2 and len(FillerFalso.llamadas) <= self.fallos:
+                raise TimeoutException("La página 2 no terminó de renderizarse")
+            self.notificar('pagina_completada', pagina=pagina)
+
+
+def test_clasificacion_y_backoff():
+    assert clasificar_error(TimeoutException()) == 'transitorio'
+    assert clasificar_error(NoSuchElementException()) == 'selector'
+    assert clasificar_error(KeyError('pagina_2')) == 'validacion'
+    assert clasificar_error(ErrorEnvioIncierto("envío final")) == 'envio_incierto'
+    # Qualtrics rechazó la página: el timeout no se arregla reintentando
+    assert clasificar_error(TimeoutException(), DriverConValidacion()) == 'validacion'
+
+    for intento in range(5):
+        assert 7.5 * 2 ** intento <= espera_reintento(intento) <= 15 * 2 ** intento
+    # Con tope de 300 s
+    assert 150 <= espera_reintento(10) <= 300
+
+
+def test_reanuda_desde_la_pagina_siguiente_al_punto_de_control():
+    FillerFalso.llamadas = []
+    punto_control = PuntoControl()
+    ejecutar_reanudable(lambda: FillerFalso(punto_control.registrar, fallos=1), {}, punto_control,
+                        dormir=lambda segundos: None)
+    assert FillerFalso.llamadas == [None, 2]
+    assert punto_control.como_dict() == {'last_page': 3, 'last_section': None, 'resumes': 1}
+
+    FillerFalso.llamadas = []
+    punto_control = PuntoControl()
+    with pytest.raises(TimeoutException) as error:
+        ejecutar_reanudable(lambda: FillerFalso(punto_control.registrar, fallos=5), {}, punto_control,
+                            reanudaciones=2, dormir=lambda segundos: None)
+    assert FillerFalso.llamadas == [None, 2, 2]
+    assert error.value.categoria_reintento == 'transitorio'
+
+
+@pytest.mark.parametrize('validacion', [False, True])
+def test_fallo_tras_el_envio_final_es_incierto(validacion):
+    """Sin confirmación del envío final no hay 'completado' ni reintento, salvo validación visible"""
+    filler = filler_para('form2')(driver=DriverConValidacion(validacion))
+
+    def pasos(datos, desde_pagina=None):
+        yield None
+        filler.envio_final_iniciado = True
+        raise TimeoutException("Qualtrics no confirmó el envío final")
+
+    filler.pasos = pasos
+    with pytest.raises(Exception) as error:
+        filler.ejecutar({})
+
+    if validacion:
+        assert type(error.value) is TimeoutException
+        assert clasificar_error(error.value, filler.driver) == 'validacion'
+    else:
+        assert isinstance(error.value, EnvioIncierto)
+        assert clasificar_error(error.value) == 'envio_incierto'
+        assert isinstance(error.value.__cause__, TimeoutException)
+
+    # Antes del clic final el error se informa tal cual
+    filler.envio_final_iniciado = False
+    fallo = TimeoutException()
+    assert filler.error_envio(fallo) is fallo
+    # La confirmación del envío es obligatoria: vencerla lanza en lugar de avisar
+    espera = filler.esperas.diferir(filler.esperas.envio_confirmado)
+    assert espera.obligatoria
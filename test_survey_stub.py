@@ -0,0 +1,60 @@
+"""
+Pruebas de la encuesta simulada y del envío por HTTP contra ella (sin Chrome)
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from app.form_specs import url_formulario
+from app.http_engine import filler_http_para
+from app.survey_stub import EncuestaSimulada
+
+
+EJEMPLOS = Path(__file__).parent / 'examples'
+
+
+@pytest.fixture
+def encuesta(monkeypatch):
+    with EncuestaSimulada(latencia_ms=0) as servidor:
+        monkeypatch.setenv('FORM_BASE_URL', servidor.url_base)
+        yield servidor
+
+
+def test_envio_http_queda_registrado_con_la_display_logic(encuesta):
+    """Las respuestas llegan con las claves de la especificación; las secciones ocultas se descartan"""
+    datos = json.loads((EJEMPLOS / 'form2_example.json').read_text(encoding='utf-8'))
+    datos['pagina_2'].update(apoyo_piscosocial='No', contacto_nutricionista='Si')
+
+    filler_http_para('form2')(respaldo=False).enviar(datos)
+
+    registro, = encuesta.respuestas
+    primera, segunda = registro['paginas'][1], registro['paginas'][2]
+    assert registro['form_type'] == 'form2'
+    assert primera['institucion'] == datos['lugar']
+    assert primera['recomendacion'] == datos['recomendacion']
+    assert segunda['habilidades_docentes'] == datos['pagina_2']['habilidades_docentes']
+    assert 'nutricionista' in segunda and 'profesionales_psicosocial' not in segunda
+
+
+def test_pagina_con_matriz_sin_responder_se_rechaza(encuesta):
+    """Como en Qualtrics, la página vuelve con un error y la sesión no avanza"""
+    ruta = next(f.ruta for f in encuesta.formularios.values() if f.form_type == 'form2')
+    _, _, sesion = encuesta.abrir(ruta)
+
+    _, segunda = encuesta.enviar(f"{ruta}/next", {'SessionId': sesion, 'PageNumber': '1'}, sesion)
+    _, rechazada = encuesta.enviar(f"{ruta}/next", {'SessionId': sesion, 'PageNumber': '2'}, sesion)
+
+    assert 'name="PageNumber" value="2"' in segunda
+    assert 'ValidationError' in rechazada and 'name="PageNumber" value="2"' in rechazada
+    assert encuesta.respuestas == []
+
+
+def test_url_de_los_fillers_se_redirige_por_entorno(monkeypatch):
+    """FORM{N}_URL tiene prioridad; FORM_BASE_URL cambia sólo el host"""
+    monkeypatch.setenv('FORM_BASE_URL', 'http://127.0.0.1:8090/')
+    monkeypatch.setenv('FORM3_URL', 'http://otro:9000/jfe/form/SV_prueba')
+
+    assert url_formulario('form2') == 'http://127.0.0.1:8090/jfe/form/SV_6VaaNLR3jmRV4pw'
+    assert url_formulario('form3') == 'http://otro:9000/jfe/form/SV_prueba'
@@ -0,0 +1,175 @@
+"""
+Pruebas del planificador de pestañas con un navegador simulado (sin Chrome)
+"""
+
+from app import tabs
+from app.rate_limit import LimiteExcedido
+from app.tabs import EjecutorPestanas
+
+
+class DriverFalso:
+    """Imita la gestión de ventanas de WebDriver"""
+
+    def __init__(self):
+        self.handles = ['tab-0']
+        self.current_window_handle = 'tab-0'
+        self.switch_to = self
+
+    def new_window(self, tipo):
+        self.handles.append(f'tab-{len(self.handles)}')
+        self.current_window_handle = self.handles[-1]
+
+    def window(self, handle):
+        self.current_window_handle = handle
+
+    def close(self):
+        self.handles.remove(self.current_window_handle)
+
+    def get(self, url):
+        pass
+
+
+class EsperaFalsa:
+    """Transición de página que se cumple tras `sondeos` consultas"""
+
+    def __init__(self, sondeos):
+        self.sondeos = sondeos
+
+    def sondear(self, driver):
+        self.sondeos -= 1
+        return self.sondeos <= 0
+
+
+class FillerFalso:
+    """Filler cuyo flujo registra en qué pestaña se ejecuta cada paso"""
+
+    registro = []
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def pasos(self, datos):
+        for pagina in range(2):
+            if datos.get('falla') and pagina == 1:
+                raise RuntimeError("fallo simulado")
+            FillerFalso.registro.append((datos['id'], pagina, self.driver.current_window_handle))
+            yield EsperaFalsa(sondeos=3)
+
+
+def test_pestanas_intercalan_y_aislan_fallos():
+    """Los formularios avanzan intercalados y un fallo no detiene a los demás"""
+    FillerFalso.registro = []
+    driver = DriverFalso()
+    lote = [{'id': 'a'}, {'id': 'b', 'falla': True}, {'id': 'c'}]
+
+    resultados = EjecutorPestanas(driver, FillerFalso, pestanas=2).ejecutar(lote)
+
+    assert [r['status'] for r in resultados] == ['completed', 'failed', 'completed']
+    # 'b' empezó antes de que 'a' terminara su primera transición
+    assert FillerFalso.registro[:2] == [('a', 0, 'tab-0'), ('b', 0, 'tab-1')]
+    # Cada paso corre en la pestaña de su formulario
+    pestanas = {}
+    for formulario, _, handle in FillerFalso.registro:
+        assert pestanas.setdefault(formulario, handle) == handle
+    assert driver.handles == ['tab-0']
+    print("✓ Pestañas intercaladas con fallos aislados")
+
+
+def test_cada_formulario_toma_su_turno(monkeypatch):
+    """Con concurrencia 1 en la encuesta, las pestañas no llenan dos formularios a la vez"""
+    activos = []
+    historial = {'tomados': 0, 'maximo': 0}
+
+    class TurnoFalso:
+        def __init__(self, form_type):
+            self.eventos = []
+
+        def tomar(self, espera_maxima=None):
+            if activos:
+                raise LimiteExcedido("encuesta ocupada")
+            activos.append(self)
+            historial['tomados'] += 1
+            historial['maximo'] = max(historial['maximo'], len(activos))
+            return self
+
+        def soltar(self, error=None):
+            activos.remove(self)
+
+        def registrar(self, evento, **datos):
+            self.eventos.append(evento)
+
+    class FillerConTurno(FillerFalso):
+        FORM_TYPE = 'form2'
+
+        def __init__(self, driver, notificar):
+            super().__init__(driver)
+            notificar('navegacion', duracion=0.1)
+
+    monkeypatch.setattr(tabs, 'Turno', TurnoFalso)
+    monkeypatch.setattr(tabs, 'INTERVALO_SONDEO', 0)
+    FillerFalso.registro = []
+
+    resultados = EjecutorPestanas(DriverFalso(), FillerConTurno, pestanas=2).ejecutar([{'id': 'a'}, {'id': 'b'}, {'id': 'c'}])
+
+    assert [r['status'] for r in resultados] == ['completed'] * 3
+    assert historial == {'tomados': 3, 'maximo': 1} and activos == []
+    print("✓ Un turno de la encuesta por formulario en pestañas")
+
+
+def test_tarea_en_pestanas_registra_cada_formulario(monkeypatch):
+    """Cada pestaña pasa por el registro de envíos y el progreso del lote; la entrega repetida no reenvía"""
+    from app import tasks
+
+    class FillerSinNavegador:
+        USA_NAVEGADOR = False
+        llenados = []
+
+        def ejecutar_en_pestanas(self, lista_datos, al_terminar=None):
+            resultados = []
+            for indice, datos in enumerate(lista_datos):
+                FillerSinNavegador.llenados.append(datos['id'])
+                resultado = {'indice': indice, 'status': datos['status'], 'duracion': 0.1}
+                if datos['status'] == 'failed':
+                    resultado.update(error='sin botón', error_type='selector')
+                al_terminar(resultado)
+                resultados.append(resultado)
+            return resultados
+
+    registro, lote, eventos = {}, [], []
+    monkeypatch.setitem(tasks.FORM_FILLERS, 'form2', FillerSinNavegador)
+    monkeypatch.setattr(tasks, 'envio_registrado', lambda form_type, clave: registro.get(clave))
+    monkeypatch.setattr(tasks, 'registrar_envio', lambda form_type, clave, task_id: registro.update({clave: {'task_id': task_id}}))
+    monkeypatch.setattr(tasks, 'liberar', lambda *args: lote.append(('liberar',) + args))
+    monkeypatch.setattr(tasks, 'marcar_inicio', lambda batch_id, task_id, *args: lote.append(('inicio', task_id)))
+    monkeypatch.setattr(tasks, 'marcar_exito', lambda batch_id, task_id: lote.append(('exito', task_id)))
+    monkeypatch.setattr(tasks, 'marcar_fallo', lambda batch_id, task_id, *args: lote.append(('fallo', task_id)))
+    monkeypatch.setattr(tasks, 'publicar_evento', lambda task_id, evento, *args, **datos: eventos.append(evento))
+    monkeypatch.setattr(tasks, 'registrar_formulario', lambda *args: None)
+    monkeypatch.setattr(tasks.execute_form_tabs_task, 'update_state', lambda **kwargs: None)
+
+    tarea = tasks.execute_form_tabs_task
+    lista = [{'id': 'a', 'status': 'completed'}, {'id': 'b', 'status': 'failed'}, {'id': 'c', 'status': 'partial'}]
+
+    def ejecutar():
+        tarea.push_request(id='t1', retries=0, is_eager=True, called_directly=False)
+        try:
+            return tarea.run('form2', lista, batch_id='t1', idempotency_key='k')
+        finally:
+            tarea.pop_request()
+
+    resumen = ejecutar()
+    assert resumen['status'] == 'partial'
+    assert [r['status'] for r in resumen['results']] == ['completed', 'failed', 'partial']
+    assert set(registro) == {'k:0', 'k:2'}
+    assert lote == [('inicio', 't1:0'), ('inicio', 't1:1'), ('inicio', 't1:2'),
+                    ('exito', 't1:0'), ('fallo', 't1:1'), ('exito', 't1:2')]
+    assert eventos[0] == 'STARTED' and eventos.count('PROGRESS') == 4 and eventos[-1] == 'SUCCESS'
+
+    # Entrega repetida: sólo se vuelve a llenar el que falló, con su índice original
+    FillerSinNavegador.llenados.clear()
+    lista[1]['status'] = 'completed'
+    resumen = ejecutar()
+    assert FillerSinNavegador.llenados == ['b']
+    assert [r['status'] for r in resumen['results']] == ['duplicate', 'completed', 'duplicate']
+    assert resumen['status'] == 'completed' and set(registro) == {'k:0', 'k:1', 'k:2'}
+    print("✓ Tarea en pestañas con registro de envíos y progreso por formulario")
@@ -0,0 +1,53 @@
+"""
+Pruebas de la publicación de eventos de tareas (sin Redis)
+"""
+
+import json
+
+from app import task_events
+from app.task_events import formato_sse, publicar_evento
+
+
+class PipelineFalso:
+    """Registra los comandos en lugar de enviarlos a Redis"""
+
+    def __init__(self, comandos):
+        self.comandos = comandos
+
+    def set(self, clave, valor, ex=None):
+        self.comandos.append(('set', clave, valor))
+
+    def publish(self, canal, mensaje):
+        self.comandos.append(('publish', canal, mensaje))
+
+    def execute(self):
+        pass
+
+
+class RedisFalso:
+    def __init__(self):
+        self.comandos = []
+
+    def pipeline(self, transaction=True):
+        return PipelineFalso(self.comandos)
+
+
+def test_evento_se_publica_en_tarea_y_lote(monkeypatch):
+    """Un evento guarda el último estado y llega a los canales de la tarea y del lote"""
+    redis = RedisFalso()
+    monkeypatch.setattr(task_events, 'get_redis', lambda: redis)
+
+    publicar_evento('t1', 'PAGE_COMPLETED', 'b1', pagina=1)
+
+    destinos = [(comando, clave) for comando, clave, _ in redis.comandos]
+    assert destinos == [
+        ('set', 'task:t1:last_event'),
+        ('publish', 'task:t1:events'),
+        ('publish', 'batch:b1:events'),
+    ]
+    evento = json.loads(redis.comandos[0][2])
+    assert evento['event'] == 'PAGE_COMPLETED' and evento['pagina'] == 1
+
+    sse = formato_sse(evento)
+    assert sse.startswith('event: PAGE_COMPLETED\ndata: {') and sse.endswith('\n\n')
+    print("✓ Eventos publicados en los canales de tarea y lote")
@@ -0,0 +1,44 @@
+"""
+Pruebas del progreso detallado de las tareas (sin Celery ni Redis)
+"""
+
+from app.task_progress import ProgresoTarea
+
+
+class RelojFalso:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+def test_progreso_espaciado_y_pasos_medidos():
+    """Las celdas se escriben como máximo una vez por intervalo; las páginas, siempre"""
+    reloj = RelojFalso()
+    escrituras = []
+    progreso = ProgresoTarea(escrituras.append, 'form2', intervalo=1.0, reloj=reloj)
+
+    progreso('pagina_iniciada', pagina=2)
+    progreso('seccion_iniciada', seccion='atencion', nombre='Atención', celdas=7)
+    for i in range(1, 8):
+        reloj.ahora += 0.1
+        progreso('celdas_completadas', seccion='atencion', completadas=i, celdas=7)
+    reloj.ahora += 0.5
+    progreso('seccion_completada', seccion='atencion')
+    reloj.ahora += 0.2
+    progreso('pagina_completada', pagina=2)
+
+    # Primera escritura inmediata, una al cumplirse el intervalo y la de la página
+    assert len(escrituras) == 3
+
+    meta = escrituras[1]
+    assert meta['page'] == 2 and meta['section'] == 'atencion'
+    assert (meta['cells_done'], meta['cells_total']) == (7, 7)
+    assert meta['status'] == 'Página 2: Atención (7/7 celdas)'
+
+    final = escrituras[-1]
+    assert [p['step'] for p in final['steps']] == ['atencion', 'pagina_2']
+    assert final['steps'][0]['seconds'] == 1.2
+    assert final['steps'][1]['seconds'] == 1.4
+    assert final['elapsed'] == 1.4
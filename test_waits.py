@@ -0,0 +1,73 @@
+"""
+Pruebas de la resolución del modo de espera por formulario
+"""
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from app import waits
+from app.waits import CONDICIONES, MODO_CONDICIONES, MODO_SLEEP, Condicion, Esperas, resolver_modo
+
+
+class DriverFinEncuesta:
+    """Driver falso: el DOM está estable y `#EndOfSurvey` aparece sólo si `fin` es True"""
+
+    def __init__(self, fin):
+        self.fin = fin
+
+    def execute_script(self, script, *args):
+        return 10_000
+
+    def find_elements(self, by, selector):
+        return [object()] if self.fin and selector == waits.SELECTOR_FIN_ENCUESTA else []
+
+
+def test_modo_espera_por_formulario(monkeypatch):
+    """FORM{N}_WAIT_MODE tiene prioridad sobre FORM_WAIT_MODE"""
+    monkeypatch.delenv('FORM_WAIT_MODE', raising=False)
+    monkeypatch.delenv('FORM2_WAIT_MODE', raising=False)
+    assert resolver_modo('form2') == MODO_CONDICIONES
+
+    monkeypatch.setenv('FORM_WAIT_MODE', 'sleep')
+    assert resolver_modo('form2') == MODO_SLEEP
+
+    monkeypatch.setenv('FORM2_WAIT_MODE', 'Condiciones')
+    assert resolver_modo('form2') == MODO_CONDICIONES
+    assert resolver_modo('form2', modo='sleep') == MODO_SLEEP
+
+    with pytest.raises(ValueError):
+        resolver_modo('form2', modo='rapido')
+    print("✓ Modo de espera resuelto por formulario")
+
+
+def test_transiciones_informan_su_duracion():
+    """Sólo las esperas de transición de página llegan como evento `navegacion`"""
+    eventos = []
+    esperas = Esperas(driver=None, form_type='form2', modo='condiciones',
+                      notificar=lambda evento, **datos: eventos.append((evento, datos)))
+
+    esperas._esperar('pagina_renderizada', lambda driver: True)
+    esperas._esperar('celda_marcada', lambda driver: True)
+
+    assert [evento for evento, _ in eventos] == ['navegacion']
+    assert eventos[0][1]['condicion'] == 'pagina_renderizada' and eventos[0][1]['resultado'] == 'cumplida'
+    assert eventos[0][1]['duracion'] >= 0
+    print("✓ Transiciones informadas al límite por encuesta")
+
+
+@pytest.mark.parametrize('modo', [MODO_CONDICIONES, MODO_SLEEP])
+def test_envio_confirmado_exige_fin_de_encuesta(monkeypatch, modo):
+    """Sin `#EndOfSurvey` el envío final no se da por confirmado, tampoco en modo 'sleep'"""
+    monkeypatch.setitem(CONDICIONES, 'envio_confirmado', Condicion(timeout=0.2, intervalo=0.02, sleep_legacy=0.05))
+
+    assert Esperas(DriverFinEncuesta(fin=True), form_type='form2', modo=modo).envio_confirmado()
+
+    esperas = Esperas(DriverFinEncuesta(fin=False), form_type='form2', modo=modo)
+    with pytest.raises(TimeoutException, match='fin de encuesta'):
+        esperas.envio_confirmado()
+
+    espera = esperas.diferir(esperas.envio_confirmado)
+    with pytest.raises(TimeoutException):
+        while not espera.sondear(esperas.driver):
+            pass
+    print(f"✓ Envío final confirmado sólo con la página de fin de encuesta ({modo})")
@@ -0,0 +1,23 @@
+"""
+Pruebas del dimensionamiento del worker según CPU/RAM
+"""
+
+from app import worker_capacity
+from app.worker_capacity import calcular_concurrencia
+
+
+def test_concurrencia_limitada_por_cpu_y_memoria(monkeypatch):
+    """Los slots los limita el recurso más escaso y el tamaño del pool de drivers"""
+    monkeypatch.delenv('WORKER_CONCURRENCY', raising=False)
+    monkeypatch.setattr(worker_capacity, 'CPUS_POR_NAVEGADOR', 1.0)
+    monkeypatch.setattr(worker_capacity, 'MEMORIA_POR_NAVEGADOR_MB', 700)
+    monkeypatch.setattr(worker_capacity, 'MEMORIA_RESERVADA_MB', 512)
+
+    assert calcular_concurrencia(cpus=8, memoria_mb=16000, navegadores_por_slot=1) == 8
+    assert calcular_concurrencia(cpus=8, memoria_mb=2612, navegadores_por_slot=1) == 3
+    assert calcular_concurrencia(cpus=8, memoria_mb=16000, navegadores_por_slot=2) == 4
+    assert calcular_concurrencia(cpus=0.5, memoria_mb=256, navegadores_por_slot=1) == 1
+
+    monkeypatch.setenv('WORKER_CONCURRENCY', '5')
+    assert calcular_concurrencia(cpus=1, memoria_mb=1000) == 5
+    print("✓ Concurrencia calculada según capacidad del nodo")